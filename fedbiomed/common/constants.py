@@ -202,6 +202,7 @@ class ErrorNumbers(_BaseEnum):
     FB320 = "FB320: bad model type"
     FB321 = "FB321: Secure aggregation delete error"
     FB322 = "FB322: Dataset registration error"
+    FB323 = "FB323: Intermediate aggregator error"
     # application error on researcher
 
     FB400 = "FB400: undetermined application error"
@@ -220,6 +221,7 @@ class ErrorNumbers(_BaseEnum):
     FB413 = "FB413: cannot save or load breakpoint for experiment"
     FB414 = "FB414: bad type or value for training arguments"
     FB415 = "FB415: secure aggregation handling error"
+    FB416 = "FB416: round quorum not reached before the round deadline"
 
     # node problem detected by researcher
 
@@ -8,7 +8,7 @@ Classes that simplify imports from fedbiomed.common.data
 
 from ._data_manager import DataManager
 from ._torch_data_manager import TorchDataManager
-from ._sklearn_data_manager import SkLearnDataManager, NPDataLoader
+from ._sklearn_data_manager import SkLearnDataManager, NPDataLoader, NPSubset
 from ._tabular_dataset import TabularDataset
 from ._medical_datasets import NIFTIFolderDataset, MedicalFolderDataset, MedicalFolderBase, MedicalFolderController, \
     MedicalFolderLoadingBlockTypes
@@ -32,6 +32,7 @@ __all__ = [
     "TabularDataset",
     "NIFTIFolderDataset",
     "NPDataLoader",
+    "NPSubset",
     "DataLoadingBlock",
     "MapperBlock",
     "DataLoadingPlan",
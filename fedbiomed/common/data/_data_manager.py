@@ -10,6 +10,7 @@ from typing import Union
 
 import numpy as np
 import pandas as pd
+from scipy import sparse
 
 from torch.utils.data import Dataset
 
@@ -27,7 +28,7 @@ class DataManager(object):
     PyTorch training.
     """
     def __init__(self,
-                 dataset: Union[np.ndarray, pd.DataFrame, pd.Series, Dataset],
+                 dataset: Union[np.ndarray, pd.DataFrame, pd.Series, sparse.spmatrix, Dataset],
                  target: Union[np.ndarray, pd.DataFrame, pd.Series] = None,
                  **kwargs: dict) -> None:
 
@@ -89,15 +90,17 @@ class DataManager(object):
                                                     f"dataset: {str(e)}")
 
             # For scikit-learn based training plans, the arguments `dataset` and `target` should be an instance
-            # one of `pd.DataFrame`, `pd.Series`, `np.ndarray`
-            elif isinstance(self._dataset, (pd.DataFrame, pd.Series, np.ndarray)) and \
+            # one of `pd.DataFrame`, `pd.Series`, `np.ndarray`, and `dataset` may be a scipy sparse matrix
+            elif (isinstance(self._dataset, (pd.DataFrame, pd.Series, np.ndarray)) or
+                  sparse.issparse(self._dataset)) and \
                     isinstance(self._target, (pd.DataFrame, pd.Series, np.ndarray)):
                 # Create Dataset for SkLearn training plans
                 self._data_manager_instance = SkLearnDataManager(inputs=self._dataset, target=self._target,
                                                                  **self._loader_arguments)
             else:
                 raise FedbiomedDataManagerError(f"{ErrorNumbers.FB607.value}: The argument `dataset` and `target` "
-                                                f"should be instance of pd.DataFrame, pd.Series or np.ndarray ")
+                                                f"should be instance of pd.DataFrame, pd.Series or np.ndarray, or "
+                                                f"`dataset` a scipy sparse matrix ")
         else:
             raise FedbiomedDataManagerError(f"{ErrorNumbers.FB607.value}: Undefined training plan")
 
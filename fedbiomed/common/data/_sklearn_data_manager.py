@@ -6,13 +6,18 @@ Data Management for scikit-learn in Fed-BioMed.
 
 This module introduces the NPDataLoader and SkLearnDataManager classes, to provide a data management interface for
 Fed-BioMed users relying on the scikit-learn framework that is similar to the interface for torch.
+
+Datasets may be memory-mapped on disk (eg. `np.load(path, mmap_mode='r')` on a `.npy` file): they are split into
+[`NPSubset`][fedbiomed.common.data.NPSubset] index arrays, and batches are read directly from the mapping.
+Input features may also be scipy sparse matrices, that are handled in CSR format and never densified.
 """
 
 
-from typing import Union, Tuple, Optional
+from typing import List, Union, Tuple, Optional
 
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.model_selection import train_test_split
 
 from fedbiomed.common.exceptions import FedbiomedValueError, FedbiomedTypeError
@@ -21,6 +26,68 @@ from fedbiomed.common.logger import logger
 from fedbiomed.common.utils import get_method_spec
 
 
+TAKE_CHUNK_SIZE = 4096
+"""Number of rows copied at once when materializing epochs with a type conversion"""
+
+
+class NPSubset:
+    """Subset of the rows of a numpy array, selected by an array of indices.
+
+    This is the numpy equivalent of `torch.utils.data.Subset`: rows are only read from the array when the subset is
+    indexed, so that splitting a large array, possibly memory-mapped on disk, does not copy it.
+
+    Attributes:
+        array: (np.ndarray, sparse.csr_matrix) the full array, possibly a `np.memmap` or a sparse matrix
+        indices: (np.ndarray) the indices of the rows of the subset
+    """
+
+    def __init__(self, array: Union[np.ndarray, sparse.csr_matrix], indices: np.ndarray):
+        """Construct the subset of an array.
+
+        Args:
+            array: numpy array, memory-mapped numpy array, or CSR sparse matrix
+            indices: 1D array of the indices of the rows of the subset
+        """
+        self.array = array
+        self.indices = np.asarray(indices, dtype=np.intp)
+
+    def __len__(self) -> int:
+        """Returns the number of rows of the subset"""
+        return len(self.indices)
+
+    def __getitem__(self, item):
+        """Reads rows of the subset, indexed as a numpy array"""
+        if isinstance(item, tuple):
+            return self.array[(self.indices[item[0]],) + item[1:]]
+        return self.array[self.indices[item]]
+
+    def __array__(self, dtype=None) -> np.ndarray:
+        """Reads all the rows of the subset into a numpy array"""
+        rows = self.array[self.indices]
+        if sparse.issparse(rows):
+            rows = rows.toarray()
+        return rows if dtype is None else rows.astype(dtype, copy=False)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Returns the shape of the subset"""
+        return (len(self.indices),) + self.array.shape[1:]
+
+    @property
+    def ndim(self) -> int:
+        """Returns the number of dimensions of the subset"""
+        return self.array.ndim
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Returns the type of the array"""
+        return self.array.dtype
+
+    def expand_dims(self) -> 'NPSubset':
+        """Returns the same subset of the 1-dimensional array, expanded to 2 dimensions"""
+        return NPSubset(self.array[:, np.newaxis], self.indices)
+
+
 class NPDataLoader:
     """DataLoader for a Numpy dataset.
 
@@ -28,49 +95,74 @@ class NPDataLoader:
     One design principle was to try to make the interface as similar as possible to a torch.DataLoader.
 
     Attributes:
-        _dataset: (np.ndarray) a 2d array of features
-        _target: (np.ndarray) an optional array of target values
+        _dataset: (np.ndarray, sparse.csr_matrix, NPSubset) a 2d array of features
+        _target: (np.ndarray, NPSubset) an optional array of target values
         _batch_size: (int) the number of elements in one batch
         _shuffle: (bool) if True, shuffle the data at the beginning of every epoch
         _drop_last: (bool) if True, drop the last batch if it does not contain batch_size elements
         _rng: (np.random.Generator) the random number generator for shuffling
+        _materialize: (bool) if True, permute the data once per epoch and yield contiguous views of batches
+        _dtype: (np.dtype) an optional floating point type of the yielded features
+        _index: (np.ndarray) the indices of the current epoch, reused over epochs
+        _features: (np.ndarray) the features from which unshuffled epochs are materialized, cast to `_dtype`
+            unless they are memory-mapped
+        _buffers: (tuple) the preallocated features and target arrays of the materialized epoch
+        _sparse: (bool) whether the features are a sparse matrix
     """
 
     def __init__(self,
-                 dataset: np.ndarray,
-                 target: np.ndarray,
+                 dataset: Union[np.ndarray, sparse.spmatrix, NPSubset],
+                 target: Union[np.ndarray, NPSubset],
                  batch_size: int = 1,
                  shuffle: bool = False,
                  random_seed: Optional[int] = None,
-                 drop_last: bool = False):
+                 drop_last: bool = False,
+                 materialize: bool = False,
+                 dtype: Optional[Union[str, type, np.dtype]] = None):
         """Construct numpy data loader
 
         Args:
-            dataset: 2D Numpy array
-            target: Numpy array of target values
+            dataset: 2D Numpy array, possibly memory-mapped, scipy sparse matrix (converted to CSR format), or
+                subset of the rows of an array. Batches of a sparse matrix are CSR matrices.
+            target: Numpy array of target values, or subset of the rows of an array
             batch_size: batch size for each iteration
             shuffle: shuffle before iteration
             random_seed: an optional integer to set the numpy random seed for shuffling. If it equals
                 None, then no attempt will be made to set the random seed.
             drop_last: whether to drop the last batch in case it does not fill the whole batch size
+            materialize: whether to permute the whole dataset once per epoch into preallocated buffers, and yield
+                batches as contiguous views of these buffers instead of copies. Buffers are reused over epochs:
+                batches are only valid until the next epoch starts. Without shuffling, batches are views of the
+                dataset itself. This mostly benefits small batches and narrow tables: for wide tables whose
+                permuted copy does not fit in the CPU caches, combine it with `dtype='float32'`.
+            dtype: an optional floating point type (eg. `'float32'`) of the yielded features. Targets keep
+                their type. When materializing unshuffled epochs, an in-memory dataset is cast once, at the first
+                epoch, while batches of a memory-mapped dataset are cast one at a time.
+
+        Sparse features are materialized into a new row-permuted CSR matrix at each epoch, rather than into a
+        preallocated buffer.
         """
 
-        if not isinstance(dataset, np.ndarray) or not isinstance(target, np.ndarray):
+        if not isinstance(dataset, (np.ndarray, NPSubset)) and not sparse.issparse(dataset) or \
+                not isinstance(target, (np.ndarray, NPSubset)):
             msg = f"{ErrorNumbers.FB609.value}. Wrong input type for `dataset` or `target` in NPDataLoader. " \
-                  f"Expected type np.ndarray for both, instead got {type(dataset)} and" \
-                  f"{type(target)} respectively."
+                  f"Expected type np.ndarray or NPSubset for both, or a scipy sparse matrix for `dataset`, " \
+                  f"instead got {type(dataset)} and {type(target)} respectively."
             logger.error(msg)
             raise FedbiomedTypeError(msg)
 
+        if sparse.issparse(dataset):
+            dataset = sparse.csr_matrix(dataset)
+
         # If the researcher gave a 1-dimensional dataset, we expand it to 2 dimensions
         if dataset.ndim == 1:
             logger.info(f"NPDataLoader expanding 1-dimensional dataset to become 2-dimensional.")
-            dataset = dataset[:, np.newaxis]
+            dataset = dataset.expand_dims() if isinstance(dataset, NPSubset) else dataset[:, np.newaxis]
 
         # If the researcher gave a 1-dimensional target, we expand it to 2 dimensions
         if target.ndim == 1:
             logger.info(f"NPDataLoader expanding 1-dimensional target to become 2-dimensional.")
-            target = target[:, np.newaxis]
+            target = target.expand_dims() if isinstance(target, NPSubset) else target[:, np.newaxis]
 
         if dataset.ndim != 2 or target.ndim != 2:
             msg = f"{ErrorNumbers.FB609.value}. Wrong shape for `dataset` or `target` in NPDataLoader. " \
@@ -79,9 +171,9 @@ class NPDataLoader:
             logger.error(msg)
             raise FedbiomedValueError(msg)
 
-        if len(dataset) != len(target):
+        if dataset.shape[0] != target.shape[0]:
             msg = f"{ErrorNumbers.FB609.value}. Inconsistent length for `dataset` and `target` in NPDataLoader. " \
-                  f"Expected same length, instead got len(dataset)={len(dataset)}, len(target)={len(target)}"
+                  f"Expected same length, instead got len(dataset)={dataset.shape[0]}, len(target)={target.shape[0]}"
             logger.error(msg)
             raise FedbiomedValueError(msg)
 
@@ -115,16 +207,43 @@ class NPDataLoader:
             logger.error(msg)
             raise FedbiomedTypeError(msg)
 
+        if not isinstance(materialize, bool):
+            msg = f"{ErrorNumbers.FB609.value}. Wrong type for `materialize` parameter of NPDataLoader. " \
+                  f"Expected `bool`, instead got {type(materialize)}."
+            logger.error(msg)
+            raise FedbiomedTypeError(msg)
+
+        if dtype is not None:
+            try:
+                dtype = np.dtype(dtype)
+            except TypeError:
+                msg = f"{ErrorNumbers.FB609.value}. Wrong type for `dtype` parameter of NPDataLoader. " \
+                      f"Expected a numpy floating point type or None, instead got {dtype}."
+                logger.error(msg)
+                raise FedbiomedTypeError(msg)
+            if not np.issubdtype(dtype, np.floating):
+                msg = f"{ErrorNumbers.FB609.value}. Wrong value for `dtype` parameter of NPDataLoader. " \
+                      f"Expected a numpy floating point type or None, instead got {dtype}."
+                logger.error(msg)
+                raise FedbiomedValueError(msg)
+
         self._dataset = dataset
         self._target = target
         self._batch_size = batch_size
         self._shuffle = shuffle
         self._drop_last = drop_last
         self._rng = np.random.default_rng(random_seed)
+        self._materialize = materialize
+        self._dtype = dtype
+        self._index = None
+        self._features = None
+        self._buffers = None
+        self._sparse = sparse.issparse(dataset.array if isinstance(dataset, NPSubset) else dataset)
+        self._classes = None
 
     def __len__(self) -> int:
         """Returns the length of the encapsulated dataset"""
-        n = len(self._dataset) // self._batch_size
+        n = self._dataset.shape[0] // self._batch_size
         if not self._drop_last and self.n_remainder_samples() != 0:
             n += 1
         return n
@@ -134,7 +253,7 @@ class NPDataLoader:
         return _BatchIterator(self)
 
     @property
-    def dataset(self) -> np.ndarray:
+    def dataset(self) -> Union[np.ndarray, sparse.csr_matrix, NPSubset]:
         """Returns the encapsulated dataset
 
         This needs to be a property to harmonize the API with torch.DataLoader, enabling us to write
@@ -143,7 +262,7 @@ class NPDataLoader:
         return self._dataset
 
     @property
-    def target(self) -> np.ndarray:
+    def target(self) -> Union[np.ndarray, NPSubset]:
         """Returns the array of target values
 
         This has been made a property to have a homogeneous interface with the dataset property above.
@@ -166,9 +285,89 @@ class NPDataLoader:
         """Returns the boolean drop_last attribute"""
         return self._drop_last
 
+    def materialize(self) -> bool:
+        """Returns the boolean materialize attribute"""
+        return self._materialize
+
+    def dtype(self) -> Optional[np.dtype]:
+        """Returns the type of the yielded features, or None if the dataset's type is kept"""
+        return self._dtype
+
+    def classes(self) -> np.ndarray:
+        """Returns the unique target labels of the loader.
+
+        Labels are computed once, with a single `np.unique` over the target array, unless they were set with
+        `set_classes`, eg. by the data manager from the labels of the whole dataset.
+        """
+        if self._classes is None:
+            self._classes = np.unique(np.asarray(self._target))
+        return self._classes
+
+    def set_classes(self, classes: Union[np.ndarray, List]) -> None:
+        """Sets the unique target labels returned by `classes`, instead of computing them from the target.
+
+        Args:
+            classes: unique target labels
+        """
+        self._classes = np.unique(np.asarray(classes))
+
     def n_remainder_samples(self) -> int:
         """Returns the remainder of the division between dataset length and batch size."""
-        return len(self._dataset) % self._batch_size
+        return self._dataset.shape[0] % self._batch_size
+
+    def _epoch_index(self) -> np.ndarray:
+        """Returns the indices of the samples of a new epoch, shuffled if shuffle is True.
+
+        The index array is allocated once, and the permutation of the previous epoch is shuffled in place at each
+        epoch, which gives a uniformly random permutation as well.
+        """
+        if self._index is None:
+            self._index = np.arange(self._dataset.shape[0])
+        if self._shuffle:
+            self._rng.shuffle(self._index)
+        return self._index
+
+    def _epoch_data(self, index: np.ndarray) -> Tuple[Union[np.ndarray, sparse.csr_matrix], np.ndarray]:
+        """Materializes the features and target of an epoch in the order of `index`.
+
+        Without shuffling, the dataset and target arrays are returned as is. An in-memory dataset is cast at the
+        first epoch, but not a memory-mapped one, that may not fit in memory: its batches are cast by the iterator.
+        Otherwise, or for subsets, rows are copied into buffers that are allocated at the first epoch and reused
+        for the next ones. Sparse features are copied into a new CSR matrix.
+        """
+        if not self._shuffle and isinstance(self._dataset, np.ndarray) and isinstance(self._target, np.ndarray):
+            if self._features is None:
+                self._features = self._dataset if self._dtype is None or isinstance(self._dataset, np.memmap) \
+                    else self._dataset.astype(self._dtype, copy=False)
+            return self._features[:len(index)], self._target[:len(index)]
+
+        if self._buffers is None:
+            self._buffers = (
+                None if self._sparse else
+                np.empty((len(index), self._dataset.shape[1]), dtype=self._dtype or self._dataset.dtype),
+                np.empty((len(index), self._target.shape[1]), dtype=self._target.dtype)
+            )
+        features, target = self._buffers
+        if self._sparse:
+            features = self._dataset[index]
+            if self._dtype is not None:
+                features = features.astype(self._dtype, copy=False)
+        else:
+            self._take(self._dataset, index, features)
+        self._take(self._target, index, target)
+        return features, target
+
+    @staticmethod
+    def _take(array: Union[np.ndarray, NPSubset], index: np.ndarray, out: np.ndarray) -> None:
+        """Copies the rows `index` of an array, or of a subset, into `out`."""
+        if isinstance(array, NPSubset):
+            array, index = array.array, array.indices[index]
+        if array.dtype == out.dtype:
+            # mode 'clip' avoids buffering the output, indices are valid
+            np.take(array, index, axis=0, out=out, mode='clip')
+        else:
+            for start in range(0, len(index), TAKE_CHUNK_SIZE):
+                out[start:start + TAKE_CHUNK_SIZE] = array[index[start:start + TAKE_CHUNK_SIZE]]
 
 
 class _BatchIterator:
@@ -178,6 +377,7 @@ class _BatchIterator:
         _loader: (NPDataLoader) the data loader that created this iterator
         _index: (np.array) an array  of indices into the data loader's data
         _num_yielded: (int) the number of batches yielded in the current epoch
+        _epoch: (tuple) the materialized features and target of the current epoch, if the loader materializes epochs
     """
     def __init__(self, loader: NPDataLoader):
         """Constructs the _BatchIterator.
@@ -188,6 +388,7 @@ class _BatchIterator:
         self._loader = loader
         self._index = None
         self._num_yielded = 0
+        self._epoch = None
         self._reset()
 
     def _reset(self):
@@ -196,13 +397,8 @@ class _BatchIterator:
         restore num_yielded to 0, reshuffles the indices if shuffle is True, and applies drop_last
         """
         self._num_yielded = 0
-        dlen = len(self._loader.dataset)
-
-        self._index = np.arange(dlen)
-
-        # Perform the optional shuffling.
-        if self._loader.shuffle():
-            self._loader.rng().shuffle(self._index)
+        self._epoch = None
+        self._index = self._loader._epoch_index()
 
         # Optionally drop the last samples if they make for a smaller batch.
         if self._loader.drop_last() and self._loader.n_remainder_samples() != 0:
@@ -214,6 +410,9 @@ class _BatchIterator:
         if no target array was provided to the data loader, it will return (dataset_batch, None), else it will return
         (features_batch, target_batch).
 
+        If the data loader materializes epochs, the data of the epoch is permuted when its first batch is requested,
+        and batches are contiguous views of the permuted data.
+
         Automatically resets the iterator after each epoch.
 
         Raises:
@@ -222,12 +421,26 @@ class _BatchIterator:
         if self._num_yielded < len(self._loader):
             start = self._num_yielded*self._loader.batch_size()
             stop = (self._num_yielded+1)*self._loader.batch_size()
-            indices = self._index[start:stop]
             self._num_yielded += 1
+
+            if self._loader.materialize():
+                if self._epoch is None:
+                    self._epoch = self._loader._epoch_data(self._index)
+                features, target = self._epoch
+                features = features[start:stop]
+                if self._loader.dtype() is not None:
+                    # no copy, unless the epoch is a memory-mapped dataset that is not cast
+                    features = features.astype(self._loader.dtype(), copy=False)
+                return features, None if target is None else target[start:stop]
+
+            indices = self._index[start:stop]
+            features = self._loader.dataset[indices, :]
+            if self._loader.dtype() is not None:
+                features = features.astype(self._loader.dtype(), copy=False)
             if self._loader.target is None:
-                return self._loader.dataset[indices, :], None
+                return features, None
             else:
-                return self._loader.dataset[indices, :], self._loader.target[indices, :]
+                return features, self._loader.target[indices, :]
 
         # Set index to zero for next epochs
         self._reset()
@@ -239,9 +452,16 @@ class SkLearnDataManager(object):
 
     Manages datasets for scikit-learn based model training. Responsible for managing inputs, and target
     variables that have been provided in `training_data` of scikit-learn based training plans.
+
+    Numpy arrays are not copied: they may be memory-mapped on disk, eg. with `np.load(path, mmap_mode='r')`, for
+    datasets larger than the memory. Training and validation subsets are [`NPSubset`][fedbiomed.common.data.NPSubset]
+    index arrays over the dataset.
+
+    Inputs may also be scipy sparse matrices, converted to CSR format. Their subsets are always `NPSubset` objects,
+    whose length is defined, unlike the length of sparse matrices.
     """
     def __init__(self,
-                 inputs: Union[np.ndarray, pd.DataFrame, pd.Series],
+                 inputs: Union[np.ndarray, pd.DataFrame, pd.Series, sparse.spmatrix],
                  target: Union[np.ndarray, pd.DataFrame, pd.Series],
                  **kwargs: dict):
 
@@ -257,16 +477,19 @@ class SkLearnDataManager(object):
             **kwargs: Loader arguments
         """
 
-        if not isinstance(inputs, (np.ndarray, pd.DataFrame, pd.Series)) or \
+        if not isinstance(inputs, (np.ndarray, pd.DataFrame, pd.Series)) and not sparse.issparse(inputs) or \
                 not isinstance(target, (np.ndarray, pd.DataFrame, pd.Series)):
             msg = f"{ErrorNumbers.FB609.value}. Parameters `inputs` and `target` for " \
-                  f"initialization of {self.__class__.__name__} should be one of np.ndarray, pd.DataFrame, pd.Series"
+                  f"initialization of {self.__class__.__name__} should be one of np.ndarray, pd.DataFrame, " \
+                  f"pd.Series, or a scipy sparse matrix for `inputs`"
             logger.error(msg)
             raise FedbiomedTypeError(msg)
 
         # Convert pd.DataFrame or pd.Series to np.ndarray for `inputs`
         if isinstance(inputs, (pd.DataFrame, pd.Series)):
             self._inputs = inputs.to_numpy()
+        elif sparse.issparse(inputs):
+            self._inputs = sparse.csr_matrix(inputs)
         else:
             self._inputs = inputs
 
@@ -279,11 +502,16 @@ class SkLearnDataManager(object):
         # Additional loader arguments
         self._loader_arguments = kwargs
 
+        # Unique target labels, computed once when first needed (or set from the dataset's metadata)
+        self._classes: Optional[np.ndarray] = None
+        # Whether `_classes` are known to be the labels of the target, or still need to be checked
+        self._classes_checked = False
+
         # Subset None means that train/validation split has not been performed
-        self._subset_test: Union[Tuple[np.ndarray, np.ndarray], None] = None
-        self._subset_train: Union[Tuple[np.ndarray, np.ndarray], None] = None
+        self._subset_test: Union[Tuple[Union[np.ndarray, NPSubset], Union[np.ndarray, NPSubset]], None] = None
+        self._subset_train: Union[Tuple[Union[np.ndarray, NPSubset], Union[np.ndarray, NPSubset]], None] = None
 
-    def dataset(self) -> Tuple[np.ndarray, np.ndarray]:
+    def dataset(self) -> Tuple[Union[np.ndarray, sparse.csr_matrix], np.ndarray]:
         """Gets the entire registered dataset.
 
         This method returns whole dataset as it is without any split.
@@ -294,7 +522,39 @@ class SkLearnDataManager(object):
         """
         return self._inputs, self._target
 
-    def subset_test(self) -> Tuple[np.ndarray, np.ndarray]:
+    def classes(self) -> np.ndarray:
+        """Gets the unique target labels of the whole dataset.
+
+        Labels are computed with a single `np.unique` over the target array, and cached with the dataset. Labels
+        set with `set_classes` are checked against the target at first use instead, which is cheaper.
+
+        Returns:
+            Sorted unique target labels
+        """
+        if self._classes is not None and not self._classes_checked and \
+                not self._are_target_labels(self._classes, self._target):
+            logger.warning(f"Labels {self._classes.tolist()[:10]} of the dataset's metadata are not the labels of "
+                           f"the target returned by the training plan (eg. the target is mapped or binarized): "
+                           f"computing the labels from the target instead.")
+            self._classes = None
+        if self._classes is None:
+            self._classes = np.unique(np.asarray(self._target))
+        self._classes_checked = True
+        return self._classes
+
+    def set_classes(self, classes: Union[np.ndarray, List]) -> None:
+        """Sets the unique target labels of the dataset, eg. stored in the dataset's metadata at registration.
+
+        Labels are checked at first use: if they are not the labels of the target, they are replaced by the labels
+        computed from the target.
+
+        Args:
+            classes: unique target labels of the dataset
+        """
+        self._classes = np.unique(np.asarray(classes))
+        self._classes_checked = False
+
+    def subset_test(self) -> Tuple[Union[np.ndarray, NPSubset], Union[np.ndarray, NPSubset]]:
         """Gets Subset of dataset for validation partition.
 
         Returns:
@@ -303,7 +563,7 @@ class SkLearnDataManager(object):
         """
         return self._subset_test
 
-    def subset_train(self) -> Tuple[np.ndarray, np.ndarray]:
+    def subset_train(self) -> Tuple[Union[np.ndarray, NPSubset], Union[np.ndarray, NPSubset]]:
 
         """Gets Subset for train partition.
 
@@ -317,6 +577,9 @@ class SkLearnDataManager(object):
     def split(self, test_ratio: float) -> Tuple[NPDataLoader, NPDataLoader]:
         """Splits `np.ndarray` dataset into train and validation.
 
+        Subsets are index arrays over the dataset, the dataset is not copied. Validation indices are sorted, to read
+        the validation subset in the order of the dataset.
+
         Args:
              test_ratio: Ratio for validation set partition. Rest of the samples will be used for training
 
@@ -338,25 +601,67 @@ class SkLearnDataManager(object):
             logger.error(msg)
             raise FedbiomedTypeError(msg)
 
-        empty_subset = (np.array([]), np.array([]))
+        n_samples = self._inputs.shape[0]
+        if sparse.issparse(self._inputs):
+            empty_subset = (NPSubset(self._inputs, []), NPSubset(self._target, []))
+        else:
+            empty_subset = (np.array([]), np.array([]))
 
         if test_ratio <= 0.:
-            self._subset_train = (self._inputs, self._target)
+            self._subset_train = self._full_subset()
             self._subset_test = empty_subset
         elif test_ratio >= 1.:
             self._subset_train = empty_subset
-            self._subset_test = (self._inputs, self._target)
+            self._subset_test = self._full_subset()
         else:
-            x_train, x_test, y_train, y_test = train_test_split(self._inputs, self._target, test_size=test_ratio)
-            self._subset_test = (x_test, y_test)
-            self._subset_train = (x_train, y_train)
+            train_indices, test_indices = train_test_split(np.arange(n_samples), test_size=test_ratio)
+            test_indices.sort()
+            self._subset_test = (NPSubset(self._inputs, test_indices), NPSubset(self._target, test_indices))
+            self._subset_train = (NPSubset(self._inputs, train_indices), NPSubset(self._target, train_indices))
+
+        test_batch_size = max(1, self._subset_test[0].shape[0])
+        train_loader = self._subset_loader(self._subset_train, **self._loader_arguments)
+        test_loader = self._subset_loader(self._subset_test, batch_size=test_batch_size)
+        # both loaders share the labels of the whole dataset, so that they are computed at most once
+        if self._classes is not None:
+            train_loader.set_classes(self.classes())
+            test_loader.set_classes(self.classes())
+        return train_loader, test_loader
 
-        test_batch_size = max(1, len(self._subset_test[0]))
-        return self._subset_loader(self._subset_train, **self._loader_arguments), \
-            self._subset_loader(self._subset_test, batch_size=test_batch_size)
+    @staticmethod
+    def _are_target_labels(classes: np.ndarray, target: Union[np.ndarray, NPSubset]) -> bool:
+        """Checks that sorted unique labels are exactly the labels of a target array.
+
+        Each target value is located in the labels with a binary search, which is cheaper than sorting the target.
+
+        Args:
+            classes: sorted unique labels
+            target: target array
+
+        Returns:
+            True if all target values are labels, and all labels are target values
+        """
+        target = np.asarray(target).reshape(-1)
+        if len(classes) == 0:
+            return len(target) == 0
+        try:
+            positions = np.minimum(np.searchsorted(classes, target), len(classes) - 1)
+        except (TypeError, ValueError):
+            # labels and target values cannot be compared, eg. strings and numbers
+            return False
+        return bool(np.all(classes[positions] == target)) and \
+            bool(np.all(np.bincount(positions, minlength=len(classes)) > 0))
+
+    def _full_subset(self) -> Tuple[Union[np.ndarray, NPSubset], Union[np.ndarray, NPSubset]]:
+        """Returns the whole dataset as a subset: arrays as is, or sparse matrices wrapped in `NPSubset` objects."""
+        if sparse.issparse(self._inputs):
+            indices = np.arange(self._inputs.shape[0])
+            return NPSubset(self._inputs, indices), NPSubset(self._target, indices)
+        return self._inputs, self._target
 
     @staticmethod
-    def _subset_loader(subset: Tuple[np.ndarray, np.ndarray], **loader_arguments) -> Optional[NPDataLoader]:
+    def _subset_loader(subset: Tuple[Union[np.ndarray, NPSubset], Union[np.ndarray, NPSubset]],
+                       **loader_arguments) -> Optional[NPDataLoader]:
         """Loads subset partition for SkLearn based training plans.
 
         Raises:
@@ -367,11 +672,11 @@ class SkLearnDataManager(object):
         """
         if not isinstance(subset, Tuple) \
                 or len(subset) != 2 \
-                or not isinstance(subset[0], np.ndarray) \
-                or not isinstance(subset[1], np.ndarray):
+                or not (isinstance(subset[0], (np.ndarray, NPSubset)) or sparse.issparse(subset[0])) \
+                or not isinstance(subset[1], (np.ndarray, NPSubset)):
 
             raise FedbiomedTypeError(f'{ErrorNumbers.FB609.value}: The argument `subset` should a Tuple of size 2 '
-                                     f'that contains inputs/data and target as np.ndarray.')
+                                     f'that contains inputs/data and target as np.ndarray or NPSubset.')
 
         try:
             loader = NPDataLoader(dataset=subset[0], target=subset[1], **loader_arguments)
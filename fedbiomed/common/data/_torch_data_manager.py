@@ -6,8 +6,10 @@ Torch data manager
 """
 
 import math
-from typing import Union, Tuple
+import tempfile
+from typing import Optional, Union, Tuple
 
+import numpy as np
 from torch.utils.data import Dataset, Subset, DataLoader
 from torch.utils.data import random_split
 
@@ -17,6 +19,10 @@ from fedbiomed.common.constants import ErrorNumbers
 from ._sklearn_data_manager import SkLearnDataManager
 
 
+TO_SKLEARN_CHUNK_SIZE = 1024
+"""Number of samples collated at once when converting a PyTorch dataset to numpy arrays"""
+
+
 class TorchDataManager(object):
     """Wrapper for PyTorch Dataset to manage loading operations for validation and train."""
 
@@ -129,20 +135,71 @@ class TorchDataManager(object):
 
         return loaders
 
-    def to_sklearn(self) -> SkLearnDataManager:
+    def to_sklearn(self,
+                   chunk_size: int = TO_SKLEARN_CHUNK_SIZE,
+                   mmap_dir: Optional[str] = None) -> SkLearnDataManager:
         """Converts PyTorch `Dataset` to sklearn data manager of Fed-BioMed.
 
+        The dataset is read once, in chunks of `chunk_size` samples collated by a PyTorch `DataLoader`, that are
+        copied into preallocated numpy arrays. Shapes and types of the arrays are those of the first chunk. Peak
+        memory is the size of the arrays, plus one chunk.
+
+        Args:
+            chunk_size: Number of samples collated at once
+            mmap_dir: Directory where the input and target arrays are written as `.npy` files, memory-mapped
+                instead of held in memory. Files are not removed. Defaults to None (arrays in memory).
+
+        Raises:
+            FedbiomedTorchDataManagerError: If the dataset is empty, or does not have the number of samples given
+                by its length
+
         Returns:
             Data manager to use in SkLearn base training plans
         """
-
-        loader = self._create_torch_data_loader(self._dataset, batch_size=len(self._dataset))
-        # Iterate over samples and get input variable and target variable
-        inputs = next(iter(loader))[0].numpy()
-        target = next(iter(loader))[1].numpy()
+        n_samples = len(self._dataset)
+        if n_samples == 0:
+            raise FedbiomedTorchDataManagerError(f"{ErrorNumbers.FB608.value}: Can not convert an empty dataset "
+                                                 f"to a numpy based dataset")
+
+        loader = self._create_torch_data_loader(self._dataset, batch_size=chunk_size)
+        inputs, target = None, None
+        start = 0
+        # Iterate over chunks of samples and copy input variable and target variable
+        for chunk_inputs, chunk_target in loader:
+            chunk_inputs, chunk_target = chunk_inputs.numpy(), chunk_target.numpy()
+            if inputs is None:
+                inputs = self._allocate_array(n_samples, chunk_inputs, mmap_dir)
+                target = self._allocate_array(n_samples, chunk_target, mmap_dir)
+            stop = start + chunk_inputs.shape[0]
+            if stop > n_samples:
+                break
+            inputs[start:stop] = chunk_inputs
+            target[start:stop] = chunk_target
+            start = stop
+
+        if start != n_samples:
+            raise FedbiomedTorchDataManagerError(f"{ErrorNumbers.FB608.value}: Can not convert dataset "
+                                                 f"{str(self._dataset)}, its length {n_samples} is not its number "
+                                                 f"of samples")
 
         return SkLearnDataManager(inputs=inputs, target=target, **self._loader_arguments)
 
+    @staticmethod
+    def _allocate_array(n_samples: int, chunk: np.ndarray, mmap_dir: Optional[str] = None) -> np.ndarray:
+        """Allocates an array of `n_samples` samples of the shape and type of the samples of `chunk`.
+
+        Args:
+            n_samples: Number of samples of the array
+            chunk: First chunk of samples
+            mmap_dir: Directory of the memory-mapped `.npy` file of the array, or None for an array in memory
+        """
+        shape = (n_samples,) + chunk.shape[1:]
+        if mmap_dir is None:
+            return np.empty(shape, dtype=chunk.dtype)
+        with tempfile.NamedTemporaryFile(dir=mmap_dir, suffix='.npy', delete=False) as file:
+            filename = file.name
+        return np.lib.format.open_memmap(filename, mode='w+', dtype=chunk.dtype, shape=shape)
+
     def _subset_loader(self, subset: Subset, **kwargs) -> Union[DataLoader, None]:
         """Loads subset (train/validation) partition of as pytorch DataLoader.
 
@@ -567,6 +567,8 @@ class TrainRequest(Message):
         training_plan_url: URL where TrainingPlan is available
         training_plan_class: Class name of the training plan
         command: Reply command string
+        aggregator_args: Arguments managed by and shared with the researcher-side aggregator
+        round: Number of the round the request is sent for, if known
 
     Raises:
         FedbiomedMessageError: triggered if message's fields validation failed
@@ -582,6 +584,58 @@ class TrainRequest(Message):
     training_plan_class: str
     command: str
     aggregator_args: dict
+    round: (int, type(None)) = None
+
+
+@catch_dataclass_exception
+@dataclass
+class PrepareRequest(Message):
+    """Describes a prepare notice sent by the researcher before a training request.
+
+    The node prepares the next training round of the job (imports the training plan and loads the data)
+    while the researcher aggregates the former round. No reply is expected.
+
+    Attributes:
+        researcher_id: ID of the researcher that sends the notice
+        job_id: Id of the Job that is sent by researcher
+        training_args: Arguments for training routine
+        training_data: Dataset meta-data for training
+        model_args: Arguments to initialize training plan class
+        training_plan_url: URL where TrainingPlan is available
+        training_plan_class: Class name of the training plan
+        command: Request command string
+
+    Raises:
+        FedbiomedMessageError: triggered if message's fields validation failed
+    """
+    researcher_id: str
+    job_id: str
+    training_args: dict
+    training_data: dict
+    model_args: dict
+    training_plan_url: str
+    training_plan_class: str
+    command: str
+
+
+@catch_dataclass_exception
+@dataclass
+class JobEndRequest(Message):
+    """Describes a job end notice sent by the researcher when a job will not send training requests anymore.
+
+    The node releases the training sessions kept warm for the job. No reply is expected.
+
+    Attributes:
+        researcher_id: ID of the researcher that sends the notice
+        job_id: Id of the Job that ended
+        command: Request command string
+
+    Raises:
+        FedbiomedMessageError: triggered if message's fields validation failed
+    """
+    researcher_id: str
+    job_id: str
+    command: str
 
 
 @catch_dataclass_exception
@@ -599,6 +653,8 @@ class TrainReply(Message):
         timing: Timing statistics
         msg: Custom message
         command: Reply command string
+        profile_url: URL of the profiling trace uploaded by node, if profiling was requested
+        num_updates: Number of updates (batches) actually performed by the node, if counted
 
     Raises:
         FedbiomedMessageError: triggered if message's fields validation failed
@@ -613,6 +669,8 @@ class TrainReply(Message):
     sample_size: (int, type(None))
     msg: str
     command: str
+    profile_url: (str, type(None)) = None
+    num_updates: (int, type(None)) = None
 
 
 # protocol definition
@@ -676,6 +734,8 @@ class ResearcherMessages():
 
     @classmethod
     def request_create(cls, params: Dict[str, Any]) -> Union[TrainRequest,
+                                                             PrepareRequest,
+                                                             JobEndRequest,
                                                              SearchRequest,
                                                              PingRequest,
                                                              ListRequest,
@@ -711,6 +771,8 @@ class ResearcherMessages():
             raise FedbiomedMessageError(_msg)
 
         MESSAGE_TYPE_TO_CLASS_MAP = {'train': TrainRequest,
+                                     'prepare': PrepareRequest,
+                                     'job-end': JobEndRequest,
                                      'search': SearchRequest,
                                      'ping': PingRequest,
                                      'list': ListRequest,
@@ -732,6 +794,8 @@ class NodeMessages():
 
     @classmethod
     def request_create(cls, params: dict) -> Union[TrainRequest,
+                                                   PrepareRequest,
+                                                   JobEndRequest,
                                                    SearchRequest,
                                                    PingRequest,
                                                    ListRequest,
@@ -762,6 +826,8 @@ class NodeMessages():
 
         # mapping message type to an object
         MESSAGE_TYPE_TO_CLASS_MAP = {'train': TrainRequest,
+                                     'prepare': PrepareRequest,
+                                     'job-end': JobEndRequest,
                                      'search': SearchRequest,
                                      'ping': PingRequest,
                                      'list': ListRequest,
@@ -10,6 +10,7 @@ from copy import copy
 import numpy as np
 from typing import Any, Dict, List, Tuple, Union
 
+from scipy import sparse
 from sklearn import metrics
 from sklearn.preprocessing import OneHotEncoder
 
@@ -84,8 +85,8 @@ class Metrics(object):
         This method configures given y_pred and y_true to make them compatible with default evaluation methods.
 
         Args:
-            y_true: True values
-            y_pred: Predicted values
+            y_true: True values. Scipy sparse matrices are converted to `np.ndarray`.
+            y_pred: Predicted values. Scipy sparse matrices are converted to `np.ndarray`.
             metric: An instance of MetricTypes to chose metric that will be used for evaluation
             **kwargs: The arguments specifics to each type of metrics.
 
@@ -98,6 +99,12 @@ class Metrics(object):
         if not isinstance(metric, MetricTypes):
             raise FedbiomedMetricError(f"{ErrorNumbers.FB611.value}: Metric should instance of `MetricTypes`")
 
+        # Targets and predictions are small compared to inputs: sparse ones are densified
+        if sparse.issparse(y_true):
+            y_true = y_true.toarray()
+        if sparse.issparse(y_pred):
+            y_pred = y_pred.toarray()
+
         if y_true is not None and not isinstance(y_true, (np.ndarray, list)):
             raise FedbiomedMetricError(f"{ErrorNumbers.FB611.value}: The argument `y_true` should an instance "
                                        f"of `np.ndarray`, but got {type(y_true)} ")
@@ -7,9 +7,11 @@ from typing import Dict, Tuple, Union
 
 from opacus import PrivacyEngine
 from opacus.data_loader import DPDataLoader
+from opacus.utils.module_utils import trainable_modules
 from opacus.validators import ModuleValidator
 from torch import randn_like
-from torch.nn import Module
+from torch.nn import Conv1d, Conv2d, Conv3d, Embedding, GroupNorm, InstanceNorm1d, InstanceNorm2d, \
+    InstanceNorm3d, LayerNorm, Linear, Module
 from torch.optim import Optimizer
 from torch.utils.data import DataLoader
 
@@ -17,10 +19,25 @@ from fedbiomed.common.validator import ValidateError
 from fedbiomed.common.training_args import DPArgsValidator
 from fedbiomed.common.exceptions import FedbiomedDPControllerError
 from fedbiomed.common.constants import ErrorNumbers
+from fedbiomed.common.logger import logger
 
 
 class DPController:
-    """Controls DP action during training."""
+    """Controls DP action during training.
+
+    Per-sample gradients are computed by the Opacus backend selected with the `backend` DP argument:
+
+    - `hooks` (default): module hooks computing per-sample gradients from activations and backpropagated
+        gradients, for any layer supported by Opacus
+    - `functorch`: vectorized per-sample gradients (`vmap` over `grad`) for all layers
+    - `ew`: vectorized per-sample gradients with PyTorch expanded weights, usually the fastest backend. Only
+        supports the layers in `EW_SUPPORTED_LAYERS`: other models automatically fall back to `hooks`.
+
+    The backend does not change the clipping, the noise, nor the privacy accounting.
+    """
+
+    EW_SUPPORTED_LAYERS = (Conv1d, Conv2d, Conv3d, Embedding, GroupNorm, InstanceNorm1d, InstanceNorm2d,
+                           InstanceNorm3d, LayerNorm, Linear)
 
     def __init__(self, dp_args: Union[Dict, None] = None) -> None:
         """Constructs DPController with given model.
@@ -35,6 +52,11 @@ class DPController:
         if self._is_active:
             self._configure_dp_args()
 
+    @property
+    def is_active(self) -> bool:
+        """Tells whether differential privacy is applied to the training."""
+        return self._is_active
+
     def before_training(self,
                         model: Module,
                         optimizer: Optimizer,
@@ -71,7 +93,8 @@ class DPController:
                     optimizer=optimizer,
                     data_loader=loader,
                     noise_multiplier=float(self._dp_args['sigma']),
-                    max_grad_norm=float(self._dp_args['clip'])
+                    max_grad_norm=float(self._dp_args['clip']),
+                    grad_sample_mode=self._grad_sample_mode(model)
                 )
             except Exception as e:
                 raise FedbiomedDPControllerError(
@@ -92,6 +115,26 @@ class DPController:
             params = self._postprocess_dp(params)
         return params
 
+    def _grad_sample_mode(self, model: Module) -> str:
+        """Gets the Opacus grad sample mode used to compute per-sample gradients of the model.
+
+        Args:
+            model: Model that will be used for training
+
+        Returns:
+            Grad sample mode of the selected backend, or `hooks` if the model has layers that the backend
+                does not support
+        """
+        backend = self._dp_args.get('backend', 'hooks')
+        if backend == 'ew':
+            unsupported = {type(module).__name__ for _, module in trainable_modules(model)
+                           if not isinstance(module, self.EW_SUPPORTED_LAYERS)}
+            if unsupported:
+                logger.warning(f"DP backend `ew` does not support layers {sorted(unsupported)}, "
+                               "falling back to `hooks` backend")
+                return 'hooks'
+        return backend
+
     def _configure_dp_args(self) -> None:
         """Initialize arguments to perform DP training. """
         self._dp_args = DPArgsValidator.populate_with_defaults(
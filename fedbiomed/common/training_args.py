@@ -25,6 +25,15 @@ def _validate_dp_type(value: Any):
         return True
 
 
+@validator_decorator
+def _validate_dp_backend(value: Any):
+    """ Validates whether DP backend is valid"""
+    if value not in ["hooks", "functorch", "ew"]:
+        return False, f"DP backend should one of `hooks`, `functorch` or `ew` not {value}"
+    else:
+        return True
+
+
 DPArgsValidator = SchemeValidator({
     'type': {
         "rules": [str, _validate_dp_type], "required": True, "default": "central"
@@ -35,6 +44,9 @@ DPArgsValidator = SchemeValidator({
     'clip': {
         "rules": [float], "required": True
     },
+    'backend': {
+        "rules": [str, _validate_dp_backend], "required": False, "default": "hooks"
+    },
 })
 
 
@@ -156,7 +168,9 @@ class TrainingArgs:
                 "epochs",
                 "use_gpu",
                 "num_updates",
-                "batch_size"]
+                "batch_size",
+                "mixed_precision",
+                "max_train_seconds"]
         return self._extract_args(keys)
 
     def dp_arguments(self):
@@ -221,6 +235,32 @@ class TrainingArgs:
             return True
         return False, f"Expected `fedprox_mu` value is float, but got {type(val)}. "
 
+    @staticmethod
+    @validator_decorator
+    def _max_train_seconds_validator(val: Union[float, int, None]) -> Union[Tuple[bool, str], bool]:
+        """Validates time budget of the training is None (no budget) or a positive number of seconds
+
+        Returns:
+            Validation status  or/and error message
+        """
+        if val is None:
+            return True
+        if isinstance(val, (float, int)) and not isinstance(val, bool) and val > 0:
+            return True
+        return False, f"Expected `max_train_seconds` value is None or a positive number, but got {val}. "
+
+    @staticmethod
+    @validator_decorator
+    def _mixed_precision_validator(val: Union[str, None]) -> Union[Tuple[bool, str], bool]:
+        """Validates mixed precision mode is None (full precision) or a supported mode
+
+        Returns:
+            Validation status  or/and error message
+        """
+        if val is None or val == 'bf16':
+            return True
+        return False, f"Expected `mixed_precision` value is None or 'bf16', but got {val}. "
+
     @staticmethod
     @validator_decorator
     def _test_ratio_hook(v: Any) -> bool:
@@ -306,9 +346,26 @@ class TrainingArgs:
             "use_gpu": {
                 "rules": [bool], 'required': False, "default": False
             },
+            "mixed_precision": {
+                "rules": [cls._mixed_precision_validator], 'required': False, "default": None
+            },
+            "max_train_seconds": {
+                "rules": [cls._max_train_seconds_validator], 'required': False, "default": None
+            },
             "dp_args": {
                 "rules": [cls._validate_dp_args], "required": True, "default": None
             },
+            "profile_steps": {
+                "rules": [cls._nonnegative_integer_value_validator_hook('profile_steps')],
+                "required": False, "default": None
+            },
+            "persist_optimizer_state": {
+                "rules": [bool], "required": False, "default": False
+            },
+            "optimizer_state_max_staleness": {
+                "rules": [cls._nonnegative_integer_value_validator_hook('optimizer_state_max_staleness')],
+                "required": False, "default": 0
+            },
         }
 
     def __str__(self) -> str:
@@ -10,6 +10,7 @@ that are used for federated training
 from ._torchnn import TorchTrainingPlan
 from ._sklearn_training_plan import SKLearnTrainingPlan
 from ._sklearn_models import FedPerceptron, FedSGDClassifier, FedSGDRegressor
+from ._sklearn_statistics import FedGaussianNB, FedLinearRegression, FedPCA
 from ._base_training_plan import BaseTrainingPlan
 
 __all__ = [
@@ -18,5 +19,8 @@ __all__ = [
     "FedPerceptron",
     "FedSGDRegressor",
     'FedSGDClassifier',
+    "FedLinearRegression",
+    "FedGaussianNB",
+    "FedPCA",
     "BaseTrainingPlan"
 ]
@@ -9,6 +9,7 @@ from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
+from scipy import sparse
 
 from collections import OrderedDict
 
@@ -20,6 +21,7 @@ from fedbiomed.common.data import NPDataLoader
 from fedbiomed.common.exceptions import FedbiomedError, FedbiomedTrainingPlanError, FedbiomedUserInputError
 from fedbiomed.common.logger import logger
 from fedbiomed.common.metrics import Metrics, MetricTypes
+from fedbiomed.common.training_plans._phase_timer import TrainingPhaseTimer
 from fedbiomed.common.training_plans._training_iterations import MiniBatchTrainingIterationsAccountant
 from fedbiomed.common.utils import get_class_source
 from fedbiomed.common.utils import get_method_spec
@@ -57,6 +59,8 @@ class BaseTrainingPlan(metaclass=ABCMeta):
         ] = OrderedDict()
         self.training_data_loader: Union[DataLoader, NPDataLoader, None] = None
         self.testing_data_loader: Union[DataLoader, NPDataLoader, None] = None
+        self._phase_timer = TrainingPhaseTimer()
+        self._num_updates_performed: Optional[int] = None
 
     @abstractmethod
     def post_init(
@@ -212,6 +216,25 @@ class BaseTrainingPlan(metaclass=ABCMeta):
     def set_aggregator_args(self, aggregator_args: Dict[str, Any]):
         raise FedbiomedTrainingPlanError("method not implemented and needed")
 
+    def training_timing(self) -> Dict[str, float]:
+        """Retrieves the time spent in each phase of the last training routine.
+
+        Returns:
+            Phase totals in seconds and sample throughput, see
+                [`TrainingPhaseTimer.timing`][fedbiomed.common.training_plans._phase_timer.TrainingPhaseTimer.timing]
+        """
+        return self._phase_timer.timing()
+
+    def num_updates_performed(self) -> Optional[int]:
+        """Retrieves the number of updates (batches) actually performed by the last training routine.
+
+        It may be lower than requested when the time budget of the training (`max_train_seconds`) is consumed.
+
+        Returns:
+            Number of updates, or None if the training routine does not count them
+        """
+        return self._num_updates_performed
+
     def optimizer_args(self) -> Dict:
         """Retrieves optimizer arguments (to be overridden
         by children classes)
@@ -430,7 +453,8 @@ class BaseTrainingPlan(metaclass=ABCMeta):
             raise FedbiomedTrainingPlanError(msg)
 
         n_batches = len(self.testing_data_loader)
-        n_samples = len(self.testing_data_loader.dataset)
+        dataset = self.testing_data_loader.dataset
+        n_samples = dataset.shape[0] if sparse.issparse(dataset) else len(dataset)
         # Set up a batch-wise metrics-computation function.
         # Either use an optionally-implemented custom training routine.
         if hasattr(self, "testing_step"):
@@ -508,7 +532,7 @@ class BaseTrainingPlan(metaclass=ABCMeta):
         return NotImplemented
 
     @staticmethod
-    def _infer_batch_size(data: Union[dict, list, tuple, 'torch.Tensor', 'np.ndarray']) -> int:
+    def _infer_batch_size(data: Union[dict, list, tuple, 'torch.Tensor', 'np.ndarray', 'sparse.spmatrix']) -> int:
         """Utility function to guess batch size from data.
 
         This function is a temporary fix needed to handle the case where
@@ -526,6 +550,9 @@ class BaseTrainingPlan(metaclass=ABCMeta):
             return BaseTrainingPlan._infer_batch_size(next(iter(data.values())))
         elif isinstance(data, (list, tuple)):
             return BaseTrainingPlan._infer_batch_size(data[0])
+        elif sparse.issparse(data):
+            # case `data` is a scipy sparse matrix, whose length is ambiguous
+            return data.shape[0]
         else:
             # case `data` is a torch.Tensor or a np.ndarray
             batch_size = len(data)
@@ -0,0 +1,370 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+"""Multi-process data parallel training on CPU, for nodes with large datasets."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from collections import deque
+from datetime import timedelta
+from typing import Deque, Iterable, Iterator, List, Optional
+
+import torch
+import torch.distributed as dist
+from torch.utils.data import DataLoader, IterableDataset, RandomSampler, Sampler
+
+from fedbiomed.common.constants import ErrorNumbers
+from fedbiomed.common.exceptions import FedbiomedTrainingPlanError
+from fedbiomed.common.logger import logger
+
+
+STARTUP_TIMEOUT = 300
+"""Maximum time (in seconds) for worker processes to load the training plan and join the process group"""
+
+COLLECTIVE_TIMEOUT = timedelta(minutes=30)
+"""Maximum time of a collective operation (eg. gradient all-reduce) between processes"""
+
+WORKER_EXIT_TIMEOUT = 60
+"""Maximum time (in seconds) for worker processes to exit at the end of the training, before they are killed"""
+
+
+class _ShardBatchSampler(Sampler):
+    """Batch sampler of the shard of a process: splits each batch of the node's data loader between processes.
+
+    All processes draw the same permutation of the dataset at each epoch (each new iterator), and cut it in the
+    batches of single process training. Each process takes a consecutive slice of each batch, the sizes of the
+    slices of the processes differ by one sample at most.
+
+    A process that gets no sample of a batch (the batch is smaller than the number of processes) still takes part
+    in the gradient all-reduce: it is given the first sample of the batch, which is not counted and whose gradient
+    has a zero weight.
+    """
+
+    def __init__(self, num_samples: int, batch_size: int, drop_last: bool, shuffle: bool, seed: int,
+                 world_size: int, rank: int):
+        self._num_samples = num_samples
+        self._batch_size = batch_size
+        self._drop_last = drop_last
+        self._shuffle = shuffle
+        self._seed = seed
+        self._world_size = world_size
+        self._rank = rank
+        self._epoch = 0
+        self.batch_samples: Deque[int] = deque()
+        """Number of samples of this process in each batch of the current epoch, not yet consumed"""
+
+    def __len__(self) -> int:
+        if self._drop_last:
+            return self._num_samples // self._batch_size
+        return -(-self._num_samples // self._batch_size)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        # batches of the whole epoch are computed at once, as data loader workers may prefetch them
+        if self._shuffle:
+            generator = torch.Generator()
+            generator.manual_seed(self._seed + self._epoch)
+            indices = torch.randperm(self._num_samples, generator=generator).tolist()
+        else:
+            indices = list(range(self._num_samples))
+        self._epoch += 1
+
+        batches = []
+        self.batch_samples = deque()
+        for start in range(0, len(self) * self._batch_size, self._batch_size):
+            batch = indices[start:start + self._batch_size]
+            share, remainder = divmod(len(batch), self._world_size)
+            first = self._rank * share + min(self._rank, remainder)
+            size = share + (1 if self._rank < remainder else 0)
+            batches.append(batch[first:first + size] if size > 0 else batch[:1])
+            self.batch_samples.append(size)
+        return iter(batches)
+
+
+class CPUDataParallel:
+    """Trains a torch training plan with several local processes on CPU.
+
+    Each process trains the same model on a slice of each batch of the training data loader. Before each optimizer
+    step, gradients are averaged over processes (all-reduce with the `gloo` backend on localhost), weighted by the
+    number of samples of each process in the batch, so all processes keep identical parameters. For losses averaged
+    over the samples of a batch (the default reduction of torch losses) the training performs the same updates as
+    single process training with the same batch size, up to the order of the samples when they are shuffled and
+    to batch statistics (eg. batch norm). The node process is the process of rank 0, it reports the training
+    progress and keeps the resulting model. Other processes are started for each training routine, from a serialized
+    copy of the training plan, and use their share of the CPU threads.
+
+    The time budget of the training (`max_train_seconds`) is combined over processes so that they all stop at the
+    same batch, and buffers (eg. batch norm statistics) are averaged at the end of the training.
+    """
+
+    def __init__(self, world_size: int, rank: int = 0, store: Optional[dist.Store] = None):
+        """Constructor of the class.
+
+        Args:
+            world_size: number of processes training together, including the node process
+            rank: rank of the process. 0 for the node process.
+            store: store of the process group, for worker processes
+        """
+        self._world_size = world_size
+        self._rank = rank
+        self._store = store
+        self._workers: List[subprocess.Popen] = []
+        self._payload_path = None
+        self._num_threads = torch.get_num_threads()
+        self._sampler: Optional[_ShardBatchSampler] = None
+        self._batch_samples = 0
+
+    @property
+    def rank(self) -> int:
+        return self._rank
+
+    @property
+    def world_size(self) -> int:
+        return self._world_size
+
+    @staticmethod
+    def supports(loader: DataLoader) -> bool:
+        """Tells whether a data loader can be sharded over processes.
+
+        Args:
+            loader: training data loader
+
+        Returns:
+            True if the loader is a torch data loader of a map-style dataset, with a batch size
+        """
+        return isinstance(loader, DataLoader) and \
+            not isinstance(loader.dataset, IterableDataset) and \
+            loader.batch_size is not None
+
+    def start(self, training_plan: 'TorchTrainingPlan'):
+        """Starts the worker processes, and joins the process group with them as the process of rank 0.
+
+        Args:
+            training_plan: training plan, ready for training, that is copied to the worker processes
+
+        Raises:
+            FedbiomedTrainingPlanError: training plan cannot be serialized, or worker processes cannot be started
+        """
+        threads = max(1, self._num_threads // self._world_size)
+        fd, self._payload_path = tempfile.mkstemp(prefix='fedbiomed_data_parallel_', suffix='.pt')
+        os.close(fd)
+        try:
+            torch.save(training_plan, self._payload_path)
+        except Exception as e:
+            self._remove_payload()
+            raise FedbiomedTrainingPlanError(
+                f"{ErrorNumbers.FB605.value}: cannot copy the training plan to worker processes: {e}")
+
+        self._store = dist.TCPStore('127.0.0.1', 0, self._world_size, True, COLLECTIVE_TIMEOUT,
+                                    wait_for_workers=False)
+
+        # worker processes import the training plan module, which is not in the default path of the node
+        module_dir = os.path.dirname(os.path.abspath(sys.modules[type(training_plan).__module__].__file__))
+        env = dict(os.environ,
+                   PYTHONPATH=os.pathsep.join([module_dir] + [path for path in sys.path if path]),
+                   OMP_NUM_THREADS=str(threads),
+                   MKL_NUM_THREADS=str(threads))
+        command = [sys.executable, '-c',
+                   'from fedbiomed.common.training_plans._data_parallel import worker_main; worker_main()']
+        for rank in range(1, self._world_size):
+            self._workers.append(subprocess.Popen(
+                command + [str(rank), str(self._world_size), str(self._store.port), str(threads),
+                           self._payload_path],
+                env=env))
+
+        try:
+            self._wait_for_workers()
+        except FedbiomedTrainingPlanError:
+            for worker in self._workers:
+                worker.kill()
+            self.stop()
+            raise
+
+        torch.set_num_threads(threads)
+        dist.init_process_group('gloo', store=self._store, rank=0, world_size=self._world_size,
+                                timeout=COLLECTIVE_TIMEOUT)
+        logger.debug(f"Training with {self._world_size} processes on CPU, {threads} threads per process")
+
+    def stop(self):
+        """Leaves the process group and waits for the worker processes to end.
+
+        Raises:
+            FedbiomedTrainingPlanError: a worker process failed
+        """
+        if dist.is_initialized():
+            dist.destroy_process_group()
+        torch.set_num_threads(self._num_threads)
+
+        failed = []
+        for worker in self._workers:
+            try:
+                worker.wait(timeout=WORKER_EXIT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+                worker.wait()
+            if worker.returncode != 0:
+                failed.append(worker.returncode)
+        self._workers = []
+        self._store = None
+        self._remove_payload()
+
+        if failed:
+            raise FedbiomedTrainingPlanError(
+                f"{ErrorNumbers.FB605.value}: data parallel worker processes failed with exit codes {failed}")
+
+    def shard(self, loader: DataLoader) -> DataLoader:
+        """Builds the data loader of the shard of this process.
+
+        The shard has the same number of batches per epoch as `loader`: each batch of the shard is the slice of
+        this process of a batch of `loader`, see `_ShardBatchSampler`. The number of samples of this process in
+        each batch is given by `batch_samples`.
+
+        Args:
+            loader: training data loader of the node
+
+        Returns:
+            Data loader of the shard
+        """
+        # all processes shuffle the dataset with the same seed, drawn by the node process
+        seed = torch.randint(2 ** 31, (1,)) if self._rank == 0 else torch.zeros(1, dtype=torch.int64)
+        dist.broadcast(seed, src=0)
+
+        self._sampler = _ShardBatchSampler(len(loader.dataset),
+                                           batch_size=loader.batch_size,
+                                           drop_last=loader.drop_last,
+                                           shuffle=isinstance(loader.sampler, RandomSampler),
+                                           seed=int(seed.item()),
+                                           world_size=self._world_size,
+                                           rank=self._rank)
+        return DataLoader(loader.dataset,
+                          batch_sampler=self._sampler,
+                          num_workers=loader.num_workers,
+                          collate_fn=loader.collate_fn,
+                          pin_memory=loader.pin_memory,
+                          worker_init_fn=loader.worker_init_fn)
+
+    def batch_samples(self) -> int:
+        """Moves to the next batch of the shard, and returns the number of samples of this process in it.
+
+        Padding (the sample given to a process that has no sample in a batch) is not counted. This number is also
+        the weight of the gradients of this process in the next all-reduce.
+
+        Returns:
+            Number of samples of the batch trained by this process
+        """
+        self._batch_samples = self._sampler.batch_samples.popleft()
+        return self._batch_samples
+
+    def all_reduce_gradients(self, params: Iterable[torch.Tensor]):
+        """Averages the gradients of the parameters over processes, with a single all-reduce.
+
+        Gradients are weighted by the number of samples of each process in the current batch (see `batch_samples`),
+        so that the result is the gradient of the loss averaged over the whole batch. Trainable parameters without
+        gradient get a zero gradient, so that all processes reduce the same tensors.
+
+        Args:
+            params: model parameters
+        """
+        grads = []
+        for param in params:
+            if param.requires_grad:
+                if param.grad is None:
+                    param.grad = torch.zeros_like(param)
+                grads.append(param.grad)
+        if not grads:
+            return
+
+        # the number of samples of the batch is reduced with the gradients, as the last element of the buffer
+        flat = torch.cat([grad.reshape(-1) for grad in grads] + [torch.ones(1, dtype=grads[0].dtype)])
+        flat.mul_(self._batch_samples)
+        dist.all_reduce(flat)
+        flat.div_(flat[-1].item())
+        for grad, reduced in zip(grads, torch.split(flat[:-1], [grad.numel() for grad in grads])):
+            grad.copy_(reduced.view_as(grad))
+
+    def average_buffers(self, model: torch.nn.Module):
+        """Averages the floating point buffers of the model (eg. batch norm statistics) over processes.
+
+        Args:
+            model: trained model
+        """
+        for buffer in model.buffers():
+            if torch.is_floating_point(buffer):
+                dist.all_reduce(buffer)
+                buffer.div_(self._world_size)
+
+    def any(self, flag: bool) -> bool:
+        """Combines a boolean decision over processes.
+
+        Args:
+            flag: decision of this process
+
+        Returns:
+            True if the decision of at least one process is True
+        """
+        value = torch.tensor([1 if flag else 0])
+        dist.all_reduce(value, op=dist.ReduceOp.MAX)
+        return bool(value.item())
+
+    def sum(self, value: int) -> int:
+        """Sums a count over processes.
+
+        Args:
+            value: count of this process
+
+        Returns:
+            Total count of all processes
+        """
+        total = torch.tensor([value], dtype=torch.int64)
+        dist.all_reduce(total)
+        return int(total.item())
+
+    def _wait_for_workers(self):
+        """Waits for the worker processes to load the training plan, failing fast if one of them stops."""
+        keys = [f'worker_ready_{rank}' for rank in range(1, self._world_size)]
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            try:
+                self._store.wait(keys, timedelta(seconds=1))
+                return
+            except RuntimeError:
+                pass
+            if any(worker.poll() is not None for worker in self._workers) or time.monotonic() > deadline:
+                raise FedbiomedTrainingPlanError(
+                    f"{ErrorNumbers.FB605.value}: data parallel worker processes could not be started")
+
+    def _remove_payload(self):
+        if self._payload_path is not None and os.path.isfile(self._payload_path):
+            os.remove(self._payload_path)
+        self._payload_path = None
+
+
+def worker_main():
+    """Entry point of a worker process: trains a shard of the data until the node process ends the training.
+
+    Command line arguments are the rank of the process, the number of processes, the port of the store of
+    the process group, the number of threads of the process and the path of the serialized training plan.
+    """
+    rank, world_size, port, threads = (int(arg) for arg in sys.argv[1:5])
+    payload_path = sys.argv[5]
+
+    torch.set_num_threads(threads)
+    store = dist.TCPStore('127.0.0.1', port, world_size, False, COLLECTIVE_TIMEOUT)
+    training_plan = torch.load(payload_path)
+    store.set(f'worker_ready_{rank}', '1')
+
+    dist.init_process_group('gloo', store=store, rank=rank, world_size=world_size, timeout=COLLECTIVE_TIMEOUT)
+    try:
+        training_plan._train_data_parallel_shard(CPUDataParallel(world_size, rank, store), history_monitor=None)
+    except Exception:
+        traceback.print_exc()
+        sys.stderr.flush()
+        os._exit(1)
+
+    # the model of the worker is discarded: exit without tearing down the process group and the interpreter,
+    # which can block on the connections with the node process once it has left the group
+    sys.stdout.flush()
+    os._exit(0)
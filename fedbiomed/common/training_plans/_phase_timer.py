@@ -0,0 +1,88 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+from typing import Callable, Dict, Optional
+
+
+class TrainingPhaseTimer:
+    """Accumulates the wall-clock time spent in each phase of a training routine.
+
+    The training loop calls `lap` at the end of each phase: the time elapsed since the former call (or since
+    `start`) is added to the total of the phase. This only costs one `time.perf_counter` call per phase and batch.
+    It also calls `end_step` at the end of each batch, which calls the step hook of the timer if one is set
+    (eg. to advance a profiler).
+
+    Phases used by the training plans:
+
+    - `data_loading`: fetching batches from the data loader (including iterator creation)
+    - `send_to_device`: transferring batches to the training device
+    - `forward`: zeroing gradients, forward pass and loss computation
+    - `backward_step`: backward pass, gradient corrections and optimizer step (or `partial_fit` for scikit-learn)
+    - `dp`: differential privacy setup of model, optimizer and data loader
+    - `reporting`: computing reported loss values and sending them to the researcher
+
+    !!! note
+        CUDA kernels run asynchronously: on GPU, computation time may be accounted for in the next phase that
+        synchronizes with the device (eg. `reporting`, which retrieves the loss value).
+    """
+
+    PHASES = ('data_loading', 'send_to_device', 'forward', 'backward_step', 'dp', 'reporting')
+
+    def __init__(self):
+        """Constructor of the class."""
+        self._totals = dict.fromkeys(self.PHASES, 0.)
+        self._num_samples = 0
+        self._last = None
+        self._step_hook = None
+
+    def start(self):
+        """Resets the phase totals and starts timing."""
+        self._totals = dict.fromkeys(self.PHASES, 0.)
+        self._num_samples = 0
+        self._last = time.perf_counter()
+
+    def lap(self, phase: str):
+        """Ends a phase, adding the time elapsed since the end of the former phase to its total.
+
+        Args:
+            phase: name of the phase, one of `PHASES`
+        """
+        now = time.perf_counter()
+        if self._last is not None:
+            self._totals[phase] += now - self._last
+        self._last = now
+
+    def add_samples(self, num_samples: int):
+        """Counts samples processed by the training loop, for throughput computation.
+
+        Args:
+            num_samples: number of samples in the batch
+        """
+        self._num_samples += num_samples
+
+    def set_step_hook(self, hook: Optional[Callable[[], None]]):
+        """Sets the function called at the end of each training step (batch).
+
+        Args:
+            hook: function without arguments, or None to remove the hook
+        """
+        self._step_hook = hook
+
+    def end_step(self):
+        """Ends a training step (batch) of the training loop, calling the step hook if one is set."""
+        if self._step_hook is not None:
+            self._step_hook()
+
+    def timing(self) -> Dict[str, float]:
+        """Gets the phase totals and the sample throughput of the last training routine.
+
+        Returns:
+            Dict with `rtime_<phase>` totals in seconds, the number of samples trained (`num_samples_trained`)
+                and the throughput over the timed phases (`samples_per_second`)
+        """
+        timing = {f'rtime_{phase}': total for phase, total in self._totals.items()}
+        total = sum(self._totals.values())
+        timing['num_samples_trained'] = self._num_samples
+        timing['samples_per_second'] = self._num_samples / total if total > 0 else 0.
+        return timing
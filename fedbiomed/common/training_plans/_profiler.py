@@ -0,0 +1,94 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+import cProfile
+
+import torch
+
+from fedbiomed.common.constants import ErrorNumbers, TrainingPlans
+from fedbiomed.common.exceptions import FedbiomedTrainingPlanError
+from fedbiomed.common.logger import logger
+
+
+class TrainingProfiler:
+    """Captures a profiling trace of the routines of a training plan, for a bounded number of training steps.
+
+    Torch training plans are profiled with the torch profiler, and the trace is written in Chrome trace format
+    (`.json`, can be opened with `chrome://tracing` or Perfetto). Scikit-learn training plans are profiled with
+    `cProfile`, and statistics are written in `pstats` format (`.pstats`).
+
+    While profiling, the profiler steps are advanced by the step hook of the phase timer of the training plan,
+    called by the training loop at the end of each batch.
+    """
+
+    def __init__(self, training_plan: 'BaseTrainingPlan', max_steps: int, path: str):
+        """Constructor of the class.
+
+        Args:
+            training_plan: training plan to profile
+            max_steps: maximum number of training steps (batches) recorded in the trace
+            path: path of the trace file, without extension
+
+        Raises:
+            FedbiomedTrainingPlanError: training plan type is not supported
+        """
+        self._training_plan = training_plan
+        self._max_steps = max_steps
+        self._num_steps = 0
+
+        tp_type = training_plan.type()
+        if tp_type == TrainingPlans.TorchTrainingPlan:
+            self._path = path + '.json'
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+            self._profiler = torch.profiler.profile(
+                activities=activities,
+                schedule=torch.profiler.schedule(wait=0, warmup=0, active=max_steps, repeat=1),
+                on_trace_ready=lambda prof: prof.export_chrome_trace(self._path),
+                record_shapes=True)
+        elif tp_type == TrainingPlans.SkLearnTrainingPlan:
+            self._path = path + '.pstats'
+            self._profiler = cProfile.Profile()
+        else:
+            msg = f"{ErrorNumbers.FB605.value}: cannot profile training plan of type {tp_type}"
+            logger.critical(msg)
+            raise FedbiomedTrainingPlanError(msg)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def start(self):
+        """Starts profiling the training plan."""
+        self._num_steps = 0
+        self._training_plan._phase_timer.set_step_hook(self.step)
+        if isinstance(self._profiler, cProfile.Profile):
+            self._profiler.enable()
+        else:
+            self._profiler.start()
+
+    def step(self):
+        """Ends a training step: profiling stops once `max_steps` steps are recorded."""
+        self._num_steps += 1
+        if isinstance(self._profiler, cProfile.Profile):
+            if self._num_steps == self._max_steps:
+                self._profiler.disable()
+        elif self._num_steps <= self._max_steps:
+            self._profiler.step()
+
+    def stop(self) -> str:
+        """Stops profiling and writes the trace file.
+
+        Returns:
+            Path of the trace file
+        """
+        self._training_plan._phase_timer.set_step_hook(None)
+
+        if isinstance(self._profiler, cProfile.Profile):
+            self._profiler.disable()
+            self._profiler.dump_stats(self._path)
+            return self._path
+
+        self._profiler.stop()
+        return self._path
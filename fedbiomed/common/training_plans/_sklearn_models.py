@@ -6,13 +6,11 @@
 """SKLearnTrainingPlan subclasses for models implementing `partial_fit`."""
 
 import functools
-import sys
 from abc import ABCMeta
-from contextlib import contextmanager
-from io import StringIO
-from typing import Any, Dict, Iterator, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
+from scipy import sparse
 from sklearn.linear_model import SGDClassifier, SGDRegressor
 
 from fedbiomed.common.constants import ErrorNumbers
@@ -20,6 +18,8 @@ from fedbiomed.common.exceptions import FedbiomedTrainingPlanError
 from fedbiomed.common.logger import logger
 from fedbiomed.common.training_plans import SKLearnTrainingPlan
 from fedbiomed.common.training_plans._training_iterations import MiniBatchTrainingIterationsAccountant
+from fedbiomed.common.training_plans._sklearn_sgd import Inputs, LossFunction, as_float_inputs, \
+    batch_sgd_loss_function, batch_sgd_update, sgd_loss_function, sgd_losses
 
 
 __all__ = [
@@ -29,27 +29,6 @@ __all__ = [
 ]
 
 
-@contextmanager
-def capture_stdout() -> Iterator[List[str]]:
-    """Context manager to capture console outputs (stdout).
-
-    Returns:
-        A list, empty at first, that will be populated with the line-wise
-        strings composing the captured stdout upon exiting the context.
-    """
-    output = []  # type: List[str]
-    stdout = sys.stdout
-    str_io = StringIO()
-    # Capture stdout outputs into the StringIO. Return yet-empty list.
-    try:
-        sys.stdout = str_io
-        yield output
-    # Restore sys.stdout, then parse captured outputs for loss values.
-    finally:
-        sys.stdout = stdout
-        output.extend(str_io.getvalue().splitlines())
-
-
 class SKLearnTrainingPlanPartialFit(SKLearnTrainingPlan, metaclass=ABCMeta):
     """Base SKLearnTrainingPlan for models implementing `partial_fit`."""
 
@@ -81,9 +60,11 @@ class SKLearnTrainingPlanPartialFit(SKLearnTrainingPlan, metaclass=ABCMeta):
         """
         # set number of training loop iterations
         iterations_accountant = MiniBatchTrainingIterationsAccountant(self)
+        timer = self._phase_timer
+        timer.start()
         # Gather reporting parameters.
         report = False
-        if (history_monitor is not None) and hasattr(self._model, "verbose"):
+        if history_monitor is not None:
             report = True
             loss_name = getattr(self._model, "loss", "")
             loss_name = "Loss" + (f" {loss_name}" if loss_name else "")
@@ -91,8 +72,6 @@ class SKLearnTrainingPlanPartialFit(SKLearnTrainingPlan, metaclass=ABCMeta):
                 history_monitor.add_scalar,
                 train=True,
             )
-            verbose = self._model.get_params("verbose")
-            self._model.set_params(verbose=1)
         # Iterate over epochs.
         for epoch in iterations_accountant.iterate_epochs():
             training_data_iter: Iterator = iter(self.training_data_loader)
@@ -101,9 +80,14 @@ class SKLearnTrainingPlanPartialFit(SKLearnTrainingPlan, metaclass=ABCMeta):
                 inputs, target = next(training_data_iter)
                 batch_size = self._infer_batch_size(inputs)
                 iterations_accountant.increment_sample_counters(batch_size)
-                loss = self._train_over_batch(inputs, target, report)
+                timer.add_samples(batch_size)
+                timer.lap('data_loading')
+                # Only compute the training loss of the batches that are reported.
+                log_batch = report and iterations_accountant.should_log_this_batch()
+                loss = self._train_over_batch(inputs, target, log_batch)
+                timer.lap('backward_step')
                 # Optionally report on the batch training loss.
-                if report and not np.isnan(loss) and iterations_accountant.should_log_this_batch():
+                if log_batch and not np.isnan(loss):
                     # Retrieve reporting information: semantics differ whether num_updates or epochs were specified
                     num_samples, num_samples_max = iterations_accountant.reporting_on_num_samples()
                     num_iter, num_iter_max = iterations_accountant.reporting_on_num_iter()
@@ -129,99 +113,144 @@ class SKLearnTrainingPlanPartialFit(SKLearnTrainingPlan, metaclass=ABCMeta):
                         total_samples=num_samples_max,
                         batch_samples=batch_size
                     )
-        # Reset model verbosity to its initial value.
-        if report:
-            self._model.set_params(verbose=verbose)
+                timer.lap('reporting')
+                timer.end_step()
 
+        self._num_updates_performed = iterations_accountant.num_updates_performed
         return iterations_accountant.num_samples_observed_in_total
 
     def _train_over_batch(
             self,
-            inputs: np.ndarray,
+            inputs: Inputs,
             target: np.ndarray,
             report: bool
         ) -> float:
         """Perform gradient descent over a single data batch.
 
+        Each sample computes an SGD step from the start weights of the
+        model, and the resulting weights are averaged over the batch.
+        Supported SGD models are updated with vectorized numpy operations
+        over the whole batch, for dense or CSR sparse inputs; other
+        models fall back to calling `partial_fit` on each sample.
+
         This method also resets the n_iter_ attribute of the
         scikit-learn model, such that n_iter_ will always equal
         1 at the end of the execution.
 
         Args:
-            inputs: 2D-array of batched input features.
+            inputs: 2D-array or CSR matrix of batched input features.
             target: 2D-array of batched target labels.
-            report: Whether to capture and parse the training
-                loss printed out to the console by the scikit-learn
-                model. If False, or if parsing fails, return a nan.
+            report: Whether to compute the training loss over the batch,
+                at the start weights of the model. If False, or if the
+                loss of the model is not supported, return a nan.
         """
+        loss_function = batch_sgd_loss_function(self._model)
+        if loss_function is not None and (isinstance(inputs, np.ndarray) and inputs.ndim == 2 or
+                                          sparse.issparse(inputs)):
+            return self._train_over_batch_vectorized(loss_function, inputs, target, report)
+
+        loss = self._batch_loss(inputs, target) if report else float('nan')
         b_len = inputs.shape[0]
         # Gather start weights of the model and initialize zero gradients.
-        param = {k: getattr(self._model, k) for k in self._param_list}
+        # partial_fit updates weights in place: keep a copy of the start weights.
+        param = {k: np.array(getattr(self._model, k)) for k in self._param_list}
         grads = {k: np.zeros_like(v) for k, v in param.items()}
-        # Iterate over the batch; accumulate sample-wise gradients (and loss).
-        stdout = []  # type: List[List[str]]
+        # Iterate over the batch; accumulate sample-wise gradients.
         for idx in range(b_len):
-            # Compute updated weights based on the sample. Capture loss prints.
-            with capture_stdout() as console:
-                self._model.partial_fit(inputs[idx:idx+1], target[idx])
-            stdout.append(console)
+            # Compute updated weights based on the sample.
+            self._model.partial_fit(inputs[idx:idx+1], target[idx])
             # Accumulate updated weights (weights + sum of gradients).
             # Reset the model's weights and iteration counter.
             for key in self._param_list:
                 grads[key] += getattr(self._model, key)
-                setattr(self._model, key, param[key])
+                setattr(self._model, key, param[key].copy())
             self._model.n_iter_ -= 1
         # Compute the batch-averaged updated weights and apply them.
         # Update the `param` values, and reset gradients to zero.
         for key in self._param_list:
             setattr(self._model, key, grads[key] / b_len)
         self._model.n_iter_ += 1
-        # Optionally report the training loss over this batch.
+        return loss
+
+    def _train_over_batch_vectorized(
+            self,
+            loss_function: LossFunction,
+            inputs: Inputs,
+            target: np.ndarray,
+            report: bool
+        ) -> float:
+        """Perform gradient descent over a single data batch, for all samples at once.
+
+        Args:
+            loss_function: Vectorized loss function of the model.
+            inputs: 2D-array or CSR matrix of batched input features.
+            target: 2D-array of batched target labels.
+            report: Whether to return the training loss over the batch.
+        """
+        target, targets = self._sgd_targets(target)
+        losses = batch_sgd_update(self._model, loss_function, as_float_inputs(inputs), targets)
         if report:
-            try:
-                return self._parse_batch_loss(stdout, inputs, target)
-            except Exception as exc:
-                msg = (
-                    f"{ErrorNumbers.FB605.value}: error while parsing "
-                    f"training losses from stdout: {exc}"
-                )
-                logger.error(msg)
-        # Otherwise, return nan as a fill-in value.
+            return self._average_batch_loss(losses, target)
         return float('nan')
 
-    def _parse_batch_loss(
+    def _batch_loss(
             self,
-            stdout: List[List[str]],
-            inputs: np.ndarray,
+            inputs: Inputs,
             target: np.ndarray
         ) -> float:
-        """Parse logged loss values from captured stdout lines.
+        """Compute the training loss over a batch, from the decision function of the model.
+
+        Args:
+            inputs: 2D-array or CSR matrix of batched input features.
+            target: 2D-array of batched target labels.
+
+        Returns:
+            The batch-averaged loss, or nan if the loss of the model is not supported.
+        """
+        loss_function = sgd_loss_function(self._model)
+        if loss_function is None:
+            return float('nan')
+        target, targets = self._sgd_targets(target)
+        losses = sgd_losses(self._model, loss_function, as_float_inputs(inputs), targets)
+        return self._average_batch_loss(losses, target)
+
+    def _sgd_targets(
+            self,
+            target: np.ndarray
+        ) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert batched target labels to the targets of the SGD weight vectors of the model.
 
         Args:
-            stdout: Captured stdout outputs from calling
-                the model's partial fit, with one list per batched sample.
-            inputs: Batched input features.
             target: Batched target labels.
+
+        Returns:
+            The target labels as a (n, 1)-shaped array, and the targets
+            with one column per weight vector of the model: one-vs-rest
+            `+1`/`-1` targets for classifiers (only for the positive class
+            of binary classifiers, as in scikit-learn), or the target
+            values for regressors.
         """
-        values = [self._parse_sample_losses(sample) for sample in stdout]
-        losses = np.array(values)
-        return float(np.mean(losses))
+        target = np.asarray(target).reshape(-1, 1)
+        if self._is_classification:
+            classes = self._model.classes_
+            if len(classes) == 2:
+                classes = classes[1:]
+            return target, np.where(target == classes, 1., -1.)
+        return target, target.astype(np.float64)
+
+    def _average_batch_loss(
+            self,
+            losses: np.ndarray,
+            target: np.ndarray
+        ) -> float:
+        """Average sample-wise loss values over a batch.
 
-    @staticmethod
-    def _parse_sample_losses(
-            stdout: List[str]
-        ) -> List[float]:
-        """Parse logged loss values from captured stdout lines."""
-        losses = []  # type: List[float]
-        for row in stdout:
-            split = row.rsplit("loss: ", 1)
-            if len(split) == 1:  # no "loss: " in the line
-                continue
-            try:
-                losses.append(float(split[1]))
-            except ValueError as exc:
-                logger.error(f"Value error during monitoring: {exc}")
-        return losses
+        Args:
+            losses: Loss values, with one row per batched sample
+                and one column per weight vector of the model.
+            target: Batched target labels, as a (n, 1)-shaped array.
+        """
+        return float(np.mean(losses))
 
 
 class FedSGDRegressor(SKLearnTrainingPlanPartialFit):
@@ -291,20 +320,18 @@ class FedSGDClassifier(SKLearnTrainingPlanPartialFit):
     def get_learning_rate(self) -> List[float]:
         return self._model.eta0
 
-    def _parse_batch_loss(
+    def _average_batch_loss(
             self,
-            stdout: List[List[str]],
-            inputs: np.ndarray,
+            losses: np.ndarray,
             target: np.ndarray
         ) -> float:
-        """Parse logged loss values from captured stdout lines."""
+        """Average sample-wise loss values over a batch."""
         # Delegate binary classification case to parent class.
         if self._model_args["n_classes"] == 2:
-            return super()._parse_batch_loss(stdout, inputs, target)
+            return super()._average_batch_loss(losses, target)
         # Handle multilabel classification case.
-        # Compute and batch-average sample-wise label-wise losses.
-        values = [self._parse_sample_losses(sample) for sample in stdout]
-        losses = np.array(values).mean(axis=0)
+        # Batch-average sample-wise label-wise losses.
+        losses = losses.mean(axis=0)
         # Compute the support-weighted average of label-wise losses.
         # NOTE: this assumes a (n, 1)-shaped targets array.
         classes = getattr(self._model, "classes_")
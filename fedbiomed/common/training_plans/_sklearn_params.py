@@ -0,0 +1,128 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+"""Parameters-only exchange format of scikit-learn training plans.
+
+Scikit-learn training plans exchange a few arrays (eg. `coef_` and `intercept_`), not the estimator: each party
+builds the estimator from the model arguments of the experiment. Parameters are written as raw contiguous buffers,
+after a small header:
+
+- the magic string `MAGIC`,
+- the length of the JSON header, as a little-endian 64 bits unsigned integer,
+- the JSON header, that lists the name, dtype, shape and offset in the file of each array,
+- the buffers of the arrays, each aligned on `ALIGNMENT` bytes.
+
+Unlike pickle, reading a file does not execute code: only numeric, boolean and fixed-size string arrays and
+scalars can be exchanged.
+"""
+
+import json
+import struct
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from fedbiomed.common.constants import ErrorNumbers
+from fedbiomed.common.exceptions import FedbiomedTrainingPlanError
+from fedbiomed.common.logger import logger
+
+
+MAGIC = b'FBSKLP\x01\x00'
+"""First bytes of a parameters file, with the version of the format"""
+
+ALIGNMENT = 64
+"""Alignment in bytes of the array buffers in the file"""
+
+_HEADER_LENGTH = struct.Struct('<Q')
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_params(filename: str, params: Dict[str, Any]) -> None:
+    """Writes parameters to a file, in the parameters-only format.
+
+    Args:
+        filename: path to the output file
+        params: parameters, mapped by name. Values are numpy arrays (or sequences, loaded back as arrays), or
+            python and numpy scalars, loaded back as python scalars.
+
+    Raises:
+        FedbiomedTrainingPlanError: a parameter cannot be written as a raw buffer, eg. an array of objects
+    """
+    entries = []
+    arrays = []
+    for name, value in params.items():
+        array = np.asarray(value, order='C')
+        if array.dtype.hasobject or array.dtype.names is not None:
+            msg = f"{ErrorNumbers.FB304.value}: parameter `{name}` of type {type(value)} and dtype {array.dtype} " \
+                  "cannot be saved: only numeric, boolean and string arrays and scalars are supported."
+            logger.critical(msg)
+            raise FedbiomedTrainingPlanError(msg)
+        entries.append({
+            'name': name,
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'scalar': array.ndim == 0 and not isinstance(value, np.ndarray),
+        })
+        arrays.append(array)
+
+    # offsets depend on the length of the header, that contains them: they are relative to the first buffer
+    offset = 0
+    for entry, array in zip(entries, arrays):
+        entry['offset'] = offset
+        offset = _align(offset + array.nbytes)
+    header = json.dumps({'params': entries}).encode('utf-8')
+    start = _align(len(MAGIC) + _HEADER_LENGTH.size + len(header))
+
+    with open(filename, 'wb') as file:
+        file.write(MAGIC)
+        file.write(_HEADER_LENGTH.pack(len(header)))
+        file.write(header)
+        for entry, array in zip(entries, arrays):
+            file.write(b'\0' * (start + entry['offset'] - file.tell()))
+            file.write(array.data)
+
+
+def load_params(filename: str) -> Optional[Dict[str, Any]]:
+    """Reads parameters written by `save_params`.
+
+    The file is read at once: arrays are writable views of a single buffer, without copies.
+
+    Args:
+        filename: path to the parameters file
+
+    Returns:
+        Parameters, mapped by name, or None if the file is not in the parameters-only format (eg. a joblib dump).
+
+    Raises:
+        FedbiomedTrainingPlanError: the file is truncated or its header is corrupted
+    """
+    with open(filename, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            return None
+        file.seek(0, 2)
+        data = bytearray(file.tell())
+        file.seek(0)
+        file.readinto(data)
+
+    try:
+        (header_length,) = _HEADER_LENGTH.unpack_from(data, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LENGTH.size
+        header = json.loads(data[header_start:header_start + header_length].decode('utf-8'))
+        start = _align(header_start + header_length)
+        params = {}
+        for entry in header['params']:
+            dtype = np.dtype(entry['dtype'])
+            if dtype.hasobject:
+                raise ValueError(f"unsupported dtype {dtype}")
+            shape = tuple(entry['shape'])
+            array = np.frombuffer(data, dtype=dtype, count=int(np.prod(shape)),
+                                  offset=start + entry['offset']).reshape(shape)
+            params[entry['name']] = array.item() if entry['scalar'] else array
+    except (struct.error, UnicodeDecodeError, KeyError, TypeError, ValueError) as e:
+        msg = f"{ErrorNumbers.FB304.value}: cannot read the parameters file {filename}: {e}"
+        logger.critical(msg)
+        raise FedbiomedTrainingPlanError(msg)
+    return params
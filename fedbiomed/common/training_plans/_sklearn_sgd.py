@@ -0,0 +1,300 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+"""Vectorized minibatch updates of scikit-learn SGD linear models.
+
+Scikit-learn's `partial_fit` runs plain SGD sample after sample. Fed-BioMed trains linear models with minibatch
+gradient descent instead: each sample of a batch computes an SGD step from the same start weights, and the
+resulting weights are averaged over the batch. This module computes these steps for all samples of a batch at
+once with numpy, with the losses, penalties and learning rate schedules of scikit-learn's `_plain_sgd`, and
+computes training losses in closed form from the decision function of the models.
+
+Input features may be dense arrays or CSR sparse matrices, that are never densified. As in scikit-learn, sparse
+inputs use a decayed intercept update, and L1 truncation only applies to the features stored in each sample.
+"""
+
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+
+
+LossFunction = Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+"""Function of the predictions `p` and targets `y`, returning sample-wise loss values and loss derivatives in `p`"""
+
+MAX_DLOSS = 1e12
+"""Clipping value of the loss derivatives, as in scikit-learn"""
+
+L1_CHUNK_SIZE = 2 ** 22
+"""Maximum number of weight values of the sample-wise updates computed at once for L1 penalties"""
+
+LEARNING_RATES = ('constant', 'optimal', 'invscaling', 'adaptive')
+"""Learning rate schedules supported by the vectorized updates"""
+
+SPARSE_INTERCEPT_DECAY = 0.01
+"""Decay of the intercept updates for sparse inputs, as in scikit-learn"""
+
+Inputs = Union[np.ndarray, sparse.csr_matrix]
+"""2D-array or CSR sparse matrix of batched input features"""
+
+
+def _hinge(threshold: float) -> LossFunction:
+    def loss_function(p, y):
+        z = p * y
+        active = z <= threshold
+        return np.where(active, threshold - z, 0.), np.where(active, -y, 0.)
+    return loss_function
+
+
+def _squared_hinge(threshold: float) -> LossFunction:
+    def loss_function(p, y):
+        z = np.maximum(threshold - p * y, 0.)
+        return z * z, -2. * y * z
+    return loss_function
+
+
+def _log(p, y):
+    z = p * y
+    # same approximations as scikit-learn for large margins, exp(-z) is only used for z >= -18
+    exp_neg_z = np.exp(-np.maximum(z, -18.))
+    loss = np.where(z > 18., exp_neg_z, np.where(z < -18., -z, np.log(1. + exp_neg_z)))
+    dloss = np.where(z > 18., -exp_neg_z * y, np.where(z < -18., -y, -y * exp_neg_z / (1. + exp_neg_z)))
+    return loss, dloss
+
+
+def _modified_huber(p, y):
+    z = p * y
+    loss = np.where(z >= 1., 0., np.where(z >= -1., (1. - z) ** 2, -4. * z))
+    dloss = np.where(z >= 1., 0., np.where(z >= -1., -2. * (1. - z) * y, -4. * y))
+    return loss, dloss
+
+
+def _squared(p, y):
+    r = p - y
+    return .5 * r * r, r
+
+
+def _huber(c: float) -> LossFunction:
+    def loss_function(p, y):
+        r = p - y
+        abs_r = np.abs(r)
+        small = abs_r <= c
+        return np.where(small, .5 * r * r, c * abs_r - .5 * c * c), np.where(small, r, np.sign(r) * c)
+    return loss_function
+
+
+def _epsilon_insensitive(epsilon: float) -> LossFunction:
+    def loss_function(p, y):
+        z = y - p
+        return np.maximum(np.abs(z) - epsilon, 0.), np.where(z > epsilon, -1., np.where(-z > epsilon, 1., 0.))
+    return loss_function
+
+
+def _squared_epsilon_insensitive(epsilon: float) -> LossFunction:
+    def loss_function(p, y):
+        z = y - p
+        excess = np.maximum(np.abs(z) - epsilon, 0.)
+        return excess * excess, -2. * np.sign(z) * excess
+    return loss_function
+
+
+_LOSS_FUNCTIONS: Dict[str, Callable[[float], LossFunction]] = {
+    'hinge': lambda epsilon: _hinge(1.),
+    'perceptron': lambda epsilon: _hinge(0.),
+    'squared_hinge': lambda epsilon: _squared_hinge(1.),
+    'log_loss': lambda epsilon: _log,
+    'log': lambda epsilon: _log,
+    'modified_huber': lambda epsilon: _modified_huber,
+    'squared_error': lambda epsilon: _squared,
+    'huber': _huber,
+    'epsilon_insensitive': _epsilon_insensitive,
+    'squared_epsilon_insensitive': _squared_epsilon_insensitive,
+}
+
+
+def sgd_loss_function(model) -> Optional[LossFunction]:
+    """Gets the vectorized loss function of a scikit-learn SGD model.
+
+    Args:
+        model: scikit-learn model
+
+    Returns:
+        Loss function of the model, or None if the model is not an `SGDClassifier` or `SGDRegressor` model
+            with a known loss
+    """
+    if not isinstance(model, (SGDClassifier, SGDRegressor)):
+        return None
+    loss_function = _LOSS_FUNCTIONS.get(model.loss)
+    return None if loss_function is None else loss_function(model.epsilon)
+
+
+def batch_sgd_loss_function(model) -> Optional[LossFunction]:
+    """Gets the vectorized loss function of a scikit-learn SGD model, if its updates can be vectorized.
+
+    Supported models are `SGDClassifier` (including the `perceptron` loss) and `SGDRegressor`, with any loss,
+    penalty and learning rate schedule, without averaging nor class weights.
+
+    Args:
+        model: scikit-learn model
+
+    Returns:
+        Loss function of the model, or None if the model must be trained with `partial_fit`
+    """
+    if not isinstance(model, (SGDClassifier, SGDRegressor)):
+        return None
+    if model.average or getattr(model, 'class_weight', None) is not None or \
+            model.learning_rate not in LEARNING_RATES or \
+            str(model.penalty).lower() not in ('none', 'l2', 'l1', 'elasticnet'):
+        return None
+    return sgd_loss_function(model)
+
+
+def as_float_inputs(inputs) -> Inputs:
+    """Converts batched input features to a float64 2D-array, or CSR matrix if they are sparse.
+
+    Args:
+        inputs: array-like or scipy sparse matrix of batched input features
+
+    Returns:
+        Input features, without copy if they already have the expected type
+    """
+    if sparse.issparse(inputs):
+        return sparse.csr_matrix(inputs, dtype=np.float64)
+    return np.asarray(inputs, dtype=np.float64)
+
+
+def sgd_losses(model,
+               loss_function: LossFunction,
+               inputs: Inputs,
+               targets: np.ndarray) -> np.ndarray:
+    """Computes the sample-wise losses of a scikit-learn SGD model over a batch, from its decision function.
+
+    Args:
+        model: scikit-learn SGD model, with initialized `coef_` and `intercept_`
+        loss_function: loss function of the model, from `sgd_loss_function`
+        inputs: 2D-array or CSR matrix of batched input features
+        targets: 2D-array of batched targets, with one column per weight vector of the model
+
+    Returns:
+        2D-array of the sample-wise loss values, with the shape of `targets`
+    """
+    weights, intercept = _weights(model, inputs.shape[1])
+    losses, _ = loss_function(inputs @ weights.T + intercept, targets)
+    return losses
+
+
+def batch_sgd_update(model,
+                     loss_function: LossFunction,
+                     inputs: Inputs,
+                     targets: np.ndarray) -> np.ndarray:
+    """Updates a scikit-learn SGD model with the average of the SGD steps of the samples of a batch.
+
+    The result is the same as resetting the model to its start weights before calling `partial_fit` on each
+    sample, and averaging the resulting weights. The `t_` counter of the model advances by one per sample, and
+    `n_iter_` is set to 1.
+
+    Args:
+        model: scikit-learn SGD model, with initialized `coef_` and `intercept_`
+        loss_function: loss function of the model, from `batch_sgd_loss_function`
+        inputs: 2D-array or CSR matrix of batched input features
+        targets: 2D-array of batched targets, with one column per weight vector of the model (`+1` or `-1`
+            for each class of classifiers)
+
+    Returns:
+        2D-array of the sample-wise loss values at the start weights, with the shape of `targets`
+    """
+    n_samples = inputs.shape[0]
+    coef_shape = np.shape(model.coef_)
+    weights, intercept = _weights(model, inputs.shape[1])
+
+    alpha = model.alpha
+    penalty = str(model.penalty).lower()
+    l1_ratio = {'l2': 0., 'l1': 1.}.get(penalty, model.l1_ratio)
+
+    # sample-wise learning rates, following scikit-learn's schedules
+    t_start = float(getattr(model, 't_', 1.))
+    t = t_start + np.arange(n_samples)
+    if model.learning_rate == 'optimal':
+        typw = np.sqrt(1. / np.sqrt(alpha))
+        _, dloss = loss_function(np.array(-typw), np.array(1.))
+        initial_eta0 = typw / max(1., float(dloss))
+        eta = 1. / (alpha * (1. / (initial_eta0 * alpha) + t - 1.))
+    elif model.learning_rate == 'invscaling':
+        eta = model.eta0 / np.power(t, model.power_t)
+    else:
+        eta = np.full(n_samples, float(model.eta0))
+
+    predictions = inputs @ weights.T + intercept
+    losses, dloss = loss_function(predictions, targets)
+    updates = -eta[:, None] * np.clip(dloss, -MAX_DLOSS, MAX_DLOSS)
+
+    if penalty in ('l2', 'elasticnet'):
+        scales = np.maximum(0., 1. - (1. - l1_ratio) * eta * alpha)
+    else:
+        scales = np.ones(n_samples)
+
+    is_sparse = sparse.issparse(inputs)
+    if is_sparse and penalty in ('l1', 'elasticnet'):
+        new_weights = _sparse_l1_weights(weights, inputs, scales, updates, l1_ratio * eta * alpha)
+    elif is_sparse:
+        new_weights = scales.mean() * weights + (inputs.T @ updates).T / n_samples
+    elif penalty in ('l1', 'elasticnet'):
+        # truncated gradient: sample-wise weights are thresholded before averaging
+        thresholds = l1_ratio * eta * alpha
+        new_weights = np.zeros_like(weights)
+        chunk = max(1, L1_CHUNK_SIZE // weights.size)
+        for start in range(0, n_samples, chunk):
+            end = min(start + chunk, n_samples)
+            sample_weights = scales[start:end, None, None] * weights + \
+                updates[start:end, :, None] * inputs[start:end, None, :]
+            sample_weights = np.sign(sample_weights) * \
+                np.maximum(np.abs(sample_weights) - thresholds[start:end, None, None], 0.)
+            new_weights += sample_weights.sum(axis=0)
+        new_weights /= n_samples
+    else:
+        new_weights = scales.mean() * weights + updates.T @ inputs / n_samples
+
+    model.coef_ = new_weights.reshape(coef_shape)
+    if model.fit_intercept:
+        intercept_decay = SPARSE_INTERCEPT_DECAY if is_sparse else 1.
+        model.intercept_ = intercept + intercept_decay * updates.mean(axis=0)
+    model.t_ = t_start + n_samples
+    model.n_iter_ = 1
+    return losses
+
+
+def _sparse_l1_weights(weights: np.ndarray,
+                       inputs: sparse.csr_matrix,
+                       scales: np.ndarray,
+                       updates: np.ndarray,
+                       thresholds: np.ndarray) -> np.ndarray:
+    """Averages the sample-wise SGD steps of sparse inputs, with L1 truncation of their stored features.
+
+    The untruncated steps are averaged with a sparse product, then the truncation of each stored value of the
+    inputs is added as a correction, in chunks of entries.
+    """
+    n_samples = inputs.shape[0]
+    if not inputs.has_canonical_format:
+        inputs = inputs.copy()
+        inputs.sum_duplicates()
+    new_weights = scales.mean() * weights + (inputs.T @ updates).T / n_samples
+    rows = np.repeat(np.arange(n_samples), np.diff(inputs.indptr))
+    chunk = max(1, L1_CHUNK_SIZE // weights.shape[0])
+    for start in range(0, inputs.nnz, chunk):
+        end = min(start + chunk, inputs.nnz)
+        r, c = rows[start:end], inputs.indices[start:end]
+        # sample-wise weights of the stored features, before and after truncation
+        sample_weights = scales[r, None] * weights[:, c].T + updates[r] * inputs.data[start:end, None]
+        truncated = np.sign(sample_weights) * np.maximum(np.abs(sample_weights) - thresholds[r, None], 0.)
+        for k in range(weights.shape[0]):
+            new_weights[k] += np.bincount(c, weights=truncated[:, k] - sample_weights[:, k],
+                                          minlength=weights.shape[1]) / n_samples
+    return new_weights
+
+
+def _weights(model, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Gets the weights of a linear model as a 2D-array with one row per weight vector, and the intercepts."""
+    weights = np.asarray(model.coef_, dtype=np.float64).reshape(-1, n_features)
+    intercept = np.asarray(model.intercept_, dtype=np.float64).reshape(-1)
+    return weights, intercept
@@ -0,0 +1,254 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+# coding: utf-8
+
+"""SKLearnTrainingPlan subclasses for models computed from sufficient statistics, in a single round."""
+
+from abc import ABCMeta, abstractmethod
+from typing import Dict, Optional
+
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import PCA
+from sklearn.linear_model import LinearRegression
+from sklearn.naive_bayes import GaussianNB
+
+from fedbiomed.common.constants import ErrorNumbers
+from fedbiomed.common.exceptions import FedbiomedTrainingPlanError
+from fedbiomed.common.logger import logger
+from fedbiomed.common.training_plans import SKLearnTrainingPlan
+
+
+__all__ = [
+    "FedGaussianNB",
+    "FedLinearRegression",
+    "FedPCA",
+]
+
+
+class SKLearnTrainingPlanSufficientStatistics(SKLearnTrainingPlan, metaclass=ABCMeta):
+    """Base SKLearnTrainingPlan for models computed exactly from local sufficient statistics.
+
+    Instead of training the model, each node makes a single pass over its training data, accumulating statistics
+    that are sums over samples (eg. counts, sums, `XᵀX`). These statistics are the parameters sent to the
+    researcher, named by `_param_list`. The matching aggregator of
+    [`sufficient_statistics`][fedbiomed.researcher.aggregators.sufficient_statistics] sums them over nodes and
+    computes the model centrally, so that the federated model is the same as the model fitted on the pooled data,
+    after one round.
+
+    The model attributes computed by the aggregator (eg. `coef_`) are sent back to the nodes with the aggregated
+    parameters, for evaluation.
+    """
+
+    def _training_routine(
+            self,
+            history_monitor: Optional['HistoryMonitor'] = None
+        ) -> int:
+        """Accumulate the sufficient statistics of the model over one pass of the training data.
+
+        The number of epochs or updates of the training arguments is not used. No loss is reported.
+
+        Args:
+            history_monitor: unused, no loss is computed.
+
+        Returns:
+            number of samples observed.
+        """
+        timer = self._phase_timer
+        timer.start()
+        self._reset_statistics()
+        num_samples = 0
+        num_batches = 0
+        for inputs, target in self.training_data_loader:
+            batch_size = self._infer_batch_size(inputs)
+            timer.add_samples(batch_size)
+            timer.lap('data_loading')
+            # statistics are dense: sparse batches are densified one at a time
+            inputs = inputs.toarray() if sparse.issparse(inputs) else inputs
+            self._accumulate(np.asarray(inputs, dtype=np.float64), target)
+            timer.lap('backward_step')
+            timer.end_step()
+            num_samples += batch_size
+            num_batches += 1
+            if self._training_args.get('dry_run'):
+                break
+
+        self._num_updates_performed = num_batches
+        return num_samples
+
+    def set_init_params(self) -> None:
+        """Initialize the statistics to zero, and the model's attributes, so that it can be evaluated."""
+        self._reset_statistics()
+        self._param_list = list(self._statistics_shapes())
+        self._init_model()
+
+    def _reset_statistics(self) -> None:
+        """Set all statistics to zero."""
+        for key, shape in self._statistics_shapes().items():
+            setattr(self._model, key, np.zeros(shape))
+
+    @abstractmethod
+    def _statistics_shapes(self) -> Dict[str, tuple]:
+        """Names and shapes of the statistics of the model."""
+
+    @abstractmethod
+    def _init_model(self) -> None:
+        """Initialize the model's attributes before the first round."""
+
+    @abstractmethod
+    def _accumulate(self, inputs: np.ndarray, target: np.ndarray) -> None:
+        """Add the statistics of a batch of data.
+
+        Args:
+            inputs: 2D-array of batched input features.
+            target: 2D-array of batched targets.
+        """
+
+
+class FedLinearRegression(SKLearnTrainingPlanSufficientStatistics):
+    """Fed-BioMed training plan for scikit-learn LinearRegression models (ordinary least squares).
+
+    Statistics are the number of samples, the sums of the features and target, and the `XᵀX` and `Xᵀy` matrices.
+    Model arguments must provide `n_features`, the number of input features. The model is solved by the
+    [`LinearRegressionAggregator`][fedbiomed.researcher.aggregators.LinearRegressionAggregator].
+    """
+
+    _model_cls = LinearRegression
+    _model_dep = (
+        "from sklearn.linear_model import LinearRegression",
+        "from fedbiomed.common.training_plans import FedLinearRegression"
+    )
+    _aggregated_params = ('coef_', 'intercept_')
+
+    def __init__(self) -> None:
+        """Initialize the sklearn LinearRegression training plan."""
+        super().__init__()
+        self._is_regression = True
+
+    def _statistics_shapes(self) -> Dict[str, tuple]:
+        n_features = self._model_args['n_features']
+        return {
+            'n_samples_': (1,),
+            'sum_x_': (n_features,),
+            'sum_y_': (1,),
+            'xtx_': (n_features, n_features),
+            'xty_': (n_features,),
+        }
+
+    def _init_model(self) -> None:
+        self._model.coef_ = np.zeros(self._model_args['n_features'])
+        self._model.intercept_ = 0.
+
+    def _accumulate(self, inputs: np.ndarray, target: np.ndarray) -> None:
+        target = np.asarray(target, dtype=np.float64).reshape(-1)
+        self._model.n_samples_ += inputs.shape[0]
+        self._model.sum_x_ += inputs.sum(axis=0)
+        self._model.sum_y_ += target.sum()
+        self._model.xtx_ += inputs.T @ inputs
+        self._model.xty_ += inputs.T @ target
+
+
+class FedGaussianNB(SKLearnTrainingPlanSufficientStatistics):
+    """Fed-BioMed training plan for scikit-learn GaussianNB models.
+
+    Statistics are the per-class counts, sums of the features and sums of the squared features. Model arguments
+    must provide `n_features` and `n_classes`: target values are assumed to be integers in `range(n_classes)`.
+    The model is solved by the [`GaussianNBAggregator`][fedbiomed.researcher.aggregators.GaussianNBAggregator].
+    """
+
+    _model_cls = GaussianNB
+    _model_dep = (
+        "from sklearn.naive_bayes import GaussianNB",
+        "from fedbiomed.common.training_plans import FedGaussianNB"
+    )
+    _aggregated_params = ('classes_', 'theta_', 'var_', 'class_prior_', 'class_count_', 'epsilon_')
+
+    def __init__(self) -> None:
+        """Initialize the sklearn GaussianNB training plan."""
+        super().__init__()
+        self._is_classification = True
+
+    def _statistics_shapes(self) -> Dict[str, tuple]:
+        n_classes = self._model_args['n_classes']
+        n_features = self._model_args['n_features']
+        return {
+            'class_count_': (n_classes,),
+            'sum_x_': (n_classes, n_features),
+            'sum_xx_': (n_classes, n_features),
+        }
+
+    def _init_model(self) -> None:
+        n_classes = self._model_args['n_classes']
+        n_features = self._model_args['n_features']
+        self._model.classes_ = np.arange(n_classes)
+        self._model.theta_ = np.zeros((n_classes, n_features))
+        self._model.var_ = np.ones((n_classes, n_features))
+        self._model.class_prior_ = np.full(n_classes, 1. / n_classes)
+        self._model.epsilon_ = 0.
+
+    def _accumulate(self, inputs: np.ndarray, target: np.ndarray) -> None:
+        target = np.asarray(target).reshape(-1)
+        n_classes = self._model_args['n_classes']
+        try:
+            labels = target.astype(int)
+            valid = np.array_equal(labels, target) and bool(np.all((labels >= 0) & (labels < n_classes)))
+        except (TypeError, ValueError):
+            valid = False
+        if not valid:
+            msg = f"{ErrorNumbers.FB605.value}: FedGaussianNB expects target values that are integers in " \
+                  f"range(n_classes), with n_classes={n_classes}, but got values {np.unique(target)[:10]}"
+            logger.critical(msg)
+            raise FedbiomedTrainingPlanError(msg)
+        # one-hot encoded labels: per-class sums are computed with matrix products
+        one_hot = np.zeros((inputs.shape[0], n_classes))
+        one_hot[np.arange(inputs.shape[0]), labels] = 1.
+        self._model.class_count_ += one_hot.sum(axis=0)
+        self._model.sum_x_ += one_hot.T @ inputs
+        self._model.sum_xx_ += one_hot.T @ (inputs * inputs)
+
+
+class FedPCA(SKLearnTrainingPlanSufficientStatistics):
+    """Fed-BioMed training plan for scikit-learn PCA models.
+
+    Statistics are the number of samples, the sums of the features and the `XᵀX` matrix. Model arguments must
+    provide `n_features`, and may provide `n_components` (default: all components). The model is solved by the
+    [`PCAAggregator`][fedbiomed.researcher.aggregators.PCAAggregator].
+
+    !!! info "Evaluation"
+        PCA models have no `predict` method: evaluating them requires a `testing_step` method in the training plan.
+    """
+
+    _model_cls = PCA
+    _model_dep = (
+        "from sklearn.decomposition import PCA",
+        "from fedbiomed.common.training_plans import FedPCA"
+    )
+    _aggregated_params = ('n_components_', 'n_features_in_', 'components_', 'mean_', 'explained_variance_',
+                          'explained_variance_ratio_', 'singular_values_', 'noise_variance_')
+
+    def _statistics_shapes(self) -> Dict[str, tuple]:
+        n_features = self._model_args['n_features']
+        return {
+            'n_samples_': (1,),
+            'sum_x_': (n_features,),
+            'xtx_': (n_features, n_features),
+        }
+
+    def _init_model(self) -> None:
+        n_features = self._model_args['n_features']
+        # all components until the aggregator selects them, when `n_components` is not a number of components
+        n_components = self._model.n_components if isinstance(self._model.n_components, int) else n_features
+        self._model.n_components_ = n_components
+        self._model.n_features_in_ = n_features
+        self._model.components_ = np.eye(n_components, n_features)
+        self._model.mean_ = np.zeros(n_features)
+        self._model.explained_variance_ = np.ones(n_components)
+        self._model.explained_variance_ratio_ = np.full(n_components, 1. / n_features)
+        self._model.singular_values_ = np.ones(n_components)
+        self._model.noise_variance_ = 0.
+
+    def _accumulate(self, inputs: np.ndarray, target: Optional[np.ndarray]) -> None:
+        self._model.n_samples_ += inputs.shape[0]
+        self._model.sum_x_ += inputs.sum(axis=0)
+        self._model.xtx_ += inputs.T @ inputs
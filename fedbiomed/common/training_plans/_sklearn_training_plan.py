@@ -7,21 +7,28 @@ This module implements the base class for all implementations of
 Fed-BioMed training plans wrapping scikit-learn models.
 """
 
+import os
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 import joblib
 import numpy as np
-from sklearn.base import BaseEstimator
+from sklearn.base import BaseEstimator, clone
 from torch.utils.data import DataLoader
 
 from fedbiomed.common.constants import ErrorNumbers, TrainingPlans
 from fedbiomed.common.data import NPDataLoader
 from fedbiomed.common.exceptions import FedbiomedTrainingPlanError
 from fedbiomed.common.logger import logger
-from fedbiomed.common.metrics import MetricTypes
+from fedbiomed.common.metrics import Metrics, MetricTypes
 
 from ._base_training_plan import BaseTrainingPlan
+from ._sklearn_params import load_params, save_params
+
+
+PREDICT_CHUNK_SIZE = 2 ** 16
+"""Maximum number of samples predicted at once when evaluating a model over a validation dataset"""
 
 
 class SKLearnTrainingPlan(BaseTrainingPlan, metaclass=ABCMeta):
@@ -46,6 +53,7 @@ class SKLearnTrainingPlan(BaseTrainingPlan, metaclass=ABCMeta):
 
     _model_cls: Type[BaseEstimator]        # wrapped model class
     _model_dep: Tuple[str, ...] = tuple()  # model-specific dependencies
+    _aggregated_params: Tuple[str, ...] = tuple()  # model attributes computed by the aggregator, if not in _param_list
 
     def __init__(self) -> None:
         """Initialize the SKLearnTrainingPlan."""
@@ -85,11 +93,13 @@ class SKLearnTrainingPlan(BaseTrainingPlan, metaclass=ABCMeta):
         """
         self._model_args = model_args
         self._aggregator_args = aggregator_args or {}
-        self._model_args.setdefault("verbose", 1)
         self._training_args = training_args.pure_training_arguments()
         self._batch_maxnum = self._training_args.get('batch_maxnum', self._batch_maxnum)
         # Add dependencies
         self._configure_dependencies()
+        # Start from an unfitted estimator, so that a training plan initialized again for a new round (eg. kept
+        # warm by the node) does not carry fitted state such as the `t_` counter of the learning rate schedule.
+        self._model = clone(self._model)
         # Override default model parameters based on `self._model_args`.
         params = {
             key: self._model_args.get(key, val)
@@ -247,6 +257,10 @@ class SKLearnTrainingPlan(BaseTrainingPlan, metaclass=ABCMeta):
             (the signature of which is func(data, target) -> metrics)
             then it will be used rather than the input metric.
 
+        Otherwise, the metric is computed once, over the whole validation
+        dataset: predictions are computed in chunks of `PREDICT_CHUNK_SIZE`
+        samples, in a thread pool, rather than batch after batch.
+
         Args:
             metric: The metric used for validation.
                 If None, use MetricTypes.ACCURACY.
@@ -276,10 +290,79 @@ class SKLearnTrainingPlan(BaseTrainingPlan, metaclass=ABCMeta):
                 metric = MetricTypes.ACCURACY
             else:
                 metric = MetricTypes.MEAN_SQUARE_ERROR
-        # Delegate the actual evalation routine to the parent class.
-        super().testing_routine(
-            metric, metric_args, history_monitor, before_train
+        # Delegate custom evaluation steps to the parent class.
+        if hasattr(self, "testing_step"):
+            super().testing_routine(
+                metric, metric_args, history_monitor, before_train
+            )
+            return
+        # Otherwise, evaluate the model over the whole dataset at once.
+        loader = self.testing_data_loader
+        n_samples = loader.dataset.shape[0]
+        if not n_samples:
+            return
+        try:
+            output = self._predict_dataset(loader)
+            m_value = Metrics().evaluate(
+                np.asarray(loader.target), output, metric=metric, **metric_args
+            )
+        except Exception as exc:
+            msg = (
+                f"{ErrorNumbers.FB605.value}: An error occurred "
+                f"while computing the {metric.name} metric: {exc}"
+            )
+            logger.critical(msg)
+            raise FedbiomedTrainingPlanError(msg)
+        logger.debug(
+            f"Validation: Samples {n_samples}/{n_samples} "
+            f"| Metric[{metric.name}]: {m_value}"
         )
+        # Report the metric once (provided a monitor is set).
+        if history_monitor is not None:
+            history_monitor.add_scalar(
+                metric=self._create_metric_result_dict(m_value, metric.name),
+                iteration=1,
+                epoch=None,
+                test=True,
+                test_on_local_updates=(not before_train),
+                test_on_global_updates=before_train,
+                total_samples=n_samples,
+                batch_samples=n_samples,
+                num_batches=1
+            )
+
+    def _predict_dataset(
+            self,
+            loader: NPDataLoader
+        ) -> np.ndarray:
+        """Return model predictions for all the samples of a data loader.
+
+        Predictions are computed by `predict`, over chunks of at most
+        `PREDICT_CHUNK_SIZE` samples, read in the order of the dataset.
+        Several chunks are predicted concurrently in a thread pool, as
+        scikit-learn's predictions mostly release the GIL.
+
+        Args:
+            loader: Data loader wrapping the input features.
+
+        Returns:
+            Output predictions for all the samples, concatenated.
+        """
+        dataset, dtype = loader.dataset, loader.dtype()
+        n_samples = dataset.shape[0]
+        starts = range(0, n_samples, PREDICT_CHUNK_SIZE)
+
+        def predict_chunk(start: int) -> np.ndarray:
+            data = dataset[start:start + PREDICT_CHUNK_SIZE]
+            if dtype is not None:
+                data = data.astype(dtype, copy=False)
+            return np.asarray(self.predict(data))
+
+        if len(starts) == 1:
+            return predict_chunk(0)
+        n_workers = min(len(starts), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            return np.concatenate(list(pool.map(predict_chunk, starts)))
 
     def predict(
             self,
@@ -306,23 +389,34 @@ class SKLearnTrainingPlan(BaseTrainingPlan, metaclass=ABCMeta):
     def _classes_from_concatenated_train_test(self) -> np.ndarray:
         """Return unique target labels from the training and testing datasets.
 
+        Labels are the cached label inventories of the loaders (see
+        `NPDataLoader.classes`), rather than the result of an iteration
+        over their batches.
+
         Returns:
             Numpy array containing the unique values from the targets wrapped
             in the training and testing NPDataLoader instances.
         """
-        return np.unique([t for loader in (self.training_data_loader, self.testing_data_loader) for d, t in loader])
+        classes = [
+            loader.classes()
+            for loader in (self.training_data_loader, self.testing_data_loader)
+        ]
+        # empty subsets are skipped, so that integer labels are not cast to float
+        classes = [c for c in classes if len(c)]
+        if not classes:
+            return np.array([])
+        return np.unique(np.concatenate(classes))
 
     def save(
             self,
             filename: str,
             params: Union[None, Dict[str, np.ndarray], Dict[str, Any]] = None
         ) -> None:
-        """Save the wrapped model and its trainable parameters.
+        """Save the trainable parameters of the wrapped model.
 
-        This method is designed for parameter communication. It
-        uses the joblib.dump function, which in turn uses pickle
-        to serialize the model. Note that unpickling objects can
-        lead to arbitrary code execution; hence use with care.
+        This method is designed for parameter communication. Only the
+        parameters are saved, as raw array buffers (see `load`), not the
+        estimator: the receiving party builds it from the model arguments.
 
         Args:
             filename: Path to the output file.
@@ -330,6 +424,7 @@ class SKLearnTrainingPlan(BaseTrainingPlan, metaclass=ABCMeta):
                 This may either be a {name: array} parameters dict, or a
                 nested dict that stores such a parameters dict under the
                 'model_params' key (in the context of the Round class).
+                If None, the `_param_list` attributes of the model are saved.
 
         Notes:
             Save can be called from Job or Round.
@@ -343,29 +438,40 @@ class SKLearnTrainingPlan(BaseTrainingPlan, metaclass=ABCMeta):
                 params = params["model_params"]
             for key, val in params.items():
                 setattr(self._model, key, val)
-        # Save the wrapped model (using joblib, hence pickle).
-        with open(filename, "wb") as file:
-            joblib.dump(self._model, file)
+        else:
+            params = {key: getattr(self._model, key) for key in self._param_list}
+        save_params(filename, params)
 
     def load(
             self,
             filename: str,
-            to_params: bool = False
+            to_params: bool = False,
+            allow_legacy_pickle: bool = False
         ) -> Union[BaseEstimator, Dict[str, Dict[str, np.ndarray]]]:
-        """Load a scikit-learn model dump, overwriting the wrapped model.
+        """Load model parameters, overwriting those of the wrapped model.
+
+        Parameters files are written by `save`: they contain raw array
+        buffers and a small header, so that reading them executes no
+        code. The parameters are assigned to the wrapped model, that is
+        built locally from the model arguments.
 
-        This method uses the joblib.load function, which in turn uses
-        pickle to deserialize the model. Note that unpickling objects
-        can lead to arbitrary code execution; hence use with care.
+        Only the parameters named by `_param_list`, and the model
+        attributes computed by the aggregator of the training plan (if
+        any), are loaded: files assigning other attributes of the model
+        are refused.
 
-        This function updates the `_model` private attribute with the
-        loaded instance, and returns either that same model or a dict
-        wrapping its trainable parameters.
+        Files of earlier versions of Fed-BioMed, that are joblib dumps
+        of the whole model, can only be loaded with `allow_legacy_pickle`,
+        for breakpoints of the researcher. This uses pickle, which can
+        lead to arbitrary code execution: files received from other
+        parties (eg. node updates) are never unpickled.
 
         Args:
-            filename: The path to the pickle file to load.
+            filename: The path to the parameters file to load.
             to_params: Whether to return the model's parameters
                 wrapped as a dict rather than the model instance.
+            allow_legacy_pickle: Whether to load joblib dumps of the
+                model written by earlier versions. Only for trusted files.
 
         Notes:
             Load can be called from a Job or Round:
@@ -374,8 +480,52 @@ class SKLearnTrainingPlan(BaseTrainingPlan, metaclass=ABCMeta):
 
         Returns:
             Dictionary with the loaded parameters.
+
+        Raises:
+            FedbiomedTrainingPlanError: if the file is not a parameters
+                file, unless it is a joblib dump of a model of the expected
+                type and `allow_legacy_pickle` is True, or if it contains
+                parameters that are not expected for the model.
+        """
+        params = load_params(filename)
+        if params is None:
+            params = self._load_joblib_params(filename, allow_legacy_pickle)
+        unexpected = set(params).difference(self._param_list, self._aggregated_params)
+        if unexpected:
+            msg = (
+                f"{ErrorNumbers.FB304.value}: parameters file {filename} "
+                f"contains unexpected parameters {sorted(unexpected)}."
+            )
+            logger.critical(msg)
+            raise FedbiomedTrainingPlanError(msg)
+        for key, val in params.items():
+            setattr(self._model, key, val)
+        # Optionally return the model's pseudo state dict instead of it.
+        if to_params:
+            return {"model_params": params}
+        return self._model
+
+    def _load_joblib_params(
+            self,
+            filename: str,
+            allow_legacy_pickle: bool
+        ) -> Dict[str, Any]:
+        """Load the parameters of a joblib dump of the whole model, written by earlier versions.
+
+        Raises:
+            FedbiomedTrainingPlanError: if unpickling is not allowed, or
+                the dump is not a model of the expected type.
         """
-        # Deserialize the dump, type-check the instance and assign it.
+        if not allow_legacy_pickle:
+            msg = (
+                f"{ErrorNumbers.FB304.value}: {filename} is not a parameters "
+                "file. Model dumps of earlier versions are only loaded from "
+                "breakpoints, as they are unpickled."
+            )
+            logger.critical(msg)
+            raise FedbiomedTrainingPlanError(msg)
+        logger.warning(f"Loading parameters from the model dump {filename} using pickle.")
+        # Deserialize the dump and type-check the instance.
         with open(filename, "rb") as file:
             model = joblib.load(file)
         if not isinstance(model, self._model_cls):
@@ -386,12 +536,7 @@ class SKLearnTrainingPlan(BaseTrainingPlan, metaclass=ABCMeta):
             )
             logger.critical(msg)
             raise FedbiomedTrainingPlanError(msg)
-        self._model = model
-        # Optionally return the model's pseudo state dict instead of it.
-        if to_params:
-            params = {k: getattr(self._model, k) for k in self._param_list}
-            return {"model_params": params}
-        return self._model
+        return {k: getattr(model, k) for k in self._param_list}
 
     def type(self) -> TrainingPlans:
         """Getter for training plan type """
@@ -4,9 +4,8 @@
 """TrainingPlan definition for the pytorch deep learning framework."""
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Tuple, Optional, OrderedDict, Union, Iterator
-
-from copy import deepcopy
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, List, Tuple, Optional, OrderedDict, Union, Iterator
 
 import numpy as np
 from fedbiomed.common.training_args import TrainingArgs
@@ -21,6 +20,7 @@ from fedbiomed.common.privacy import DPController
 from fedbiomed.common.utils import get_method_spec
 from fedbiomed.common.training_plans._training_iterations import MiniBatchTrainingIterationsAccountant
 from fedbiomed.common.training_plans._base_training_plan import BaseTrainingPlan
+from fedbiomed.common.training_plans._data_parallel import CPUDataParallel
 
 ModelInputType = Union[torch.Tensor, Dict, List, Tuple]
 
@@ -71,6 +71,7 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
         self._model_args = None
         self._optimizer_args = None
         self._use_gpu = False
+        self._mixed_precision = None
 
         self._batch_maxnum = 100
         self._fedprox_mu = None
@@ -81,6 +82,10 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
 
         self.correction_state = OrderedDict()
         self.aggregator_name = None
+        # SCAFFOLD corrections aligned with the model parameters, on the training device
+        self._scaffold_corrections: Optional[Tuple[List[torch.Tensor], List[torch.Tensor]]] = None
+        # processes training together, while training with several processes on CPU
+        self._data_parallel: Optional[CPUDataParallel] = None
 
         # TODO : add random seed init
         # self.random_seed_params = None
@@ -132,6 +137,7 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
         self._optimizer_args = training_args.optimizer_arguments() or {}
         self._training_args = training_args.pure_training_arguments()
         self._use_gpu = self._training_args.get('use_gpu')
+        self._mixed_precision = self._training_args.get('mixed_precision')
         self._batch_maxnum = self._training_args.get('batch_maxnum')
 
         self._log_interval = self._training_args.get('log_interval')
@@ -149,6 +155,11 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
         # FIXME: we should have a AggregatorHandler that handles aggregator args
 
         self._dp_controller = DPController(training_args.dp_arguments() or None)
+        if self._mixed_precision is not None and training_args.dp_arguments():
+            msg = (f"{ErrorNumbers.FB605.value}: mixed precision training (`mixed_precision`) cannot be used with "
+                   "differential privacy (`dp_args`)")
+            logger.critical(msg)
+            raise FedbiomedTrainingPlanError(msg)
 
         # Add dependencies
         self._configure_dependencies()
@@ -411,6 +422,8 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
                     GPU device if this GPU device is available. Default None.
                 - `gpu_only (bool)`: force use of a GPU device if any available, even if researcher
                     doesn't request for using a GPU. Default False.
+                - `cpu_workers (Union[int, None])`: number of processes training together when training on CPU,
+                    each on a slice of each batch. Default None (single process).
         Returns:
             Total number of samples observed during the training.
         """
@@ -422,20 +435,58 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
 
         # send all model to device, ensures having all the requested tensors
         self._set_device(self._use_gpu, node_args)
+        if self._mixed_precision is not None and self._device != "cpu":
+            msg = (f"{ErrorNumbers.FB605.value}: mixed precision training (`mixed_precision`) is only supported on "
+                   f"CPU, but node trains on {self._device}")
+            logger.critical(msg)
+            raise FedbiomedTrainingPlanError(msg)
         self._model.to(self._device)
+        self._prepare_scaffold_corrections()
 
         # Run preprocess when everything is ready before the training
         self._preprocess()
 
-        # initial aggregated model parameters
-        self._init_params = deepcopy(list(self._model.parameters()))
+        # initial aggregated model parameters (detached snapshot, used by FedProx)
+        self._init_params = [param.detach().clone() for param in self._model.parameters()]
 
         # DP actions
+        timer = self._phase_timer
+        timer.start()
         self._model, self._optimizer, self.training_data_loader = \
             self._dp_controller.before_training(self._model, self._optimizer, self.training_data_loader)
+        timer.lap('dp')
+
+        data_parallel = self._configure_data_parallel(node_args)
+        if data_parallel is not None:
+            num_samples = self._data_parallel_training_loop(data_parallel, history_monitor)
+        else:
+            num_samples = self._training_loop(history_monitor)
+
+        # release gpu usage as much as possible though:
+        # - it should be done by deleting the object
+        # - and some gpu memory remains used until process (cuda kernel ?) finishes
+
+        self._model.to(self._device_init)
+        torch.cuda.empty_cache()
+
+        return num_samples
+
+    def _training_loop(self, history_monitor: Any) -> int:
+        """Runs the training loop iterations over the training data loader.
+
+        Args:
+            history_monitor: Monitor handler for real-time feed, or None
+
+        Returns:
+            Number of samples observed during the training.
+        """
+        timer = self._phase_timer
 
         # set number of training loop iterations
         iterations_accountant = MiniBatchTrainingIterationsAccountant(self)
+        if self._data_parallel is not None:
+            # all processes stop at the same batch when the time budget is consumed
+            iterations_accountant.sync_stop = self._data_parallel.any
 
         # Training loop iterations
         for epoch in iterations_accountant.iterate_epochs():
@@ -446,11 +497,18 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
                 data, target = next(training_data_iter)
 
                 # update accounting for number of observed samples
-                batch_size = self._infer_batch_size(data)
+                if self._data_parallel is not None:
+                    # samples of the batch trained by this process, without padding
+                    batch_size = self._data_parallel.batch_samples()
+                else:
+                    batch_size = self._infer_batch_size(data)
                 iterations_accountant.increment_sample_counters(batch_size)
+                timer.add_samples(batch_size)
+                timer.lap('data_loading')
 
                 # handle training on accelerator devices
                 data, target = self.send_to_device(data, self._device), self.send_to_device(target, self._device)
+                timer.lap('send_to_device')
 
                 # train this batch
                 corrected_loss, loss = self._train_over_batch(data, target)
@@ -484,21 +542,93 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
                                                    num_batches=num_iter_max,
                                                    total_samples=num_samples_max,
                                                    batch_samples=batch_size)
+                timer.lap('reporting')
+                timer.end_step()
 
                 # Handle dry run mode
                 if self._dry_run:
-                    self._model.to(self._device_init)
-                    torch.cuda.empty_cache()
+                    self._num_updates_performed = iterations_accountant.num_updates_performed
                     return iterations_accountant.num_samples_observed_in_total
 
-        # release gpu usage as much as possible though:
-        # - it should be done by deleting the object
-        # - and some gpu memory remains used until process (cuda kernel ?) finishes
+        self._num_updates_performed = iterations_accountant.num_updates_performed
+        return iterations_accountant.num_samples_observed_in_total
 
-        self._model.to(self._device_init)
-        torch.cuda.empty_cache()
+    def _configure_data_parallel(self, node_args: dict) -> Optional[CPUDataParallel]:
+        """Sets up training with several processes on CPU, if requested by the node.
 
-        return iterations_accountant.num_samples_observed_in_total
+        Args:
+            node_args: command line arguments for node, see `training_routine`
+
+        Returns:
+            Data parallel training of the routine, or None for single process training
+        """
+        cpu_workers = node_args.get('cpu_workers') or 1
+        if cpu_workers <= 1:
+            return None
+
+        if self._device != "cpu":
+            logger.warning(f"Node requests training with {cpu_workers} processes on CPU, but trains on "
+                           f"{self._device}: training in a single process")
+        elif self._dp_controller is not None and self._dp_controller.is_active:
+            logger.warning(f"Node requests training with {cpu_workers} processes on CPU, which is not supported "
+                           f"with differential privacy: training in a single process")
+        elif not CPUDataParallel.supports(self.training_data_loader):
+            logger.warning(f"Node requests training with {cpu_workers} processes on CPU, which is only supported "
+                           f"for data loaders of map-style datasets with a batch size: training in a single process")
+        else:
+            return CPUDataParallel(cpu_workers)
+        return None
+
+    def _data_parallel_training_loop(self, data_parallel: CPUDataParallel, history_monitor: Any) -> int:
+        """Runs the training loop with several processes on CPU, each on a shard of the training data.
+
+        Falls back to single process training if worker processes cannot be started.
+
+        Args:
+            data_parallel: data parallel training of the routine
+            history_monitor: Monitor handler for real-time feed
+
+        Returns:
+            Number of samples observed by all processes during the training.
+        """
+        try:
+            data_parallel.start(self)
+        except FedbiomedTrainingPlanError as e:
+            logger.warning(f"{e}: training in a single process")
+            return self._training_loop(history_monitor)
+
+        try:
+            num_samples = self._train_data_parallel_shard(data_parallel, history_monitor)
+        finally:
+            data_parallel.stop()
+        return num_samples
+
+    def _train_data_parallel_shard(self, data_parallel: CPUDataParallel, history_monitor: Any) -> int:
+        """Runs the training loop over the shard of the training data of a process training with other processes.
+
+        Only the loss of the shard of the node process is reported.
+
+        Args:
+            data_parallel: data parallel training of the routine, for this process
+            history_monitor: Monitor handler for real-time feed, or None for worker processes
+
+        Returns:
+            Number of samples observed by all processes during the training.
+        """
+        loader = self.training_data_loader
+        self._data_parallel = data_parallel
+        try:
+            self.training_data_loader = data_parallel.shard(loader)
+            num_samples = self._training_loop(history_monitor)
+            data_parallel.average_buffers(self._model)
+            total_samples = data_parallel.sum(num_samples)
+        finally:
+            self.training_data_loader = loader
+            self._data_parallel = None
+
+        # throughput of the training accounts for all processes
+        self._phase_timer.add_samples(total_samples - num_samples)
+        return total_samples
 
     def _train_over_batch(self, data: ModelInputType, target: ModelInputType) -> Tuple[torch.Tensor, torch.Tensor]:
         """Train the model over a single batch of data.
@@ -511,32 +641,43 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
             target: the training labels
 
         Returns:
-            corrected loss: the loss value used for backward propagation, including any correction terms
+            corrected loss: the loss value including the FedProx proximal term, if any (detached)
             loss: the uncorrected loss for reporting
         """
         # zero-out gradients
         self._optimizer.zero_grad()
 
         # compute loss
-        loss = self.training_step(data, target)  # raises an exception if not provided
-        corrected_loss = torch.clone(loss)
-
-        # If FedProx is enabled: use regularized loss function
-        if self._fedprox_mu is not None:
-            corrected_loss += float(self._fedprox_mu) / 2 * self.__norm_l2()
+        with self._autocast():
+            loss = self.training_step(data, target)  # raises an exception if not provided
+        if self._mixed_precision is not None:
+            # backward pass and regularization terms are computed in full precision
+            loss = loss.float()
+        self._phase_timer.lap('forward')
 
         # Run the backward pass to compute parameters' gradients
-        corrected_loss.backward()
+        loss.backward()
+
+        # If trained with several processes: average the gradients of all processes
+        if self._data_parallel is not None:
+            self._data_parallel.all_reduce_gradients(self._model.parameters())
+
+        # If FedProx is enabled: add the gradient of the proximal term, mu/2 * ||w - w0||^2
+        corrected_loss = loss.detach().clone()
+        if self._fedprox_mu is not None:
+            corrected_loss += self._add_proximal_gradient(float(self._fedprox_mu))
 
         # If Scaffold is used: apply corrections to the gradients
-        if self.aggregator_name is not None and self.aggregator_name.lower() == "scaffold":
-            for name, param in self._model.named_parameters():
-                correction = self.correction_state.get(name)
-                if correction is not None:
-                    param.grad.add_(correction.to(param.grad.device))
+        if self._scaffold_corrections is not None:
+            params, corrections = self._scaffold_corrections
+            for param in params:
+                if param.grad is None:
+                    param.grad = torch.zeros_like(param)
+            torch._foreach_add_([param.grad for param in params], corrections)
 
         # Have the optimizer collect, refine and apply gradients
         self._optimizer.step()
+        self._phase_timer.lap('backward_step')
 
         return corrected_loss, loss
 
@@ -573,7 +714,7 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
             raise FedbiomedTrainingPlanError(msg)
         try:
             self._model.eval()  # pytorch switch for model inference-mode
-            with torch.no_grad():
+            with torch.no_grad(), self._autocast():
                 super().testing_routine(
                     metric, metric_args, history_monitor, before_train
                 )
@@ -600,10 +741,37 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
             np.ndarray: Output predictions, converted to a numpy array
                 (as per the `fedbiomed.common.metrics.Metrics` specs).
         """
-        with torch.no_grad():
+        with torch.no_grad(), self._autocast():
             pred = self._model(data)
+        if pred.dtype == torch.bfloat16:
+            pred = pred.float()
         return pred.numpy()
 
+    def _autocast(self) -> ContextManager:
+        """Gets the context running operations in the requested mixed precision mode.
+
+        With `mixed_precision='bf16'`, eligible operations (eg. matrix multiplications, convolutions) run in
+        bfloat16 through CPU autocast, while model parameters, their gradients and optimizer states are kept in
+        full precision.
+
+        Returns:
+            CPU autocast context, or a context doing nothing if mixed precision is not requested
+        """
+        if self._mixed_precision is None:
+            return nullcontext()
+        return torch.autocast(device_type="cpu", dtype=torch.bfloat16)
+
+    def training_timing(self) -> Dict[str, Any]:
+        """Retrieves the time spent in each phase of the last training routine, and the precision mode used.
+
+        Returns:
+            Phase totals in seconds and sample throughput, plus the `mixed_precision` mode if any
+        """
+        timing = super().training_timing()
+        if self._mixed_precision is not None:
+            timing['mixed_precision'] = self._mixed_precision
+        return timing
+
     # provided by fedbiomed
     def save(self, filename: str, params: dict = None) -> None:
         """Save the torch training parameters from this training plan or from given `params` to a file
@@ -643,6 +811,8 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
             'aggregator_correction' with correction states)
         """
         self.aggregator_name = aggregator_args.get('aggregator_name') or self.aggregator_name
+        # corrections are aligned with the model parameters on the training device by the training routine
+        self._scaffold_corrections = None
 
         for arg_name, aggregator_arg in aggregator_args.items():
             if arg_name == 'aggregator_correction' and aggregator_arg.get('param_path', False):
@@ -679,15 +849,101 @@ class TorchTrainingPlan(BaseTrainingPlan, ABC):
         params = self._dp_controller.after_training(params)
         return params
 
-    def __norm_l2(self) -> float:
-        """Regularize L2 that is used by FedProx optimization
+    def optimizer_state(self) -> Dict[str, Any]:
+        """Gets the per-parameter state of the optimizer (eg. Adam moments, SGD momentum), to be kept by the node.
+
+        States are indexed by parameter names rather than by parameter positions, so that they can be restored
+        onto the parameters of a new model and optimizer with
+        [`set_optimizer_state`][fedbiomed.common.training_plans.TorchTrainingPlan.set_optimizer_state].
+        Hyperparameters (eg. learning rate) are not part of the state.
 
         Returns:
-            L2 norm of model parameters (before local training)
+            Dict with the optimizer class name (`optimizer`) and the state tensors of each parameter, on CPU
+                (`state`)
         """
-        norm = 0
+        # unwrap the optimizer wrapped for differential privacy, if any
+        optimizer = getattr(self._optimizer, 'original_optimizer', self._optimizer)
+        names = {param: name.replace('_module.', '') for name, param in self._model.named_parameters()}
+
+        state = {}
+        for param, param_state in optimizer.state.items():
+            if param in names:
+                state[names[param]] = {key: value.detach().cpu().clone() if isinstance(value, torch.Tensor) else value
+                                       for key, value in param_state.items()}
+        return {'optimizer': type(optimizer).__name__, 'state': state}
+
+    def set_optimizer_state(self, state: Dict[str, Any]):
+        """Restores an optimizer state onto the parameters of the model, after model parameters are loaded.
+
+        Parameters are matched by name. The state is not restored if the optimizer class changed, and the state of
+        a parameter is skipped if the parameter no longer exists or changed shape.
 
-        for current_model, init_model in zip(self._model.parameters(), self._init_params):
-            norm += ((current_model - init_model) ** 2).sum()
-        return norm
+        Args:
+            state: optimizer state, as returned by
+                [`optimizer_state`][fedbiomed.common.training_plans.TorchTrainingPlan.optimizer_state]
+        """
+        if state.get('optimizer') != type(self._optimizer).__name__:
+            logger.warning(f"Optimizer state of a `{state.get('optimizer')}` optimizer cannot be restored onto a "
+                           f"`{type(self._optimizer).__name__}` optimizer, starting from a fresh optimizer state")
+            return
+
+        params = dict(self._model.named_parameters())
+        for name, param_state in state['state'].items():
+            param = params.get(name)
+            if param is None or any(isinstance(value, torch.Tensor) and value.dim() > 0 and value.shape != param.shape
+                                    for value in param_state.values()):
+                logger.debug(f"Skipping optimizer state of parameter {name}, which does not match the model")
+                continue
+            # scalar tensors (eg. step counts) are kept on CPU, as done by torch optimizers
+            self._optimizer.state[param] = {
+                key: value.to(param.device) if isinstance(value, torch.Tensor) and value.dim() > 0 else value
+                for key, value in param_state.items()}
+
+    def _prepare_scaffold_corrections(self):
+        """Aligns the SCAFFOLD correction states with the model parameters, on the training device.
+
+        Called once per round, after the model is sent to the training device, so that corrections are applied
+        to the gradients of each batch with a single multi-tensor add, without per-parameter lookup or copy.
+        """
+        self._scaffold_corrections = None
+        if self.aggregator_name is None or self.aggregator_name.lower() != "scaffold":
+            return
+
+        params, corrections = [], []
+        for name, param in self._model.named_parameters():
+            correction = self.correction_state.get(name)
+            if correction is not None:
+                params.append(param)
+                corrections.append(correction.to(param.device))
+        if params:
+            self._scaffold_corrections = (params, corrections)
+
+    def _add_proximal_gradient(self, mu: float) -> torch.Tensor:
+        """Adds the gradient of the FedProx proximal term `mu/2 * ||w - w0||^2` to the parameters' gradients.
+
+        The gradient `mu * (w - w0)` is computed with multi-tensor (foreach) operations on the detached snapshot
+        `w0` of the parameters taken at the beginning of the round, instead of back-propagating the term through
+        an autograd graph built for each batch.
+
+        Args:
+            mu: FedProx regularization coefficient
+
+        Returns:
+            Value of the proximal term (detached from the autograd graph)
+        """
+        params, init_params = [], []
+        for param, init_param in zip(self._model.parameters(), self._init_params):
+            if param.requires_grad:
+                if param.grad is None:
+                    param.grad = torch.zeros_like(param)
+                params.append(param)
+                init_params.append(init_param)
+        if not params:
+            return torch.zeros(())
+
+        with torch.no_grad():
+            diffs = torch._foreach_sub(params, init_params)
+            torch._foreach_add_([param.grad for param in params], diffs, alpha=mu)
+            norms = torch._foreach_norm(diffs)
+            return mu / 2 * torch.stack([norm.to(norms[0].device) for norm in norms]).pow(2).sum()
 
@@ -1,7 +1,8 @@
 # This file is originally part of Fed-BioMed
 # SPDX-License-Identifier: Apache-2.0
 
-from typing import Tuple, Optional, TypeVar
+import time
+from typing import Callable, Tuple, Optional, TypeVar
 from fedbiomed.common.logger import logger
 from fedbiomed.common.constants import ErrorNumbers
 from fedbiomed.common.exceptions import FedbiomedUserInputError
@@ -25,11 +26,17 @@ class MiniBatchTrainingIterationsAccountant:
         - manage iterators for epochs and batches
         - provide up-to-date values for reporting
         - handle different semantics in case the researcher asked for num_updates or epochs
+        - stop iterations when the time budget of the training (`max_train_seconds`) is consumed
 
     We assume that the underlying implementation for the training loop is always made in terms of epochs and batches.
     So the primary purpose of this class is to provide a way to correctly convert the number of updates into
     epochs and batches.
 
+    When the researcher specified `max_train_seconds`, iterations stop at the first batch starting after the time
+    budget is consumed (counted from the start of the epochs iteration), even if the requested epochs or updates are
+    not completed. At least one batch is always performed. The number of batches actually performed is available in
+    `num_updates_performed`.
+
     For reporting purposes, in the case of num_updates then we think of the training as a single big loop, while
     in the case of epochs and batches we think of it as two nested loops. This changes the meaning of the values
     outputted by the reporting functions (see their docstrings for more details).
@@ -43,6 +50,10 @@ class MiniBatchTrainingIterationsAccountant:
         num_batches_in_last_epoch: the number of iterations in the last epoch (can be zero)
         num_samples_observed_in_epoch: a counter for the number of samples observed in the current epoch, for reporting
         num_samples_observed_in_total: a counter for the number of samples observed total, for reporting
+        num_updates_performed: a counter for the number of batches (model updates) performed
+        time_budget_exhausted: whether iterations were stopped because the time budget was consumed
+        sync_stop: optional function combining the time budget decision of this process with the decisions of the
+            other processes training together, so that they all stop at the same batch
     """
     def __init__(self, training_plan: TBaseTrainingPlan):
         """Initialize the class.
@@ -58,6 +69,10 @@ class MiniBatchTrainingIterationsAccountant:
         self.num_batches_in_last_epoch: int = 0
         self.num_samples_observed_in_epoch: int = 0
         self.num_samples_observed_in_total: int = 0
+        self.num_updates_performed: int = 0
+        self.time_budget_exhausted: bool = False
+        self.sync_stop: Optional[Callable[[bool], bool]] = None
+        self._deadline: Optional[float] = None
         self._n_training_iterations()
 
     def num_batches_in_this_epoch(self) -> int:
@@ -141,6 +156,29 @@ class MiniBatchTrainingIterationsAccountant:
                 self.cur_batch >= self.num_batches_in_this_epoch() or  # last batch
                 self.cur_batch == 1)  # first batch
 
+    def _start_time_budget(self):
+        """Starts counting the time budget of the training, if the researcher specified one."""
+        max_train_seconds = self._training_plan.training_args().get('max_train_seconds')
+        self._deadline = time.perf_counter() + max_train_seconds if max_train_seconds is not None else None
+
+    def _check_time_budget(self) -> bool:
+        """Checks whether the time budget of the training is consumed, after at least one update.
+
+        Returns:
+            True if iterations should stop because the time budget is consumed
+        """
+        if self.time_budget_exhausted or self._deadline is None or self.num_updates_performed == 0:
+            return self.time_budget_exhausted
+
+        consumed = time.perf_counter() >= self._deadline
+        if self.sync_stop is not None:
+            consumed = self.sync_stop(consumed)
+        if consumed:
+            self.time_budget_exhausted = True
+            logger.info(f"Time budget of {self._training_plan.training_args()['max_train_seconds']}s for local "
+                        f"training is consumed: stopping after {self.num_updates_performed} updates")
+        return self.time_budget_exhausted
+
     def _n_training_iterations(self):
         """Computes the number of training iterations from the training arguments given by researcher.
 
@@ -199,8 +237,10 @@ class MiniBatchTrainingIterationsAccountant:
             This function also resets the batch counter and other reporting attributes
 
             Raises:
-                StopIteration: when the total number of epochs has been exhausted
+                StopIteration: when the total number of epochs has been exhausted, or the time budget is consumed
             """
+            if self._accountant._check_time_budget():
+                raise StopIteration
             self._accountant.cur_epoch += 1
             self._accountant.num_samples_observed_in_epoch = 0
             self._accountant.cur_batch = 0
@@ -209,8 +249,9 @@ class MiniBatchTrainingIterationsAccountant:
             return self._accountant.cur_epoch
 
         def __iter__(self):
-            """Returns this iterator's instance."""
+            """Returns this iterator's instance, and starts counting the time budget of the training."""
             self._accountant.cur_epoch = 0
+            self._accountant._start_time_budget()
             return self
 
     class BatchIter:
@@ -226,11 +267,14 @@ class MiniBatchTrainingIterationsAccountant:
             """Performs next batch iteration
 
             Raises:
-                StopIteration: when the total number of epochs has been exhausted
+                StopIteration: when the batches of the epoch have been exhausted, or the time budget is consumed
             """
+            if self._accountant._check_time_budget():
+                raise StopIteration
             self._accountant.cur_batch += 1
             if self._accountant.cur_batch > self._accountant.num_batches_in_this_epoch():
                 raise StopIteration
+            self._accountant.num_updates_performed += 1
             return self._accountant.cur_batch
 
         def __iter__(self):
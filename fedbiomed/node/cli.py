@@ -186,7 +186,9 @@ def launch_cli():
                             action='store')
     # this option provides a json file describing the data to add
     cli.parser.add_argument('-adff', '--add-dataset-from-file',
-                            help='Add a local dataset described by json file (non-interactive)',
+                            help='Add a local dataset described by json file (non-interactive). For CSV datasets, '
+                                 'an optional "target_column" entry gives the column of the labels, whose classes '
+                                 'are stored',
                             type=str,
                             action='store')
     cli.parser.add_argument('-d', '--delete',
@@ -236,6 +238,20 @@ def launch_cli():
                             help='Force use of a GPU device, if any available, even if researcher doesnt ' +
                                  'request it (default: dont use GPU)',
                             action='store_true')
+    cli.parser.add_argument('-cw', '--cpu-workers',
+                            help='Number of processes training together on CPU, each on a slice of each batch '
+                                 '(default: 1, single process training)',
+                            type=int,
+                            action='store')
+    cli.parser.add_argument('-ws', '--warm-sessions',
+                            help='Maximum number of training sessions (training plan and data loaders) kept warm '
+                                 'between rounds, 0 disables warm sessions (default: 4)',
+                            type=int,
+                            action='store')
+    cli.parser.add_argument('-st', '--session-timeout',
+                            help='Time in seconds after which an unused warm session is evicted (default: 600)',
+                            type=float,
+                            action='store')
 
     print(__intro__)
     print('\t- 🆔 Your node ID:', environ['NODE_ID'], '\n')
@@ -290,7 +306,8 @@ def launch_cli():
                      data_type=data["data_type"],
                      description=data["description"],
                      tags=data["tags"],
-                     name=data["name"]
+                     name=data["name"],
+                     target_column=data.get("target_column")
                      )
 
     elif cli.arguments.list:
@@ -324,7 +341,10 @@ def launch_cli():
             'gpu': (cli.arguments.gpu_num is not None) or (cli.arguments.gpu is True) or
                    (cli.arguments.gpu_only is True),
             'gpu_num': cli.arguments.gpu_num,
-            'gpu_only': (cli.arguments.gpu_only is True)
+            'gpu_only': (cli.arguments.gpu_only is True),
+            'cpu_workers': cli.arguments.cpu_workers,
+            'warm_sessions': cli.arguments.warm_sessions,
+            'session_timeout': cli.arguments.session_timeout
         }
         launch_node(node_args)
 
@@ -25,7 +25,8 @@ def add_database(interactive: bool = True,
                  name: str = None,
                  tags: str = None,
                  description: str = None,
-                 data_type: str = None):
+                 data_type: str = None,
+                 target_column: str = None):
     """Adds a dataset to the node database.
 
     Also queries interactively the user on the command line (and file browser)
@@ -39,6 +40,8 @@ def add_database(interactive: bool = True,
         tags: Comma separated list of tags for the dataset.
         description: Human readable description of the dataset.
         data_type: Keyword for the data type of the dataset.
+        target_column: For CSV datasets, name or position of the column of the labels, whose classes are
+            stored with the dataset. Defaults to None (classes are not stored).
     """
 
     dataset_parameters = None
@@ -134,6 +137,9 @@ def add_database(interactive: bool = True,
                 data_loading_plan[FlambyLoadingBlockTypes.FLAMBY_DATASET_METADATA] = metadata_dlb
             else:
                 path = validated_path_input(data_type)
+                if data_type == 'csv':
+                    target_column = input('Column of the labels, to store the classes of a classification dataset '
+                                          '(name or position, leave empty to skip): ')
 
         # if a data loading plan was specified, we now ask for the description
         if interactive and data_loading_plan is not None:
@@ -163,6 +169,9 @@ def add_database(interactive: bool = True,
         if not os.path.exists(path):
             logger.critical("provided path does not exists: " + path)
 
+    if data_type == 'csv' and target_column:
+        dataset_parameters = {'target_column': target_column}
+
     logger.info(f"PATH VALUE {path}")
     # Add database
     try:
@@ -17,6 +17,7 @@ import tarfile
 from fedbiomed.common import data
 
 from tinydb import TinyDB, Query
+import numpy as np
 import pandas as pd
 from tabulate import tabulate  # only used for printing
 
@@ -352,6 +353,37 @@ class DatasetManager:
         """
         return self.read_csv(path)
 
+    @staticmethod
+    def get_csv_classes(dataset: pd.DataFrame, target_column: Union[str, int]) -> list:
+        """Gets the unique labels of the target column of a CSV dataset.
+
+        Labels are stored in the dataset's parameters at registration, so that classification training plans do not
+        need to compute them from the data at each round.
+
+        Args:
+            dataset: A Pandas dataframe
+            target_column: name, or position, of the target column. A position may be given as a string of digits
+                (eg. on the command line) when it is not the name of a column.
+
+        Returns:
+            Sorted unique labels of the target column
+
+        Raises:
+            FedbiomedDatasetManagerError: target column is not a column of the dataset
+        """
+        if isinstance(target_column, str) and target_column not in dataset.columns and target_column.isdigit():
+            target_column = int(target_column)
+        try:
+            if isinstance(target_column, int) and target_column not in dataset.columns:
+                column = dataset.iloc[:, target_column]
+            else:
+                column = dataset[target_column]
+        except (KeyError, IndexError):
+            msg = f"{ErrorNumbers.FB322.value}, target column {target_column} is not a column of the dataset"
+            logger.critical(msg)
+            raise FedbiomedDatasetManagerError(msg)
+        return np.unique(column.to_numpy()).tolist()
+
     def add_database(self,
                      name: str,
                      data_type: str,
@@ -372,7 +404,8 @@ class DatasetManager:
             description: Human readable description of the dataset.
             path: Path to the dataset. Defaults to None.
             dataset_id: Id of the dataset. Defaults to None.
-            dataset_parameters: a dictionary of additional (customized) parameters, or None
+            dataset_parameters: a dictionary of additional (customized) parameters, or None. For CSV datasets,
+                the labels of the `target_column` parameter (name or position), if any, are stored as `classes`.
             data_loading_plan: a DataLoadingPlan to be linked to this dataset, or None
             save_dlp: if True, save the `data_loading_plan`
 
@@ -433,6 +466,8 @@ class DatasetManager:
             dataset = self.load_csv_dataset(path)
             shape = dataset.shape
             dtypes = self.get_csv_data_types(dataset)
+            if dataset_parameters and 'target_column' in dataset_parameters:
+                dataset_parameters['classes'] = self.get_csv_classes(dataset, dataset_parameters['target_column'])
 
         elif data_type == 'images':
             assert os.path.isdir(path), f'Folder {path} for Images Dataset does not exist.'
@@ -0,0 +1,474 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+'''
+Intermediate aggregator component, for two-tier (hierarchical) federated learning.
+
+An intermediate aggregator sits between the researcher and a cluster of nodes (eg. one per region or site
+cluster). It is seen as a single node by the researcher, and as a researcher by its child nodes:
+
+- it connects upstream to the researcher's message broker with the node configuration (`NODE_ID`,
+    `MQTT_BROKER`, `UPLOADS_URL`, ...),
+- it connects downstream to the message broker of its cluster, where the child nodes are connected,
+- `train` requests received from the researcher are relayed to the child nodes, their model updates are
+    aggregated locally using the researcher's [`Aggregator`][fedbiomed.researcher.aggregators.Aggregator]
+    classes, and a single weighted update is forwarded upstream, with the summed sample size.
+
+The researcher thus downloads and aggregates one update per cluster instead of one update per node.
+
+**Typical use (local processes):**
+
+```bash
+# cluster broker
+mosquitto -p 1884 &
+# child nodes connect to the cluster broker
+MQTT_BROKER_PORT=1884 CONFIG_FILE=config_child1.ini ./scripts/fedbiomed_run node start &
+MQTT_BROKER_PORT=1884 CONFIG_FILE=config_child2.ini ./scripts/fedbiomed_run node start &
+# intermediate aggregator connects to the researcher broker (from its config) and to the cluster broker
+CONFIG_FILE=config_relay.ini python -m fedbiomed.node.intermediate_aggregator --downstream-broker-port 1884
+```
+
+!!! note
+    Aggregators that need per-node state on the researcher side (eg. `Scaffold`) and secure aggregation
+    cannot see through an intermediate aggregator, and are not supported.
+'''
+
+import argparse
+import importlib
+import os
+import queue
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from fedbiomed.common.constants import ComponentType, ErrorNumbers, TrainingPlanApprovalStatus
+from fedbiomed.common.exceptions import FedbiomedError
+from fedbiomed.common.logger import logger
+from fedbiomed.common.message import NodeMessages, ResearcherMessages
+from fedbiomed.common.messaging import Messaging
+from fedbiomed.common.repository import Repository
+from fedbiomed.common.tasks_queue import TasksQueue
+from fedbiomed.common.training_args import TrainingArgs
+
+from fedbiomed.node.environ import environ
+from fedbiomed.researcher.aggregators import Aggregator, FedAverage
+
+
+class IntermediateAggregator:
+    """Relays requests of the researcher to a cluster of nodes and aggregates their model updates.
+
+    Attributes:
+        messaging: upstream messaging, connected to the researcher's message broker
+        children_messaging: downstream messaging, connected to the message broker of the cluster
+        tasks_queue: queue of the requests received from the researcher
+        repository: upstream file repository, where the aggregated updates are uploaded
+    """
+
+    def __init__(self,
+                 downstream_broker: str = 'localhost',
+                 downstream_broker_port: int = 1884,
+                 aggregator: Optional[Aggregator] = None,
+                 round_timeout: Optional[float] = None,
+                 reply_timeout: Optional[float] = None):
+        """Constructor of the class.
+
+        Args:
+            downstream_broker: IP address / URL of the message broker of the cluster.
+            downstream_broker_port: port of the message broker of the cluster.
+            aggregator: aggregator used for combining the updates of the child nodes. Defaults to
+                [`FedAverage`][fedbiomed.researcher.aggregators.FedAverage].
+            round_timeout: maximum time (seconds) to wait for the child nodes to reply to a `train` request.
+                Child nodes that did not reply in time are left out of the aggregation. If None, waits for all
+                the child nodes.
+            reply_timeout: time (seconds) to wait for child nodes replies to quick requests (`search`, `list`,
+                `training-plan-status`). Defaults to half of `TIMEOUT`, so that the researcher still listens
+                when the merged reply is forwarded.
+        """
+        self._id = environ['NODE_ID']
+        self._aggregator = aggregator if aggregator is not None else FedAverage()
+        self._round_timeout = round_timeout
+        self._reply_timeout = reply_timeout if reply_timeout is not None else environ['TIMEOUT'] / 2
+
+        # maps dataset ids advertised upstream to the child node owning the dataset
+        self._datasets: Dict[str, str] = {}
+        self._children_replies = queue.Queue()
+
+        self.tasks_queue = TasksQueue(environ['MESSAGES_QUEUE_DIR'], environ['TMP_DIR'])
+        self.repository = Repository(environ['UPLOADS_URL'], environ['TMP_DIR'], environ['CACHE_DIR'])
+        self.messaging = Messaging(self.on_message, ComponentType.NODE,
+                                   self._id, environ['MQTT_BROKER'], environ['MQTT_BROKER_PORT'])
+        self.children_messaging = Messaging(self.on_child_message, ComponentType.RESEARCHER,
+                                            self._id, downstream_broker, downstream_broker_port)
+
+    def children(self) -> List[str]:
+        """Gets the child nodes that own a dataset advertised to the researcher.
+
+        Returns:
+            Ids of the child nodes
+        """
+        return sorted(set(self._datasets.values()))
+
+    def on_message(self, msg: dict, topic: str = None):
+        """Handler for the messages received from the researcher.
+
+        Pings are answered immediately, other requests are queued and handled by
+        [`task_manager`][fedbiomed.node.intermediate_aggregator.IntermediateAggregator.task_manager].
+
+        Args:
+            msg: incoming message from the researcher
+            topic: messaging topic name, currently unused
+        """
+        try:
+            command = msg['command']
+            request = NodeMessages.request_create(msg).get_dict()
+        except Exception as e:
+            resid = msg.get('researcher_id', 'unknown_researcher_id')
+            self.messaging.send_error(ErrorNumbers.FB301, extra_msg=f"Cannot parse request: {e}",
+                                      researcher_id=resid)
+            return
+
+        if command == 'ping':
+            self.messaging.send_message(
+                NodeMessages.reply_create(
+                    {
+                        'researcher_id': msg['researcher_id'],
+                        'node_id': self._id,
+                        'success': True,
+                        'sequence': msg['sequence'],
+                        'command': 'pong'
+                    }).get_dict())
+        else:
+            self.tasks_queue.add(request)
+
+    def on_child_message(self, msg: dict, topic: str = None):
+        """Handler for the messages received from the child nodes.
+
+        Replies are stored for the task being handled, logs and monitoring messages are forwarded to the
+        researcher as is.
+
+        Args:
+            msg: incoming message from a child node
+            topic: messaging topic name
+        """
+        if topic == 'general/researcher':
+            self._children_replies.put(ResearcherMessages.reply_create(msg).get_dict())
+        elif topic == 'general/logger':
+            self.messaging.send_message(msg, client='logger')
+        elif topic == 'general/monitoring':
+            self.messaging.send_message(msg, client='monitoring')
+        else:
+            logger.error("message received on wrong topic (" + str(topic) + ") - IGNORING")
+
+    def task_manager(self):
+        """Handles the queued requests of the researcher, one after the other."""
+
+        while True:
+            item = self.tasks_queue.get()
+            try:
+                request = NodeMessages.request_create(item)
+                command = request.get_param('command')
+                if command == 'train':
+                    reply = self.relay_training(request)
+                elif command in ('search', 'list'):
+                    reply = self.relay_search(request)
+                elif command == 'training-plan-status':
+                    reply = self.relay_training_plan_status(request)
+                else:
+                    raise FedbiomedError(f"{ErrorNumbers.FB319.value}: command `{command}` can not be "
+                                         "relayed by an intermediate aggregator")
+            except Exception as e:
+                logger.error(f"{ErrorNumbers.FB323.value}: {e}")
+                reply = NodeMessages.reply_create(
+                    {
+                        'command': 'error',
+                        'extra_msg': str(e),
+                        'node_id': self._id,
+                        'researcher_id': item.get('researcher_id', 'NOT_SET'),
+                        'errnum': ErrorNumbers.FB323
+                    }
+                ).get_dict()
+            self.messaging.send_message(reply)
+            self.tasks_queue.task_done()
+
+    def relay_search(self, request) -> dict:
+        """Relays a `search` or `list` request to the child nodes and merges their datasets in one reply.
+
+        Args:
+            request: `SearchRequest` or `ListRequest` received from the researcher
+
+        Returns:
+            Reply to send to the researcher
+        """
+        command = request.get_param('command')
+        self._drain_children_replies()
+        self.children_messaging.send_message(request.get_dict())
+        replies, _ = self._collect_children_replies([command], timeout=self._reply_timeout)
+
+        databases = []
+        for reply in replies:
+            for database in reply['databases']:
+                self._datasets[database['dataset_id']] = reply['node_id']
+                databases.append(database)
+
+        return NodeMessages.reply_create({'success': True,
+                                          'command': command,
+                                          'node_id': self._id,
+                                          'researcher_id': request.get_param('researcher_id'),
+                                          'databases': databases,
+                                          'count': len(databases)}).get_dict()
+
+    def relay_training_plan_status(self, request) -> dict:
+        """Relays a `training-plan-status` request to the child nodes.
+
+        The training plan is reported as approved only if it is approved by every child node that replied.
+
+        Args:
+            request: `TrainingPlanStatusRequest` received from the researcher
+
+        Returns:
+            Reply to send to the researcher
+        """
+        self._drain_children_replies()
+        self.children_messaging.send_message(request.get_dict())
+        replies, _ = self._collect_children_replies(['training-plan-status'], timeout=self._reply_timeout)
+
+        not_approved = [r for r in replies if r['status'] != TrainingPlanApprovalStatus.APPROVED.value]
+        status = not_approved[0]['status'] if not_approved else TrainingPlanApprovalStatus.APPROVED.value
+        return NodeMessages.reply_create({
+            'researcher_id': request.get_param('researcher_id'),
+            'node_id': self._id,
+            'job_id': request.get_param('job_id'),
+            'success': len(replies) > 0 and all(r['success'] for r in replies),
+            'approval_obligation': any(r['approval_obligation'] for r in replies),
+            'status': status,
+            'msg': '; '.join(f"{r['node_id']}: {r['msg']}" for r in replies),
+            'training_plan_url': request.get_param('training_plan_url'),
+            'command': 'training-plan-status'
+        }).get_dict()
+
+    def relay_training(self, request) -> dict:
+        """Relays a `train` request to the child nodes, and aggregates their model updates.
+
+        Args:
+            request: `TrainRequest` received from the researcher
+
+        Returns:
+            Train reply to send to the researcher, with the aggregated update and the summed sample size
+        """
+        dataset_ids = request.get_param('training_data').get(self._id, [])
+        unknown = [d for d in dataset_ids if d not in self._datasets]
+        if unknown or not dataset_ids:
+            return self._train_reply(request, success=False,
+                                     message=f"{ErrorNumbers.FB313.value}: no child node owns dataset(s) {unknown}")
+
+        training_data = {}
+        for dataset_id in dataset_ids:
+            training_data.setdefault(self._datasets[dataset_id], []).append(dataset_id)
+
+        self._drain_children_replies()
+        for node_id, node_datasets in training_data.items():
+            child_request = dict(request.get_dict(), training_data={node_id: node_datasets})
+            self.children_messaging.send_message(child_request, client=node_id)
+
+        rtime_before = time.perf_counter()
+        replies, missing = self._collect_children_replies(['train', 'error'],
+                                                          expected_nodes=list(training_data),
+                                                          timeout=self._round_timeout)
+        if missing:
+            logger.warning(f"{ErrorNumbers.FB408.value}: child node(s) {missing} did not reply before the "
+                           "deadline, they are left out of the aggregation")
+
+        replies = [r for r in replies if r['command'] == 'train' and r['job_id'] == request.get_param('job_id')]
+        failed = [r['node_id'] for r in replies if not r['success']]
+        if failed:
+            logger.error(f"{ErrorNumbers.FB409.value}: child node(s) {failed} could not complete the round")
+        replies = [r for r in replies if r['success']]
+        if not replies:
+            return self._train_reply(request, success=False,
+                                     message=f"{ErrorNumbers.FB407.value}: no child node completed the round")
+
+        timing = {'rtime_training': max(r['timing'].get('rtime_training', 0.) for r in replies),
+                  'ptime_training': sum(r['timing'].get('ptime_training', 0.) for r in replies),
+                  'rtime_children': time.perf_counter() - rtime_before}
+        if not request.get_param('training'):
+            # validation only: nothing to aggregate
+            return self._train_reply(request, success=True, timing=timing)
+
+        # training plan approval is checked by each child node before training: the code is only loaded
+        # here once the child nodes accepted and ran it
+        training_plan = self._load_training_plan(request)
+        params_url, sample_size = self._aggregate(training_plan, request, replies)
+        return self._train_reply(request, success=True, params_url=params_url, timing=timing,
+                                 sample_size=sample_size)
+
+    def _aggregate(self, training_plan, request, replies: List[Dict[str, Any]]) -> Tuple[str, int]:
+        """Aggregates the model updates of the child nodes and uploads the result upstream.
+
+        Args:
+            training_plan: training plan of the job, used for loading and saving model parameters
+            request: `TrainRequest` received from the researcher
+            replies: successful train replies of the child nodes
+
+        Returns:
+            URL of the aggregated update, and the number of samples it was computed on
+        """
+        model_params = {}
+        sample_sizes = {}
+        optimizer_args = None
+        for reply in replies:
+            _, params_path = self.repository.download_file(reply['params_url'],
+                                                           'node_params_' + str(uuid.uuid4()) + '.pt')
+            loaded = training_plan.load(params_path, to_params=True)
+            model_params[reply['node_id']] = loaded['model_params']
+            optimizer_args = loaded.get('optimizer_args', optimizer_args)
+            sample_sizes[reply['node_id']] = reply['sample_size'] or 0
+
+        sample_size = sum(sample_sizes.values())
+        weights = {node_id: size / sample_size if sample_size else 1 / len(sample_sizes)
+                   for node_id, size in sample_sizes.items()}
+        aggregated_params = self._aggregator.aggregate(model_params, weights)
+
+        results = {'researcher_id': request.get_param('researcher_id'),
+                   'job_id': request.get_param('job_id'),
+                   'model_params': aggregated_params,
+                   'node_id': self._id,
+                   'optimizer_args': optimizer_args}
+        filename = os.path.join(environ['TMP_DIR'], 'node_params_' + str(uuid.uuid4()) + '.pt')
+        training_plan.save(filename, results)
+        res = self.repository.upload_file(filename)
+        logger.info(f"Aggregated update of child nodes {list(model_params)} uploaded successfully")
+
+        return res['file'], sample_size
+
+    def _load_training_plan(self, request):
+        """Downloads and instantiates the training plan of a `train` request.
+
+        The training plan is only used for loading and saving model parameters in its own format.
+
+        Args:
+            request: `TrainRequest` received from the researcher
+
+        Returns:
+            Training plan instance
+        """
+        import_module = 'training_plan_' + str(uuid.uuid4().hex)
+        self.repository.download_file(request.get_param('training_plan_url'), import_module + '.py')
+
+        sys.path.insert(0, environ['TMP_DIR'])
+        try:
+            module = importlib.import_module(import_module)
+            training_plan = getattr(module, request.get_param('training_plan_class'))()
+        finally:
+            sys.path.pop(0)
+
+        training_plan.post_init(model_args=request.get_param('model_args') or {},
+                                training_args=TrainingArgs(request.get_param('training_args') or {},
+                                                           only_required=False))
+        return training_plan
+
+    def _collect_children_replies(self,
+                                  commands: List[str],
+                                  expected_nodes: Optional[List[str]] = None,
+                                  timeout: Optional[float] = None) -> Tuple[List[dict], List[str]]:
+        """Waits for the replies of the child nodes.
+
+        Args:
+            commands: commands of the replies to collect, other replies are discarded
+            expected_nodes: if set, stop as soon as each of these nodes has replied
+            timeout: maximum time to wait (seconds). None means waiting until all `expected_nodes` replied.
+
+        Returns:
+            A tuple with the collected replies and the expected nodes that did not reply
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        waiting = list(expected_nodes) if expected_nodes is not None else None
+        replies = []
+
+        while waiting is None or waiting:
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                reply = self._children_replies.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if reply.get('command') not in commands:
+                continue
+            if waiting is not None:
+                if reply.get('node_id') not in waiting:
+                    continue
+                waiting.remove(reply['node_id'])
+            replies.append(reply)
+
+        return replies, waiting or []
+
+    def _drain_children_replies(self):
+        """Discards pending replies of child nodes, that belong to previous requests."""
+        while not self._children_replies.empty():
+            try:
+                self._children_replies.get(block=False)
+            except queue.Empty:
+                break
+
+    def _train_reply(self,
+                     request,
+                     success: bool,
+                     message: str = '',
+                     params_url: str = '',
+                     timing: Union[dict, None] = None,
+                     sample_size: Union[int, None] = None) -> dict:
+        """Creates the train reply sent to the researcher.
+
+        Args:
+            request: `TrainRequest` received from the researcher
+            success: whether the round succeeded
+            message: message regarding the round
+            params_url: URL of the aggregated update
+            timing: timing statistics
+            sample_size: number of samples of the aggregated update
+        """
+        if not success:
+            logger.error(message)
+        dataset_ids = request.get_param('training_data').get(self._id, [])
+        return NodeMessages.reply_create({'node_id': self._id,
+                                          'job_id': request.get_param('job_id'),
+                                          'researcher_id': request.get_param('researcher_id'),
+                                          'command': 'train',
+                                          'success': success,
+                                          'dataset_id': ','.join(dataset_ids) if success else '',
+                                          'params_url': params_url,
+                                          'msg': message,
+                                          'sample_size': sample_size,
+                                          'timing': timing or {}}).get_dict()
+
+    def start_messaging(self):
+        """Starts the upstream and downstream messaging."""
+        self.children_messaging.start(block=False)
+        self.messaging.start(block=False)
+
+
+def main():
+    """Entry point for running an intermediate aggregator as a local process."""
+    parser = argparse.ArgumentParser(description='Fed-BioMed intermediate aggregator')
+    parser.add_argument('--downstream-broker', type=str, default='localhost',
+                        help='IP address / URL of the message broker of the child nodes')
+    parser.add_argument('--downstream-broker-port', type=int, default=1884,
+                        help='port of the message broker of the child nodes')
+    parser.add_argument('--round-timeout', type=float, default=None,
+                        help='maximum time (seconds) to wait for the child nodes during a round')
+    args = parser.parse_args()
+
+    logger.info(f"Launching intermediate aggregator {environ['NODE_ID']}")
+    relay = IntermediateAggregator(downstream_broker=args.downstream_broker,
+                                   downstream_broker_port=args.downstream_broker_port,
+                                   round_timeout=args.round_timeout)
+    relay.start_messaging()
+    try:
+        relay.task_manager()
+    except KeyboardInterrupt:
+        logger.critical('Intermediate aggregator stopped by user.')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,12 +7,13 @@ Core code of the node component.
 
 from json import decoder
 
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, Tuple
 
 from fedbiomed.common import json
 from fedbiomed.common.constants import ComponentType, ErrorNumbers, SecaggElementTypes
 from fedbiomed.common.logger import logger
-from fedbiomed.common.message import NodeMessages, SecaggDeleteRequest, SecaggRequest, TrainRequest
+from fedbiomed.common.message import JobEndRequest, NodeMessages, PrepareRequest, SecaggDeleteRequest, \
+    SecaggRequest, TrainRequest
 from fedbiomed.common.messaging import Messaging
 from fedbiomed.common.tasks_queue import TasksQueue
 
@@ -23,6 +24,7 @@ from fedbiomed.node.training_plan_security_manager import TrainingPlanSecurityMa
 from fedbiomed.node.round import Round
 from fedbiomed.node.secagg import SecaggSetup, SecaggServkeySetup, SecaggBiprimeSetup
 from fedbiomed.node.secagg_manager import SecaggServkeyManager, SecaggBiprimeManager
+from fedbiomed.node.session_cache import SessionCache, DEFAULT_MAX_SESSIONS, DEFAULT_IDLE_TIMEOUT
 
 import validators
 
@@ -54,9 +56,17 @@ class Node:
         self.dataset_manager = dataset_manager
         self.tp_security_manager = tp_security_manager
         self.rounds = []
+        self._prepared_rounds = {}  # dataset_id -> (request key, prepared round) for the next training request
 
         self.node_args = node_args
 
+        node_args = node_args or {}
+        self._session_cache = SessionCache(
+            max_sessions=node_args.get('warm_sessions') if node_args.get('warm_sessions') is not None
+            else DEFAULT_MAX_SESSIONS,
+            idle_timeout=node_args.get('session_timeout') if node_args.get('session_timeout') is not None
+            else DEFAULT_IDLE_TIMEOUT)
+
     def add_task(self, task: dict):
         """Adds a task to the pending tasks queue.
 
@@ -73,6 +83,8 @@ class Node:
         mainly:
         - ping requests,
         - train requests (then a new task will be added on node's task queue),
+        - prepare notices for the next train request (also added on node's task queue),
+        - job end notices (also added on node's task queue),
         - search requests (for searching data in node's database).
 
         Args:
@@ -91,7 +103,7 @@ class Node:
             # get the request from the received message (from researcher)
             command = msg['command']
             request = NodeMessages.request_create(msg).get_dict()
-            if command in ['train', 'secagg']:
+            if command in ['train', 'prepare', 'job-end', 'secagg']:
                 # add training task to queue
                 self.add_task(request)
             elif command == 'secagg-delete':
@@ -337,6 +349,84 @@ class Node:
         )
 
 
+    @staticmethod
+    def _request_key(msg: Union[TrainRequest, PrepareRequest]) -> Tuple:
+        """Gets the fields of a train request or prepare notice that a prepared round depends on.
+
+        Args:
+            msg: `TrainRequest` or `PrepareRequest` message object
+
+        Returns:
+            Researcher id, job id, training plan url and class name, model and training arguments of the request
+        """
+        return (msg.get_param('researcher_id'),
+                msg.get_param('job_id'),
+                msg.get_param('training_plan_url'),
+                msg.get_param('training_plan_class'),
+                msg.get_param('model_args') or {},
+                msg.get_param('training_args') or {})
+
+    def _task_prepare(self, msg: PrepareRequest):
+        """Prepares the rounds of the next training request of a job, while the researcher aggregates.
+
+        The training plan is downloaded, checked and imported and the data loaders are created for each
+        dataset of the node. Prepared rounds are used by the next train request if it matches the notice,
+        otherwise they are dropped. Failures are only logged: the train request will report them.
+
+        Args:
+            msg: `PrepareRequest` message object to parse
+        """
+        # rounds prepared for a former notice were not used
+        for _, round_ in self._prepared_rounds.values():
+            round_.discard()
+        self._prepared_rounds = {}
+        request_key = self._request_key(msg)
+
+        for dataset_id in msg.get_param('training_data').get(environ['NODE_ID'], []):
+            data = self.dataset_manager.get_by_id(dataset_id)
+            if data is None or 'path' not in data.keys():
+                logger.debug(f'Cannot prepare round, dataset {dataset_id} not found on node={environ["NODE_ID"]}')
+                continue
+
+            dlp_and_loading_block_metadata = None
+            if 'dlp_id' in data:
+                dlp_and_loading_block_metadata = self.dataset_manager.get_dlp_by_id(data['dlp_id'])
+            round_ = Round(msg.get_param('model_args') or {},
+                           msg.get_param('training_args') or {},
+                           True,
+                           data,
+                           msg.get_param('training_plan_url'),
+                           msg.get_param('training_plan_class'),
+                           None,
+                           msg.get_param('job_id'),
+                           msg.get_param('researcher_id'),
+                           None,
+                           None,
+                           self.node_args,
+                           dlp_and_loading_block_metadata=dlp_and_loading_block_metadata,
+                           session_cache=self._session_cache)
+
+            error_message = round_.prepare()
+            if error_message is not None:
+                logger.warning(f'Cannot prepare round for dataset {dataset_id}: {error_message}')
+                continue
+            self._prepared_rounds[dataset_id] = (request_key, round_)
+            logger.debug(f'Round prepared for job {msg.get_param("job_id")} on dataset {dataset_id}')
+
+    def _task_job_end(self, msg: JobEndRequest):
+        """Releases the training sessions kept for a job that ended.
+
+        Warm sessions of the job are evicted from the session cache and rounds prepared for the job are discarded.
+
+        Args:
+            msg: `JobEndRequest` message object to parse
+        """
+        job_id = msg.get_param('job_id')
+        for dataset_id in [d for d, (_, round_) in self._prepared_rounds.items() if round_.job_id == job_id]:
+            self._prepared_rounds.pop(dataset_id)[1].discard()
+        self._session_cache.evict_job(job_id)
+        logger.debug(f'Sessions of job {job_id} released')
+
     def parser_task_train(self, msg: TrainRequest):
         """Parses a given training task message to create a round instance
 
@@ -357,7 +447,8 @@ class Node:
         job_id = msg.get_param('job_id')
         researcher_id = msg.get_param('researcher_id')
         aggregator_args = msg.get_param('aggregator_args') or None
-        
+        round_number = msg.get_param('round')
+
 
         assert training_plan_url is not None, 'URL for training plan on repository not found.'
         assert validators.url(
@@ -373,6 +464,10 @@ class Node:
         self.rounds = []  # store here rounds associated to each dataset_id
         # (so it is possible to train model on several dataset per round)
 
+        # rounds prepared for this request, if any, are used once
+        prepared_rounds, self._prepared_rounds = self._prepared_rounds, {}
+        request_key = self._request_key(msg)
+
         if environ['NODE_ID'] in msg.get_param('training_data'):
             for dataset_id in msg.get_param('training_data')[environ['NODE_ID']]:
                 data = self.dataset_manager.get_by_id(dataset_id)
@@ -392,6 +487,14 @@ class Node:
                          'errnum': ErrorNumbers.FB313,
                          'extra_msg': "Did not found proper data in local datasets"}
                     ).get_dict())
+                elif dataset_id in prepared_rounds and prepared_rounds[dataset_id][0] == request_key:
+                    round_ = prepared_rounds[dataset_id][1]
+                    round_.training = training_status
+                    round_.params_url = params_url
+                    round_.history_monitor = hist_monitor
+                    round_.aggregator_args = aggregator_args
+                    round_.round_number = round_number
+                    self.rounds.append(round_)
                 else:
                     dlp_and_loading_block_metadata = None
                     if 'dlp_id' in data:
@@ -408,7 +511,14 @@ class Node:
                                              hist_monitor,
                                              aggregator_args,
                                              self.node_args,
-                                             dlp_and_loading_block_metadata=dlp_and_loading_block_metadata))
+                                             dlp_and_loading_block_metadata=dlp_and_loading_block_metadata,
+                                             session_cache=self._session_cache,
+                                             round_number=round_number))
+
+        # prepared rounds that do not match the request are not used
+        for _, round_ in prepared_rounds.values():
+            if round_ not in self.rounds:
+                round_.discard()
 
     def task_manager(self):
         """Manages training tasks in the queue.
@@ -460,6 +570,10 @@ class Node:
                                 }
                             ).get_dict()
                         )
+                elif command == 'prepare':
+                    self._task_prepare(item)
+                elif command == 'job-end':
+                    self._task_job_end(item)
                 elif command == 'secagg':
                     self._task_secagg(item)
                 else:
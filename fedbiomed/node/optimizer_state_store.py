@@ -0,0 +1,99 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+'''
+Storage of the optimizer states kept by the node between the rounds of a job.
+'''
+
+import os
+import uuid
+from typing import Any, Dict, Optional
+
+import torch
+
+from fedbiomed.common.logger import logger
+
+
+class OptimizerStateStore:
+    """Persists the optimizer state of a training plan between the rounds of a job, on the node's disk.
+
+    One state is stored per job and dataset. It is saved at the end of a training round, and restored at the
+    next training round of the job on the same dataset, so that optimizers with a state (eg. Adam, SGD with
+    momentum) do not restart from scratch in every round. Optimizer states never leave the node.
+
+    A state saved at round `r` is considered stale at round `r'` when the node skipped more than `max_staleness`
+    rounds in between (`r' - r - 1 > max_staleness`), or when `r' <= r` (eg. the experiment was resumed from
+    an earlier breakpoint): stale states are discarded instead of being restored.
+    """
+
+    def __init__(self, directory: str):
+        """Constructor of the class.
+
+        Args:
+            directory: directory where optimizer states are saved, one sub-directory per job
+        """
+        self._directory = directory
+
+    def save(self, job_id: str, dataset_id: str, round_number: Optional[int], state: Dict[str, Any]):
+        """Saves the optimizer state of a job on a dataset, replacing the former one.
+
+        Args:
+            job_id: id of the job
+            dataset_id: id of the dataset the optimizer was trained on
+            round_number: number of the round the optimizer was trained in, if known
+            state: optimizer state
+        """
+        path = self._path(job_id, dataset_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # write to a temporary file first, so that an interrupted save does not leave a corrupted state
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        torch.save({'round': round_number, 'state': state}, tmp_path)
+        os.replace(tmp_path, path)
+
+    def load(self,
+             job_id: str,
+             dataset_id: str,
+             round_number: Optional[int],
+             max_staleness: int = 0) -> Optional[Dict[str, Any]]:
+        """Loads the optimizer state of a job on a dataset, unless it is stale.
+
+        Staleness is not checked when the round numbers are not known.
+
+        Args:
+            job_id: id of the job
+            dataset_id: id of the dataset the optimizer is trained on
+            round_number: number of the round the optimizer is trained in, if known
+            max_staleness: maximum number of rounds the node may have skipped since the state was saved
+
+        Returns:
+            The optimizer state, or None if there is no state or if it is stale
+        """
+        path = self._path(job_id, dataset_id)
+        if not os.path.isfile(path):
+            return None
+
+        saved = torch.load(path, map_location='cpu')
+        saved_round = saved.get('round')
+        if round_number is not None and saved_round is not None:
+            if round_number <= saved_round or round_number - saved_round - 1 > max_staleness:
+                logger.info(f'Discarding optimizer state of job {job_id} on dataset {dataset_id} saved at round '
+                            f'{saved_round}: stale at round {round_number}')
+                self.remove(job_id, dataset_id)
+                return None
+
+        return saved['state']
+
+    def remove(self, job_id: str, dataset_id: str):
+        """Removes the optimizer state of a job on a dataset, if any.
+
+        Args:
+            job_id: id of the job
+            dataset_id: id of the dataset
+        """
+        path = self._path(job_id, dataset_id)
+        if os.path.isfile(path):
+            os.remove(path)
+
+    def _path(self, job_id: str, dataset_id: str) -> str:
+        return os.path.join(self._directory, job_id, f'{dataset_id}.pt')
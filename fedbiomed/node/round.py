@@ -5,6 +5,7 @@
 implementation of Round class of the node component
 '''
 
+import hashlib
 import os
 import shutil
 import sys
@@ -14,16 +15,19 @@ import importlib
 from typing import Dict, Iterable, Union, Any, Optional, Tuple, List
 import uuid
 
-from fedbiomed.common.constants import ErrorNumbers, TrainingPlanApprovalStatus
+from fedbiomed.common.constants import ErrorNumbers, TrainingPlanApprovalStatus, TrainingPlans
 from fedbiomed.common.data import DataManager, DataLoadingPlan
 from fedbiomed.common.exceptions import FedbiomedError, FedbiomedRoundError, FedbiomedUserInputError
 from fedbiomed.common.logger import logger
 from fedbiomed.common.message import NodeMessages
 from fedbiomed.common.repository import Repository
 from fedbiomed.common.training_args import TrainingArgs
+from fedbiomed.common.training_plans._profiler import TrainingProfiler
 
 from fedbiomed.node.environ import environ
 from fedbiomed.node.history_monitor import HistoryMonitor
+from fedbiomed.node.optimizer_state_store import OptimizerStateStore
+from fedbiomed.node.session_cache import SessionCache
 from fedbiomed.researcher.strategies import strategy
 from fedbiomed.node.training_plan_security_manager import TrainingPlanSecurityManager
 
@@ -46,7 +50,9 @@ class Round:
                  history_monitor: HistoryMonitor = None,
                  aggregator_args: dict = None,
                  node_args: Union[dict, None] = None,
-                 dlp_and_loading_block_metadata: Optional[Tuple[dict, List[dict]]] = None):
+                 dlp_and_loading_block_metadata: Optional[Tuple[dict, List[dict]]] = None,
+                 session_cache: Optional[SessionCache] = None,
+                 round_number: Optional[int] = None):
 
         """Constructor of the class
 
@@ -68,6 +74,11 @@ class Round:
                     GPU device if this GPU device is available.
                 - `gpu_only (bool)`: force use of a GPU device if any available, even if researcher
                     doesn't request for using a GPU.
+                - `cpu_workers (Union[int, None])`: number of processes training together on CPU.
+            dlp_and_loading_block_metadata: data loading plan and loading blocks metadata of the dataset, if any
+            session_cache: cache of the warm sessions of the node. If None, the training plan is imported and the
+                data loaders are created for each round.
+            round_number: number of the round of the experiment, if sent by the researcher
         """
 
         self.dataset = dataset
@@ -84,7 +95,14 @@ class Round:
         self.repository = Repository(environ['UPLOADS_URL'], environ['TMP_DIR'], environ['CACHE_DIR'])
         self.training_plan = None
         self.training = training
+        self._import_module = None
+        self._prepared = False
+        self._session_cache = session_cache
+        self._session_key = None
+        self._data_loaders = None
         self._dlp_and_loading_block_metadata = dlp_and_loading_block_metadata
+        self.round_number = round_number
+        self._optimizer_state_store = OptimizerStateStore(os.path.join(environ['VAR_DIR'], 'optimizer_states'))
 
         self.training_kwargs = training_kwargs
         self.model_arguments = model_kwargs
@@ -158,79 +176,94 @@ class Round:
 
             return True, params_path, ''
 
-    def run_model_training(self) -> dict[str, Any]:
-        """This method downloads training plan file; then runs the training of a model
-        and finally uploads model params to the file repository
+    def prepare(self) -> Union[str, None]:
+        """Prepares the round before receiving its training request.
+
+        Downloads, checks and imports the training plan, then loads the data and creates the data loaders, so that
+        only model parameters and aggregator arguments remain to be loaded when the training request is received.
+        This is done while the researcher aggregates the updates of the former round.
 
         Returns:
-            Returns the corresponding node message, training reply instance
+            Error message if the preparation failed, None if it succeeded
         """
-        is_failed = False
-
-        # Initialize and validate requested experiment/training arguments
+        self._prepared = False
         try:
             self.initialize_validate_training_arguments()
-        except FedbiomedUserInputError as e:
-            return self._send_round_reply(success=False, message=str(e))
         except Exception as e:
-            msg = 'Unexpected error while validating training argument'
-            logger.debug(f"{msg}: {e}")
-            return self._send_round_reply(success=False, message=f'{msg}. Please contact system provider')
+            return f'Cannot validate training arguments: {e}'
 
-        try:
-            # module name cannot contain dashes
-            import_module = 'training_plan_' + str(uuid.uuid4().hex)
-            status, _ = self.repository.download_file(self.training_plan_url,
-                                                      import_module + '.py')
+        error_message = self._download_training_plan()
+        if error_message is None:
+            error_message = self._initialize_training_plan()
+        if error_message is None:
+            error_message = self._set_data_loaders()
+        if error_message is not None:
+            self.discard()
+            return error_message
 
-            if status != 200:
-                error_message = "Cannot download training plan file: " + self.training_plan_url
-                return self._send_round_reply(success=False, message=error_message)
-            else:
-                if environ["TRAINING_PLAN_APPROVAL"]:
-                    approved, training_plan_ = self.tp_security_manager.check_training_plan_status(
-                        os.path.join(environ["TMP_DIR"], import_module + '.py'),
-                        TrainingPlanApprovalStatus.APPROVED)
+        self._prepared = True
+        return None
 
-                    if not approved:
-                        error_message = f'Requested training plan is not approved by the node: {environ["NODE_ID"]}'
-                        return self._send_round_reply(success=False, message=error_message)
-                    else:
-                        logger.info(f'Training plan has been approved by the node {training_plan_["name"]}')
+    def discard(self):
+        """Deletes the training plan and data loaders of a round that failed or will not be run.
 
-            if not is_failed:
+        The session of the round is not put back in the session cache, and the training plan module is unloaded.
+        """
+        if self._import_module is not None:
+            sys.modules.pop(self._import_module, None)
+        self.training_plan = None
+        self._data_loaders = None
+        self._prepared = False
 
-                success, params_path, error_msg = self.download_file(self.params_url, 'my_model_')
-                if success:
-                    # retrieving arggegator args
-                    success, error_msg = self.download_aggregator_args()
+    def is_prepared(self) -> bool:
+        """Tells whether the round was successfully prepared (see `prepare`).
 
-                if not success:
-                    return self._send_round_reply(success=False, message=error_msg)
+        Returns:
+            True if the training plan and data loaders of the round are ready
+        """
+        return self._prepared
 
-        except Exception as e:
-            is_failed = True
-            # FIXME: this will trigger if model is not approved by node
-            error_message = f"Cannot download training plan files: {str(e)}"
-            return self._send_round_reply(success=False, message=error_message)
+    def run_model_training(self) -> dict[str, Any]:
+        """This method downloads training plan file; then runs the training of a model
+        and finally uploads model params to the file repository
+
+        When the round was prepared, only model parameters and aggregator arguments are downloaded, and
+        the training plan is re-initialized with the aggregator arguments.
+
+        Returns:
+            Returns the corresponding node message, training reply instance
+        """
+        if not self._prepared:
+            # Initialize and validate requested experiment/training arguments
+            try:
+                self.initialize_validate_training_arguments()
+            except FedbiomedUserInputError as e:
+                return self._send_round_reply(success=False, message=str(e))
+            except Exception as e:
+                msg = 'Unexpected error while validating training argument'
+                logger.debug(f"{msg}: {e}")
+                return self._send_round_reply(success=False, message=f'{msg}. Please contact system provider')
+
+            error_message = self._download_training_plan()
+            if error_message is not None:
+                return self._send_round_reply(success=False, message=error_message)
 
-        # import module, declare the training plan, load parameters
         try:
-            sys.path.insert(0, environ['TMP_DIR'])
-            module = importlib.import_module(import_module)
-            train_class = getattr(module, self.training_plan_class)
-            self.training_plan = train_class()
-            sys.path.pop(0)
+            success, params_path, error_msg = self.download_file(self.params_url, 'my_model_')
+            if success:
+                # retrieving arggegator args
+                success, error_msg = self.download_aggregator_args()
+
+            if not success:
+                return self._send_round_reply(success=False, message=error_msg)
+
         except Exception as e:
-            error_message = f"Cannot instantiate training plan object: {str(e)}"
+            error_message = f"Cannot download training plan files: {str(e)}"
             return self._send_round_reply(success=False, message=error_message)
 
-        try:
-            self.training_plan.post_init(model_args=self.model_arguments,
-                                         training_args=self.training_arguments,
-                                         aggregator_args=self.aggregator_args)
-        except Exception as e:
-            error_message = f"Can't initialize training plan with the arguments: {e}"
+        # import module, declare the training plan (or re-initialize prepared one with aggregator args)
+        error_message = self._initialize_training_plan()
+        if error_message is not None:
             return self._send_round_reply(success=False, message=error_message)
 
         # import model params into the training plan instance
@@ -241,17 +274,18 @@ class Round:
             error_message = f"Cannot initialize model parameters: f{str(e)}"
             return self._send_round_reply(success=False, message=error_message)
 
-        # Split training and validation data
-        try:
-            self._set_training_testing_data_loaders()
-        except FedbiomedError as e:
-            error_message = f"Can not create validation/train data: {str(e)}"
-            return self._send_round_reply(success=False, message=error_message)
-        except Exception as e:
-            error_message = f"Undetermined error while creating data for training/validation. Can not create " \
-                            f"validation/train data: {str(e)}"
-            return self._send_round_reply(success=False, message=error_message)
-        
+        # Split training and validation data (or set the data loaders of the warm session)
+        if not self._prepared:
+            error_message = self._set_data_loaders()
+            if error_message is not None:
+                return self._send_round_reply(success=False, message=error_message)
+
+        # Restore the optimizer state of the former round of the job, if requested
+        self._restore_optimizer_state()
+
+        # Capture a profiling trace of the routines, if requested
+        profiler = self._start_profiling()
+
         # Validation Before Training
         if self.testing_arguments.get('test_on_global_updates', False) is not False:
 
@@ -284,6 +318,7 @@ class Round:
                     rtime_after = time.perf_counter()
                     ptime_after = time.process_time()
                 except Exception as e:
+                    self._stop_profiling(profiler)
                     error_message = f"Cannot train model in round: {str(e)}"
                     return self._send_round_reply(success=False, message=error_message)
 
@@ -309,6 +344,15 @@ class Round:
                         f"{ErrorNumbers.FB314.value}: Can not execute validation routine due to missing testing "
                         f"dataset please make sure that test_ratio has been set correctly")
 
+            profile_url = self._stop_profiling(profiler)
+            self._save_optimizer_state()
+
+            timing = {'rtime_training': rtime_after - rtime_before,
+                      'ptime_training': ptime_after - ptime_before}
+            # time spent in each phase of the training loop
+            if hasattr(self.training_plan, 'training_timing'):
+                timing.update(self.training_plan.training_timing())
+
             # Upload results
             results['researcher_id'] = self.researcher_id
             results['job_id'] = self.job_id
@@ -317,6 +361,8 @@ class Round:
             results['optimizer_args'] = self.training_plan.optimizer_args()
 
             sample_size = len(self.training_plan.training_data_loader.dataset)
+            num_updates = self.training_plan.num_updates_performed() \
+                if hasattr(self.training_plan, 'num_updates_performed') else None
 
             try:
                 # TODO : should validation status code but not yet returned
@@ -327,33 +373,235 @@ class Round:
                 logger.info("results uploaded successfully ")
 
             except Exception as e:
-                is_failed = True
                 error_message = f"Cannot upload results: {str(e)}"
                 return self._send_round_reply(success=False, message=error_message)
 
-            # end : clean the namespace
-            try:
-                del self.training_plan
-                del import_module
-            except Exception as e:
-                logger.debug(f'Exception raise while deleting training plan instance: {e}')
-                pass
+            # end : keep the session warm for next round, or clean the namespace
+            self._release_training_plan()
 
             return self._send_round_reply(success=True,
-                                          timing={'rtime_training': rtime_after - rtime_before,
-                                                  'ptime_training': ptime_after - ptime_before},
+                                          timing=timing,
                                           params_url=res['file'],
-                                          sample_size=sample_size)
+                                          sample_size=sample_size,
+                                          profile_url=profile_url,
+                                          num_updates=num_updates)
         else:
             # Only for validation
-            return self._send_round_reply(success=True)
+            profile_url = self._stop_profiling(profiler)
+            self._release_training_plan()
+            return self._send_round_reply(success=True, profile_url=profile_url)
+
+    def _download_training_plan(self) -> Union[str, None]:
+        """Downloads the training plan file, and checks it is approved by the node.
+
+        Returns:
+            Error message if the training plan cannot be downloaded or is not approved, None otherwise
+        """
+        try:
+            # module name cannot contain dashes
+            self._import_module = 'training_plan_' + str(uuid.uuid4().hex)
+            status, training_plan_path = self.repository.download_file(self.training_plan_url,
+                                                                       self._import_module + '.py')
+
+            if status != 200:
+                return "Cannot download training plan file: " + self.training_plan_url
+            else:
+                if environ["TRAINING_PLAN_APPROVAL"]:
+                    approved, training_plan_ = self.tp_security_manager.check_training_plan_status(
+                        os.path.join(environ["TMP_DIR"], self._import_module + '.py'),
+                        TrainingPlanApprovalStatus.APPROVED)
+
+                    if not approved:
+                        return f'Requested training plan is not approved by the node: {environ["NODE_ID"]}'
+                    else:
+                        logger.info(f'Training plan has been approved by the node {training_plan_["name"]}')
+
+                if self._session_cache is not None:
+                    self._restore_session(training_plan_path)
+        except Exception as e:
+            # FIXME: this will trigger if model is not approved by node
+            return f"Cannot download training plan files: {str(e)}"
+
+        return None
+
+    def _restore_session(self, training_plan_path: str):
+        """Reuses the training plan and data loaders of a warm session of the job for this round, if any.
+
+        Args:
+            training_plan_path: path of the downloaded training plan file
+        """
+        with open(training_plan_path, 'rb') as file:
+            training_plan_hash = hashlib.sha256(file.read()).hexdigest()
+
+        self._session_key = SessionCache.key(self.job_id,
+                                             training_plan_hash,
+                                             self.dataset,
+                                             self.loader_arguments,
+                                             self.testing_arguments.get('test_ratio', 0),
+                                             self._dlp_and_loading_block_metadata)
+        session = self._session_cache.get(self._session_key)
+        if session is not None:
+            self._import_module = session['import_module']
+            self.training_plan = session['training_plan']
+            self._data_loaders = session['data_loaders']
+
+    def _release_training_plan(self):
+        """Puts the training plan and data loaders back in the session cache, or deletes the training plan."""
+        if self._session_cache is not None and self._session_key is not None and self._data_loaders is not None:
+            self._session_cache.put(self._session_key, {'import_module': self._import_module,
+                                                        'training_plan': self.training_plan,
+                                                        'data_loaders': self._data_loaders})
+        self.training_plan = None
+        self._data_loaders = None
+
+    def _initialize_training_plan(self) -> Union[str, None]:
+        """Imports and instantiates the training plan if not done yet, then initializes it with the arguments.
+
+        Returns:
+            Error message if the training plan cannot be instantiated or initialized, None otherwise
+        """
+        if self.training_plan is None:
+            try:
+                sys.path.insert(0, environ['TMP_DIR'])
+                module = importlib.import_module(self._import_module)
+                train_class = getattr(module, self.training_plan_class)
+                self.training_plan = train_class()
+                sys.path.pop(0)
+            except Exception as e:
+                return f"Cannot instantiate training plan object: {str(e)}"
+
+        try:
+            self.training_plan.post_init(model_args=self.model_arguments,
+                                         training_args=self.training_arguments,
+                                         aggregator_args=self.aggregator_args)
+        except Exception as e:
+            return f"Can't initialize training plan with the arguments: {e}"
+
+        return None
+
+    def _set_data_loaders(self) -> Union[str, None]:
+        """Splits training and validation data, and sets the data loaders of the training plan.
+
+        Data loaders of a warm session are set again as they are (the training routine may have wrapped them, eg.
+        for differential privacy).
+
+        Returns:
+            Error message if the data loaders cannot be created, None otherwise
+        """
+        if self._data_loaders is not None:
+            self.training_plan.set_data_loaders(*self._data_loaders)
+            return None
+
+        try:
+            self._set_training_testing_data_loaders()
+        except FedbiomedError as e:
+            return f"Can not create validation/train data: {str(e)}"
+        except Exception as e:
+            return f"Undetermined error while creating data for training/validation. Can not create " \
+                   f"validation/train data: {str(e)}"
+
+        self._data_loaders = (self.training_plan.training_data_loader, self.training_plan.testing_data_loader)
+        return None
+
+    def _persist_optimizer_state(self) -> bool:
+        """Tells whether the optimizer state is kept by the node between rounds, as requested by training arguments.
+
+        Returns:
+            True if the optimizer state is persisted for this round
+        """
+        if not self.training or not self.training_arguments.get('persist_optimizer_state'):
+            return False
+        if not hasattr(self.training_plan, 'optimizer_state'):
+            logger.warning(f"Optimizer state cannot be persisted for training plans of type "
+                           f"{self.training_plan.type()}")
+            return False
+        return True
+
+    def _restore_optimizer_state(self):
+        """Restores the optimizer state saved by the former round of the job on the dataset, if any.
+
+        Errors are only logged, training then starts from a fresh optimizer state.
+        """
+        if not self._persist_optimizer_state():
+            return
+
+        try:
+            state = self._optimizer_state_store.load(self.job_id,
+                                                     self.dataset['dataset_id'],
+                                                     self.round_number,
+                                                     self.training_arguments.get('optimizer_state_max_staleness') or 0)
+            if state is not None:
+                self.training_plan.set_optimizer_state(state)
+                logger.debug(f"Optimizer state of job {self.job_id} restored for round {self.round_number}")
+        except Exception as e:
+            logger.error(f"Cannot restore optimizer state, starting from a fresh optimizer state: {e}")
+
+    def _save_optimizer_state(self):
+        """Saves the optimizer state after training, for the next round of the job on the dataset.
+
+        Errors are only logged, they do not fail the round.
+        """
+        if not self._persist_optimizer_state():
+            return
+
+        try:
+            self._optimizer_state_store.save(self.job_id,
+                                             self.dataset['dataset_id'],
+                                             self.round_number,
+                                             self.training_plan.optimizer_state())
+        except Exception as e:
+            logger.error(f"Cannot save optimizer state of the round: {e}")
+
+    def _start_profiling(self) -> Union[TrainingProfiler, None]:
+        """Starts capturing a profiling trace of the training plan routines, if requested by training arguments.
+
+        Returns:
+            The started profiler, or None if profiling is not requested or cannot be started
+        """
+        profile_steps = self.training_arguments.get('profile_steps')
+        if not profile_steps:
+            return None
+
+        try:
+            profiler = TrainingProfiler(self.training_plan,
+                                        profile_steps,
+                                        os.path.join(environ['TMP_DIR'], 'node_profile_' + str(uuid.uuid4())))
+            profiler.start()
+        except Exception as e:
+            logger.error(f"Cannot start profiling the round: {e}")
+            return None
+        return profiler
+
+    def _stop_profiling(self, profiler: Union[TrainingProfiler, None]) -> Union[str, None]:
+        """Stops capturing the profiling trace, and uploads it to the repository.
+
+        Profiling errors are only logged, they do not fail the round.
+
+        Args:
+            profiler: profiler returned by `_start_profiling`
+
+        Returns:
+            URL of the uploaded trace, or None if there is no trace
+        """
+        if profiler is None:
+            return None
+
+        try:
+            res = self.repository.upload_file(profiler.stop())
+        except Exception as e:
+            logger.error(f"Cannot upload profiling trace of the round: {e}")
+            return None
+        logger.info("profiling trace uploaded successfully")
+        return res['file']
 
     def _send_round_reply(self,
                           message: str = '',
                           success: bool = False,
                           params_url: Union[str, None] = '',
                           timing: dict = {},
-                          sample_size: Union[int, None] = None) -> NodeMessages:
+                          sample_size: Union[int, None] = None,
+                          profile_url: Union[str, None] = None,
+                          num_updates: Union[int, None] = None) -> NodeMessages:
         """
         Private method for sending reply to researcher after training/validation. Message content changes
         based on success status.
@@ -363,11 +611,15 @@ class Round:
             success: Declares whether training/validation is successful
             params_url: URL where parameters are uploaded
             timing: Timing statistics
+            sample_size: Number of samples used for training
+            profile_url: URL where the profiling trace is uploaded, if profiling was requested
+            num_updates: Number of updates actually performed by the training routine, if counted
         """
 
-        # If round is not successful log error message
+        # If round is not successful log error message, and drop the training plan of the round
         if not success:
             logger.error(message)
+            self.discard()
 
         return NodeMessages.reply_create({'node_id': environ['NODE_ID'],
                                           'job_id': self.job_id,
@@ -378,7 +630,9 @@ class Round:
                                           'params_url': params_url,
                                           'msg': message,
                                           'sample_size': sample_size,
-                                          'timing': timing}).get_dict()
+                                          'timing': timing,
+                                          'profile_url': profile_url,
+                                          'num_updates': num_updates}).get_dict()
 
     def _set_training_testing_data_loaders(self):
         """
@@ -469,6 +723,13 @@ class Round:
         except FedbiomedError as e:
             raise FedbiomedRoundError(f"{ErrorNumbers.FB314.value}: Error while loading data manager; {str(e)}")
 
+        # Labels stored in the dataset's metadata at registration spare their computation from the data. They are
+        # labels of the raw target column: the data manager checks them against the target of the training plan
+        if training_plan_type == TrainingPlans.SkLearnTrainingPlan:
+            classes = (self.dataset.get("dataset_parameters") or {}).get("classes")
+            if classes is not None:
+                data_manager.set_classes(classes)
+
         # Get dataset property
         if hasattr(data_manager.dataset, "set_dataset_parameters"):
             dataset_parameters = self.dataset.get("dataset_parameters", {})
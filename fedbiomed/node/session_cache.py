@@ -0,0 +1,157 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+'''
+Cache of warm training sessions kept by the node between the rounds of a job.
+'''
+
+import json
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from fedbiomed.common.logger import logger
+
+
+DEFAULT_MAX_SESSIONS = 4
+"""Default maximum number of sessions kept warm by a node"""
+
+DEFAULT_IDLE_TIMEOUT = 600
+"""Default time (in seconds) after which a session that was not used is evicted"""
+
+
+class SessionCache:
+    """Keeps the training plan and data loaders of a job alive between rounds.
+
+    A session is created by a round the first time a training plan is used on a dataset: it holds the imported
+    training plan module, the training plan instance and the training/testing data loaders. Next rounds with
+    the same key (job, hash of the training plan file, dataset, loading arguments) reuse the session instead of
+    re-importing the training plan and reloading the data: only model parameters and aggregator arguments
+    are changed.
+
+    A session is taken out of the cache while a round uses it and put back when the round succeeds, so that
+    a failing round drops it. Sessions are also evicted when the cache is full (least recently used first),
+    when they are not used for more than `idle_timeout` seconds, when a round of the same job and dataset
+    has a different key (eg. the training plan or the loading arguments changed), or when the researcher
+    notifies that their job ended.
+    """
+
+    def __init__(self,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        """Constructor of the class.
+
+        Args:
+            max_sessions: maximum number of sessions kept in the cache. 0 disables the cache.
+            idle_timeout: time in seconds after which a session that was not used is evicted.
+        """
+        self._max_sessions = max_sessions
+        self._idle_timeout = idle_timeout
+        self._sessions = OrderedDict()  # key -> (last use time, session)
+
+    @staticmethod
+    def key(job_id: str,
+            training_plan_hash: str,
+            dataset: Dict[str, Any],
+            loader_arguments: Optional[Dict[str, Any]],
+            test_ratio: float,
+            dlp_and_loading_block_metadata: Any = None) -> Tuple:
+        """Builds the key of a session.
+
+        Args:
+            job_id: id of the job
+            training_plan_hash: hash of the training plan file
+            dataset: dataset entry of the node, including its id and path
+            loader_arguments: arguments of the data loaders
+            test_ratio: ratio of the testing partition of the data
+            dlp_and_loading_block_metadata: data loading plan of the dataset, if any
+
+        Returns:
+            Key of the session
+        """
+        def freeze(obj: Any) -> str:
+            return json.dumps(obj, sort_keys=True, default=str)
+
+        return (job_id,
+                training_plan_hash,
+                dataset.get('dataset_id'),
+                freeze(dataset),
+                freeze(loader_arguments),
+                test_ratio,
+                freeze(dlp_and_loading_block_metadata))
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Takes a session out of the cache.
+
+        Sessions of the same job and dataset that do not match the `key` are evicted.
+
+        Args:
+            key: key of the session, see `key`
+
+        Returns:
+            The session (dict with `import_module`, `training_plan` and `data_loaders` entries) or None if there
+                is no session for the `key`
+        """
+        self.evict_idle()
+        entry = self._sessions.pop(key, None)
+
+        for stale_key in [k for k in self._sessions if k[0] == key[0] and k[2] == key[2]]:
+            self._evict(stale_key, 'superseded')
+
+        if entry is None:
+            return None
+        logger.debug(f'Reusing warm session of job {key[0]} on dataset {key[2]}')
+        return entry[1]
+
+    def put(self, key: Tuple, session: Dict[str, Any]):
+        """Puts a session back in the cache after a round used it.
+
+        Args:
+            key: key of the session, see `key`
+            session: dict with `import_module`, `training_plan` and `data_loaders` entries
+        """
+        if self._max_sessions <= 0:
+            self._release(session)
+            return
+
+        if key in self._sessions:
+            self._evict(key, 'replaced')
+        self._sessions[key] = (time.monotonic(), session)
+
+        while len(self._sessions) > self._max_sessions:
+            self._evict(next(iter(self._sessions)), 'cache is full')
+
+    def evict_job(self, job_id: str):
+        """Evicts all sessions of a job.
+
+        Args:
+            job_id: id of the job
+        """
+        for key in [k for k in self._sessions if k[0] == job_id]:
+            self._evict(key, 'job ended')
+
+    def evict_idle(self):
+        """Evicts the sessions not used for more than `idle_timeout` seconds."""
+        now = time.monotonic()
+        for key in [k for k, (last_use, _) in self._sessions.items() if now - last_use > self._idle_timeout]:
+            self._evict(key, 'idle timeout')
+
+    def clear(self):
+        """Evicts all sessions."""
+        for key in list(self._sessions):
+            self._evict(key, 'cache cleared')
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self, key: Tuple, reason: str):
+        _, session = self._sessions.pop(key)
+        logger.debug(f'Evicting warm session of job {key[0]} on dataset {key[2]}: {reason}')
+        self._release(session)
+
+    @staticmethod
+    def _release(session: Dict[str, Any]):
+        # unload the training plan module imported for the session
+        sys.modules.pop(session.get('import_module'), None)
+        session.clear()
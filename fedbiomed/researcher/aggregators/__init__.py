@@ -1,16 +1,28 @@
 # This file is originally part of Fed-BioMed
 # SPDX-License-Identifier: Apache-2.0
 
-from .aggregator import Aggregator
+from .aggregator import Aggregator, RobustAggregator
 from .fedavg import FedAverage
 from .scaffold import Scaffold
+from .median import CoordinateMedian, TrimmedMean
+from .krum import Krum
+from .sufficient_statistics import SufficientStatisticsAggregator, LinearRegressionAggregator, \
+    GaussianNBAggregator, PCAAggregator
 from .functional import initialize, federated_averaging, weighted_sum
 
 __all__ = [
     "Aggregator",
+    "RobustAggregator",
     "FedAverage",
     "initialize",
     "federated_averaging",
     "weighted_sum",
-    "Scaffold"
+    "Scaffold",
+    "CoordinateMedian",
+    "TrimmedMean",
+    "Krum",
+    "SufficientStatisticsAggregator",
+    "LinearRegressionAggregator",
+    "GaussianNBAggregator",
+    "PCAAggregator"
 ]
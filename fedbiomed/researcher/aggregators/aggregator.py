@@ -116,3 +116,70 @@ class Aggregator:
         use for breakpoints. load the aggregator state
         """
         self._aggregator_args = state['parameters']
+
+
+class RobustAggregator(Aggregator):
+    """
+    Top class for byzantine-robust aggregators, that combine nodes' models coordinate-wise.
+
+    Models are processed in fixed-size chunks of their flattened parameters, to bound the memory used by the
+    aggregation. Robust aggregators do not send any argument to the nodes.
+    """
+    def __init__(self, chunk_size: int):
+        """Constructor of the class.
+
+        Args:
+            chunk_size: number of model coordinates processed at once.
+        """
+        super().__init__()
+        self._aggregator_args = {'chunk_size': self._check_chunk_size(chunk_size)}
+
+    def create_aggregator_args(self, *args, **kwargs) -> Tuple[dict, dict]:
+        """Returns aggregator arguments that are expecting by the nodes: none for robust aggregators.
+
+        Returns:
+            Two empty dictionaries
+        """
+        return {}, {}
+
+    def load_state(self, state: Dict[str, Any] = None, **kwargs):
+        """
+        use for breakpoints. load the aggregator state
+        """
+        super().load_state(state)
+        self._check_chunk_size(self._aggregator_args['chunk_size'])
+
+    @staticmethod
+    def check_model_params(model_params: Dict[str, Dict[str, Any]]):
+        """Checks that nodes' models can be aggregated coordinate-wise.
+
+        Args:
+            model_params: contains each model layers, mapped by node id
+
+        Raises:
+            FedbiomedAggregatorError: no model, or models with different layers
+        """
+        if not model_params:
+            msg = f"{ErrorNumbers.FB401.value}: no model to aggregate"
+            logger.critical(msg)
+            raise FedbiomedAggregatorError(msg)
+        layers = {key: tuple(val.shape) for key, val in next(iter(model_params.values())).items()}
+        for node_id, params in model_params.items():
+            if {key: tuple(val.shape) for key, val in params.items()} != layers:
+                msg = f"{ErrorNumbers.FB401.value}: model of node {node_id} does not have the same layers as " \
+                      "the other nodes"
+                logger.critical(msg)
+                raise FedbiomedAggregatorError(msg)
+
+    @staticmethod
+    def _check_chunk_size(chunk_size: Any) -> int:
+        """Checks the chunk size argument.
+
+        Raises:
+            FedbiomedAggregatorError: chunk size is not a positive integer
+        """
+        if not isinstance(chunk_size, int) or isinstance(chunk_size, bool) or chunk_size <= 0:
+            msg = f"{ErrorNumbers.FB401.value}: `chunk_size` should be a positive integer, not {chunk_size}"
+            logger.critical(msg)
+            raise FedbiomedAggregatorError(msg)
+        return chunk_size
@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import copy
-from typing import Dict, List, Mapping, Tuple, Union
+from typing import Dict, Iterator, List, Mapping, Tuple, Union
 
 import torch
 import numpy as np
@@ -70,6 +70,203 @@ def weighted_sum(model_params: List[Dict[str, Union[torch.Tensor, np.ndarray]]],
     return avg_params
 
 
+DEFAULT_CHUNK_SIZE = 2 ** 18
+"""Default number of model coordinates processed at once by the robust aggregation operators"""
+
+
+def _flat_views(params: Dict[str, Union[torch.Tensor, np.ndarray]]) -> List[torch.Tensor]:
+    """Gets flat tensor views of model parameters, without copy when possible."""
+    views = []
+    for val in params.values():
+        if isinstance(val, torch.Tensor):
+            views.append(val.detach().reshape(-1))
+        else:
+            views.append(torch.from_numpy(np.ascontiguousarray(val)).reshape(-1))
+    return views
+
+
+def _flat_sizes(params: Dict[str, Union[torch.Tensor, np.ndarray]]) -> List[int]:
+    """Number of coordinates of each layer of model parameters."""
+    return [int(np.prod(val.shape)) for val in params.values()]
+
+
+def _compute_dtype(model_params: List[Dict[str, Union[torch.Tensor, np.ndarray]]]) -> torch.dtype:
+    """Floating point type used for aggregating model parameters (at least float32)."""
+    dtype = torch.float32
+    for view in _flat_views(model_params[0]):
+        if view.is_floating_point():
+            dtype = torch.promote_types(dtype, view.dtype)
+    return dtype
+
+
+def iter_chunks(model_params: List[Dict[str, Union[torch.Tensor, np.ndarray]]],
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[int, int, torch.Tensor]]:
+    """Iterates over fixed-size chunks of the nodes' flattened model parameters.
+
+    Model parameters of each node are seen as one flat buffer (concatenation of all layers, in the order of
+    the first node's parameters). Chunks are copied into a single preallocated (n_nodes, chunk_size) tensor,
+    which bounds the memory used by the aggregation operators whatever the model size.
+
+    Args:
+        model_params: list that contains nodes' model parameters; each model is stored as an OrderedDict (maps
+            model layer name to the model weights)
+        chunk_size: maximum number of coordinates in a chunk
+
+    Yields:
+        Start and stop positions of the chunk in the flat buffer, and a (n_nodes, stop - start) tensor
+            holding the chunk of each node. The tensor is reused for the next chunk.
+    """
+    keys = list(model_params[0].keys())
+    views = [_flat_views({key: params[key] for key in keys}) for params in model_params]
+    sizes = _flat_sizes(model_params[0])
+    total = sum(sizes)
+    buffer = torch.empty((len(model_params), min(chunk_size, total)), dtype=_compute_dtype(model_params))
+
+    layer, layer_start = 0, 0
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        chunk = buffer[:, :stop - start]
+        position = start
+        while position < stop:
+            while layer_start + sizes[layer] <= position:
+                layer_start += sizes[layer]
+                layer += 1
+            end = min(stop, layer_start + sizes[layer])
+            for node, node_views in enumerate(views):
+                chunk[node, position - start:end - start].copy_(
+                    node_views[layer][position - layer_start:end - layer_start])
+            position = end
+        yield start, stop, chunk
+
+
+def unflatten(flat: torch.Tensor,
+              like: Dict[str, Union[torch.Tensor, np.ndarray]]) -> Dict[str, Union[torch.Tensor, np.ndarray]]:
+    """Splits a flat buffer back into model parameters.
+
+    Args:
+        flat: flat buffer of model parameters
+        like: model parameters giving the names, shapes, types and order of the layers
+
+    Returns:
+        Model parameters, with the same structure and types as `like`
+    """
+    params = copy.copy(like)
+    offset = 0
+    for key, val in like.items():
+        size = int(np.prod(val.shape))
+        layer = flat[offset:offset + size].reshape(val.shape)
+        if isinstance(val, torch.Tensor):
+            params[key] = layer.to(val.dtype)
+        else:
+            params[key] = layer.numpy().astype(val.dtype)
+        offset += size
+    return params
+
+
+def coordinate_median(model_params: List[Dict[str, Union[torch.Tensor, np.ndarray]]],
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Mapping[str, Union[torch.Tensor, np.ndarray]]:
+    """Computes the coordinate-wise median of nodes' model parameters.
+
+    For an even number of nodes, the median is the mean of the two middle values.
+
+    Args:
+        model_params: list that contains nodes' model parameters
+        chunk_size: number of coordinates processed at once
+
+    Returns:
+        Model parameters made of the coordinate-wise median
+    """
+    return trimmed_mean(model_params, (len(model_params) - 1) // 2, chunk_size)
+
+
+def trimmed_mean(model_params: List[Dict[str, Union[torch.Tensor, np.ndarray]]],
+                 n_trimmed: int,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> Mapping[str, Union[torch.Tensor, np.ndarray]]:
+    """Computes the coordinate-wise trimmed mean of nodes' model parameters.
+
+    For each coordinate, the `n_trimmed` largest and `n_trimmed` smallest values are discarded and the
+    remaining values are averaged. Values are selected with an in-place partial sort of each chunk, which
+    does not allocate memory (unlike a full sort, that also returns indices).
+
+    Args:
+        model_params: list that contains nodes' model parameters
+        n_trimmed: number of values discarded on each side, for each coordinate
+        chunk_size: number of coordinates processed at once
+
+    Returns:
+        Model parameters made of the coordinate-wise trimmed mean
+    """
+    assert len(model_params) > 0, 'An empty list of models was passed.'
+    assert 0 <= 2 * n_trimmed < len(model_params), 'Cannot trim more values than the number of models.'
+
+    n_nodes = len(model_params)
+    kth = sorted({n_trimmed, n_nodes - n_trimmed - 1})
+    flat = torch.empty(sum(_flat_sizes(model_params[0])), dtype=_compute_dtype(model_params))
+    for start, stop, chunk in iter_chunks(model_params, chunk_size):
+        if n_trimmed > 0:
+            chunk.numpy().partition(kth, axis=0)
+        torch.mean(chunk[n_trimmed:n_nodes - n_trimmed], dim=0, out=flat[start:stop])
+    return unflatten(flat, model_params[0])
+
+
+def pairwise_squared_distances(model_params: List[Dict[str, Union[torch.Tensor, np.ndarray]]],
+                               chunk_size: int = DEFAULT_CHUNK_SIZE) -> torch.Tensor:
+    """Computes the squared euclidean distances between all pairs of nodes' model parameters.
+
+    Squared distances add up over coordinates: they are accumulated chunk by chunk, using one batched
+    (Gram matrix) distance computation per chunk.
+
+    Args:
+        model_params: list that contains nodes' model parameters
+        chunk_size: number of coordinates processed at once
+
+    Returns:
+        (n_nodes, n_nodes) tensor of squared distances
+    """
+    n_nodes = len(model_params)
+    distances = torch.zeros((n_nodes, n_nodes), dtype=torch.float64)
+    for _, _, chunk in iter_chunks(model_params, chunk_size):
+        squared_norms = (chunk * chunk).sum(dim=1)
+        gram = chunk @ chunk.T
+        distances += (squared_norms[:, None] + squared_norms[None, :] - 2 * gram).double()
+    distances.clamp_(min=0.)
+    distances.fill_diagonal_(0.)
+    return distances
+
+
+def krum_scores(distances: torch.Tensor, n_byzantine: int) -> torch.Tensor:
+    """Computes Krum scores from pairwise squared distances.
+
+    The score of a node is the sum of its squared distances to its `n - n_byzantine - 2` closest neighbours.
+
+    Args:
+        distances: (n_nodes, n_nodes) tensor of squared distances
+        n_byzantine: number of byzantine nodes tolerated
+
+    Returns:
+        Score of each node (lower is better)
+    """
+    n_nodes = distances.shape[0]
+    n_neighbours = n_nodes - n_byzantine - 2
+    assert n_neighbours > 0, 'Krum requires more than 2 * n_byzantine + 2 models.'
+    # first sorted value is the null distance of a node to itself
+    return distances.sort(dim=1).values[:, 1:n_neighbours + 1].sum(dim=1)
+
+
+def mean(model_params: List[Dict[str, Union[torch.Tensor, np.ndarray]]],
+         chunk_size: int = DEFAULT_CHUNK_SIZE) -> Mapping[str, Union[torch.Tensor, np.ndarray]]:
+    """Computes the (unweighted) mean of nodes' model parameters, chunk by chunk.
+
+    Args:
+        model_params: list that contains nodes' model parameters
+        chunk_size: number of coordinates processed at once
+
+    Returns:
+        Model parameters made of the mean
+    """
+    return trimmed_mean(model_params, 0, chunk_size)
+
+
 def init_correction_states(model_params: Dict, node_ids: Dict) -> Dict:
     init_params = {key: initialize(tensor)[1] for key, tensor in model_params.items()}
     client_correction = {node_id: copy.deepcopy(init_params) for node_id in node_ids}
@@ -0,0 +1,89 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Byzantine-robust aggregation with (multi-)Krum
+"""
+
+from typing import Dict, Mapping, Union
+
+from fedbiomed.common.constants import ErrorNumbers
+from fedbiomed.common.exceptions import FedbiomedAggregatorError
+from fedbiomed.common.logger import logger
+from fedbiomed.researcher.aggregators.aggregator import RobustAggregator
+from fedbiomed.researcher.aggregators.functional import DEFAULT_CHUNK_SIZE, krum_scores, mean, \
+    pairwise_squared_distances
+
+
+class Krum(RobustAggregator):
+    """
+    Defines the (multi-)Krum aggregation strategy.
+
+    Each node's model is scored by the sum of its squared distances to its `n - n_byzantine - 2` closest
+    models. The `n_selected` models with the lowest scores are averaged into the global model (`n_selected=1`
+    is Krum, `n_selected>1` is multi-Krum). Node weights (sample sizes) are ignored.
+    """
+
+    def __init__(self, n_byzantine: int = 1, n_selected: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Construct `Krum` object as an instance of [`RobustAggregator`]
+        [fedbiomed.researcher.aggregators.RobustAggregator].
+
+        Args:
+            n_byzantine: number of byzantine nodes tolerated. Aggregation requires more than
+                `2 * n_byzantine + 2` nodes.
+            n_selected: number of models averaged into the global model.
+            chunk_size: number of model coordinates processed at once, bounds the memory used by the aggregation.
+        """
+        super().__init__(chunk_size)
+        self.aggregator_name = "Krum"
+        for name, value, minimum in (('n_byzantine', n_byzantine, 0), ('n_selected', n_selected, 1)):
+            if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+                msg = f"{ErrorNumbers.FB401.value}: `{name}` should be an integer >= {minimum}, not {value}"
+                logger.critical(msg)
+                raise FedbiomedAggregatorError(msg)
+        self._aggregator_args['n_byzantine'] = n_byzantine
+        self._aggregator_args['n_selected'] = n_selected
+        self._last_selection = []
+
+    def last_selection(self):
+        """Gets the ids of the nodes whose models were selected at the last aggregation."""
+        return self._last_selection
+
+    def aggregate(
+            self,
+            model_params: Dict[str, Dict[str, Union['torch.Tensor', 'numpy.ndarray']]],
+            weights: Dict[str, float],
+            *args,
+            **kwargs
+    ) -> Mapping[str, Union['torch.Tensor', 'numpy.ndarray']]:
+        """Aggregates local models sent by participating nodes into a global model, with (multi-)Krum.
+
+        Args:
+            model_params: contains each model layers, mapped by node id
+            weights: contains the weight of each node, unused
+
+        Returns:
+            Aggregated parameters
+
+        Raises:
+            FedbiomedAggregatorError: not enough nodes for the number of byzantine nodes tolerated
+        """
+        self.check_model_params(model_params)
+        n_byzantine = self._aggregator_args['n_byzantine']
+        n_selected = self._aggregator_args['n_selected']
+        if len(model_params) <= 2 * n_byzantine + 2 or len(model_params) < n_selected:
+            msg = f"{ErrorNumbers.FB401.value}: Krum needs more than {2 * n_byzantine + 2} and at least " \
+                  f"{n_selected} models, received {len(model_params)}"
+            logger.critical(msg)
+            raise FedbiomedAggregatorError(msg)
+
+        node_ids = list(model_params)
+        params = [model_params[node_id] for node_id in node_ids]
+        chunk_size = self._aggregator_args['chunk_size']
+
+        scores = krum_scores(pairwise_squared_distances(params, chunk_size), n_byzantine)
+        selected = scores.argsort()[:n_selected].tolist()
+        self._last_selection = [node_ids[i] for i in selected]
+        logger.info(f"Krum selected the models of nodes {self._last_selection}")
+
+        return mean([params[i] for i in selected], chunk_size)
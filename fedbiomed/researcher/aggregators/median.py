@@ -0,0 +1,100 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Byzantine-robust aggregation with coordinate-wise median and trimmed mean
+"""
+
+from typing import Dict, Mapping, Union
+
+from fedbiomed.common.constants import ErrorNumbers
+from fedbiomed.common.exceptions import FedbiomedAggregatorError
+from fedbiomed.common.logger import logger
+from fedbiomed.researcher.aggregators.aggregator import RobustAggregator
+from fedbiomed.researcher.aggregators.functional import DEFAULT_CHUNK_SIZE, coordinate_median, trimmed_mean
+
+
+class CoordinateMedian(RobustAggregator):
+    """
+    Defines the coordinate-wise median aggregation strategy.
+
+    Each coordinate of the global model is the median of the nodes' values for this coordinate. Node weights
+    (sample sizes) are ignored, as they could be forged by a byzantine node.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Construct `CoordinateMedian` object as an instance of [`RobustAggregator`]
+        [fedbiomed.researcher.aggregators.RobustAggregator].
+
+        Args:
+            chunk_size: number of model coordinates aggregated at once, bounds the memory used by the aggregation.
+        """
+        super().__init__(chunk_size)
+        self.aggregator_name = "CoordinateMedian"
+
+    def aggregate(
+            self,
+            model_params: Dict[str, Dict[str, Union['torch.Tensor', 'numpy.ndarray']]],
+            weights: Dict[str, float],
+            *args,
+            **kwargs
+    ) -> Mapping[str, Union['torch.Tensor', 'numpy.ndarray']]:
+        """Aggregates local models sent by participating nodes into a global model, with coordinate-wise median.
+
+        Args:
+            model_params: contains each model layers, mapped by node id
+            weights: contains the weight of each node, unused
+
+        Returns:
+            Aggregated parameters
+        """
+        self.check_model_params(model_params)
+        return coordinate_median(list(model_params.values()), self._aggregator_args['chunk_size'])
+
+
+class TrimmedMean(RobustAggregator):
+    """
+    Defines the coordinate-wise trimmed mean aggregation strategy.
+
+    For each coordinate, the largest and smallest values (a `trim_ratio` fraction of the nodes on each side) are
+    discarded and the remaining values are averaged. Node weights (sample sizes) are ignored.
+    """
+
+    def __init__(self, trim_ratio: float = .1, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Construct `TrimmedMean` object as an instance of [`RobustAggregator`]
+        [fedbiomed.researcher.aggregators.RobustAggregator].
+
+        Args:
+            trim_ratio: fraction of the nodes whose values are discarded on each side, for each coordinate.
+                Should be in [0, 0.5[.
+            chunk_size: number of model coordinates aggregated at once, bounds the memory used by the aggregation.
+        """
+        super().__init__(chunk_size)
+        self.aggregator_name = "TrimmedMean"
+        if not isinstance(trim_ratio, (int, float)) or isinstance(trim_ratio, bool) or \
+                not 0. <= trim_ratio < .5:
+            msg = f"{ErrorNumbers.FB401.value}: `trim_ratio` should be a number in [0, 0.5[, not {trim_ratio}"
+            logger.critical(msg)
+            raise FedbiomedAggregatorError(msg)
+        self._aggregator_args['trim_ratio'] = trim_ratio
+
+    def aggregate(
+            self,
+            model_params: Dict[str, Dict[str, Union['torch.Tensor', 'numpy.ndarray']]],
+            weights: Dict[str, float],
+            *args,
+            **kwargs
+    ) -> Mapping[str, Union['torch.Tensor', 'numpy.ndarray']]:
+        """Aggregates local models sent by participating nodes into a global model, with coordinate-wise
+        trimmed mean.
+
+        Args:
+            model_params: contains each model layers, mapped by node id
+            weights: contains the weight of each node, unused
+
+        Returns:
+            Aggregated parameters
+        """
+        self.check_model_params(model_params)
+        n_trimmed = int(self._aggregator_args['trim_ratio'] * len(model_params))
+        return trimmed_mean(list(model_params.values()), n_trimmed, self._aggregator_args['chunk_size'])
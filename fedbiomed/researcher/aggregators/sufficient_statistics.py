@@ -0,0 +1,248 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Single-round aggregation of models computed from sufficient statistics
+"""
+
+from typing import Any, Dict, Mapping, Union
+
+import numpy as np
+
+from fedbiomed.common.constants import ErrorNumbers
+from fedbiomed.common.exceptions import FedbiomedAggregatorError
+from fedbiomed.common.logger import logger
+from fedbiomed.common.training_plans import BaseTrainingPlan
+from fedbiomed.researcher.aggregators.aggregator import Aggregator
+
+
+class SufficientStatisticsAggregator(Aggregator):
+    """
+    Top class for aggregators of sufficient statistics, computed by the nodes with training plans of
+    [`fedbiomed.common.training_plans`][fedbiomed.common.training_plans] such as `FedLinearRegression`.
+
+    Statistics of the nodes are sums over their samples: they are summed over nodes, and the model is computed
+    from the total statistics, as if it was fitted on the pooled data of the nodes. Node weights (sample sizes) are
+    not used. Aggregated parameters are the attributes of the fitted scikit-learn model.
+    """
+
+    def aggregate(
+            self,
+            model_params: Dict[str, Dict[str, 'numpy.ndarray']],
+            weights: Dict[str, float],
+            *args,
+            training_plan: BaseTrainingPlan = None,
+            **kwargs
+    ) -> Mapping[str, Union[float, 'numpy.ndarray']]:
+        """Sums the statistics sent by participating nodes, and computes the global model.
+
+        Args:
+            model_params: contains the statistics of each node, mapped by node id
+            weights: contains the weight of each node, unused
+            training_plan: training plan of the experiment, whose model arguments are used to compute the model
+
+        Returns:
+            Aggregated parameters: attributes of the model
+        """
+        statistics = self.sum_statistics(model_params)
+        return self._solve(statistics, training_plan.model())
+
+    @staticmethod
+    def sum_statistics(model_params: Dict[str, Dict[str, 'numpy.ndarray']]) -> Dict[str, np.ndarray]:
+        """Sums the statistics of the nodes.
+
+        Args:
+            model_params: contains the statistics of each node, mapped by node id
+
+        Returns:
+            Total statistics
+
+        Raises:
+            FedbiomedAggregatorError: no statistics, or statistics of the nodes do not match
+        """
+        if not model_params:
+            msg = f"{ErrorNumbers.FB401.value}: no statistics to aggregate"
+            logger.critical(msg)
+            raise FedbiomedAggregatorError(msg)
+
+        statistics = None
+        for node_id, params in model_params.items():
+            params = {key: np.asarray(val, dtype=np.float64) for key, val in params.items()}
+            if statistics is None:
+                statistics = params
+                continue
+            if {key: val.shape for key, val in params.items()} != \
+                    {key: val.shape for key, val in statistics.items()}:
+                msg = f"{ErrorNumbers.FB401.value}: statistics of node {node_id} do not match the statistics of " \
+                      "the other nodes"
+                logger.critical(msg)
+                raise FedbiomedAggregatorError(msg)
+            for key, val in params.items():
+                statistics[key] = statistics[key] + val
+        return statistics
+
+    def _solve(self, statistics: Dict[str, np.ndarray], model: Any) -> Dict[str, Any]:
+        """Computes the model from the total statistics.
+
+        Args:
+            statistics: total statistics of the nodes
+            model: scikit-learn model of the training plan, with the model arguments of the experiment
+
+        Returns:
+            Attributes of the fitted model
+        """
+        msg = ErrorNumbers.FB401.value + \
+            ": _solve method should be overloaded by the sufficient statistics aggregator"
+        logger.critical(msg)
+        raise FedbiomedAggregatorError(msg)
+
+    @staticmethod
+    def _n_samples(n_samples: float, minimum: int = 1) -> float:
+        """Checks that enough samples were observed by the nodes.
+
+        Raises:
+            FedbiomedAggregatorError: not enough samples
+        """
+        if n_samples < minimum:
+            msg = f"{ErrorNumbers.FB401.value}: at least {minimum} samples are needed to compute the model, " \
+                  f"nodes observed {int(n_samples)}"
+            logger.critical(msg)
+            raise FedbiomedAggregatorError(msg)
+        return n_samples
+
+
+class LinearRegressionAggregator(SufficientStatisticsAggregator):
+    """
+    Computes ordinary least squares linear regression models from the statistics of `FedLinearRegression`.
+    """
+
+    def __init__(self):
+        """Construct `LinearRegressionAggregator` object."""
+        super().__init__()
+        self.aggregator_name = "LinearRegressionAggregator"
+
+    def _solve(self, statistics: Dict[str, np.ndarray], model: Any) -> Dict[str, Any]:
+        if getattr(model, 'positive', False):
+            msg = f"{ErrorNumbers.FB401.value}: linear regression with positive coefficients cannot be computed " \
+                  "from sufficient statistics"
+            logger.critical(msg)
+            raise FedbiomedAggregatorError(msg)
+
+        n_samples = self._n_samples(statistics['n_samples_'][0])
+        xtx, xty = statistics['xtx_'], statistics['xty_']
+        if model.fit_intercept:
+            # center the statistics on the means of the pooled data
+            mean_x = statistics['sum_x_'] / n_samples
+            mean_y = statistics['sum_y_'][0] / n_samples
+            xtx = xtx - n_samples * np.outer(mean_x, mean_x)
+            xty = xty - n_samples * mean_x * mean_y
+
+        # minimum norm solution, as scikit-learn, if features are collinear
+        coef = np.linalg.lstsq(xtx, xty, rcond=None)[0]
+        intercept = mean_y - mean_x @ coef if model.fit_intercept else 0.
+        return {'coef_': coef, 'intercept_': float(intercept)}
+
+
+class GaussianNBAggregator(SufficientStatisticsAggregator):
+    """
+    Computes Gaussian naive Bayes models from the statistics of `FedGaussianNB`.
+    """
+
+    def __init__(self):
+        """Construct `GaussianNBAggregator` object."""
+        super().__init__()
+        self.aggregator_name = "GaussianNBAggregator"
+
+    def _solve(self, statistics: Dict[str, np.ndarray], model: Any) -> Dict[str, Any]:
+        class_count = statistics['class_count_']
+        sum_x, sum_xx = statistics['sum_x_'], statistics['sum_xx_']
+        n_samples = self._n_samples(class_count.sum())
+
+        # variance smoothing, relative to the largest variance of the features over all classes
+        mean = sum_x.sum(axis=0) / n_samples
+        variance = np.maximum(sum_xx.sum(axis=0) / n_samples - mean * mean, 0.)
+        epsilon = model.var_smoothing * variance.max()
+
+        # classes that are not observed by any node get a zero mean and prior
+        count = np.maximum(class_count, 1.)[:, None]
+        theta = sum_x / count
+        var = np.maximum(sum_xx / count - theta * theta, 0.) + epsilon
+
+        if model.priors is not None:
+            class_prior = np.asarray(model.priors, dtype=np.float64)
+        else:
+            class_prior = class_count / n_samples
+        return {
+            'classes_': np.arange(len(class_count)),
+            'theta_': theta,
+            'var_': var,
+            'class_prior_': class_prior,
+            'class_count_': class_count,
+            'epsilon_': epsilon,
+        }
+
+
+class PCAAggregator(SufficientStatisticsAggregator):
+    """
+    Computes principal component analysis models from the statistics of `FedPCA`.
+
+    Components are the eigenvectors of the covariance matrix of the pooled data. Their signs are chosen so that the
+    largest coefficient (in absolute value) of each component is positive. `n_components` may be an integer, None
+    (all components) or a float in ]0, 1[ (minimum ratio of explained variance).
+    """
+
+    def __init__(self):
+        """Construct `PCAAggregator` object."""
+        super().__init__()
+        self.aggregator_name = "PCAAggregator"
+
+    def _solve(self, statistics: Dict[str, np.ndarray], model: Any) -> Dict[str, Any]:
+        n_samples = self._n_samples(statistics['n_samples_'][0], minimum=2)
+        mean = statistics['sum_x_'] / n_samples
+        covariance = (statistics['xtx_'] - n_samples * np.outer(mean, mean)) / (n_samples - 1)
+
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        order = np.argsort(eigenvalues)[::-1]
+        explained_variance = np.maximum(eigenvalues[order], 0.)
+        components = eigenvectors[:, order].T
+        signs = np.sign(components[np.arange(len(components)), np.argmax(np.abs(components), axis=1)])
+        components *= signs[:, None]
+
+        total_variance = explained_variance.sum()
+        explained_variance_ratio = explained_variance / total_variance if total_variance > 0 else \
+            np.zeros_like(explained_variance)
+        max_components = int(min(n_samples, len(mean)))
+        n_components = self._n_components(model.n_components, explained_variance_ratio, max_components)
+        noise_variance = explained_variance[n_components:max_components].mean() \
+            if n_components < max_components else 0.
+
+        return {
+            'n_components_': n_components,
+            'n_features_in_': len(mean),
+            'components_': components[:n_components],
+            'mean_': mean,
+            'explained_variance_': explained_variance[:n_components],
+            'explained_variance_ratio_': explained_variance_ratio[:n_components],
+            'singular_values_': np.sqrt(explained_variance[:n_components] * (n_samples - 1)),
+            'noise_variance_': float(noise_variance),
+        }
+
+    @staticmethod
+    def _n_components(n_components: Any, explained_variance_ratio: np.ndarray, max_components: int) -> int:
+        """Number of components kept, following the `n_components` argument of the model.
+
+        Raises:
+            FedbiomedAggregatorError: unsupported `n_components`
+        """
+        if n_components is None:
+            return max_components
+        if isinstance(n_components, float) and 0. < n_components < 1.:
+            ratio = np.cumsum(explained_variance_ratio)
+            return int(min(np.searchsorted(ratio, n_components, side='right') + 1, max_components))
+        if isinstance(n_components, int) and 0 < n_components <= max_components:
+            return n_components
+
+        msg = f"{ErrorNumbers.FB401.value}: `n_components` {n_components} is not supported by the PCA " \
+              f"aggregator, it should be None, an integer in [1, {max_components}] or a float in ]0, 1["
+        logger.critical(msg)
+        raise FedbiomedAggregatorError(msg)
@@ -4,6 +4,8 @@
 """Code of the researcher. Implements the experiment orchestration"""
 
 import functools
+from concurrent.futures import ThreadPoolExecutor
+import math
 import os
 import sys
 import json
@@ -31,6 +33,7 @@ from fedbiomed.researcher.environ import environ
 from fedbiomed.researcher.filetools import create_exp_folder, choose_bkpt_file, \
     create_unique_link, create_unique_file_link, find_breakpoint_path
 from fedbiomed.researcher.job import Job
+from fedbiomed.researcher.lazy_params import LazyParams
 from fedbiomed.researcher.monitor import Monitor
 from fedbiomed.researcher.requests import Requests
 from fedbiomed.researcher.responses import Responses
@@ -134,7 +137,12 @@ class Experiment(object):
                  tensorboard: bool = False,
                  experimentation_folder: Union[str, None] = None,
                  use_secagg: bool = False,
-                 secagg_timeout: float = 0
+                 secagg_timeout: float = 0,
+                 round_timeout: Union[float, None] = None,
+                 round_quorum: Union[int, float, None] = None,
+                 late_replies_policy: str = 'discard',
+                 retain_rounds: Union[int, None] = None,
+                 pipelined_rounds: bool = False
                  ):
 
         """Constructor of the class.
@@ -197,6 +205,21 @@ class Experiment(object):
             secagg_timeout: when `use_secagg` is `True`, maximum duration for the setup phase of each
                 secagg context element (server key and biprime), thus total secagg setup is twice the `timeout`.
                 Defaults to `environ['TIMEOUT']` if unset or equals 0.
+            round_timeout: maximum duration (in seconds) of a training round. At the deadline, the round is closed
+                and aggregation is done with the replies received so far, nodes that did not reply are reported as
+                stragglers. Defaults to None (no deadline, wait for all sampled nodes).
+            round_quorum: minimum number of node replies (`int`) or minimum fraction of the sampled nodes
+                (`float` in ]0, 1]) needed at the deadline of a round for aggregating. Only used when
+                `round_timeout` is set. Defaults to None (no quorum, at least one reply is needed).
+            late_replies_policy: what to do with a training reply received after the deadline of its round:
+                `'discard'` ignores it, `'keep'` uses it in the next training round in place of the node reply
+                if the node does not reply in time for the next round. Defaults to `'discard'`.
+            retain_rounds: number of last rounds for which aggregated params and node params of the training replies
+                are kept in memory. Params of older rounds stay on disk and are reloaded from their `params_path`
+                each time they are accessed. Defaults to None (keep all rounds in memory).
+            pipelined_rounds: whether to overlap the rounds: nodes are notified to prepare the next round while
+                the researcher aggregates, the next round is sent to the nodes as soon as the aggregated params are
+                uploaded, and breakpoints are written in background while the nodes train. Defaults to False.
         """
 
         # predefine all class variables, so no need to write try/except
@@ -234,6 +257,18 @@ class Experiment(object):
         self._secagg_servkey = None
         self._secagg_biprime = None
 
+        self._round_timeout = None
+        self._round_quorum = None
+        self._late_replies_policy = 'discard'
+        self._retain_rounds = None
+        self._pipelined_rounds = False
+        self._dispatched_round = None  # round whose training requests were already sent (pipelined rounds)
+        self._sampled_nodes = []  # nodes sampled for the last round sent
+        self._run_until = None  # round where the current `run` stops, no next round is sent beyond it
+        self._background_worker = None
+        self._background_tasks = []
+        # TODO: rewrite after experiment results refactoring
+        self._aggregated_params = {}
 
         #        use_secagg: bool = False,
         #        secagg_timeout: float = 0
@@ -261,6 +296,11 @@ class Experiment(object):
         # "current" means number of rounds already trained
         self._set_round_current(0)
         self.set_round_limit(round_limit)
+        self.set_round_timeout(round_timeout)
+        self.set_round_quorum(round_quorum)
+        self.set_late_replies_policy(late_replies_policy)
+        self.set_retain_rounds(retain_rounds)
+        self.set_pipelined_rounds(pipelined_rounds)
 
         # set self._experimentation_folder: type str
         self.set_experimentation_folder(experimentation_folder)
@@ -279,9 +319,6 @@ class Experiment(object):
         # set self._job to Union[Job, None]
         self.set_job()
 
-        # TODO: rewrite after experiment results refactoring
-        self._aggregated_params = {}
-
         self.set_save_breakpoints(save_breakpoints)
 
         # always create a monitoring process
@@ -387,6 +424,63 @@ class Experiment(object):
         """
         return self._round_current
 
+    @exp_exceptions
+    def round_timeout(self) -> Union[float, None]:
+        """Retrieves the maximum duration of a training round.
+
+        Please see also [`set_round_timeout`][fedbiomed.researcher.experiment.Experiment.set_round_timeout].
+
+        Returns:
+            Maximum duration of a training round in seconds. `None` if rounds have no deadline.
+        """
+        return self._round_timeout
+
+    @exp_exceptions
+    def retain_rounds(self) -> Union[int, None]:
+        """Retrieves the number of last rounds whose params are kept in memory.
+
+        Please see also [`set_retain_rounds`][fedbiomed.researcher.experiment.Experiment.set_retain_rounds].
+
+        Returns:
+            Number of last rounds whose params are kept in memory. `None` if all rounds are kept in memory.
+        """
+        return self._retain_rounds
+
+    @exp_exceptions
+    def pipelined_rounds(self) -> bool:
+        """Retrieves whether rounds are pipelined.
+
+        Please see also [`set_pipelined_rounds`][fedbiomed.researcher.experiment.Experiment.set_pipelined_rounds].
+
+        Returns:
+            `True` if rounds are pipelined, `False` if they run strictly in sequence.
+        """
+        return self._pipelined_rounds
+
+    @exp_exceptions
+    def round_quorum(self) -> Union[int, float, None]:
+        """Retrieves the minimum number (or fraction) of node replies needed at the deadline of a round.
+
+        Please see also [`set_round_quorum`][fedbiomed.researcher.experiment.Experiment.set_round_quorum].
+
+        Returns:
+            Round quorum as a number of nodes (`int`) or a fraction of the sampled nodes (`float`). `None` if
+                no quorum is set.
+        """
+        return self._round_quorum
+
+    @exp_exceptions
+    def late_replies_policy(self) -> str:
+        """Retrieves the policy applied to training replies received after the deadline of their round.
+
+        Please see also [`set_late_replies_policy`]
+        [fedbiomed.researcher.experiment.Experiment.set_late_replies_policy].
+
+        Returns:
+            Either `'discard'` or `'keep'`
+        """
+        return self._late_replies_policy
+
     @exp_exceptions
     def experimentation_folder(self) -> str:
         """Retrieves the folder name where experiment data/result are saved.
@@ -597,6 +691,71 @@ class Experiment(object):
         else:
             return self._job.training_replies
 
+    @exp_exceptions
+    def stragglers(self) -> Union[Dict[int, List[str]], None]:
+        """Retrieves the nodes that did not reply before the deadline of each training round.
+
+        Stragglers are only recorded for rounds run with a `round_timeout`.
+
+        Returns:
+            Dictionary of straggling node ids, keys stand for each round of training. None, if
+                [Job][fedbiomed.researcher.job] isn't declared.
+        """
+        if self._job is None:
+            logger.error('No `job` defined for experiment, cannot get `stragglers`')
+            return None
+        else:
+            return self._job.stragglers
+
+    @exp_exceptions
+    def nodes_idle_time(self) -> Union[Dict[int, Dict[str, float]], None]:
+        """Retrieves the idle time of the nodes before each training round.
+
+        Idle time of a node for a round is the time (in seconds) between the reception of its training reply for
+        its former round and the sending of its training request for this round, as measured by the researcher.
+
+        Returns:
+            Dictionary of idle time per node id, keys stand for each round of training. None, if
+                [Job][fedbiomed.researcher.job] isn't declared.
+        """
+        if self._job is None:
+            logger.error('No `job` defined for experiment, cannot get `nodes_idle_time`')
+            return None
+        else:
+            return self._job.nodes_idle_time
+
+    @exp_exceptions
+    def download_profiles(self, round: Optional[int] = None) -> Union[Dict[str, str], None]:
+        """Downloads the profiling traces sent by the nodes for a round of training.
+
+        Nodes send a profiling trace of their routines when the `profile_steps` training argument is set, eg.
+        `exp.set_training_args({..., 'profile_steps': 10})` profiles the first 10 training steps of each node.
+
+        Args:
+            round: round of training. Defaults to None, meaning the last round with training replies.
+
+        Returns:
+            Path of the downloaded trace file of each node that sent one, by node id. None, if
+                [Job][fedbiomed.researcher.job] isn't declared.
+
+        Raises:
+            FedbiomedExperimentError: bad round type or value
+        """
+        if self._job is None:
+            logger.error('No `job` defined for experiment, cannot download profiles')
+            return None
+
+        if round is None:
+            if not self._job.training_replies:
+                return {}
+            round = max(self._job.training_replies.keys())
+        elif not isinstance(round, int) or isinstance(round, bool):
+            msg = ErrorNumbers.FB410.value + f', in method `download_profiles` param `round` : type {type(round)}'
+            logger.critical(msg)
+            raise FedbiomedExperimentError(msg)
+
+        return self._job.download_profiles(round)
+
     # TODO: better checking of training plan object type in Job() to guarantee it is a TrainingPlan
 
     @exp_exceptions
@@ -672,6 +831,11 @@ class Experiment(object):
                 'Training Arguments',
                 'Rounds already run',
                 'Rounds total',
+                'Round timeout',
+                'Round quorum',
+                'Late replies policy',
+                'Rounds retained in memory',
+                'Pipelined rounds',
                 'Experiment folder',
                 'Experiment Path',
                 'Breakpoint State',
@@ -692,6 +856,11 @@ class Experiment(object):
                 self._training_args,
                 self._round_current,
                 self._round_limit,
+                self._round_timeout,
+                self._round_quorum,
+                self._late_replies_policy,
+                self._retain_rounds,
+                self._pipelined_rounds,
                 self._experimentation_folder,
                 self.experimentation_path(),
                 self._save_breakpoints,
@@ -1002,6 +1171,134 @@ class Experiment(object):
         # at this point self._round_limit is a Union[int, None]
         return self._round_limit
 
+    @exp_exceptions
+    def set_round_timeout(self, round_timeout: Union[float, None]) -> Union[float, None]:
+        """Sets `round_timeout` + verification on arguments type
+
+        Args:
+            round_timeout: maximum duration (in seconds) of a training round. When the deadline is reached, the
+                round is closed and aggregation is done with the replies received so far. `None` means that
+                rounds have no deadline (wait for all sampled nodes).
+
+        Returns:
+            Maximum duration of a training round
+
+        Raises:
+            FedbiomedExperimentError : bad round_timeout type or value
+        """
+        if round_timeout is None:
+            self._round_timeout = None
+        elif isinstance(round_timeout, (int, float)) and not isinstance(round_timeout, bool):
+            if round_timeout <= 0:
+                msg = ErrorNumbers.FB410.value + f' `round_timeout` must be positive: {round_timeout}'
+                logger.critical(msg)
+                raise FedbiomedExperimentError(msg)
+            self._round_timeout = float(round_timeout)
+        else:
+            msg = ErrorNumbers.FB410.value + f' `round_timeout` : {type(round_timeout)}'
+            logger.critical(msg)
+            raise FedbiomedExperimentError(msg)
+
+        return self._round_timeout
+
+    @exp_exceptions
+    def set_round_quorum(self, round_quorum: Union[int, float, None]) -> Union[int, float, None]:
+        """Sets `round_quorum` + verification on arguments type
+
+        Args:
+            round_quorum: minimum number of node replies (`int` >= 1) or minimum fraction of the sampled nodes
+                (`float` in ]0, 1]) needed at the deadline of a round for aggregating. Only used when a
+                `round_timeout` is set. `None` means that at least one reply is needed.
+
+        Returns:
+            Round quorum
+
+        Raises:
+            FedbiomedExperimentError : bad round_quorum type or value
+        """
+        if round_quorum is None:
+            self._round_quorum = None
+        elif isinstance(round_quorum, int) and not isinstance(round_quorum, bool):
+            if round_quorum < 1:
+                msg = ErrorNumbers.FB410.value + f' `round_quorum` must be at least 1: {round_quorum}'
+                logger.critical(msg)
+                raise FedbiomedExperimentError(msg)
+            self._round_quorum = round_quorum
+        elif isinstance(round_quorum, float):
+            if not 0 < round_quorum <= 1:
+                msg = ErrorNumbers.FB410.value + f' `round_quorum` fraction must be within ]0, 1]: {round_quorum}'
+                logger.critical(msg)
+                raise FedbiomedExperimentError(msg)
+            self._round_quorum = round_quorum
+        else:
+            msg = ErrorNumbers.FB410.value + f' `round_quorum` : {type(round_quorum)}'
+            logger.critical(msg)
+            raise FedbiomedExperimentError(msg)
+
+        if self._round_quorum is not None and self._round_timeout is None:
+            logger.debug('`round_quorum` is only used when a `round_timeout` is set')
+
+        return self._round_quorum
+
+    @exp_exceptions
+    def set_retain_rounds(self, retain_rounds: Union[int, None]) -> Union[int, None]:
+        """Sets `retain_rounds` + verification on arguments type
+
+        Aggregated params and node params of the training replies of older rounds are released from memory after
+        each round. They stay on disk, and are reloaded from their `params_path` each time they are accessed through
+        [`aggregated_params`][fedbiomed.researcher.experiment.Experiment.aggregated_params] or
+        [`training_replies`][fedbiomed.researcher.experiment.Experiment.training_replies].
+
+        Args:
+            retain_rounds: number of last rounds (`int` >= 1) whose params are kept in memory. `None` means
+                that params of all rounds are kept in memory.
+
+        Returns:
+            Number of last rounds whose params are kept in memory
+
+        Raises:
+            FedbiomedExperimentError : bad retain_rounds type or value
+        """
+        if retain_rounds is None:
+            self._retain_rounds = None
+        elif isinstance(retain_rounds, int) and not isinstance(retain_rounds, bool):
+            if retain_rounds < 1:
+                msg = ErrorNumbers.FB410.value + f' `retain_rounds` must be at least 1: {retain_rounds}'
+                logger.critical(msg)
+                raise FedbiomedExperimentError(msg)
+            self._retain_rounds = retain_rounds
+        else:
+            msg = ErrorNumbers.FB410.value + f' `retain_rounds` : {type(retain_rounds)}'
+            logger.critical(msg)
+            raise FedbiomedExperimentError(msg)
+
+        self._release_params()
+        return self._retain_rounds
+
+    @exp_exceptions
+    def set_late_replies_policy(self, late_replies_policy: str) -> str:
+        """Sets `late_replies_policy` + verification on arguments type
+
+        Args:
+            late_replies_policy: what to do with a training reply received after the deadline of its round.
+                `'discard'` ignores the reply, `'keep'` uses it in the next training round in place of the node
+                reply if the node does not reply in time for this next round.
+
+        Returns:
+            Late replies policy
+
+        Raises:
+            FedbiomedExperimentError : bad late_replies_policy type or value
+        """
+        if late_replies_policy not in ('discard', 'keep'):
+            msg = ErrorNumbers.FB410.value + f' `late_replies_policy` must be `discard` or `keep`, ' \
+                f'not {late_replies_policy}'
+            logger.critical(msg)
+            raise FedbiomedExperimentError(msg)
+        self._late_replies_policy = late_replies_policy
+
+        return self._late_replies_policy
+
     # no setter for self._round_current eg
     # def set_round_current(self, round_current: int) -> int:
     # ...
@@ -1386,6 +1683,8 @@ class Experiment(object):
                          '{self._round_current} rounds, may give inconsistent results')
             # note:
             # if self._secagg_servkey != None, then it should be redefined
+            # nodes can release the sessions kept for the former job
+            self._job.send_end_notice()
 
         if self._training_plan_is_defined is not True:
             # training plan not properly defined yet
@@ -1461,6 +1760,35 @@ class Experiment(object):
 
         return self._tensorboard
 
+    @exp_exceptions
+    def set_pipelined_rounds(self, pipelined_rounds: bool) -> bool:
+        """Sets `pipelined_rounds` + verification on arguments type
+
+        When rounds are pipelined:
+        - nodes receive a notice to prepare the next round (import training plan, load data) while the
+            researcher aggregates,
+        - the training requests of the next round are sent as soon as the aggregated params are uploaded,
+            when this next round is run by the current [`run`][fedbiomed.researcher.experiment.Experiment.run]
+            (or is below the `round_limit`),
+        - breakpoint writing and tensorboard flushing are done in a background worker while the nodes train.
+
+        Args:
+            pipelined_rounds: whether to pipeline the rounds
+
+        Returns:
+            Whether rounds are pipelined
+
+        Raises:
+            FedbiomedExperimentError : bad pipelined_rounds type
+        """
+        if not isinstance(pipelined_rounds, bool):
+            msg = ErrorNumbers.FB410.value + f' `pipelined_rounds` : {type(pipelined_rounds)}'
+            logger.critical(msg)
+            raise FedbiomedExperimentError(msg)
+
+        self._pipelined_rounds = pipelined_rounds
+        return self._pipelined_rounds
+
     # TODO: add setters for secagg context elements
 
     @exp_exceptions
@@ -1579,23 +1907,35 @@ class Experiment(object):
             self._global_model = self._job.training_plan.get_model_params()  # initial server state, before optimization/aggregation
 
         self._aggregator.set_training_plan_type(self._job.training_plan.type())
-        # Sample nodes using strategy (if given)
-        self._job.nodes = self._node_selection_strategy.sample_nodes(self._round_current)
 
-        # check aggregator parameter(s) before starting a round
-        self._aggregator.check_values(n_updates=self._training_args.get('num_updates'),
-                                      training_plan=self._job.training_plan)
-        logger.info('Sampled nodes in round ' + str(self._round_current) + ' ' + str(self._job.nodes))
+        if self._dispatched_round == self._round_current:
+            # training requests were sent at the end of the former round (pipelined rounds):
+            # finish writing its breakpoint before collecting replies, so that the job state is not modified meanwhile
+            self._wait_background_tasks()
+            self._dispatched_round = None
+            self._job.collect_training_replies(round=self._round_current,
+                                               timeout=self._round_timeout,
+                                               late_replies_policy=self._late_replies_policy)
+        else:
+            # a breakpoint of the former round may still be written in background (pipelined rounds)
+            self._wait_background_tasks()
+            aggr_args_thr_msg, aggr_args_thr_file = self._sample_round_nodes()
 
-        aggr_args_thr_msg, aggr_args_thr_file = self._aggregator.create_aggregator_args(self._global_model,
-                                                                                        self._job._nodes)
+            # Trigger training round on sampled nodes
+            _ = self._job.start_nodes_training_round(round=self._round_current,
+                                                     aggregator_args_thr_msg=aggr_args_thr_msg,
+                                                     aggregator_args_thr_files=aggr_args_thr_file,
+                                                     do_training=True,
+                                                     timeout=self._round_timeout,
+                                                     late_replies_policy=self._late_replies_policy)
+
+        if self._round_timeout is not None:
+            self._close_round_at_deadline(self._sampled_nodes)
+
+        if self._pipelined_rounds and not test_after and self._runs_round(self._round_current + 1):
+            # nodes prepare the next round while the researcher aggregates
+            self._job.send_prepare_notice()
 
-        # Trigger training round on sampled nodes
-        _ = self._job.start_nodes_training_round(round=self._round_current,
-                                                 aggregator_args_thr_msg=aggr_args_thr_msg,
-                                                 aggregator_args_thr_files=aggr_args_thr_file,
-                                                 do_training=True)
-        
         # refining/normalizing model weights received from nodes
         model_params, weights = self._node_selection_strategy.refine(
             self._job.training_replies[self._round_current], self._round_current)
@@ -1621,28 +1961,155 @@ class Experiment(object):
 
         self._aggregated_params[self._round_current] = {'params': aggregated_params,
                                                         'params_path': aggregated_params_path}
+        self._release_params()
 
         self._round_current += 1
 
         # Update round in monitor for the next round
         self._monitor.set_round(round_=self._round_current + 1)
 
-        if self._save_breakpoints:
+        if self._pipelined_rounds and not test_after and self._runs_round(self._round_current):
+            # send next round as soon as aggregated params are uploaded
+            aggr_args_thr_msg, aggr_args_thr_file = self._sample_round_nodes()
+            self._job.send_training_requests(round=self._round_current,
+                                             aggregator_args_thr_msg=aggr_args_thr_msg,
+                                             aggregator_args_thr_files=aggr_args_thr_file,
+                                             do_training=True)
+            self._dispatched_round = self._round_current
+
+        if self._pipelined_rounds:
+            # write breakpoint and tensorboard logs while the nodes train
+            if self._save_breakpoints:
+                self._run_in_background(self.breakpoint)
+            if self._tensorboard:
+                self._run_in_background(self._monitor.flush_writers)
+        elif self._save_breakpoints:
             self.breakpoint()
 
         # do final validation after saving breakpoint :
         # not saved in breakpoint for current round, but more simple
         if test_after:
+            # the breakpoint may be written in background: wait for it before the job state is modified
+            self._wait_background_tasks()
             # FIXME: should we sample nodes here too?
             aggr_args_thr_msg, aggr_args_thr_file = self._aggregator.create_aggregator_args(self._global_model,
                                                                                             self._job._nodes)
             self._job.start_nodes_training_round(round=self._round_current,
                                                  aggregator_args_thr_msg=aggr_args_thr_msg,
                                                  aggregator_args_thr_files=aggr_args_thr_file,
-                                                 do_training=False)
+                                                 do_training=False,
+                                                 timeout=self._round_timeout,
+                                                 late_replies_policy=self._late_replies_policy)
 
         return 1
 
+    def _sample_round_nodes(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """Samples the nodes of the current round, and creates the aggregator arguments to send them.
+
+        Returns:
+            Aggregator arguments to be sent through messaging and through file exchange system
+        """
+        # Sample nodes using strategy (if given)
+        self._job.nodes = self._node_selection_strategy.sample_nodes(self._round_current)
+        self._sampled_nodes = list(self._job.nodes)
+
+        # check aggregator parameter(s) before starting a round
+        self._aggregator.check_values(n_updates=self._training_args.get('num_updates'),
+                                      training_plan=self._job.training_plan)
+        logger.info('Sampled nodes in round ' + str(self._round_current) + ' ' + str(self._job.nodes))
+
+        return self._aggregator.create_aggregator_args(self._global_model, self._job._nodes)
+
+    def _runs_round(self, round_: int) -> bool:
+        """Tells whether a round will be run by the experiment, for sending it in advance (pipelined rounds).
+
+        Args:
+            round_: round number
+
+        Returns:
+            True if `round_` is below the round where the current `run` stops, or below `round_limit` when
+                not called from `run`
+        """
+        until = self._run_until if self._run_until is not None else self._round_limit
+        return until is not None and round_ < until
+
+    def _run_in_background(self, task: Callable):
+        """Runs a task in the background worker of the experiment. Tasks are run one at a time, in order.
+
+        Args:
+            task: function to run, without arguments
+        """
+        if self._background_worker is None:
+            self._background_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='experiment_worker')
+        self._background_tasks.append(self._background_worker.submit(task))
+
+    def _wait_background_tasks(self):
+        """Waits for the end of the tasks run in background, re-raising their error if any."""
+        tasks, self._background_tasks = self._background_tasks, []
+        for task in tasks:
+            task.result()
+
+    def _release_params(self):
+        """Releases from memory the params of the rounds older than the last `retain_rounds` rounds.
+
+        Released aggregated params and node params stay on disk, they are replaced by
+        [`LazyParams`][fedbiomed.researcher.lazy_params.LazyParams] handles reloading them on access.
+        """
+        if self._retain_rounds is None:
+            return
+
+        if self._job is not None:
+            self._job.release_training_replies(self._retain_rounds)
+
+        if self._aggregated_params:
+            last_round = max(self._aggregated_params.keys())
+            for round_, aggregated_params in self._aggregated_params.items():
+                if round_ > last_round - self._retain_rounds or isinstance(aggregated_params, LazyParams):
+                    continue
+                self._aggregated_params[round_] = LazyParams(aggregated_params, self._load_params)
+
+    def _load_params(self, params_path: str) -> dict:
+        """Loads aggregated params saved in a file.
+
+        Aggregated params files are written by the researcher, they may come from a breakpoint.
+
+        Args:
+            params_path: path to the file containing the aggregated params
+
+        Returns:
+            Aggregated params
+        """
+        return self._job.load_breakpoint_params(params_path, to_params=True)
+
+    def _close_round_at_deadline(self, sampled_nodes: List[str]):
+        """Checks the quorum of a round run with a deadline, and reports its stragglers to the strategy.
+
+        Args:
+            sampled_nodes: nodes sampled for the current round
+
+        Raises:
+            FedbiomedExperimentError: less node replies than the round quorum
+        """
+        stragglers = self._job.stragglers.get(self._round_current, [])
+        if stragglers:
+            logger.warning(f'Round {self._round_current} closed at deadline of {self._round_timeout} seconds, '
+                           f'stragglers: {stragglers}')
+            self._node_selection_strategy.declare_stragglers(self._round_current, stragglers)
+
+        if isinstance(self._round_quorum, float):
+            quorum = math.ceil(self._round_quorum * len(sampled_nodes))
+        elif self._round_quorum is None:
+            quorum = 1
+        else:
+            quorum = self._round_quorum
+
+        n_replies = len(self._job.training_replies[self._round_current])
+        if n_replies < quorum:
+            msg = ErrorNumbers.FB416.value + f', round {self._round_current} received {n_replies} node replies ' \
+                f'out of {len(sampled_nodes)} sampled nodes, while quorum is {quorum}'
+            logger.critical(msg)
+            raise FedbiomedExperimentError(msg)
+
     @exp_exceptions
     def run(self, rounds: Union[int, None] = None, increase: bool = False) -> int:
         """Run one or more rounds of an experiment, continuing from the point the
@@ -1739,6 +2206,29 @@ class Experiment(object):
         # At this point `rounds` is an int > 0 (not None)
 
         # run the rounds
+        self._run_until = self._round_current + rounds
+        try:
+            self._run_rounds(rounds)
+        finally:
+            self._run_until = None
+            self._wait_background_tasks()
+
+        if self._job is not None and isinstance(self._round_limit, int) and \
+                self._round_current >= self._round_limit:
+            # experiment is over: nodes can release the sessions kept for the job
+            self._job.send_end_notice()
+
+        return rounds
+
+    def _run_rounds(self, rounds: int):
+        """Runs rounds of the experiment, see [`run`][fedbiomed.researcher.experiment.Experiment.run].
+
+        Args:
+            rounds: number of rounds to run
+
+        Raises:
+            FedbiomedExperimentError: a round could not be run
+        """
         for _ in range(rounds):
             if isinstance(self._round_limit, int) and self._round_current == (self._round_limit - 1) \
                     and self._training_args['test_on_global_updates'] is True:
@@ -1759,8 +2249,6 @@ class Experiment(object):
                 logger.critical(msg)
                 raise FedbiomedExperimentError(msg)
 
-        return rounds
-
     # Training plan checking functions
 
     @exp_exceptions
@@ -1844,6 +2332,11 @@ class Experiment(object):
         be saved:
           - round_current
           - round_limit
+          - round_timeout
+          - round_quorum
+          - late_replies_policy
+          - retain_rounds
+          - pipelined_rounds
           - tags
           - experimentation_folder
           - aggregator
@@ -1913,6 +2406,11 @@ class Experiment(object):
             # formatted in Experiment with current version
             'round_current': self._round_current,
             'round_limit': self._round_limit,
+            'round_timeout': self._round_timeout,
+            'round_quorum': self._round_quorum,
+            'late_replies_policy': self._late_replies_policy,
+            'retain_rounds': self._retain_rounds,
+            'pipelined_rounds': self._pipelined_rounds,
             'experimentation_folder': self._experimentation_folder,
             'aggregator': self._aggregator.save_state(self._job.training_plan, breakpoint_path, global_model=self._global_model),  # aggregator state
             'node_selection_strategy': self._node_selection_strategy.save_state(),
@@ -2021,6 +2519,11 @@ class Experiment(object):
                         # aggregator=bkpt_aggregator,
                          node_selection_strategy=bkpt_sampling_strategy,
                          round_limit=saved_state.get("round_limit"),
+                         round_timeout=saved_state.get("round_timeout"),
+                         round_quorum=saved_state.get("round_quorum"),
+                         late_replies_policy=saved_state.get("late_replies_policy", 'discard'),
+                         retain_rounds=saved_state.get("retain_rounds"),
+                         pipelined_rounds=saved_state.get("pipelined_rounds", False),
                          training_plan_class=saved_state.get("training_plan_class"),
                          training_plan_path=saved_state.get("training_plan_path"),
                          model_args=saved_state.get("model_args"),
@@ -2045,7 +2548,8 @@ class Experiment(object):
         else:
             loaded_exp._aggregated_params = loaded_exp._load_aggregated_params(
                 saved_state.get('aggregated_params'),
-                training_plan.load
+                loaded_exp._job.load_breakpoint_params,
+                loaded_exp.retain_rounds()
             )
 
         # retrieve and change federator
@@ -2055,7 +2559,7 @@ class Experiment(object):
         loaded_exp.set_aggregator(bkpt_aggregator)
 
         # changing `Job` attributes
-        loaded_exp._job.load_state(saved_state.get('job'))
+        loaded_exp._job.load_state(saved_state.get('job'), loaded_exp.retain_rounds())
 
 
         # nota: exceptions should be handled in Job, when refactoring it
@@ -2127,8 +2631,8 @@ class Experiment(object):
 
     @staticmethod
     @exp_exceptions
-    def _load_aggregated_params(aggregated_params: Dict[str, dict], func_load_params: Callable
-                                ) -> Dict[int, dict]:
+    def _load_aggregated_params(aggregated_params: Dict[str, dict], func_load_params: Callable,
+                                retain_rounds: Optional[int] = None) -> Dict[int, dict]:
         """Reconstruct experiment's aggregated params.
 
         Aggregated parameters structure from a breakpoint. It is identical to a classical `_aggregated_params`.
@@ -2136,6 +2640,8 @@ class Experiment(object):
         Args:
             aggregated_params: JSON formatted aggregated_params extract from a breakpoint
             func_load_params: function for loading parameters from file to aggregated params data structure
+            retain_rounds: number of last rounds for which aggregated params are loaded in memory, params of
+                older rounds are replaced by lazy handles. Defaults to None (load all rounds).
 
         Returns:
             Reconstructed aggregated params from breakpoint
@@ -2168,8 +2674,13 @@ class Experiment(object):
             logger.critical(msg)
             raise FedbiomedExperimentError(msg)
 
-        for aggreg in aggregated_params.values():
-            aggreg['params'] = func_load_params(aggreg['params_path'], to_params=True)
+        last_round = max(aggregated_params.keys(), default=0)
+        for round_, aggreg in aggregated_params.items():
+            if retain_rounds is not None and round_ <= last_round - retain_rounds:
+                aggregated_params[round_] = LazyParams(
+                    aggreg, functools.partial(func_load_params, to_params=True))
+            else:
+                aggreg['params'] = func_load_params(aggreg['params_path'], to_params=True)
             # errors should be handled in training plan loader function
 
         return aggregated_params
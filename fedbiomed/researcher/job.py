@@ -18,15 +18,18 @@ from typing import Any, Optional, Tuple, Union, Callable, List, Dict, Type
 
 import validators
 
-from fedbiomed.common.constants import TrainingPlanApprovalStatus
-from fedbiomed.common.exceptions import FedbiomedRepositoryError, FedbiomedDataQualityCheckError
+from fedbiomed.common.constants import ErrorNumbers, TrainingPlanApprovalStatus
+from fedbiomed.common.exceptions import FedbiomedRepositoryError, FedbiomedDataQualityCheckError, \
+    FedbiomedTrainingPlanError
 from fedbiomed.common.logger import logger
 from fedbiomed.common.repository import Repository
 from fedbiomed.common.training_args import TrainingArgs
+from fedbiomed.common.training_plans import SKLearnTrainingPlan
 
 from fedbiomed.researcher.datasets import FederatedDataSet
 from fedbiomed.researcher.environ import environ
 from fedbiomed.researcher.filetools import create_unique_link, create_unique_file_link
+from fedbiomed.researcher.lazy_params import LazyParams
 from fedbiomed.researcher.requests import Requests
 from fedbiomed.researcher.responses import Responses
 
@@ -74,6 +77,13 @@ class Job:
         self._model_args = model_args
         self._nodes = nodes
         self._training_replies = {}  # will contain all node replies for every round
+        self._stragglers = {}  # will contain nodes that missed the round deadline, for every round
+        self._late_requests = {}  # node_id -> rounds (and send time) of requests still unanswered after deadline
+        self._late_replies = []  # late replies kept for being used in the next training round
+        self._dispatched_round = None  # (round, send time of requests per node, do_training) of last requests sent
+        self._last_reply_time = {}  # node_id -> time of reception of the last training reply of the node
+        self._nodes_idle_time = {}  # round -> node_id -> time between former reply and request for this round
+        self._samples_per_second = {}  # node_id -> precision ('fp32' or mixed precision mode) -> last throughput
         self._model_file = None  # path to local file containing model code
         self._model_params_file = None  # path to local file containing current version of aggregated params
         self._training_plan_class = training_plan_class
@@ -230,6 +240,14 @@ class Job:
     def training_replies(self):
         return self._training_replies
 
+    @property
+    def stragglers(self):
+        return self._stragglers
+
+    @property
+    def nodes_idle_time(self):
+        return self._nodes_idle_time
+
     @property
     def training_args(self):
         return self._training_args.dict()
@@ -348,7 +366,9 @@ class Job:
                                    round: int,
                                    aggregator_args_thr_msg: Dict[str, Dict[str, Any]],
                                    aggregator_args_thr_files: Dict[str, Dict[str, Any]],
-                                   do_training: bool = True):
+                                   do_training: bool = True,
+                                   timeout: Optional[float] = None,
+                                   late_replies_policy: str = 'discard'):
         """ Sends training request to nodes and waits for the responses
 
         Args:
@@ -361,6 +381,33 @@ class Job:
                 via the Repository's HTTP API, as opposed to the mqtt system. Format is the same as
                 aggregator_args_thr_msg .
             do_training: if False, skip training in this round (do only validation). Defaults to True.
+            timeout: maximum duration of the round in seconds. When the deadline is reached, the round is closed
+                with the replies received so far and the nodes that did not reply are recorded as stragglers
+                for this round (see `stragglers`). Defaults to None (wait for all nodes).
+            late_replies_policy: what to do with a training reply received after the deadline of its round.
+                Either `'discard'` (reply is ignored) or `'keep'` (reply is used in the next training round, unless
+                the node sends a fresh reply for this next round). Defaults to `'discard'`.
+        """
+        self.send_training_requests(round, aggregator_args_thr_msg, aggregator_args_thr_files, do_training)
+        return self.collect_training_replies(round, timeout, late_replies_policy)
+
+    def send_training_requests(self,
+                               round: int,
+                               aggregator_args_thr_msg: Dict[str, Dict[str, Any]],
+                               aggregator_args_thr_files: Dict[str, Dict[str, Any]],
+                               do_training: bool = True):
+        """Sends training request to nodes, without waiting for the responses.
+
+        Replies are then collected with
+        [`collect_training_replies`][fedbiomed.researcher.job.Job.collect_training_replies].
+
+        Args:
+            round: current number of round the algorithm is performing
+            aggregator_args_thr_msg: dictionary containing some metadata about the aggregation strategy, to be
+                sent through MQTT messaging system. First key should be the node_id.
+            aggregator_args_thr_files: dictionary containing metadata about aggregation strategy, to be transferred
+                via the Repository's HTTP API. Format is the same as aggregator_args_thr_msg .
+            do_training: if False, skip training in this round (do only validation). Defaults to True.
         """
         headers = {'researcher_id': self._researcher_id,
                    'job_id': self._id,
@@ -368,7 +415,8 @@ class Job:
                    'training': do_training,
                    'model_args': self._model_args,
                    'command': 'train',
-                   'aggregator_args': {}}
+                   'aggregator_args': {},
+                   'round': round}
 
         msg = {**headers, **self._repository_args}
         time_start = {}
@@ -396,18 +444,97 @@ class Job:
                             f'\n {5 * "-------------"}')
 
             time_start[cli] = time.perf_counter()
+            if do_training and cli in self._last_reply_time:
+                self._nodes_idle_time.setdefault(round, {})[cli] = time_start[cli] - self._last_reply_time.pop(cli)
             self._reqs.send_message(msg, cli)  # send request to node
 
+        self._dispatched_round = (round, time_start, do_training)
+
+    def send_prepare_notice(self, nodes: Optional[List[str]] = None):
+        """Notifies nodes that a training request of this job will follow, so they can prepare it.
+
+        Nodes import the training plan and load their data while the researcher aggregates. No reply is expected.
+
+        Args:
+            nodes: nodes to notify. Defaults to None (all nodes of the training data).
+        """
+        if nodes is None:
+            nodes = self._data.node_ids()
+
+        msg = {'researcher_id': self._researcher_id,
+               'job_id': self._id,
+               'training_args': self._training_args.dict(),
+               'model_args': self._model_args,
+               'training_plan_url': self._repository_args.get('training_plan_url'),
+               'training_plan_class': self._repository_args.get('training_plan_class'),
+               'command': 'prepare'}
+
+        for cli in nodes:
+            msg['training_data'] = {cli: [ds['dataset_id'] for ds in self._data.data()[cli]]}
+            self._reqs.send_message(msg, cli)
+        logger.debug(f'Prepare notice for next training round sent to nodes {nodes}')
+
+    def send_end_notice(self):
+        """Notifies nodes that this job will not send training requests anymore.
+
+        Nodes release the training plan and data loaders they keep warm for the job. No reply is expected.
+        """
+        msg = {'researcher_id': self._researcher_id,
+               'job_id': self._id,
+               'command': 'job-end'}
+
+        for cli in self._data.node_ids():
+            self._reqs.send_message(msg, cli)
+        logger.debug(f'Job end notice sent to nodes {self._data.node_ids()}')
+
+    def collect_training_replies(self,
+                                 round: int,
+                                 timeout: Optional[float] = None,
+                                 late_replies_policy: str = 'discard'):
+        """Waits for the responses to the training requests sent for a round.
+
+        Args:
+            round: number of the round the requests were sent for
+                (see [`send_training_requests`][fedbiomed.researcher.job.Job.send_training_requests])
+            timeout: maximum duration of the round in seconds, counted from the sending of the requests.
+                See [`start_nodes_training_round`][fedbiomed.researcher.job.Job.start_nodes_training_round].
+                Defaults to None (wait for all nodes).
+            late_replies_policy: what to do with a training reply received after the deadline of its round.
+                Defaults to `'discard'`.
+
+        Returns:
+            The list of nodes which answered
+        """
+        _, time_start, do_training = self._dispatched_round
+        self._dispatched_round = None
+        deadline = None if timeout is None else max(time_start.values(), default=time.perf_counter()) + timeout
+
         # Recollect models trained
         self._training_replies[round] = Responses([])
         while self.waiting_for_nodes(self._training_replies[round]):
             # collect nodes responses from researcher request 'train'
-            # (wait for all nodes with a ` while true` loop)
+            # (wait for all nodes with a ` while true` loop, or until deadline is reached)
             # models_done = self._reqs.get_responses(look_for_commands=['train'])
-            models_done = self._reqs.get_responses(look_for_commands=['train', 'error'], only_successful=False)
+            if deadline is None:
+                models_done = self._reqs.get_responses(look_for_commands=['train', 'error'], only_successful=False)
+            else:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                models_done = self._reqs.get_responses(look_for_commands=['train', 'error'],
+                                                       timeout=min(environ['TIMEOUT'], remaining),
+                                                       only_successful=False,
+                                                       while_responses=False)
             for m in models_done.data():  # retrieve all models
                 # (there should have as many models done as nodes)
 
+                # a node answers its requests in order: first answers are for requests of former rounds
+                # that did not complete before their deadline
+                if self._late_requests.get(m['node_id']) and \
+                        ('errnum' in m or (m['researcher_id'] == environ['RESEARCHER_ID'] and m['job_id'] == self._id)):
+                    self._handle_late_reply(m, late_replies_policy)
+                    continue
+
                 # manage error messages during training
                 if 'errnum' in m:  # TODO: need a stronger filter
                     if m['extra_msg']:
@@ -431,44 +558,185 @@ class Job:
                     continue
 
                 rtime_total = time.perf_counter() - time_start[m['node_id']]
-
-                # TODO : handle error depending on status
                 if do_training:
-                    logger.info(f"Downloading model params after training on {m['node_id']} - from {m['params_url']}")
-                    try:
-                        _, params_path = self.repo.download_file(m['params_url'],
-                                                                 'node_params_' + str(uuid.uuid4()) + '.pt')
-                    except FedbiomedRepositoryError as err:
-                        logger.error(f"Cannot download model parameter from node {m['node_id']}, probably because Node"
-                                     f" stops working (details: {err})")
-                        return
-                    loaded_model = self._training_plan.load(params_path, to_params=True)
-                    params = loaded_model['model_params']
-                    optimizer_args = loaded_model.get('optimizer_args')
-                else:
-                    params_path = None
-                    params = None
-                    optimizer_args = None
-
-                # TODO: could choose completely different name/structure for
-                timing = m['timing']
-                timing['rtime_total'] = rtime_total
-
-                r = Responses({'success': m['success'],
-                               'msg': m['msg'],
-                               'dataset_id': m['dataset_id'],
-                               'node_id': m['node_id'],
-                               'params_path': params_path,
-                               'params': params,
-                               'optimizer_args': optimizer_args,
-                               'sample_size': m["sample_size"],
-                               'timing': timing})
+                    self._last_reply_time[m['node_id']] = time.perf_counter()
+
+                r = self._create_training_reply(m, rtime_total, do_training)
+                if r is None:
+                    return
 
                 self._training_replies[round].append(r)
 
+        if deadline is not None:
+            replied_nodes = [reply['node_id'] for reply in self._training_replies[round]]
+            stragglers = [node_id for node_id in self._nodes if node_id not in replied_nodes]
+            self._stragglers[round] = stragglers
+            for node_id in stragglers:
+                logger.warning(f"{ErrorNumbers.FB408.value}: node {node_id} did not reply before the deadline "
+                               f"of round {round}, it is considered as a straggler for this round")
+                self._late_requests.setdefault(node_id, []).append((round, time_start[node_id], do_training))
+
+            if do_training:
+                # use late replies kept from former rounds for nodes that did not send a fresh reply
+                for late_reply in self._late_replies:
+                    if late_reply['node_id'] not in replied_nodes:
+                        logger.info(f"Using late reply of node {late_reply['node_id']} in round {round}")
+                        self._training_replies[round].append(late_reply)
+                        replied_nodes.append(late_reply['node_id'])
+                        if late_reply['node_id'] not in self._nodes:
+                            self._nodes.append(late_reply['node_id'])
+                self._late_replies = []
+
+            self._nodes = [node_id for node_id in self._nodes if node_id in replied_nodes]
+
         # return the list of nodes which answered because nodes in error have been removed
         return self._nodes
 
+    def _handle_late_reply(self, message: Dict[str, Any], late_replies_policy: str):
+        """Manages a reply received from a node after the deadline of the round it was sent for.
+
+        Args:
+            message: reply message received from the node
+            late_replies_policy: `'keep'` for keeping the reply to be used in the next training round,
+                `'discard'` for ignoring it.
+        """
+        node_id = message['node_id']
+        late_round, time_start, do_training = self._late_requests[node_id].pop(0)
+        if not self._late_requests[node_id]:
+            del self._late_requests[node_id]
+
+        if 'errnum' in message or not message['success'] or not do_training:
+            logger.debug(f"{ErrorNumbers.FB405.value}: ignoring late reply of node {node_id} for round {late_round}")
+            return
+
+        if late_replies_policy == 'keep':
+            logger.info(f"{ErrorNumbers.FB405.value}: keeping late reply of node {node_id} for round "
+                        f"{late_round}, it will be used in next training round")
+            r = self._create_training_reply(message, time.perf_counter() - time_start, do_training)
+            if r is not None:
+                self._late_replies = [reply for reply in self._late_replies if reply['node_id'] != node_id]
+                self._late_replies.extend(r.data())
+        else:
+            logger.info(f"{ErrorNumbers.FB405.value}: discarding late reply of node {node_id} for round "
+                        f"{late_round}")
+
+    def _create_training_reply(self,
+                               message: Dict[str, Any],
+                               rtime_total: float,
+                               do_training: bool) -> Union[Responses, None]:
+        """Builds the training reply of a node, downloading the model parameters it sent.
+
+        Args:
+            message: reply message received from the node
+            rtime_total: time elapsed between sending the request to the node and receiving the reply
+            do_training: whether the request was a training request (True) or only a validation request (False)
+
+        Returns:
+            Training reply of the node, or None if the parameters could not be downloaded or loaded
+        """
+        # TODO : handle error depending on status
+        if do_training:
+            logger.info(f"Downloading model params after training on {message['node_id']} - "
+                        f"from {message['params_url']}")
+            try:
+                _, params_path = self.repo.download_file(message['params_url'],
+                                                         'node_params_' + str(uuid.uuid4()) + '.pt')
+            except FedbiomedRepositoryError as err:
+                logger.error(f"Cannot download model parameter from node {message['node_id']}, probably because "
+                             f"Node stops working (details: {err})")
+                return None
+            try:
+                loaded_model = self._training_plan.load(params_path, to_params=True)
+            except FedbiomedTrainingPlanError as err:
+                logger.error(f"Cannot load model parameters sent by node {message['node_id']}: discarding its "
+                             f"reply (details: {err})")
+                return None
+            params = loaded_model['model_params']
+            optimizer_args = loaded_model.get('optimizer_args')
+        else:
+            params_path = None
+            params = None
+            optimizer_args = None
+
+        # TODO: could choose completely different name/structure for
+        timing = message['timing']
+        timing['rtime_total'] = rtime_total
+        self._log_training_timing(message['node_id'], timing)
+
+        return Responses({'success': message['success'],
+                          'msg': message['msg'],
+                          'dataset_id': message['dataset_id'],
+                          'node_id': message['node_id'],
+                          'params_path': params_path,
+                          'params': params,
+                          'optimizer_args': optimizer_args,
+                          'sample_size': message["sample_size"],
+                          'timing': timing,
+                          'profile_url': message.get('profile_url'),
+                          'num_updates': message.get('num_updates')})
+
+    def download_profiles(self, round: int) -> Dict[str, str]:
+        """Downloads the profiling traces sent by the nodes for a round.
+
+        Traces are sent by the nodes when the `profile_steps` training argument is set: they are Chrome traces
+        (`.json`) for torch training plans and `pstats` files (`.pstats`) for scikit-learn training plans.
+
+        Args:
+            round: round of training
+
+        Returns:
+            Path of the downloaded trace file of each node that sent one, by node id
+        """
+        profiles = {}
+        for reply in self._training_replies.get(round, []):
+            profile_url = reply.get('profile_url')
+            if not profile_url:
+                continue
+
+            extension = os.path.splitext(profile_url.split('?')[0])[1]
+            try:
+                _, profile_path = self.repo.download_file(profile_url,
+                                                          f"node_profile_{reply['node_id']}_round_{round}{extension}")
+            except FedbiomedRepositoryError as err:
+                logger.error(f"Cannot download profiling trace of node {reply['node_id']} for round {round}: {err}")
+                continue
+            profiles[reply['node_id']] = profile_path
+
+        return profiles
+
+    def _log_training_timing(self, node_id: str, timing: Dict[str, Any]):
+        """Displays the time spent by a node in each phase of its training loop, if reported.
+
+        The last throughput of the node is kept for each precision. Once the node has reported both a mixed
+        precision and a full precision (fp32) throughput, their ratio is added to `timing` as
+        `mixed_precision_speedup` (mixed precision throughput divided by fp32 throughput) and displayed.
+
+        Args:
+            node_id: id of the node
+            timing: timing statistics of the training reply of the node
+        """
+        phases = {key[len('rtime_'):]: value for key, value in timing.items()
+                  if key.startswith('rtime_') and key not in ('rtime_training', 'rtime_total')}
+        total = sum(phases.values())
+        if not phases or total <= 0:
+            return
+
+        breakdown = ', '.join(f'{phase} {value:.3f}s ({100. * value / total:.0f}%)' for phase, value in phases.items())
+        precision = f" ({timing['mixed_precision']} mixed precision)" if timing.get('mixed_precision') else ''
+
+        speedup = ''
+        samples_per_second = self._samples_per_second.setdefault(node_id, {})
+        if timing.get('samples_per_second', 0.) > 0:
+            samples_per_second[timing.get('mixed_precision') or 'fp32'] = timing['samples_per_second']
+            mixed_precision = timing.get('mixed_precision') or \
+                next((mode for mode in samples_per_second if mode != 'fp32'), None)
+            if mixed_precision is not None and 'fp32' in samples_per_second:
+                timing['mixed_precision_speedup'] = samples_per_second[mixed_precision] / samples_per_second['fp32']
+                speedup = f" | {mixed_precision} vs fp32 throughput: {timing['mixed_precision_speedup']:.2f}x"
+
+        logger.info(f"Training time of node {node_id}: {breakdown} | "
+                    f"{timing.get('samples_per_second', 0.):.1f} samples/s{precision}{speedup}")
+
     def update_parameters(self,
                           params: dict = None,
                           filename: str = None,
@@ -546,17 +814,20 @@ class Job:
 
         return state
 
-    def load_state(self, saved_state: dict = None):
+    def load_state(self, saved_state: dict = None, retain_rounds: Optional[int] = None):
         """Load breakpoints state for a Job from a saved state
 
         Args:
             saved_state: breakpoint content
+            retain_rounds: number of last rounds for which node parameters are loaded in memory, parameters
+                of older rounds are reloaded from file on access. Defaults to None (load all rounds).
         """
         self._id = saved_state.get('job_id')
         self.update_parameters(filename=saved_state.get('model_params_path'))
         self._training_replies = self._load_training_replies(
             saved_state.get('training_replies'),
-            self._training_plan.load
+            self.load_breakpoint_params,
+            retain_rounds
         )
         self._researcher_id = saved_state.get('researcher_id')
 
@@ -576,39 +847,98 @@ class Job:
         converted_training_replies = []
 
         for round_ in training_replies.keys():
-            training_reply = copy.deepcopy(training_replies[round_].data())
-            # we want to strip some fields for the breakpoint
-            for node in training_reply:
-                del node['params']
+            # we want to strip some fields for the breakpoint (before copying, params may be big or not in memory)
+            training_reply = copy.deepcopy([{key: value for key, value in node.items() if key != 'params'}
+                                            for node in training_replies[round_].data()])
             converted_training_replies.append(training_reply)
 
         return converted_training_replies
 
     @staticmethod
     def _load_training_replies(bkpt_training_replies: List[List[dict]],
-                               func_load_params: Callable) -> Dict[int, Responses]:
+                               func_load_params: Callable,
+                               retain_rounds: Optional[int] = None) -> Dict[int, Responses]:
         """Reads training replies from a formatted breakpoint file, and build a job training replies data structure .
 
         Args:
             bkpt_training_replies: Extract from training replies saved in breakpoint
             func_load_params: Function for loading parameters from file to training replies data structure
+            retain_rounds: number of last rounds for which parameters are loaded in memory, parameters of
+                older rounds are replaced by lazy handles. Defaults to None (load all rounds).
 
         Returns:
             Training replies of already executed rounds of the job
         """
 
+        def load_node_params(params_path: str) -> dict:
+            return func_load_params(params_path, to_params=True)['model_params']
+
+        n_rounds = len(bkpt_training_replies)
         training_replies = {}
-        for round_ in range(len(bkpt_training_replies)):
+        for round_ in range(n_rounds):
             loaded_training_reply = Responses(bkpt_training_replies[round_])
+            in_memory = retain_rounds is None or round_ >= n_rounds - retain_rounds
             # reload parameters from file params_path
-            for node in loaded_training_reply:
-                node['params'] = func_load_params(
-                    node['params_path'], to_params=True)['model_params']
+            for index, node in enumerate(loaded_training_reply):
+                if in_memory:
+                    node['params'] = load_node_params(node['params_path'])
+                else:
+                    loaded_training_reply.data()[index] = LazyParams(node, load_node_params)
 
             training_replies[round_] = loaded_training_reply
 
         return training_replies
 
+    def release_training_replies(self, retain_rounds: int):
+        """Releases from memory the node parameters of the rounds older than the last `retain_rounds` rounds.
+
+        Node parameters of released rounds stay on disk, their training replies keep the same structure but
+        `params` are reloaded from `params_path` each time they are accessed
+        (see [`LazyParams`][fedbiomed.researcher.lazy_params.LazyParams]).
+
+        Args:
+            retain_rounds: number of last rounds for which node parameters are kept in memory
+        """
+        if not self._training_replies:
+            return
+        last_round = max(self._training_replies.keys())
+
+        for round_, replies in self._training_replies.items():
+            if round_ > last_round - retain_rounds:
+                continue
+            for index, reply in enumerate(replies.data()):
+                if isinstance(reply, LazyParams) or reply.get('params') is None or not reply.get('params_path'):
+                    continue
+                replies.data()[index] = LazyParams(reply, self._load_node_params)
+
+    def _load_node_params(self, params_path: str) -> dict:
+        """Loads node parameters saved in a file, as they are stored in a training reply.
+
+        Args:
+            params_path: path to the file containing the parameters sent by a node
+
+        Returns:
+            Model parameters of the node
+        """
+        return self._training_plan.load(params_path, to_params=True)['model_params']
+
+    def load_breakpoint_params(self, params_path: str, to_params: bool = True) -> Any:
+        """Loads parameters saved by the researcher, eg. in a breakpoint.
+
+        Unlike parameters received from nodes, these files are trusted: the joblib dumps of
+        scikit-learn models written by earlier versions of Fed-BioMed can still be loaded.
+
+        Args:
+            params_path: path to the parameters file
+            to_params: whether to return the parameters wrapped as a dict rather than the model
+
+        Returns:
+            Loaded parameters, or model if `to_params` is False
+        """
+        if isinstance(self._training_plan, SKLearnTrainingPlan):
+            return self._training_plan.load(params_path, to_params=to_params, allow_legacy_pickle=True)
+        return self._training_plan.load(params_path, to_params=to_params)
+
     def check_data_quality(self):
         """Does quality check by comparing datasets that have been found in different nodes. """
 
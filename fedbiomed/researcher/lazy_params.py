@@ -0,0 +1,70 @@
+# This file is originally part of Fed-BioMed
+# SPDX-License-Identifier: Apache-2.0
+
+"""Lazy handles for model parameters kept on disk only, used by the researcher retention policy."""
+
+import copy
+from typing import Any, Callable, Dict
+
+
+class LazyParams(dict):
+    """Entry of the training replies or aggregated params whose `params` are not kept in memory.
+
+    A `LazyParams` behaves as the dictionary entry it replaces (eg `{'params': ..., 'params_path': ..., ...}`),
+    except that the `params` field is dropped from memory and reloaded from the `params_path` file each time
+    it is accessed. Reloaded parameters are not cached, so that memory used by old rounds is released as soon
+    as the caller drops them.
+
+    Attributes:
+        params_path: path to the file the parameters are reloaded from
+    """
+
+    def __init__(self, entry: Dict[str, Any], func_load_params: Callable):
+        """Constructor of the class.
+
+        Args:
+            entry: training reply of a node or aggregated params of a round, containing a `params_path` field
+            func_load_params: function for loading parameters from `params_path`, called with the path
+                as single argument
+        """
+        super().__init__((key, value) for key, value in entry.items() if key != 'params')
+        self._func_load_params = func_load_params
+
+    @property
+    def params_path(self) -> str:
+        return dict.get(self, 'params_path')
+
+    def __missing__(self, key: str) -> Any:
+        """Reloads `params` from file, called by `__getitem__` for keys absent from the entry.
+
+        Args:
+            key: key of the entry
+
+        Returns:
+            Parameters reloaded from `params_path` when `key` is `params`
+
+        Raises:
+            KeyError: `key` is not `params` and is not in the entry
+        """
+        if key == 'params':
+            return self._func_load_params(self.params_path)
+        raise KeyError(key)
+
+    def __contains__(self, key: Any) -> bool:
+        return key == 'params' or super().__contains__(key)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if key == 'params':
+            return self['params']
+        return super().get(key, default)
+
+    def __copy__(self) -> 'LazyParams':
+        return LazyParams(dict(self), self._func_load_params)
+
+    def __deepcopy__(self, memo: dict) -> 'LazyParams':
+        # do not copy the loader function (it may be bound to a training plan)
+        return LazyParams(copy.deepcopy(dict(self), memo), self._func_load_params)
+
+    def __reduce__(self):
+        # pickle as a plain dict without parameters: the loader function cannot be pickled
+        return dict, (dict(self),)
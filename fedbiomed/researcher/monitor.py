@@ -278,6 +278,11 @@ class Monitor:
             logger.error("tensorboard should be a boolean")
             self._tensorboard = False
 
+    def flush_writers(self):
+        """ Flushes pending events of the `SummaryWriter` of each node to the tensorboard log files """
+        for node in list(self._event_writers):
+            self._event_writers[node].flush()
+
     def close_writer(self):
         """ Closes `SummaryWriter` for each node """
         # Close each open SummaryWriter
@@ -6,7 +6,7 @@ Top class for strategy implementation
 """
 
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from fedbiomed.common.constants  import ErrorNumbers
 from fedbiomed.common.exceptions import FedbiomedStrategyError
@@ -32,6 +32,7 @@ class Strategy:
         self._fds = data
         self._sampling_node_history = {}
         self._success_node_history = {}
+        self._straggler_node_history = {}
         self._parameters = None
 
     def sample_nodes(self, round_i: int):
@@ -68,6 +69,22 @@ class Strategy:
         logger.critical(msg)
         raise FedbiomedStrategyError(msg)
 
+    def declare_stragglers(self, round_i: int, node_ids: List[str]):
+        """
+        Declares the nodes that did not reply before the deadline of a round.
+
+        Stragglers are removed from the nodes sampled for the round, so that `refine` does not expect a reply
+        from them.
+
+        Args:
+            round_i: Current round of experiment
+            node_ids: list of the ids of the nodes that missed the deadline of round `round_i`
+        """
+        self._straggler_node_history[round_i] = list(node_ids)
+        if self._sampling_node_history.get(round_i) is not None:
+            self._sampling_node_history[round_i] = [node_id for node_id in self._sampling_node_history[round_i]
+                                                    if node_id not in node_ids]
+
     def save_state(self) -> Dict[str, Any]:
         """
         Method for saving strategy state for saving breakpoints
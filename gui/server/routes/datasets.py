@@ -115,6 +115,8 @@ def add_dataset():
         path (array): Data path where dataset is saved
         desc (string): Description for dataset
         type (string): Type of the dataset, CSV or Images
+        target_column (string|int): Optional, for CSV datasets, name or position of the column of the labels,
+            whose classes are stored with the dataset
 
     Response {application/json}:
         400:
@@ -136,6 +138,10 @@ def add_dataset():
     # Create unique id for the dataset
     dataset_id = 'dataset_' + str(uuid.uuid4())
 
+    dataset_parameters = None
+    if req['type'] == 'csv' and req.get('target_column') not in (None, ''):
+        dataset_parameters = {'target_column': req['target_column']}
+
     try:
         dataset_manager.add_database(
             req['name'],
@@ -143,7 +149,8 @@ def add_dataset():
             req['tags'],
             req['desc'],
             data_path_save,
-            dataset_id)
+            dataset_id,
+            dataset_parameters=dataset_parameters)
     except Exception as e:
         return error(str(e)), 400
 
@@ -232,7 +232,8 @@ class AddDataSetRequest(Validator):
                      'errorMessages': {
                          'oneOf': ' "%s" dataset type is not supported'
                      }},
-            'desc': datasetDesc
+            'desc': datasetDesc,
+            'target_column': {'type': ['string', 'integer']}
         },
         'required': ['name', 'path', 'tags', 'desc', 'type'],
     }, message=None)
@@ -0,0 +1,118 @@
+"""
+Benchmark of the per-sample gradient backends of the DPController: throughput and peak memory.
+
+Trains a model with local DP for each backend (`hooks`, `functorch`, `ew`), and without DP as a reference, on
+random inputs. Models are the CNN of the MNIST opacus tutorial and a small MLP.
+Each measure runs in a forked process, so that peak memory (max RSS) of a measure is not polluted by others.
+
+Usage (from the `tests` directory):
+
+```
+python benchmarks/bench_dp_backends.py --models mnist-cnn mlp --batch-size 48 --batches 30 --threads 4
+```
+"""
+
+import argparse
+import multiprocessing
+import queue as queue_module
+import resource
+import time
+
+import torch
+from tabulate import tabulate
+from torch.utils.data import DataLoader, TensorDataset
+
+from fedbiomed.common.privacy import DPController
+
+
+BACKENDS = ['none', 'hooks', 'functorch', 'ew']
+
+
+def mnist_cnn() -> torch.nn.Module:
+    """Model of the `pytorch-opacus-MNIST` tutorial"""
+    return torch.nn.Sequential(torch.nn.Conv2d(1, 32, 3, 1), torch.nn.ReLU(), torch.nn.Conv2d(32, 64, 3, 1),
+                               torch.nn.ReLU(), torch.nn.MaxPool2d(2), torch.nn.Dropout(0.25), torch.nn.Flatten(),
+                               torch.nn.Linear(9216, 128), torch.nn.ReLU(), torch.nn.Dropout(0.5),
+                               torch.nn.Linear(128, 10), torch.nn.LogSoftmax(dim=1))
+
+
+def mlp() -> torch.nn.Module:
+    return torch.nn.Sequential(torch.nn.Linear(20, 64), torch.nn.ReLU(), torch.nn.Linear(64, 64), torch.nn.ReLU(),
+                               torch.nn.Linear(64, 2), torch.nn.LogSoftmax(dim=1))
+
+
+MODELS = {
+    'mnist-cnn': (mnist_cnn, (1, 28, 28), 10),
+    'mlp': (mlp, (20,), 2),
+}
+
+
+def _measure(model_name: str, backend: str, batch_size: int, batches: int, threads: int,
+             queue: multiprocessing.Queue):
+    torch.manual_seed(0)
+    torch.set_num_threads(threads)
+    build, input_shape, n_classes = MODELS[model_name]
+    # one warm-up batch, then the measured batches
+    n_samples = batch_size * (batches + 1)
+    dataset = TensorDataset(torch.randn(n_samples, *input_shape), torch.randint(0, n_classes, (n_samples,)))
+    model = build()
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
+    if backend != 'none':
+        dp_controller = DPController({'type': 'local', 'sigma': 1., 'clip': 1., 'backend': backend})
+        model = dp_controller.validate_and_fix_model(model)
+        optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+        model, optimizer, loader = dp_controller.before_training(model, optimizer, loader)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    samples = 0
+    start = None
+    for data, target in loader:
+        if len(data) == 0:
+            # poisson sampling of the DP data loader can draw empty batches
+            continue
+        optimizer.zero_grad()
+        torch.nn.functional.nll_loss(model(data), target).backward()
+        optimizer.step()
+        if start is None:
+            start = time.perf_counter()
+        else:
+            samples += len(data)
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((samples / elapsed, rss_after / 1024, (rss_after - rss_before) / 1024))
+
+
+def measure(model_name: str, backend: str, batch_size: int, batches: int, threads: int):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measure,
+                                      args=(model_name, backend, batch_size, batches, threads, queue))
+    process.start()
+    process.join()
+    try:
+        throughput, memory, extra_memory = queue.get(timeout=1)
+    except queue_module.Empty:
+        return 'failed', 'failed', 'failed'
+    return f'{throughput:.0f}', f'{memory:.0f}', f'{extra_memory:.0f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--models', nargs='+', default=list(MODELS), choices=list(MODELS))
+    parser.add_argument('--backends', nargs='+', default=BACKENDS, choices=BACKENDS)
+    parser.add_argument('--batch-size', type=int, default=48)
+    parser.add_argument('--batches', type=int, default=30)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    rows = []
+    for model_name in args.models:
+        for backend in args.backends:
+            rows.append([model_name, backend, *measure(model_name, backend, args.batch_size, args.batches,
+                                                       args.threads)])
+    print(tabulate(rows, headers=['model', 'backend', 'samples/s', 'peak memory (MiB)',
+                                  'training peak memory increase (MiB)']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark of the FedProx proximal term of torch training plans: overhead per batch vs plain training.
+
+Compares the proximal gradient added with foreach operations (`TorchTrainingPlan._train_over_batch`) with the
+previous formulation, that added the proximal term to the loss and back-propagated it through autograd, on a deep
+MLP where the term is expensive relative to the model computations.
+
+Usage (from the `tests` directory):
+
+```
+python benchmarks/bench_fedprox.py --layers 300 --width 64 --batch-size 32 --batches 50 --runs 3 --threads 4
+```
+"""
+
+import argparse
+import copy
+import time
+
+import torch
+from tabulate import tabulate
+
+from fedbiomed.common.training_plans import TorchTrainingPlan
+
+
+class MLPTrainingPlan(TorchTrainingPlan):
+    """Training plan of the benchmark: the model and optimizer are set by `measure`"""
+
+    def init_model(self):
+        pass
+
+    def training_data(self):
+        pass
+
+    def training_step(self, data, target):
+        return torch.nn.functional.mse_loss(self._model(data), target)
+
+
+class AutogradFedProxTrainingPlan(MLPTrainingPlan):
+    """Reference: proximal term added to the loss and back-propagated, as in previous versions"""
+
+    def _train_over_batch(self, data, target):
+        self._optimizer.zero_grad()
+        loss = self.training_step(data, target)
+        corrected_loss = torch.clone(loss)
+        if self._fedprox_mu is not None:
+            norm = 0
+            for param, init_param in zip(self._model.parameters(), self._init_params):
+                norm += ((param - init_param) ** 2).sum()
+            corrected_loss += float(self._fedprox_mu) / 2 * norm
+        corrected_loss.backward()
+        self._optimizer.step()
+        return corrected_loss, loss
+
+
+def measure(training_plan_cls: type, mu: float, layers: int, width: int, batch_size: int, batches: int) -> float:
+    """Returns the training time per batch, in milliseconds"""
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(*[module for _ in range(layers)
+                                  for module in (torch.nn.Linear(width, width), torch.nn.ReLU())])
+    training_plan = training_plan_cls()
+    training_plan._model = model
+    training_plan._optimizer = torch.optim.SGD(model.parameters(), lr=1e-3)
+    training_plan._fedprox_mu = mu
+    if training_plan_cls is AutogradFedProxTrainingPlan:
+        training_plan._init_params = copy.deepcopy(list(model.parameters()))
+    else:
+        training_plan._init_params = [param.detach().clone() for param in model.parameters()]
+
+    data, target = torch.randn(batches + 1, batch_size, width), torch.randn(batches + 1, batch_size, width)
+    # first batch is not measured
+    training_plan._train_over_batch(data[0], target[0])
+    start = time.perf_counter()
+    for batch in range(1, batches + 1):
+        training_plan._train_over_batch(data[batch], target[batch])
+    return (time.perf_counter() - start) / batches * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--layers', type=int, default=300)
+    parser.add_argument('--width', type=int, default=64)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--batches', type=int, default=50)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--mu', type=float, default=.01)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+    torch.set_num_threads(args.threads)
+
+    modes = {
+        'no FedProx': (MLPTrainingPlan, None),
+        'FedProx, autograd (previous)': (AutogradFedProxTrainingPlan, args.mu),
+        'FedProx, foreach': (MLPTrainingPlan, args.mu),
+    }
+    rows = []
+    for run in range(args.runs):
+        times = {mode: measure(training_plan_cls, mu, args.layers, args.width, args.batch_size, args.batches)
+                 for mode, (training_plan_cls, mu) in modes.items()}
+        baseline = times['no FedProx']
+        rows.extend([run, mode, f'{time_:.1f}', f'{time_ - baseline:+.1f}'] for mode, time_ in times.items())
+    print(tabulate(rows, headers=['run', 'training', 'ms/batch', 'overhead (ms/batch)']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark of the NPDataLoader: throughput vs table size and batch size, for each loading mode.
+
+Compares the default loader (a copy of each shuffled batch) with float32 batches, epoch-level materialization
+of the permuted dataset, and both. Each epoch, the consumer sums each batch, so that the batches are read.
+
+Usage (from the `tests` directory):
+
+```
+python benchmarks/bench_np_dataloader.py --tables 100000x50 1000000x20 200000x500 --batch-sizes 32 1024
+```
+"""
+
+import argparse
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+from fedbiomed.common.data import NPDataLoader
+
+
+MODES = {
+    'default': {},
+    'float32': {'dtype': 'float32'},
+    'materialize': {'materialize': True},
+    'materialize+f32': {'materialize': True, 'dtype': 'float32'},
+}
+
+
+def measure(dataset: np.ndarray, target: np.ndarray, batch_size: int, epochs: int, **kwargs) -> float:
+    """Returns the throughput of a loader, in millions of samples per second"""
+    loader = NPDataLoader(dataset, target, batch_size=batch_size, shuffle=True, random_seed=0, **kwargs)
+    # first epoch allocates the buffers of the loader: not measured
+    for _ in loader:
+        pass
+    start = time.perf_counter()
+    for _ in range(epochs):
+        for inputs, _ in loader:
+            inputs.sum()
+    return len(dataset) * epochs / (time.perf_counter() - start) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--tables', nargs='+', default=['100000x50', '1000000x20', '200000x500'],
+                        help='table sizes, as <samples>x<features>')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[32, 1024])
+    parser.add_argument('--epochs', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for table in args.tables:
+        n_samples, n_features = (int(size) for size in table.split('x'))
+        dataset = rng.normal(size=(n_samples, n_features))
+        target = rng.integers(0, 2, size=(n_samples, 1))
+        for batch_size in args.batch_sizes:
+            rows.append([table, batch_size] + [f'{measure(dataset, target, batch_size, args.epochs, **kwargs):.2f}'
+                                               for kwargs in MODES.values()])
+    print(tabulate(rows, headers=['table', 'batch size'] + [f'{mode} (Msamples/s)' for mode in MODES]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Benchmark of pipelined rounds: idle time of each node per round, with and without `pipelined_rounds`.
+
+Runs the researcher side of an experiment (Experiment, Job, Requests, aggregation, breakpoints) with simulated
+nodes. Messages are delivered in process instead of through the MQTT broker, and files are exchanged through a
+local directory instead of the repository server. Each node is a thread that, for each training request, prepares
+the round (download, import of the training plan, data loaders: `--prepare-seconds`) unless it was prepared on
+the notice sent by a pipelined experiment, then trains (`--train-seconds`, one value per node) and sends back the
+parameters it received.
+
+Idle time of a node before a round is reported as measured by the researcher (`Experiment.nodes_idle_time`, from
+the processing of its former reply to the sending of its request) and by the node (from sending its former reply
+to the start of its training, including the preparation of the round when it was not prepared in advance).
+Each experiment runs in a forked process.
+
+Usage (from the `tests` directory):
+
+```
+python benchmarks/bench_pipelined_rounds.py --rounds 4 --train-seconds 2 4 --prepare-seconds 1 --features 2000
+```
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue as queue_module
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from unittest.mock import patch
+
+import numpy as np
+import torch
+from tabulate import tabulate
+
+from fedbiomed.common.logger import logger
+from fedbiomed.common.training_args import TrainingArgs
+from fedbiomed.common.training_plans import TorchTrainingPlan
+from fedbiomed.researcher.aggregators.fedavg import FedAverage
+from fedbiomed.researcher.datasets import FederatedDataSet
+from fedbiomed.researcher.environ import environ
+from fedbiomed.researcher.experiment import Experiment
+
+
+class LinearTrainingPlan(TorchTrainingPlan):
+    """Training plan of the benchmark: a linear model, its size sets the cost of aggregation and breakpoints"""
+
+    def init_model(self, model_args):
+        return torch.nn.Linear(model_args['features'], model_args['features'])
+
+    def training_data(self):
+        pass
+
+    def training_step(self, data, target):
+        pass
+
+
+class LocalRepository:
+    """Repository exchanging files through a local directory, instead of the repository server"""
+
+    URL = 'http://repository.local/'
+    directory = None
+
+    def __init__(self, uploads_url, tmp_dir, cache_dir):
+        self._tmp_dir = tmp_dir
+
+    @classmethod
+    def upload(cls, filename: str) -> str:
+        name = str(uuid.uuid4()) + '_' + os.path.basename(filename)
+        shutil.copy(filename, os.path.join(cls.directory, name))
+        return cls.URL + name
+
+    @classmethod
+    def path(cls, url: str) -> str:
+        return os.path.join(cls.directory, url[len(cls.URL):])
+
+    def upload_file(self, filename):
+        return {'file': self.upload(filename)}
+
+    def download_file(self, url, filename):
+        path = os.path.join(self._tmp_dir, filename)
+        shutil.copy(self.path(url), path)
+        return 200, path
+
+
+class SimulatedNode(threading.Thread):
+    """Node answering the training requests of the researcher, after simulated preparation and training"""
+
+    def __init__(self, node_id: str, prepare_seconds: float, train_seconds: float):
+        super().__init__(daemon=True)
+        self.node_id = node_id
+        self.idle_time = {}  # round -> time between sending the former reply and starting to train
+        self._prepare_seconds = prepare_seconds
+        self._train_seconds = train_seconds
+        self._prepared_job = None
+        self._last_reply_time = None
+        self._messages = queue_module.Queue()
+
+    def receive(self, msg: dict):
+        self._messages.put(msg)
+
+    def run(self):
+        while True:
+            msg = self._messages.get()
+            if msg['command'] == 'prepare':
+                time.sleep(self._prepare_seconds)
+                self._prepared_job = msg['job_id']
+            elif msg['command'] == 'train':
+                self._train(msg)
+
+    def _train(self, msg: dict):
+        if self._prepared_job != msg['job_id']:
+            time.sleep(self._prepare_seconds)
+        if self._last_reply_time is not None:
+            self.idle_time[msg['round']] = time.perf_counter() - self._last_reply_time
+        self._prepared_job = None
+        time.sleep(self._train_seconds)
+
+        # node params are the received params: the researcher aggregates and saves models of the same size
+        params = torch.load(LocalRepository.path(msg['params_url']))
+        filename = os.path.join(LocalRepository.directory, f'node_params_{uuid.uuid4()}.pt')
+        torch.save({'model_params': params, 'node_id': self.node_id}, filename)
+        params_url = LocalRepository.upload(filename)
+        reply = {'researcher_id': msg['researcher_id'], 'job_id': msg['job_id'], 'success': True,
+                 'node_id': self.node_id, 'dataset_id': f'dataset-{self.node_id}', 'params_url': params_url,
+                 'timing': {'rtime_training': self._train_seconds}, 'sample_size': 100, 'msg': '',
+                 'command': 'train'}
+        self._last_reply_time = time.perf_counter()
+        LocalMessaging.researcher_on_message(reply, 'general/researcher')
+
+
+class LocalMessaging:
+    """Messaging delivering the messages of the researcher to the simulated nodes, instead of the MQTT broker"""
+
+    nodes = {}
+    researcher_on_message = None
+
+    def __init__(self, on_message, *args):
+        LocalMessaging.researcher_on_message = on_message
+
+    def start(self, block=False):
+        pass
+
+    def send_message(self, msg, client=None):
+        for node_id, node in self.nodes.items():
+            if client is None or client == node_id:
+                node.receive(msg)
+
+
+def _run_experiment(pipelined: bool, rounds: int, features: int, prepare_seconds: float, train_seconds: list,
+                    queue: multiprocessing.Queue):
+    LocalRepository.directory = tempfile.mkdtemp(dir=environ['TMP_DIR'])
+    LocalMessaging.nodes = {f'node-{i + 1}': SimulatedNode(f'node-{i + 1}', prepare_seconds, seconds)
+                            for i, seconds in enumerate(train_seconds)}
+    for node in LocalMessaging.nodes.values():
+        node.start()
+    training_data = FederatedDataSet({
+        node_id: [{'dataset_id': f'dataset-{node_id}', 'data_type': 'csv', 'shape': [100, features],
+                   'dtypes': ['float64'] * features}] for node_id in LocalMessaging.nodes})
+
+    with patch('fedbiomed.researcher.requests.Messaging', LocalMessaging), \
+            patch('fedbiomed.researcher.job.Repository', LocalRepository):
+        exp = Experiment(training_data=training_data,
+                         aggregator=FedAverage(),
+                         round_limit=rounds,
+                         training_plan_class=LinearTrainingPlan,
+                         model_args={'features': features},
+                         training_args=TrainingArgs({'epochs': 1}, only_required=False),
+                         save_breakpoints=True,
+                         pipelined_rounds=pipelined)
+        start = time.perf_counter()
+        exp.run()
+        elapsed = time.perf_counter() - start
+
+    nodes_idle_time = exp.nodes_idle_time()
+    rows = [[round_, node_id, nodes_idle_time.get(round_, {}).get(node_id), node.idle_time.get(round_)]
+            for round_ in range(1, rounds) for node_id, node in LocalMessaging.nodes.items()]
+    shutil.rmtree(LocalRepository.directory)
+    queue.put((rows, elapsed))
+
+
+def run_experiment(pipelined: bool, *args):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_experiment, args=(pipelined, *args, queue))
+    process.start()
+    while True:
+        try:
+            return queue.get(timeout=1)
+        except queue_module.Empty:
+            if not process.is_alive():
+                raise RuntimeError(f'experiment failed (pipelined: {pipelined})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rounds', type=int, default=4)
+    parser.add_argument('--features', type=int, default=2000,
+                        help='the model is a `features` x `features` linear layer')
+    parser.add_argument('--prepare-seconds', type=float, default=1.)
+    parser.add_argument('--train-seconds', type=float, nargs='+', default=[2., 4.],
+                        help='training time of each node (one node per value)')
+    parser.add_argument('--timeout', type=float, default=environ['TIMEOUT'],
+                        help='polling period of the researcher for node replies (environ `TIMEOUT`)')
+    args = parser.parse_args()
+    environ['TIMEOUT'] = args.timeout
+    logger.setLevel('ERROR')
+
+    rows = []
+    times = []
+    for pipelined in (False, True):
+        mode_rows, elapsed = run_experiment(pipelined, args.rounds, args.features, args.prepare_seconds,
+                                            args.train_seconds)
+        mode = 'pipelined' if pipelined else 'sequential'
+        rows.extend([mode, round_, node_id] +
+                    ['-' if idle is None else f'{idle:.2f}' for idle in (researcher_idle, node_idle)]
+                    for round_, node_id, researcher_idle, node_idle in mode_rows)
+        times.append([mode, f'{elapsed:.1f}'])
+        mean_idle = np.mean([node_idle for *_, node_idle in mode_rows if node_idle is not None])
+        times[-1].append(f'{mean_idle:.2f}')
+    print(tabulate(rows, headers=['rounds', 'round', 'node', 'idle, researcher (s)', 'idle, node (s)']))
+    print()
+    print(tabulate(times, headers=['rounds', 'experiment (s)', 'mean idle, node (s)']))
+
+
+if __name__ == '__main__':
+    main()
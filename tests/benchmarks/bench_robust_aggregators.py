@@ -0,0 +1,91 @@
+"""
+Benchmark of the byzantine-robust aggregators: time and peak memory vs number of nodes and model size.
+
+Compares the chunked aggregators with a reference implementation that stacks the full models in memory.
+Each measure runs in a forked process, so that peak memory (max RSS) of a measure is not polluted by others.
+
+Usage (from the `tests` directory):
+
+```
+python benchmarks/bench_robust_aggregators.py --nodes 5 10 20 --sizes 100000 1000000 4000000
+```
+"""
+
+import argparse
+import multiprocessing
+import queue as queue_module
+import resource
+import time
+
+import torch
+from tabulate import tabulate
+
+from fedbiomed.researcher.aggregators import CoordinateMedian, TrimmedMean, Krum
+
+
+def stacked_median(model_params, weights):
+    """Reference: stacks the full models in memory"""
+    return {key: torch.stack([p[key] for p in model_params.values()]).median(dim=0).values
+            for key in next(iter(model_params.values()))}
+
+
+def stacked_krum(model_params, weights):
+    """Reference: stacks the full flat models in memory and computes distances with cdist"""
+    flat = torch.stack([torch.cat([v.reshape(-1) for v in p.values()]) for p in model_params.values()])
+    scores = (torch.cdist(flat, flat) ** 2).sort(dim=1).values[:, 1:len(flat) - 2].sum(dim=1)
+    return flat[scores.argmin()]
+
+
+AGGREGATORS = {
+    'median (stacked reference)': lambda: stacked_median,
+    'CoordinateMedian': lambda: CoordinateMedian().aggregate,
+    'TrimmedMean(0.1)': lambda: TrimmedMean(trim_ratio=.1).aggregate,
+    'krum (stacked reference)': lambda: stacked_krum,
+    'Krum(1)': lambda: Krum(n_byzantine=1).aggregate,
+}
+
+
+def _measure(name: str, n_nodes: int, model_size: int, queue: multiprocessing.Queue):
+    torch.manual_seed(0)
+    n_layers = 4
+    model_params = {f'node_{i}': {f'layer_{k}': torch.randn(model_size // n_layers) for k in range(n_layers)}
+                    for i in range(n_nodes)}
+    aggregate = AGGREGATORS[name]()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    aggregate(model_params, {})
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, (rss_after - rss_before) / 1024))
+
+
+def measure(name: str, n_nodes: int, model_size: int):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measure, args=(name, n_nodes, model_size, queue))
+    process.start()
+    process.join()
+    try:
+        elapsed, memory = queue.get(timeout=1)
+    except queue_module.Empty:
+        # eg. killed for lack of memory
+        return 'failed', 'failed'
+    return f'{elapsed:.3f}', f'{memory:.1f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--nodes', type=int, nargs='+', default=[5, 10, 20])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10 ** 5, 10 ** 6, 4 * 10 ** 6])
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)
+    rows = []
+    for n_nodes in args.nodes:
+        for model_size in args.sizes:
+            for name in AGGREGATORS:
+                rows.append([name, n_nodes, model_size, *measure(name, n_nodes, model_size)])
+    print(tabulate(rows, headers=['aggregator', 'nodes', 'model size', 'time (s)', 'extra peak memory (MiB)']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark of the minibatch updates of sklearn SGD training plans: per-sample `partial_fit` vs vectorized updates.
+
+Trains SGD models batch per batch, with the vectorized numpy update and with the fallback path calling
+`partial_fit` on each sample, on random dense inputs. The per-sample path is slow: it is measured on fewer batches.
+
+Usage (from the `tests` directory):
+
+```
+python benchmarks/bench_sklearn_sgd.py --batch-size 256 --features 50 --batches 200 --per-sample-batches 4
+```
+"""
+
+import argparse
+import contextlib
+import time
+from unittest.mock import patch
+
+import numpy as np
+from tabulate import tabulate
+
+from fedbiomed.common.training_args import TrainingArgs
+from fedbiomed.common.training_plans import FedSGDClassifier, FedSGDRegressor
+
+
+CONFIGS = {
+    'SGDRegressor': (FedSGDRegressor, {}),
+    'SGDClassifier, 2 classes': (FedSGDClassifier, {'n_classes': 2}),
+    'SGDClassifier, 10 classes': (FedSGDClassifier, {'n_classes': 10}),
+    'SGDClassifier, 10 classes, elasticnet': (FedSGDClassifier, {'n_classes': 10, 'penalty': 'elasticnet'}),
+}
+
+
+def measure(config: str, batch_size: int, n_features: int, batches: int, per_sample: bool) -> float:
+    """Returns the throughput of the training, in samples per second"""
+    training_plan_cls, model_args = CONFIGS[config]
+    training_plan = training_plan_cls()
+    training_plan.post_init({'n_features': n_features, **model_args},
+                            TrainingArgs({'epochs': 1, 'batch_size': batch_size}, only_required=False))
+
+    rng = np.random.default_rng(0)
+    inputs = rng.normal(size=(batches, batch_size, n_features))
+    if 'n_classes' in model_args:
+        target = rng.integers(0, model_args['n_classes'], size=(batches, batch_size, 1))
+    else:
+        target = rng.normal(size=(batches, batch_size, 1))
+
+    # models without vectorized loss function are trained with `partial_fit` on each sample
+    with patch('fedbiomed.common.training_plans._sklearn_models.batch_sgd_loss_function',
+               return_value=None) if per_sample else contextlib.nullcontext():
+        start = time.perf_counter()
+        for batch in range(batches):
+            training_plan._train_over_batch(inputs[batch], target[batch], report=False)
+        elapsed = time.perf_counter() - start
+    return batches * batch_size / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--configs', nargs='+', default=list(CONFIGS), choices=list(CONFIGS))
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--features', type=int, default=50)
+    parser.add_argument('--batches', type=int, default=200)
+    parser.add_argument('--per-sample-batches', type=int, default=4)
+    args = parser.parse_args()
+
+    rows = []
+    for config in args.configs:
+        per_sample = measure(config, args.batch_size, args.features, args.per_sample_batches, True)
+        vectorized = measure(config, args.batch_size, args.features, args.batches, False)
+        rows.append([config, f'{per_sample:,.0f}', f'{vectorized:,.0f}', f'{vectorized / per_sample:,.0f}'])
+    print(tabulate(rows, headers=['model', 'per-sample (samples/s)', 'vectorized (samples/s)', 'speedup'],
+                   colalign=('left', 'right', 'right', 'right')))
+
+
+if __name__ == '__main__':
+    main()
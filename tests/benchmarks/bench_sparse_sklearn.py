@@ -0,0 +1,103 @@
+"""
+Benchmark of sklearn training on sparse inputs: memory and throughput vs the dense path.
+
+Trains one epoch of a FedSGDClassifier on CSR inputs, and on the same inputs densified, when they fit in memory.
+Each measure runs in a forked process, so that peak memory (max RSS) of a measure is not polluted by others.
+
+Usage (from the `tests` directory):
+
+```
+python benchmarks/bench_sparse_sklearn.py --tables 10000x10000:0.01 10000x1000000:0.0005 --penalties l2 l1
+```
+"""
+
+import argparse
+import multiprocessing
+import queue as queue_module
+import resource
+import time
+
+import numpy as np
+from scipy import sparse
+from tabulate import tabulate
+
+from fedbiomed.common.data import NPDataLoader
+from fedbiomed.common.training_args import TrainingArgs
+from fedbiomed.common.training_plans import FedSGDClassifier
+
+
+def make_inputs(n_samples: int, n_features: int, density: float, dense: bool):
+    """Random inputs with the same number of non-zero features per sample"""
+    rng = np.random.default_rng(0)
+    nnz = max(1, int(density * n_features))
+    inputs = sparse.csr_matrix((rng.random(n_samples * nnz),
+                                rng.integers(0, n_features, n_samples * nnz),
+                                np.arange(0, n_samples * nnz + 1, nnz)), shape=(n_samples, n_features))
+    inputs.sum_duplicates()
+    target = rng.integers(0, 2, size=(n_samples, 1))
+    return (inputs.toarray() if dense else inputs), target
+
+
+def nbytes(inputs) -> int:
+    if sparse.issparse(inputs):
+        return inputs.data.nbytes + inputs.indices.nbytes + inputs.indptr.nbytes
+    return inputs.nbytes
+
+
+def _measure(table: str, penalty: str, dense: bool, batch_size: int, queue: multiprocessing.Queue):
+    shape, density = table.split(':')
+    n_samples, n_features = (int(size) for size in shape.split('x'))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inputs, target = make_inputs(n_samples, n_features, float(density), dense)
+
+    training_plan = FedSGDClassifier()
+    training_plan.post_init({'n_classes': 2, 'n_features': n_features, 'penalty': penalty},
+                            TrainingArgs({'epochs': 1, 'batch_size': batch_size}, only_required=False))
+    loader = NPDataLoader(inputs, target, batch_size=batch_size, shuffle=True, random_seed=0)
+    training_plan.set_data_loaders(loader, loader)
+    start = time.perf_counter()
+    training_plan.training_routine()
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((nbytes(inputs) / 2 ** 20, (rss_after - rss_before) / 1024, n_samples / elapsed))
+
+
+def measure(table: str, penalty: str, dense: bool, batch_size: int):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measure, args=(table, penalty, dense, batch_size, queue))
+    process.start()
+    process.join()
+    try:
+        data, memory, throughput = queue.get(timeout=1)
+    except queue_module.Empty:
+        # eg. killed for lack of memory
+        return 'failed', 'failed', 'failed'
+    return f'{data:.0f}', f'{memory:.0f}', f'{throughput:.0f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--tables', nargs='+', default=['10000x10000:0.01', '10000x1000000:0.0005'],
+                        help='inputs, as <samples>x<features>:<density>')
+    parser.add_argument('--penalties', nargs='+', default=['l2', 'l1'])
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--max-dense-gib', type=float, default=4.,
+                        help='dense path is skipped for inputs larger than this size (float64)')
+    args = parser.parse_args()
+
+    rows = []
+    for table in args.tables:
+        n_samples, n_features = (int(size) for size in table.split(':')[0].split('x'))
+        dense_gib = n_samples * n_features * 8 / 2 ** 30
+        for penalty in args.penalties:
+            rows.append([table, penalty, 'sparse', *measure(table, penalty, False, args.batch_size)])
+            if dense_gib <= args.max_dense_gib:
+                rows.append([table, penalty, 'dense', *measure(table, penalty, True, args.batch_size)])
+            else:
+                rows.append([table, penalty, 'dense', f'{dense_gib * 1024:.0f}', 'skipped', 'skipped'])
+    print(tabulate(rows, headers=['inputs', 'penalty', 'format', 'inputs (MiB)', 'extra peak memory (MiB)',
+                                  'samples/s']))
+
+
+if __name__ == '__main__':
+    main()
@@ -89,6 +89,29 @@ class TestCli(NodeTestCase):
             # self.assertDictEqual(dlp_arg[MedicalFolderLoadingBlockTypes.MODALITIES_TO_FOLDERS].map, dlb.map)
             # self.assertEqual(dlp_arg.name, 'test-dlp-name')
 
+    def test_cli_02_add_database_csv_target_column(self):
+        """Column of the labels of a CSV dataset is asked, to store the classes of the dataset"""
+        for target_column, dataset_parameters in (('label', {'target_column': 'label'}), ('', None)):
+            database_inputs = ['test-db-name', 'test-tag1,test-tag2', 'description', target_column]
+            with patch('fedbiomed.node.cli_utils._io.input', return_value='1'), \
+                    patch('fedbiomed.node.cli_utils._database.validated_path_input', return_value='some/file.csv'), \
+                    patch('fedbiomed.node.cli_utils._database.input', new=lambda x: database_inputs.pop(0)), \
+                    patch.object(fedbiomed.node.cli_utils.dataset_manager, 'add_database') as patched_add_database:
+                add_database()
+                patched_add_database.assert_called_once_with(name='test-db-name',
+                                                             tags=['test-tag1', 'test-tag2'],
+                                                             data_type='csv',
+                                                             description='description',
+                                                             path='some/file.csv',
+                                                             dataset_parameters=dataset_parameters,
+                                                             data_loading_plan=None)
+
+        # non interactive
+        with patch.object(fedbiomed.node.cli_utils.dataset_manager, 'add_database') as patched_add_database:
+            add_database(interactive=False, path='.', name='test-db-name', tags='test-tag1', description='',
+                         data_type='csv', target_column='0')
+            self.assertDictEqual(patched_add_database.call_args[1]['dataset_parameters'], {'target_column': '0'})
+
 
 class TestMedicalFolderCliUtils(NodeTestCase):
     @staticmethod
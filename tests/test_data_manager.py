@@ -1,5 +1,7 @@
 import unittest
+import numpy as np
 import pandas as pd
+from scipy import sparse
 
 from torch.utils.data import Dataset
 from fedbiomed.common.data import DataManager
@@ -63,6 +65,11 @@ class TestDataManager(unittest.TestCase):
         data_manager.load(tp_type=TrainingPlans.SkLearnTrainingPlan)
         self.assertIsInstance(data_manager._data_manager_instance, SkLearnDataManager)
 
+        # Test SkLearn Scenario with sparse inputs
+        data_manager = DataManager(dataset=sparse.csr_matrix([[1, 0, 0], [0, 0, 3]]), target=np.array([1, 2]))
+        data_manager.load(tp_type=TrainingPlans.SkLearnTrainingPlan)
+        self.assertIsInstance(data_manager._data_manager_instance, SkLearnDataManager)
+
         # Test auto PyTorch dataset creation
         data_manager = DataManager(dataset=pd.DataFrame([[1, 2, 3], [1, 2, 3]]), target=pd.Series([1, 2]))
         data_manager.load(tp_type=TrainingPlans.TorchTrainingPlan)
@@ -439,6 +439,17 @@ class TestDatasetManager(NodeTestCase):
                                                     )
 
         self.assertEqual(dataset_id, fake_dataset_id)
+        # labels of the target column are stored in the dataset parameters
+        dataset_id = self.dataset_manager.add_database(name='test',
+                                                       tags=['classes'],
+                                                       data_type='csv',
+                                                       description='description',
+                                                       path=os.path.join(self.testdir, "csv", "tata-header.csv"),
+                                                       dataset_parameters={'target_column': 0})
+        dataset = self.dataset_manager.get_by_id(dataset_id)
+        expected = np.unique(self.dataset_manager.read_csv(dataset['path']).iloc[:, 0]).tolist()
+        self.assertListEqual(dataset['dataset_parameters']['classes'], expected)
+
         # Should raise error due to same tag
         with self.assertRaises(Exception):
             self.dataset_manager.add_database(name='test',
@@ -1100,6 +1111,20 @@ class TestDatasetManager(NodeTestCase):
 
         dataset_manager._db.close()
 
+    def test_dataset_manager_33_get_csv_classes(self):
+        """
+        Tests `get_csv_classes`, with the name or position of the target column
+        """
+        fake_csv_dataframe = pd.DataFrame(self.dummy_data)
+        self.assertListEqual(self.dataset_manager.get_csv_classes(fake_csv_dataframe, 'booleans'), [False, True])
+        self.assertListEqual(self.dataset_manager.get_csv_classes(fake_csv_dataframe, 0), list(range(10)))
+        # position given as a string, eg. on the command line
+        self.assertListEqual(self.dataset_manager.get_csv_classes(fake_csv_dataframe, '0'), list(range(10)))
+
+        for target_column in ('unknown', 10, '10'):
+            with self.assertRaises(FedbiomedDatasetManagerError):
+                self.dataset_manager.get_csv_classes(fake_csv_dataframe, target_column)
+
 
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
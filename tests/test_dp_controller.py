@@ -90,6 +90,11 @@ class TestDPController(unittest.TestCase):
         with self.assertRaises(FedbiomedDPControllerError):
             DPController(dp_args)
 
+        # Invalid backend
+        dp_args = {"type": "local", "sigma": 0.1, "clip": 0.1, "backend": "invalid"}
+        with self.assertRaises(FedbiomedDPControllerError):
+            DPController(dp_args)
+
     def test_dep_controller_05_validate_and_fix_model(self):
         """Tests builds DP controller with invalid arguments """
 
@@ -136,7 +141,8 @@ class TestDPController(unittest.TestCase):
                                                                  optimizer=opt,
                                                                  data_loader=loader,
                                                                  noise_multiplier=self.dp_args_l.get('sigma'),
-                                                                 max_grad_norm=self.dp_args_l.get('clip'))
+                                                                 max_grad_norm=self.dp_args_l.get('clip'),
+                                                                 grad_sample_mode='hooks')
 
     def test_dep_controller_07_post_process_dp(self):
         """Tests before training method with different scenarios"""
@@ -168,3 +174,20 @@ class TestDPController(unittest.TestCase):
         # Post processes with DPC
         p = self.dpc.after_training(params)
         self.assertEqual(p, "POSTPROCESS")
+
+    def test_dep_controller_10_grad_sample_mode(self):
+        """Tests selection of the backend computing per-sample gradients"""
+
+        supported = torch.nn.Sequential(torch.nn.Conv2d(1, 2, 3), torch.nn.ReLU(), torch.nn.Flatten(),
+                                        torch.nn.Linear(8, 2))
+        unsupported = torch.nn.Sequential(torch.nn.Linear(4, 4), torch.nn.GRUCell(4, 2))
+
+        self.assertEqual(self.dpl._dp_args['backend'], 'hooks')
+        self.assertEqual(self.dpl._grad_sample_mode(supported), 'hooks')
+
+        for backend in ('functorch', 'ew'):
+            dpc = DPController({**self.dp_args_l, 'backend': backend})
+            self.assertEqual(dpc._grad_sample_mode(supported), backend)
+
+        # layers not supported by expanded weights fall back to hooks
+        self.assertEqual(dpc._grad_sample_mode(unsupported), 'hooks')
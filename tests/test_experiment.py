@@ -1,4 +1,5 @@
 from typing import Dict
+import time
 import unittest
 import os
 import sys
@@ -615,6 +616,67 @@ class TestExperiment(ResearcherTestCase):
         with self.assertRaises(SystemExit):
             self.test_exp.set_round_limit(round_limit=rl_expected)
 
+    def test_experiment_07_set_round_deadline_and_quorum(self):
+        """Testing setters for round timeout, round quorum and late replies policy"""
+
+        # Test default values
+        self.assertIsNone(self.test_exp.round_timeout())
+        self.assertIsNone(self.test_exp.round_quorum())
+        self.assertEqual(self.test_exp.late_replies_policy(), 'discard')
+
+        # Test setting proper values
+        self.assertEqual(self.test_exp.set_round_timeout(30), 30)
+        self.assertEqual(self.test_exp.set_round_timeout(None), None)
+        self.assertEqual(self.test_exp.set_round_quorum(2), 2)
+        self.assertEqual(self.test_exp.set_round_quorum(0.5), 0.5)
+        self.assertEqual(self.test_exp.set_round_quorum(None), None)
+        self.assertEqual(self.test_exp.set_late_replies_policy('keep'), 'keep')
+
+        # Test passing invalid values
+        for timeout in ['toto', 0, -1., True]:
+            with self.assertRaises(SystemExit):
+                self.test_exp.set_round_timeout(timeout)
+        for quorum in ['toto', 0, 1.5, 0., True]:
+            with self.assertRaises(SystemExit):
+                self.test_exp.set_round_quorum(quorum)
+        with self.assertRaises(SystemExit):
+            self.test_exp.set_late_replies_policy('wait')
+
+    def test_experiment_07_set_retain_rounds(self):
+        """Testing setter of retain rounds and release of aggregated params of old rounds"""
+
+        self.assertIsNone(self.test_exp.retain_rounds())
+        for retain_rounds in ['toto', 0, 1.5, True]:
+            with self.assertRaises(SystemExit):
+                self.test_exp.set_retain_rounds(retain_rounds)
+
+        self.test_exp._job = MagicMock()
+        self.test_exp._job.load_breakpoint_params.side_effect = lambda path, to_params: {'path': path}
+        self.test_exp._aggregated_params = {round_: {'params': {'w': round_}, 'params_path': f'/path/{round_}.pt'}
+                                            for round_ in range(4)}
+
+        self.assertEqual(self.test_exp.set_retain_rounds(3), 3)
+        self.test_exp._job.release_training_replies.assert_called_once_with(3)
+        aggregated_params = self.test_exp.aggregated_params()
+        self.assertNotIn('params', dict.keys(aggregated_params[0]))
+        self.assertDictEqual(aggregated_params[0]['params'], {'path': '/path/0.pt'})
+        for round_ in range(1, 4):
+            self.assertDictEqual(dict.get(aggregated_params[round_], 'params'), {'w': round_})
+
+        # breakpoint only references released params files
+        with patch('fedbiomed.researcher.experiment.create_unique_file_link') as mock_create_unique_file_link:
+            mock_create_unique_file_link.side_effect = lambda path, file: file
+            saved = Experiment._save_aggregated_params(aggregated_params, '/breakpoint')
+        self.assertDictEqual(saved[0], {'params_path': '/path/0.pt'})
+
+        load_func = MagicMock(side_effect=lambda path, to_params: {'path': path})
+        loaded = Experiment._load_aggregated_params({str(k): v for k, v in saved.items()}, load_func, 1)
+        self.assertEqual(load_func.call_count, 1)
+        self.assertNotIn('params', dict.keys(loaded[2]))
+        self.assertDictEqual(loaded[2]['params'], {'path': '/path/2.pt'})
+        self.assertDictEqual(dict.get(loaded[3], 'params'), {'path': '/path/3.pt'})
+
+        self.assertIsNone(self.test_exp.set_retain_rounds(None))
 
     def test_experiment_08_private_set_round_current(self):
         """ Testing private method for setting round current for the experiment """
@@ -960,8 +1022,10 @@ class TestExperiment(ResearcherTestCase):
 
         # Test to override existing Job with set_job
         self.mock_logger_debug.reset_mock()
-        self.test_exp._job = True  # Assign any value to not make it None
+        former_job = MagicMock()
+        self.test_exp._job = former_job  # Assign any job to not make it None
         self.test_exp.set_job()
+        former_job.send_end_notice.assert_called_once()
         # There will two logger.debug calls
         # First  : About Experiment Job has been changed
         # Second : Missing proper model definition
@@ -1255,6 +1319,44 @@ class TestExperiment(ResearcherTestCase):
         result = self.test_exp.run_once()
         self.assertEqual(result, 1, "run_once did not successfully run the round")
 
+    @patch('fedbiomed.researcher.experiment.Experiment.breakpoint')
+    def test_experiment_23_run_pipelined_rounds(self, mock_experiment_breakpoint):
+        """Testing next round is sent before breakpoint, and breakpoint is written in background"""
+        job = MagicMock()
+        job.update_parameters.return_value = "path/to/my/file", "http://some/url/to/my/file"
+        job.training_replies = {0: 'reply', 1: 'reply'}
+        strategy = MagicMock()
+        strategy.sample_nodes.return_value = ['node-1']
+        strategy.refine.return_value = ({'node-1': {'param': 1}}, [1.])
+        aggregator = MagicMock()
+        aggregator.create_aggregator_args.return_value = ({}, {})
+
+        self.test_exp._job = job
+        self.test_exp._node_selection_strategy = strategy
+        self.test_exp._aggregator = aggregator
+        self.test_exp.set_round_limit(None)
+        self.test_exp.set_save_breakpoints(True)
+        with self.assertRaises(SystemExit):
+            self.test_exp.set_pipelined_rounds('yes')
+        self.assertTrue(self.test_exp.set_pipelined_rounds(True))
+
+        calls = []
+        job.start_nodes_training_round.side_effect = lambda **kwargs: calls.append(('start', kwargs['round']))
+        job.send_training_requests.side_effect = lambda **kwargs: calls.append(('send', kwargs['round']))
+        job.collect_training_replies.side_effect = lambda **kwargs: calls.append(('collect', kwargs['round']))
+        job.send_prepare_notice.side_effect = lambda: calls.append(('prepare',))
+        mock_experiment_breakpoint.side_effect = lambda: calls.append(('breakpoint', self.test_exp.round_current()))
+
+        self.assertEqual(self.test_exp.run(rounds=2), 2)
+
+        # round 1 is sent right after the aggregated params of round 0 are uploaded,
+        # and no round is sent in advance beyond the rounds of the run
+        self.assertListEqual(calls, [('start', 0), ('prepare',), ('send', 1), ('breakpoint', 1),
+                                     ('collect', 1), ('breakpoint', 2)])
+        self.assertEqual(self.test_exp.round_current(), 2)
+        self.assertIsNone(self.test_exp._dispatched_round)
+        self.assertListEqual(self.test_exp._background_tasks, [])
+
     @patch('fedbiomed.researcher.aggregators.fedavg.FedAverage.aggregate')
     @patch('fedbiomed.researcher.job.Job.training_plan', new_callable=PropertyMock)
     @patch('fedbiomed.researcher.job.Job.training_replies', new_callable=PropertyMock)
@@ -1844,8 +1946,7 @@ class TestExperiment(ResearcherTestCase):
         # patch_create_object.side_effect = side_create_object
 
         class FakeModelInstance:
-            def load(self, aggreg, to_params):
-                return model_params
+            pass
 
         patch_training_plan.return_value = FakeModelInstance()
 
@@ -1856,7 +1957,9 @@ class TestExperiment(ResearcherTestCase):
             patch('fedbiomed.researcher.experiment.Experiment.__init__',
                   ExperimentMock.__init__),
             patch('fedbiomed.researcher.experiment.Experiment._set_round_current',
-                  ExperimentMock._set_round_current)
+                  ExperimentMock._set_round_current),
+            patch('testsupport.fake_experiment.JobMock.load_breakpoint_params',
+                  side_effect=lambda params_path, to_params=True: model_params)
         ]
         for p in patches_experiment:
             p.start()
@@ -2087,6 +2190,68 @@ class TestExperiment(ResearcherTestCase):
         # clean after tests
         del test_class
 
+    @patch('fedbiomed.researcher.experiment.Experiment.breakpoint')
+    def test_experiment_33_run_pipelined_rounds_test_after(self, mock_experiment_breakpoint):
+        """Testing nodes are not requested while a breakpoint is written in background"""
+        job = MagicMock()
+        job.update_parameters.return_value = "path/to/my/file", "http://some/url/to/my/file"
+        job.training_replies = {0: 'reply', 1: 'reply', 2: 'reply'}
+        strategy = MagicMock()
+        strategy.sample_nodes.return_value = ['node-1']
+        strategy.refine.return_value = ({'node-1': {'param': 1}}, [1.])
+        aggregator = MagicMock()
+        aggregator.create_aggregator_args.return_value = ({}, {})
+
+        self.test_exp._job = job
+        self.test_exp._node_selection_strategy = strategy
+        self.test_exp._aggregator = aggregator
+        self.test_exp.set_round_limit(None)
+        self.test_exp.set_save_breakpoints(True)
+        self.test_exp.set_pipelined_rounds(True)
+
+        calls = []
+        job.start_nodes_training_round.side_effect = \
+            lambda **kwargs: calls.append(('start', kwargs['round'], kwargs['do_training']))
+        job.send_training_requests.side_effect = lambda **kwargs: calls.append(('send', kwargs['round']))
+
+        def slow_breakpoint():
+            time.sleep(.2)
+            calls.append(('breakpoint', self.test_exp.round_current()))
+        mock_experiment_breakpoint.side_effect = slow_breakpoint
+
+        # validation after the round waits for the breakpoint written in background
+        self.assertEqual(self.test_exp.run_once(test_after=True), 1)
+        # a round that was not sent in advance waits for the breakpoint of the former round
+        self.assertEqual(self.test_exp.run_once(), 1)
+        self.assertEqual(self.test_exp.run_once(), 1)
+        self.test_exp._wait_background_tasks()
+
+        self.assertListEqual(calls, [('start', 0, True), ('breakpoint', 1), ('start', 1, False),
+                                     ('start', 1, True), ('breakpoint', 2),
+                                     ('start', 2, True), ('breakpoint', 3)])
+        job.send_training_requests.assert_not_called()
+
+
+    def test_experiment_34_job_end_notice(self):
+        """Testing nodes are notified when the job is replaced or when the round limit is reached"""
+        job = MagicMock()
+        self.test_exp._job = job
+        self.test_exp.set_round_limit(3)
+        self.test_exp._round_current = 1
+
+        with patch.object(self.test_exp, '_run_rounds') as mock_run_rounds:
+            self.test_exp.run(rounds=1)
+            job.send_end_notice.assert_not_called()
+
+            def run_rounds(rounds):
+                self.test_exp._round_current += rounds
+            mock_run_rounds.side_effect = run_rounds
+            self.test_exp.run(rounds=2)
+            job.send_end_notice.assert_called_once()
+
+        job.reset_mock()
+        self.test_exp.set_job()
+        job.send_end_notice.assert_called_once()
 
 
 if __name__ == '__main__':  # pragma: no cover
@@ -11,21 +11,25 @@ To add a new sklearn model for testing, you should include its name in the `impl
 specialized class).
 """
 
+import itertools
+import joblib
 import os
 import tempfile
 import unittest
 import logging
 import numpy as np
 from copy import deepcopy
+from scipy import sparse
 from unittest.mock import MagicMock, patch, mock_open
 
 import fedbiomed.node.history_monitor
 from fedbiomed.common.exceptions import FedbiomedTrainingPlanError
 from fedbiomed.common.constants import TrainingPlans
-from fedbiomed.common.metrics import MetricTypes
+from fedbiomed.common.metrics import Metrics, MetricTypes
 from fedbiomed.common.data import NPDataLoader
 from fedbiomed.common.training_plans import SKLearnTrainingPlan, FedPerceptron, FedSGDRegressor, FedSGDClassifier
 from fedbiomed.common.training_plans._sklearn_models import SKLearnTrainingPlanPartialFit
+from fedbiomed.common.training_plans._sklearn_params import save_params
 from sklearn.linear_model import SGDClassifier
 
 class Custom:
@@ -110,54 +114,81 @@ class TestSklearnTrainingPlanBasicInheritance(unittest.TestCase):
             [x for x in np.unique(X)]
         )
 
+        # Classes are the cached labels of the loaders, and empty loaders do not change their type
+        empty_loader = NPDataLoader(dataset=np.array([]), target=np.array([]))
+        loader.set_classes([0, 1, 2, 3, 4])
+        training_plan.set_data_loaders(loader, empty_loader)
+        with patch.object(NPDataLoader, '__iter__', side_effect=AssertionError):
+            classes = training_plan._classes_from_concatenated_train_test()
+        self.assertListEqual(list(classes), [0, 1, 2, 3, 4])
+        self.assertTrue(np.issubdtype(classes.dtype, np.integer))
+
     def test_sklearntrainingplanbasicinheritance_03_save_load(self):
         training_plan = SKLearnTrainingPlan()
-        saved_params = []
-
-        def mocked_joblib_dump(obj, *args, **kwargs):
-            saved_params.append(obj)
-
-        # Base case where params are not provided to save function
-        with patch('fedbiomed.common.training_plans._sklearn_training_plan.joblib.dump',
-                   side_effect=mocked_joblib_dump), \
-                patch('builtins.open', mock_open()):
-            training_plan.save('filename')
-            self.assertEqual(saved_params[-1], training_plan.model())
-
-        # Params passed to save function as dict
-        with patch('fedbiomed.common.training_plans._sklearn_training_plan.joblib.dump',
-                   side_effect=mocked_joblib_dump), \
-                patch('builtins.open', mock_open()):
-            training_plan.save('filename', params={'coef_': 0.42, 'intercept_': 0.42})
-            self.assertEqual(saved_params[-1].coef_, 0.42)
-            self.assertEqual(saved_params[-1].intercept_, 0.42)
-
-        # Params passed as dict with 'model_params' field
-        with patch('fedbiomed.common.training_plans._sklearn_training_plan.joblib.dump',
-                   side_effect=mocked_joblib_dump), \
-                patch('builtins.open', mock_open()):
-            training_plan.save('filename', params={'model_params': {'coef_': 0.42, 'intercept_': 0.42}})
-            self.assertEqual(saved_params[-1].coef_, 0.42)
-            self.assertEqual(saved_params[-1].intercept_, 0.42)
-
-        # Saved object is not the correct type
-        with patch('fedbiomed.common.training_plans._sklearn_training_plan.joblib.load',
-                   return_value=FedSGDRegressor._model_cls()), \
-                patch('builtins.open', mock_open()):
+        training_plan._param_list = ['coef_', 'intercept_']
+        training_plan._model.coef_ = np.array([[1., 2.], [3., 4.]])
+        training_plan._model.intercept_ = np.array([.5, .6])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'params')
+
+            # Base case where params are not provided to save function: the `_param_list` params are saved
+            training_plan.save(filename)
+            params = training_plan.load(filename, to_params=True)['model_params']
+            self.assertListEqual(sorted(params), ['coef_', 'intercept_'])
+            self.assertTrue(np.array_equal(params['coef_'], np.array([[1., 2.], [3., 4.]])))
+            self.assertTrue(np.array_equal(params['intercept_'], np.array([.5, .6])))
+
+            # Params passed to save function as dict, or as dict with 'model_params' field
+            for saved in ({'coef_': np.zeros((2, 2)), 'intercept_': 0.42},
+                          {'model_params': {'coef_': np.zeros((2, 2)), 'intercept_': 0.42}}):
+                training_plan.save(filename, params=saved)
+                self.assertEqual(training_plan.model().intercept_, 0.42)
+
+                new_training_plan = SKLearnTrainingPlan()
+                new_training_plan._param_list = ['coef_', 'intercept_']
+                model = new_training_plan.load(filename)
+                self.assertIs(model, new_training_plan.model())
+                self.assertTrue(np.array_equal(model.coef_, np.zeros((2, 2))))
+                self.assertEqual(model.intercept_, 0.42)
+                # loaded arrays can be updated in place
+                model.coef_ += 1.
+
+            # Files assigning other attributes of the model are refused
+            for unexpected in ({'n_iter_': 3}, {'loss': 'log_loss'}):
+                save_params(filename, {'coef_': np.zeros((2, 2)), 'intercept_': 0.42, **unexpected})
+                new_training_plan = SKLearnTrainingPlan()
+                new_training_plan._param_list = ['coef_', 'intercept_']
+                with self.assertRaises(FedbiomedTrainingPlanError):
+                    new_training_plan.load(filename)
+                self.assertFalse(hasattr(new_training_plan.model(), 'coef_'))
+
+            # Parameters that cannot be saved as raw buffers
             with self.assertRaises(FedbiomedTrainingPlanError):
-                training_plan.load('filename')
-
-        # Option to retrieve model parameters instead of full model from load function
-        with patch.object(training_plan, '_param_list', ['coef_', 'intercept_']), \
-                patch.object(training_plan._model, 'coef_', 0.42), \
-                patch.object(training_plan._model, 'intercept_', 0.42), \
-                patch('fedbiomed.common.training_plans._sklearn_training_plan.joblib.load',
-                      return_value=training_plan._model), \
-                patch('builtins.open', mock_open()):
-            params = training_plan.load('filename', to_params=True)
-            self.assertDictEqual(params, {'model_params': {'coef_': 0.42, 'intercept_': 0.42}})
+                SKLearnTrainingPlan().save(filename, params={'coef_': None})
+
+            # Joblib dumps of earlier versions are refused, unless unpickling is explicitly allowed
+            joblib.dump(training_plan.model(), filename)
+            for to_params in (False, True):
+                with self.assertRaises(FedbiomedTrainingPlanError):
+                    training_plan.load(filename, to_params=to_params)
+            params = training_plan.load(filename, to_params=True, allow_legacy_pickle=True)['model_params']
+            self.assertListEqual(sorted(params), ['coef_', 'intercept_'])
+            self.assertTrue(np.array_equal(params['coef_'], np.zeros((2, 2))))
+            self.assertEqual(params['intercept_'], 0.42)
             params = training_plan.after_training_params()
-            self.assertDictEqual(params, {'coef_': 0.42, 'intercept_': 0.42})
+            self.assertListEqual(sorted(params), ['coef_', 'intercept_'])
+
+            # Dumped object is not the correct type
+            joblib.dump(FedSGDRegressor._model_cls(), filename)
+            with self.assertRaises(FedbiomedTrainingPlanError):
+                training_plan.load(filename, to_params=True, allow_legacy_pickle=True)
+
+            # Truncated parameters file
+            training_plan.save(filename)
+            with open(filename, 'r+b') as file:
+                file.truncate(20)
+            with self.assertRaises(FedbiomedTrainingPlanError):
+                training_plan.load(filename)
 
 
 class TestSklearnTrainingPlanPartialFit(unittest.TestCase):
@@ -173,28 +204,23 @@ class TestSklearnTrainingPlanPartialFit(unittest.TestCase):
 
     def test_sklearntrainingplanpartialfit_01_losses(self):
         training_plan = SKLearnTrainingPlanPartialFit()
-        logging.disable(logging.NOTSET)  # Temporarily re-enable logging to capture warning output
-        with self.assertLogs('fedbiomed', logging.ERROR) as captured:
-            losses = training_plan._parse_sample_losses(['loss: 1.0',
-                                                         'no loss',
-                                                         'loss: \n 4.2',
-                                                         'loss: inf',
-                                                         'loss: nan',
-                                                         'loss: over 9000'])
-            self.assertEqual(len(captured.output), 1)
-            self.assertIn('over 9000', captured.output[0])
-            self.assertIn('Value error during monitoring', captured.output[0])
-        self.assertListEqual(losses[:-1], [1.0, 4.2, np.inf])
-        self.assertTrue(np.isnan(losses[-1]))
-
-        # test a pretty common loss output
-        losses = training_plan._parse_sample_losses([
-            '-- Epoch 1',
-            'Norm: 0.00, NNZs: 0, Bias: 0.000000, T: 1, Avg. loss: 0.000000',
-            'Total training time: 0.00 seconds.'
-        ])
-        self.assertEqual(losses[0], 0.)
-        logging.disable(logging.CRITICAL)
+        training_plan._model = SGDClassifier(loss='hinge')
+        training_plan._model.coef_ = np.array([[1., -1.]])
+        training_plan._model.intercept_ = np.array([.5])
+        training_plan._model.classes_ = np.array([0, 1])
+        training_plan._is_classification = True
+        inputs = np.array([[1., 0.], [0., 1.], [2., 2.]])
+        target = np.array([[1], [1], [0]])
+        # decision function is [1.5, -.5, .5], margins are [1.5, -.5, -.5]
+        loss = training_plan._batch_loss(inputs, target)
+        self.assertAlmostEqual(loss, (0. + 1.5 + 1.5) / 3)
+
+        # losses are computed in closed form: no need for verbose outputs of the model
+        self.assertEqual(training_plan._model.verbose, 0)
+
+        # unsupported losses are not computed
+        training_plan._model = MagicMock()
+        self.assertTrue(np.isnan(training_plan._batch_loss(inputs, target)))
 
     def test_sklearntrainingplanpartialfit_02_training_routine(self):
         training_plan = SKLearnTrainingPlanPartialFit()
@@ -301,6 +327,8 @@ class TestSklearnTrainingPlansCommonFunctionalities(unittest.TestCase):
                     )
             # ensure that invalid keys from researcher's model args are not passed to the sklearn model
             self.assertNotIn('key_not_in_model', training_plan.model().get_params())
+            # losses are not parsed from the outputs of the model: it is not made verbose
+            self.assertEqual(training_plan.model().verbose, 0)
 
             # --------- Check that param_list is correctly populated
             # check that param_list is a list
@@ -324,10 +352,12 @@ class TestSklearnTrainingPlansCommonFunctionalities(unittest.TestCase):
             new_tp.post_init({'n_classes': 2, 'n_features': 1}, FakeTrainingArgs())
 
             m = new_tp.load(randomfile.name)
-            # ensure output of load is the same as original parameters
-            self.assertDictEqual(m.get_params(), orig_params)
-            # ensure that the newly loaded model has the same params as the original model
-            self.assertDictEqual(training_plan.model().get_params(), new_tp.model().get_params())
+            # only trainable parameters are exchanged: the estimator is built from the model arguments
+            self.assertDictEqual(training_plan.model().get_params(), orig_params)
+            self.assertNotEqual(m.get_params()['max_iter'], orig_params['max_iter'])
+            # ensure that the newly loaded model has the same trainable parameters as the original model
+            for key in training_plan._param_list:
+                self.assertTrue(np.array_equal(getattr(m, key), getattr(training_plan.model(), key)))
 
     @patch.multiple(SKLearnTrainingPlan, __abstractmethods__=set())
     def test_sklearntrainingplancommonfunctionalities_03_getters(self):
@@ -443,6 +473,145 @@ class TestSklearnTrainingPlansCommonFunctionalities(unittest.TestCase):
                             f"{training_plan.__class__.__name__} incorrectly computed non-zero gradients for coef_.")
             self.assertEqual(training_plan._model.n_iter_, 1)  # n_iter_ == 1 always after calling _train_over_batch
 
+    def test_sklearntrainingplancommonfunctionalities_06_vectorized_train_over_batch(self):
+        """Vectorized batch updates match the average of per-sample `partial_fit` updates."""
+        rng = np.random.default_rng(0)
+        inputs = rng.normal(size=(16, 2))
+        configurations = [
+            {'loss': 'hinge', 'penalty': 'l2', 'learning_rate': 'optimal'},
+            {'loss': 'log_loss', 'penalty': 'elasticnet', 'learning_rate': 'invscaling', 'eta0': .1},
+            {'loss': 'huber', 'penalty': 'l1', 'learning_rate': 'constant', 'eta0': .1},
+        ]
+        for parent_type in self.implemented_models:
+            for n_classes, configuration in itertools.product((2, 3), configurations):
+                model_args = {**self.model_args[parent_type], **configuration, 'n_classes': n_classes}
+                if parent_type is FedSGDRegressor:
+                    del model_args['n_classes']
+                    model_args['loss'] = 'huber'
+                    target = rng.normal(size=(16, 1))
+                else:
+                    target = rng.integers(0, n_classes, size=(16, 1))
+                vectorized, per_sample = self.subclass_types[parent_type](), self.subclass_types[parent_type]()
+                vectorized.post_init(dict(model_args), FakeTrainingArgs())
+                per_sample.post_init(dict(model_args), FakeTrainingArgs())
+
+                for batch in range(2):
+                    loss = vectorized._train_over_batch(inputs[batch::2], target[batch::2], report=True)
+                    with patch('fedbiomed.common.training_plans._sklearn_models.batch_sgd_loss_function',
+                               return_value=None):
+                        expected_loss = per_sample._train_over_batch(inputs[batch::2], target[batch::2], report=True)
+                    self.assertAlmostEqual(loss, expected_loss, places=5)
+                    for key in ('coef_', 'intercept_'):
+                        self.assertTrue(np.allclose(getattr(vectorized._model, key),
+                                                    getattr(per_sample._model, key)),
+                                        f"{parent_type.__name__} {configuration}: {key} differs")
+                    self.assertEqual(vectorized._model.t_, per_sample._model.t_)
+                    self.assertEqual(vectorized._model.n_iter_, 1)
+
+    def test_sklearntrainingplancommonfunctionalities_07_sparse_inputs(self):
+        """Sparse inputs are trained and evaluated without densifying them, as by `partial_fit` on sparse data."""
+        rng = np.random.default_rng(0)
+        inputs = sparse.random(24, 50, density=.1, format='csr', random_state=0)
+        configurations = [
+            {'loss': 'hinge', 'penalty': 'l2', 'learning_rate': 'optimal'},
+            {'loss': 'log_loss', 'penalty': 'elasticnet', 'learning_rate': 'invscaling', 'eta0': .1},
+            {'loss': 'huber', 'penalty': 'l1', 'learning_rate': 'constant', 'eta0': .1},
+        ]
+        for parent_type in self.implemented_models:
+            for n_classes, configuration in itertools.product((2, 3), configurations):
+                model_args = {**self.model_args[parent_type], **configuration, 'n_classes': n_classes,
+                              'n_features': 50, 'alpha': .01}
+                if parent_type is FedSGDRegressor:
+                    del model_args['n_classes']
+                    model_args['loss'] = 'huber'
+                    target = rng.normal(size=(24, 1))
+                else:
+                    target = rng.integers(0, n_classes, size=(24, 1))
+                vectorized, per_sample = self.subclass_types[parent_type](), self.subclass_types[parent_type]()
+                vectorized.post_init(dict(model_args), FakeTrainingArgs())
+                per_sample.post_init(dict(model_args), FakeTrainingArgs())
+
+                for batch in range(2):
+                    loss = vectorized._train_over_batch(inputs[batch::2], target[batch::2], report=True)
+                    with patch('fedbiomed.common.training_plans._sklearn_models.batch_sgd_loss_function',
+                               return_value=None):
+                        expected_loss = per_sample._train_over_batch(inputs[batch::2], target[batch::2], report=True)
+                    self.assertAlmostEqual(loss, expected_loss, places=5)
+                    for key in ('coef_', 'intercept_'):
+                        self.assertTrue(np.allclose(getattr(vectorized._model, key),
+                                                    getattr(per_sample._model, key)),
+                                        f"{parent_type.__name__} {configuration}: {key} differs")
+
+                # training and testing routines over a loader of sparse inputs
+                loader = NPDataLoader(dataset=inputs, target=target, batch_size=5, shuffle=True)
+                vectorized.set_data_loaders(loader, loader)
+                vectorized._training_args.update({'num_updates': None, 'batch_maxnum': None})
+                self.assertEqual(vectorized.training_routine(), 24)
+                metric = MetricTypes.MEAN_SQUARE_ERROR if parent_type is FedSGDRegressor else MetricTypes.ACCURACY
+                history_monitor = MagicMock()
+                vectorized.testing_routine(metric, {}, history_monitor, before_train=False)
+                self.assertEqual(history_monitor.add_scalar.call_args.kwargs['total_samples'], 24)
+
+    def test_sklearntrainingplancommonfunctionalities_08_one_shot_testing_routine(self):
+        """Metrics are computed once over the dataset, from predictions computed in chunks"""
+        rng = np.random.default_rng(0)
+        inputs = rng.normal(size=(50, 2))
+        target = rng.integers(0, 2, size=(50, 1))
+        for training_plan in self.training_plans:
+            training_plan.model().coef_ = rng.normal(size=training_plan.model().coef_.shape)
+            metric = MetricTypes.MEAN_SQUARE_ERROR if training_plan.parent_type is FedSGDRegressor \
+                else MetricTypes.ACCURACY
+            expected = Metrics().evaluate(target, training_plan.model().predict(inputs), metric=metric)
+            for batch_size, chunk_size in ((7, 50), (50, 8)):
+                loader = NPDataLoader(dataset=inputs, target=target, batch_size=batch_size)
+                training_plan.set_data_loaders(loader, loader)
+                history_monitor = MagicMock()
+                with patch('fedbiomed.common.training_plans._sklearn_training_plan.PREDICT_CHUNK_SIZE',
+                           chunk_size), \
+                        patch.object(training_plan, 'predict', wraps=training_plan.predict) as patch_predict:
+                    training_plan.testing_routine(metric, {}, history_monitor, before_train=False)
+                self.assertEqual(patch_predict.call_count, -(-50 // chunk_size))
+                history_monitor.add_scalar.assert_called_once_with(metric={metric.name: expected},
+                                                                   iteration=1,
+                                                                   epoch=None,
+                                                                   test=True,
+                                                                   test_on_local_updates=True,
+                                                                   test_on_global_updates=False,
+                                                                   total_samples=50,
+                                                                   batch_samples=50,
+                                                                   num_batches=1)
+
+    def test_sklearntrainingplancommonfunctionalities_09_warm_round_same_as_cold_round(self):
+        """A training plan initialized again for a new round trains as a newly instantiated one"""
+        rng = np.random.default_rng(0)
+        inputs = rng.normal(size=(8, 2))
+        for parent_type in self.implemented_models:
+            model_args = {**self.model_args[parent_type], 'learning_rate': 'optimal'}
+            if parent_type is FedSGDRegressor:
+                target = rng.normal(size=(8, 1))
+            else:
+                target = rng.integers(0, 2, size=(8, 1))
+
+            warm = self.subclass_types[parent_type]()
+            warm.post_init(dict(model_args), FakeTrainingArgs())
+            warm._train_over_batch(inputs, target, report=False)
+            self.assertEqual(warm._model.t_, 9.)
+            # next round: the node keeps the training plan, and loads the aggregated parameters
+            params = {key: getattr(warm._model, key).copy() for key in warm._param_list}
+            warm.post_init(dict(model_args), FakeTrainingArgs())
+            self.assertFalse(hasattr(warm._model, 't_'))
+            cold = self.subclass_types[parent_type]()
+            cold.post_init(dict(model_args), FakeTrainingArgs())
+            for plan in (warm, cold):
+                for key, val in params.items():
+                    setattr(plan._model, key, val.copy())
+                plan._train_over_batch(inputs, target, report=False)
+
+            self.assertEqual(warm._model.t_, cold._model.t_)
+            for key in warm._param_list:
+                self.assertTrue(np.array_equal(getattr(warm._model, key), getattr(cold._model, key)),
+                                f"{parent_type.__name__}: {key} differs between warm and cold rounds")
+
 
 class TestSklearnTrainingPlansRegression(unittest.TestCase):
     implemented_models = [FedSGDRegressor]
@@ -664,29 +833,24 @@ class TestSklearnTrainingPlansClassification(unittest.TestCase):
 
     def test_sklearnclassification_03_losses(self):
         for training_plan in self.training_plans:
-            batch_losses_stdout = [
-                ['loss: 1.0'],
-                ['loss: 0.0'],
-            ]
-            loss = training_plan._parse_batch_loss(batch_losses_stdout, None, None)
+            target = np.array([[0], [1]])
+            loss = training_plan._average_batch_loss(np.array([[1.0], [0.0]]), target)
             self.assertEqual(loss, 0.5)
 
-            batch_losses_stdout.append(['loss: inf'])
-            loss = training_plan._parse_batch_loss(batch_losses_stdout, None, None)
+            loss = training_plan._average_batch_loss(np.array([[1.0], [0.0], [np.inf]]), target)
             self.assertEqual(loss, np.inf)
 
-            batch_losses_stdout.append(['loss: nan'])
-            loss = training_plan._parse_batch_loss(batch_losses_stdout, None, None)
+            loss = training_plan._average_batch_loss(np.array([[1.0], [0.0], [np.inf], [np.nan]]), target)
             self.assertTrue(np.isnan(loss))
 
             with patch.object(training_plan, '_model_args', {'n_classes': 3}), \
                     patch.object(training_plan._model, 'classes_', np.array([0, 1, 2])):
-                batch_losses_stdout = [
-                    ['loss: 1.0', 'loss: 0.0', 'loss: 2.0'],
-                    ['loss: 0.0', 'loss: 1.0', 'epoch', 'loss: 0.0'],
-                ]
+                losses = np.array([
+                    [1.0, 0.0, 2.0],
+                    [0.0, 1.0, 0.0],
+                ])
                 target = np.array([[0], [2]])
-                loss = training_plan._parse_batch_loss(batch_losses_stdout, None, target)
+                loss = training_plan._average_batch_loss(losses, target)
                 # batch-average losses for each class are: [0.5, 0.5, 1.0]
                 # since we should have guessed once the first class, and once the last class, the final loss
                 # is the mean of 0.5 and 1.0, i.e. it should be 0.75
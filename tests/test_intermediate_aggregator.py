@@ -0,0 +1,147 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+#############################################################
+# Import NodeTestCase before importing FedBioMed Module
+from testsupport.base_case import NodeTestCase
+#############################################################
+
+import joblib
+import numpy as np
+import torch
+
+from fedbiomed.common.exceptions import FedbiomedTrainingPlanError
+from fedbiomed.common.message import NodeMessages
+from fedbiomed.common.training_plans import FedPerceptron
+from fedbiomed.node.environ import environ
+from fedbiomed.node.intermediate_aggregator import IntermediateAggregator
+
+
+class TestIntermediateAggregator(NodeTestCase):
+
+    def setUp(self):
+        self.messaging_patch = patch('fedbiomed.common.messaging.Messaging.__init__',
+                                     autospec=True,
+                                     return_value=None)
+        self.tasks_queue_patch = patch('fedbiomed.common.tasks_queue.TasksQueue.__init__',
+                                       autospec=True,
+                                       return_value=None)
+        self.messaging_patch.start()
+        self.tasks_queue_patch.start()
+
+        self.relay = IntermediateAggregator(round_timeout=1, reply_timeout=.1)
+        self.relay.messaging = MagicMock()
+        self.relay.children_messaging = MagicMock()
+        self.relay.repository = MagicMock()
+
+    def tearDown(self):
+        self.messaging_patch.stop()
+        self.tasks_queue_patch.stop()
+
+    def _child_replies(self, *replies):
+        """Makes child nodes reply when the relay sends them a message"""
+        def send_message(msg, client=None):
+            for reply in replies:
+                if client is None or reply['node_id'] == client:
+                    self.relay.on_child_message(reply, topic='general/researcher')
+        self.relay.children_messaging.send_message.side_effect = send_message
+
+    def _search(self):
+        search_reply = {'success': True, 'command': 'search', 'researcher_id': 'researcher',
+                        'count': 1}
+        self._child_replies(dict(search_reply, node_id='child-1', databases=[{'dataset_id': 'ds-1'}]),
+                            dict(search_reply, node_id='child-2', databases=[{'dataset_id': 'ds-2'}]))
+        return self.relay.relay_search(NodeMessages.request_create(
+            {'researcher_id': 'researcher', 'tags': ['tag'], 'command': 'search'}))
+
+    def _train_request(self):
+        return NodeMessages.request_create({
+            'researcher_id': 'researcher', 'job_id': 'job', 'params_url': 'http://params',
+            'training_args': {}, 'training_data': {environ['NODE_ID']: ['ds-1', 'ds-2']},
+            'training': True, 'model_args': {}, 'training_plan_url': 'http://tp',
+            'training_plan_class': 'TP', 'command': 'train', 'aggregator_args': {}})
+
+    def _train_reply(self, node_id, sample_size, success=True):
+        return {'researcher_id': 'researcher', 'job_id': 'job', 'success': success, 'node_id': node_id,
+                'dataset_id': 'ds', 'params_url': 'http://' + node_id, 'timing': {'rtime_training': 1.},
+                'sample_size': sample_size, 'msg': '', 'command': 'train'}
+
+    def test_intermediate_aggregator_01_search(self):
+        """Search requests are relayed and datasets of the children merged under the relay id"""
+        reply = self._search()
+
+        self.assertEqual(reply['node_id'], environ['NODE_ID'])
+        self.assertEqual(reply['count'], 2)
+        self.assertListEqual([d['dataset_id'] for d in reply['databases']], ['ds-1', 'ds-2'])
+        self.assertListEqual(self.relay.children(), ['child-1', 'child-2'])
+
+    def test_intermediate_aggregator_02_train(self):
+        """Train requests are relayed to children and their updates aggregated with summed sample size"""
+        self._search()
+        self._child_replies(self._train_reply('child-1', 10), self._train_reply('child-2', 30))
+        self.relay.children_messaging.send_message.reset_mock()
+
+        params = {'params_child-1': {'model_params': {'w': torch.tensor([1., 1.])}},
+                  'params_child-2': {'model_params': {'w': torch.tensor([5., 9.])}}}
+        training_plan = MagicMock()
+        training_plan.load.side_effect = lambda path, to_params: params[path]
+        self.relay.repository.download_file.side_effect = \
+            lambda url, filename: (200, 'params_' + url.replace('http://', ''))
+        self.relay.repository.upload_file.return_value = {'file': 'http://aggregated'}
+
+        with patch.object(IntermediateAggregator, '_load_training_plan', return_value=training_plan):
+            reply = self.relay.relay_training(self._train_request())
+
+        # one request per child node, restricted to its own dataset
+        sent = self.relay.children_messaging.send_message.call_args_list
+        self.assertEqual(len(sent), 2)
+        self.assertDictEqual(sent[0][0][0]['training_data'], {'child-1': ['ds-1']})
+        self.assertEqual(sent[0][1]['client'], 'child-1')
+
+        self.assertTrue(reply['success'])
+        self.assertEqual(reply['node_id'], environ['NODE_ID'])
+        self.assertEqual(reply['sample_size'], 40)
+        self.assertEqual(reply['params_url'], 'http://aggregated')
+        saved = training_plan.save.call_args[0][1]
+        self.assertTrue(torch.allclose(saved['model_params']['w'], torch.tensor([4., 7.])))
+
+    def test_intermediate_aggregator_03_train_failures(self):
+        """Failed or missing children are left out, unknown datasets are rejected"""
+        self._search()
+        self._child_replies(self._train_reply('child-1', 10, success=False))
+        self.relay._round_timeout = .1
+
+        reply = self.relay.relay_training(self._train_request())
+        self.assertFalse(reply['success'])
+        self.assertEqual(reply['sample_size'], None)
+
+        self.relay.children_messaging.send_message.reset_mock()
+        request = self._train_request()
+        request.training_data = {environ['NODE_ID']: ['unknown']}
+        reply = self.relay.relay_training(request)
+        self.assertFalse(reply['success'])
+        self.relay.children_messaging.send_message.assert_not_called()
+
+    def test_intermediate_aggregator_04_joblib_dumps_refused(self):
+        """Joblib dumps of sklearn models sent by children are refused, they are never unpickled"""
+        self._search()
+        self._child_replies(self._train_reply('child-1', 10), self._train_reply('child-2', 30))
+
+        training_plan = FedPerceptron()
+        training_plan.model().coef_ = np.array([[1., 2.]])
+        training_plan.model().intercept_ = np.array([.5])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            params_path = os.path.join(tmp_dir, 'node_params.pt')
+            joblib.dump(training_plan.model(), params_path)
+            self.relay.repository.download_file.return_value = (200, params_path)
+
+            with patch.object(IntermediateAggregator, '_load_training_plan', return_value=training_plan), \
+                    self.assertRaises(FedbiomedTrainingPlanError):
+                self.relay.relay_training(self._train_request())
+        self.relay.repository.upload_file.assert_not_called()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -2,11 +2,13 @@ import copy
 import inspect
 import os
 import shutil
+import tempfile
 from typing import Dict, Any
 import unittest
 from unittest.mock import patch, MagicMock
 import uuid
 
+import joblib
 import numpy as np
 import torch
 
@@ -21,6 +23,8 @@ from testsupport.fake_responses import FakeResponses
 from testsupport.fake_uuid import FakeUuid
 
 from fedbiomed.common.constants import ErrorNumbers
+from fedbiomed.common.exceptions import FedbiomedRepositoryError, FedbiomedTrainingPlanError
+from fedbiomed.common.training_plans import FedPerceptron
 from fedbiomed.researcher.environ import environ
 from fedbiomed.researcher.job import Job
 from fedbiomed.researcher.requests import Requests
@@ -445,6 +449,112 @@ class TestJob(ResearcherTestCase):
         self.assertEqual(mock_requests_send_message.call_count, 1)
         self.assertListEqual(nodes, ['node-1'])
 
+    @patch('fedbiomed.researcher.requests.Requests.send_message')
+    @patch('fedbiomed.researcher.requests.Requests.get_responses')
+    def test_job_10_start_training_round_with_deadline(self,
+                                                       mock_requests_get_responses,
+                                                       mock_requests_send_message):
+        """ Test Job - start_training_round method with a round deadline
+
+            Test - 1 : node-2 misses the deadline and is reported as straggler
+            Test - 2 : late reply of node-2 is kept and used in the next round, where node-2 straggles again
+            Test - 3 : late reply of node-2 is discarded, its fresh reply is used
+        """
+        self.fds.data = MagicMock(return_value={
+            'node-1': [{'dataset_id': '1234'}],
+            'node-2': [{'dataset_id': '12345'}]
+        })
+
+        def response(node_id: str) -> Dict[str, Any]:
+            return {'node_id': node_id, 'researcher_id': environ['RESEARCHER_ID'],
+                    'job_id': self.job._id, 'params_url': 'http://test.test',
+                    'timing': {'rtime_training': 12},
+                    'success': True,
+                    'msg': 'MSG',
+                    'dataset_id': '1234',
+                    'sample_size': 100,
+                    }
+
+        def responses_then_nothing(*replies):
+            return [FakeResponses(list(replies))] + [FakeResponses([])] * 10000
+
+        # Test - 1
+        self.job._nodes = ['node-1', 'node-2']
+        mock_requests_get_responses.side_effect = responses_then_nothing(response('node-1'))
+        nodes = self.job.start_nodes_training_round(1, aggregator_args_thr_msg={}, aggregator_args_thr_files={},
+                                                    timeout=0.05)
+        self.assertListEqual(nodes, ['node-1'])
+        self.assertDictEqual(self.job.stragglers, {1: ['node-2']})
+        self.assertEqual(len(self.job.training_replies[1]), 1)
+
+        # Test - 2
+        self.job._nodes = ['node-1', 'node-2']
+        mock_requests_get_responses.side_effect = responses_then_nothing(response('node-2'), response('node-1'))
+        nodes = self.job.start_nodes_training_round(2, aggregator_args_thr_msg={}, aggregator_args_thr_files={},
+                                                    timeout=0.05, late_replies_policy='keep')
+        self.assertListEqual(nodes, ['node-1', 'node-2'])
+        self.assertListEqual(self.job.stragglers[2], ['node-2'])
+        self.assertListEqual([r['node_id'] for r in self.job.training_replies[2]], ['node-1', 'node-2'])
+
+        # Test - 3
+        self.job._nodes = ['node-1', 'node-2']
+        fresh_reply = response('node-2')
+        fresh_reply['sample_size'] = 200
+        mock_requests_get_responses.side_effect = responses_then_nothing(response('node-2'), response('node-1'),
+                                                                         fresh_reply)
+        nodes = self.job.start_nodes_training_round(3, aggregator_args_thr_msg={}, aggregator_args_thr_files={},
+                                                    timeout=0.05, late_replies_policy='discard')
+        self.assertListEqual(nodes, ['node-1', 'node-2'])
+        self.assertListEqual(self.job.stragglers[3], [])
+        self.assertEqual(len(self.job.training_replies[3]), 2)
+        self.assertEqual(self.job.training_replies[3][1]['sample_size'], 200)
+        self.assertDictEqual(self.job._late_requests, {})
+
+    @patch('fedbiomed.researcher.requests.Requests.send_message')
+    @patch('fedbiomed.researcher.requests.Requests.get_responses')
+    def test_job_10_send_requests_then_collect_replies(self,
+                                                       mock_requests_get_responses,
+                                                       mock_requests_send_message):
+        """ Test Job - training requests sent ahead of collecting replies, prepare notice and nodes idle time"""
+        self.fds.data = MagicMock(return_value={
+            'node-1': [{'dataset_id': '1234'}],
+            'node-2': [{'dataset_id': '12345'}]
+        })
+        self.fds.node_ids = MagicMock(return_value=['node-1', 'node-2'])
+
+        def response(node_id: str) -> Dict[str, Any]:
+            return {'node_id': node_id, 'researcher_id': environ['RESEARCHER_ID'],
+                    'job_id': self.job._id, 'params_url': 'http://test.test',
+                    'timing': {'rtime_training': 12}, 'success': True, 'msg': 'MSG',
+                    'dataset_id': '1234', 'sample_size': 100}
+
+        self.job._nodes = ['node-1', 'node-2']
+        mock_requests_get_responses.return_value = FakeResponses([response('node-1'), response('node-2')])
+        self.job.send_training_requests(0, aggregator_args_thr_msg={}, aggregator_args_thr_files={})
+        self.assertEqual(mock_requests_send_message.call_count, 2)
+        mock_requests_get_responses.assert_not_called()
+
+        nodes = self.job.collect_training_replies(0)
+        self.assertListEqual(nodes, ['node-1', 'node-2'])
+        self.assertEqual(len(self.job.training_replies[0]), 2)
+        self.assertDictEqual(self.job.nodes_idle_time, {})
+
+        # prepare notice is sent to all nodes, without waiting for a reply
+        mock_requests_send_message.reset_mock()
+        self.job.send_prepare_notice()
+        self.assertEqual(mock_requests_send_message.call_count, 2)
+        notice, node_id = mock_requests_send_message.call_args[0]
+        self.assertEqual(node_id, 'node-2')
+        self.assertEqual(notice['command'], 'prepare')
+        self.assertDictEqual(notice['training_data'], {'node-2': ['12345']})
+        self.assertNotIn('params_url', notice)
+
+        # idle time is measured between the reply of a node and its next request
+        self.job.send_training_requests(1, aggregator_args_thr_msg={}, aggregator_args_thr_files={})
+        self.assertListEqual(list(self.job.nodes_idle_time.keys()), [1])
+        self.assertListEqual(sorted(self.job.nodes_idle_time[1].keys()), ['node-1', 'node-2'])
+        self.assertTrue(all(idle >= 0 for idle in self.job.nodes_idle_time[1].values()))
+
     def test_job_11_update_parameters_with_all_arguments(self):
         """ Testing update_parameters method with all available arguments"""
 
@@ -767,6 +877,61 @@ class TestJob(ResearcherTestCase):
         self.assertTrue(isinstance(sklearn_training_replies[0],
                                    Responses))
 
+    def test_job_16_release_training_replies(self):
+        """Testing node params of old rounds are released from memory and reloaded from file on access"""
+
+        self.job._training_plan = MagicMock()
+        self.job._training_plan.load.side_effect = lambda path, to_params: {'model_params': {'path': path}}
+
+        def reply(round_, node_id):
+            return {'node_id': node_id, 'params': {'w': round_}, 'params_path': f'/path/{node_id}_{round_}.pt'}
+
+        self.job._training_replies = {round_: Responses([reply(round_, 'node-1'), reply(round_, 'node-2')])
+                                      for round_ in range(3)}
+        self.job._training_replies[3] = Responses({'node_id': 'node-1', 'params': None, 'params_path': None})
+
+        self.job.release_training_replies(2)
+
+        # last 2 rounds are kept in memory, validation replies are left untouched
+        self.assertDictEqual(dict.get(self.job.training_replies[2][0], 'params'), {'w': 2})
+        self.assertIsNone(self.job.training_replies[3][0]['params'])
+        for round_ in range(2):
+            for index, node_id in enumerate(['node-1', 'node-2']):
+                released = self.job.training_replies[round_][index]
+                self.assertNotIn('params', dict.keys(released))
+                self.assertEqual(released['node_id'], node_id)
+                self.assertDictEqual(released['params'], {'path': f'/path/{node_id}_{round_}.pt'})
+        self.assertEqual(self.job.training_replies[0].get_index_from_node_id('node-2'), 1)
+
+        # released params are not saved in breakpoint
+        saved = self.job._save_training_replies(self.job.training_replies)
+        self.assertNotIn('params', saved[0][0])
+        self.assertEqual(saved[0][0]['params_path'], '/path/node-1_0.pt')
+
+        # reloading a breakpoint only loads the last rounds in memory
+        func_load_params = MagicMock(side_effect=lambda path, to_params: {'model_params': {'path': path}})
+        loaded = Job._load_training_replies(saved[:3], func_load_params, retain_rounds=1)
+        self.assertEqual(func_load_params.call_count, 2)
+        self.assertNotIn('params', dict.keys(loaded[1][1]))
+        self.assertDictEqual(loaded[1][1]['params'], {'path': '/path/node-2_1.pt'})
+        self.assertDictEqual(dict.get(loaded[2][1], 'params'), {'path': '/path/node-2_2.pt'})
+
+    @patch('fedbiomed.common.repository.Repository.download_file')
+    def test_job_16_download_profiles(self, download_file_patch):
+        """Testing profiling traces sent by nodes are downloaded"""
+        download_file_patch.side_effect = lambda url, filename: (200, os.path.join('/tmp', filename))
+        self.job._training_replies = {0: Responses([{'node_id': 'node-1', 'profile_url': 'http://repo/a.json'},
+                                                    {'node_id': 'node-2', 'profile_url': None},
+                                                    {'node_id': 'node-3'}])}
+
+        profiles = self.job.download_profiles(0)
+        self.assertDictEqual(profiles, {'node-1': '/tmp/node_profile_node-1_round_0.json'})
+        download_file_patch.assert_called_once_with('http://repo/a.json', 'node_profile_node-1_round_0.json')
+        self.assertDictEqual(self.job.download_profiles(1), {})
+
+        download_file_patch.side_effect = FedbiomedRepositoryError
+        self.assertDictEqual(self.job.download_profiles(0), {})
+
     @patch('fedbiomed.researcher.job.Job._load_training_replies')
     @patch('fedbiomed.researcher.job.Job.update_parameters')
     def test_job_17_load_state(
@@ -883,6 +1048,76 @@ class TestJob(ResearcherTestCase):
                     self.assertEqual(t_a[node_id][var]['filename'], filename)
                     self.assertEqual(t_a[node_id][var]['url'], self.job.repo.uploads_url)
 
+    def test_job_20_joblib_dumps_only_loaded_from_breakpoints(self):
+        """Joblib dumps of sklearn models are refused when sent by nodes, and loaded from breakpoints"""
+        training_plan = FedPerceptron()
+        training_plan._param_list = ['coef_', 'intercept_']
+        training_plan.model().coef_ = np.array([[1., 2.]])
+        training_plan.model().intercept_ = np.array([.5])
+        self.job._training_plan = training_plan
+
+        message = {'node_id': 'node-1', 'params_url': 'http://test.test', 'timing': {'rtime_total': 12},
+                   'success': True, 'msg': 'MSG', 'dataset_id': '1234', 'sample_size': 100}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            params_path = os.path.join(tmp_dir, 'node_params.pt')
+            self.mock_download_file.return_value = (200, params_path)
+
+            joblib.dump(training_plan.model(), params_path)
+            with self.assertRaises(FedbiomedTrainingPlanError):
+                self.job._load_node_params(params_path)
+            self.assertIsNone(self.job._create_training_reply(message, 1., True))
+
+            params = self.job.load_breakpoint_params(params_path)['model_params']
+            self.assertTrue(np.array_equal(params['coef_'], np.array([[1., 2.]])))
+
+            # parameters files are loaded from nodes
+            training_plan.save(params_path, params={'coef_': np.zeros((1, 2)), 'intercept_': np.zeros(1)})
+            reply = self.job._create_training_reply(message, 1., True)
+            self.assertTrue(np.array_equal(reply[0]['params']['coef_'], np.zeros((1, 2))))
+            self.assertTrue(np.array_equal(self.job._load_node_params(params_path)['intercept_'], np.zeros(1)))
+
+
+    @patch('fedbiomed.researcher.requests.Requests.send_message')
+    def test_job_21_send_end_notice(self, mock_requests_send_message):
+        """ Test Job - job end notice is sent to all nodes"""
+        self.fds.node_ids = MagicMock(return_value=['node-1', 'node-2'])
+        self.job.send_end_notice()
+        self.assertEqual(mock_requests_send_message.call_count, 2)
+        notice, node_id = mock_requests_send_message.call_args[0]
+        self.assertEqual(node_id, 'node-2')
+        self.assertDictEqual(notice, {'researcher_id': self.job._researcher_id, 'job_id': self.job._id,
+                                      'command': 'job-end'})
+
+
+    @patch('fedbiomed.common.logger.logger.info')
+    def test_job_22_mixed_precision_speedup(self, mock_logger_info):
+        """ Test Job - throughput ratio of mixed and full precision trainings of a node is reported"""
+        def timing(samples_per_second, mixed_precision=None):
+            timing = {'rtime_forward': 1., 'rtime_backward_step': 1., 'samples_per_second': samples_per_second}
+            if mixed_precision is not None:
+                timing['mixed_precision'] = mixed_precision
+            return timing
+
+        # only one precision is known
+        fp32_timing = timing(100.)
+        self.job._log_training_timing('node-1', fp32_timing)
+        self.assertNotIn('mixed_precision_speedup', fp32_timing)
+        self.job._log_training_timing('node-2', timing(150., 'bf16'))
+
+        bf16_timing = timing(180., 'bf16')
+        self.job._log_training_timing('node-1', bf16_timing)
+        self.assertAlmostEqual(bf16_timing['mixed_precision_speedup'], 1.8)
+        self.assertIn('bf16 vs fp32 throughput: 1.80x', mock_logger_info.call_args[0][0])
+
+        # last throughput of each precision is used
+        fp32_timing = timing(90.)
+        self.job._log_training_timing('node-1', fp32_timing)
+        self.assertAlmostEqual(fp32_timing['mixed_precision_speedup'], 2.)
+
+        node_2_timing = timing(50., 'bf16')
+        self.job._log_training_timing('node-2', node_2_timing)
+        self.assertNotIn('mixed_precision_speedup', node_2_timing)
+
 
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
@@ -0,0 +1,54 @@
+import copy
+import pickle
+import unittest
+from unittest.mock import MagicMock
+
+#############################################################
+# Import ResearcherTestCase before importing any FedBioMed Module
+from testsupport.base_case import ResearcherTestCase
+#############################################################
+
+from fedbiomed.researcher.lazy_params import LazyParams
+
+
+class TestLazyParams(ResearcherTestCase):
+    """Tests the lazy handles of parameters released from memory"""
+
+    def setUp(self):
+        self.loader = MagicMock(side_effect=lambda path: {'loaded_from': path})
+        self.entry = LazyParams({'params': {'w': 1}, 'params_path': '/path/params.pt', 'node_id': 'node-1'},
+                                self.loader)
+
+    def test_lazy_params_01_access(self):
+        """Params are dropped from memory and reloaded from file on each access"""
+        self.assertIsInstance(self.entry, dict)
+        self.assertNotIn('params', dict.keys(self.entry))
+        self.loader.assert_not_called()
+
+        self.assertDictEqual(self.entry['params'], {'loaded_from': '/path/params.pt'})
+        self.assertDictEqual(self.entry.get('params'), {'loaded_from': '/path/params.pt'})
+        self.assertEqual(self.loader.call_count, 2)
+
+        self.assertIn('params', self.entry)
+        self.assertEqual(self.entry['node_id'], 'node-1')
+        self.assertEqual(self.entry.params_path, '/path/params.pt')
+        self.assertIsNone(self.entry.get('unknown'))
+        with self.assertRaises(KeyError):
+            self.entry['unknown']
+
+    def test_lazy_params_02_copy(self):
+        """Copies keep the loader without loading params, pickling gives a dict without params"""
+        entry_copy = copy.deepcopy(self.entry)
+        self.assertIsInstance(entry_copy, LazyParams)
+        self.loader.assert_not_called()
+        entry_copy.pop('params', None)
+        self.assertEqual(entry_copy['node_id'], 'node-1')
+        self.assertDictEqual(entry_copy['params'], {'loaded_from': '/path/params.pt'})
+
+        unpickled = pickle.loads(pickle.dumps(self.entry))
+        self.assertIs(type(unpickled), dict)
+        self.assertDictEqual(unpickled, {'params_path': '/path/params.pt', 'node_id': 'node-1'})
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 import numpy as np
+from scipy import sparse
 from unittest.mock import patch
 
 from fedbiomed.common.metrics import Metrics, MetricTypes, _MetricCategory # noqa
@@ -420,6 +421,15 @@ class TestMetrics(unittest.TestCase):
         with self.assertRaises(FedbiomedMetricError):
             self.metrics.mse(y_true, y_pred)
 
+    def test_metrics_18_evaluate_sparse(self):
+        """Sparse targets and predictions are evaluated as dense arrays"""
+        y_true = np.array([[0, 1], [1, 0], [0, 1], [1, 0]])
+        y_pred = np.array([[0, 1], [1, 0], [1, 0], [1, 0]])
+        for metric in (MetricTypes.ACCURACY, MetricTypes.MEAN_SQUARE_ERROR):
+            self.assertTrue(np.allclose(
+                self.metrics.evaluate(sparse.csr_matrix(y_true), sparse.csr_matrix(y_pred), metric),
+                self.metrics.evaluate(y_true, y_pred, metric)))
+
 
 class TestMetricTypes(unittest.TestCase):
     """ Testing Enum Class MetricTypes """
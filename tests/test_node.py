@@ -516,7 +516,9 @@ class TestNode(NodeTestCase):
                                        unittest.mock.ANY,  # this is for HistoryMonitor
                                        None,
                                        None,
-                                       dlp_and_loading_block_metadata=None)
+                                       dlp_and_loading_block_metadata=None,
+                                       session_cache=self.n2._session_cache,
+                                       round_number=None)
 
         # check if object `Round()` has been called twice
         self.assertEqual(round_patch.call_count, 2)
@@ -532,6 +534,45 @@ class TestNode(NodeTestCase):
         # check id retrieve object is a HistoryMonitor object
         self.assertIsInstance(history_monitor_ref, HistoryMonitor)
 
+    @patch('fedbiomed.node.round.Round.prepare')
+    @patch('fedbiomed.node.history_monitor.HistoryMonitor.__init__', return_value=None)
+    def test_node_12_prepare_then_parser_task_train(self, history_monitor_patch, round_prepare_patch):
+        """Tests rounds prepared by a prepare notice are used by the matching train request only"""
+        request = {
+            'model_args': {'lr': 0.1},
+            'training_args': {'some_value': 1234},
+            'training_plan_url': 'https://link.to.somewhere.where.my.model',
+            'training_plan_class': 'my_test_training_plan',
+            'job_id': 'job_id_1234',
+            'researcher_id': 'researcher_id_1234',
+            'training_data': {environ['NODE_ID']: ['dataset_id_1234']}
+        }
+        train_request = dict(request, command='train', training=True, aggregator_args={},
+                             params_url='https://link.to_somewhere.where.my.model.parameters.is')
+
+        round_prepare_patch.return_value = None
+        self.n1._task_prepare(NodeMessages.request_create(dict(request, command='prepare')))
+        round_prepare_patch.assert_called_once()
+        prepared_round = self.n1._prepared_rounds['dataset_id_1234'][1]
+        self.assertIsNone(prepared_round.params_url)
+
+        self.n1.parser_task_train(NodeMessages.request_create(train_request))
+        self.assertListEqual(self.n1.rounds, [prepared_round])
+        self.assertEqual(prepared_round.params_url, train_request['params_url'])
+        self.assertDictEqual(self.n1._prepared_rounds, {})
+
+        # prepared round does not match the train request: a new round is created
+        self.n1._task_prepare(NodeMessages.request_create(dict(request, command='prepare', job_id='other_job')))
+        self.n1.parser_task_train(NodeMessages.request_create(train_request))
+        self.assertEqual(len(self.n1.rounds), 1)
+        self.assertIsNot(self.n1.rounds[0], prepared_round)
+        self.assertIsNot(self.n1.rounds[0], self.n1._prepared_rounds.get('dataset_id_1234'))
+
+        # failed preparation is not kept
+        round_prepare_patch.return_value = 'Cannot download training plan file'
+        self.n1._task_prepare(NodeMessages.request_create(dict(request, command='prepare')))
+        self.assertDictEqual(self.n1._prepared_rounds, {})
+
     @patch('fedbiomed.common.messaging.Messaging.send_message')
     @patch('fedbiomed.common.message.NodeMessages.reply_create')
     @patch('fedbiomed.node.history_monitor.HistoryMonitor.__init__')
@@ -627,8 +668,9 @@ class TestNode(NodeTestCase):
                                             unittest.mock.ANY,  # FIXME: should be an history monitor object
                                             None,
                                             None,
-                                            dlp_and_loading_block_metadata=None
-                                            )
+                                            dlp_and_loading_block_metadata=None,
+                                            session_cache=self.n1._session_cache,
+                                            round_number=None)
 
     @patch('fedbiomed.node.round.Round.__init__')
     @patch('fedbiomed.node.history_monitor.HistoryMonitor.__init__', spec=True)
@@ -676,7 +718,9 @@ class TestNode(NodeTestCase):
                                             dict_msg_1_dataset['researcher_id'],
                                             unittest.mock.ANY,  # FIXME: should be an history_monitor object
                                             None, None,
-                                            dlp_and_loading_block_metadata=None)
+                                            dlp_and_loading_block_metadata=None,
+                                            session_cache=self.n1._session_cache,
+                                            round_number=None)
 
     @patch('fedbiomed.node.history_monitor.HistoryMonitor.__init__')
     @patch('fedbiomed.common.message.NodeMessages.request_create')
@@ -1607,6 +1651,43 @@ class TestNode(NodeTestCase):
         # checks
         messaging_send_msg_patch.assert_called_once_with(secagg_delete_reply)
 
+    @patch('fedbiomed.node.round.Round.discard')
+    @patch('fedbiomed.node.round.Round.prepare', return_value=None)
+    @patch('fedbiomed.node.node.Node.add_task')
+    def test_node_36_task_job_end(self, node_add_task_patch, round_prepare_patch, round_discard_patch):
+        """Tests job end notices release the sessions and prepared rounds of the job only"""
+        notice = {'command': 'job-end', 'researcher_id': 'researcher_id_1234', 'job_id': 'job_id_1234'}
+        self.n1.on_message(notice)
+        node_add_task_patch.assert_called_once_with(notice)
+
+        request = {
+            'command': 'prepare',
+            'model_args': {},
+            'training_args': {},
+            'training_plan_url': 'https://link.to.somewhere.where.my.model',
+            'training_plan_class': 'my_test_training_plan',
+            'job_id': 'job_id_1234',
+            'researcher_id': 'researcher_id_1234',
+            'training_data': {environ['NODE_ID']: ['dataset_id_1234']}
+        }
+        self.n1._session_cache = MagicMock()
+        self.n1._task_prepare(NodeMessages.request_create(request))
+
+        self.n1._task_job_end(NodeMessages.request_create(dict(notice, job_id='other_job')))
+        self.n1._session_cache.evict_job.assert_called_once_with('other_job')
+        self.assertIn('dataset_id_1234', self.n1._prepared_rounds)
+        round_discard_patch.assert_not_called()
+
+        self.n1._task_job_end(NodeMessages.request_create(notice))
+        self.n1._session_cache.evict_job.assert_called_with('job_id_1234')
+        self.assertDictEqual(self.n1._prepared_rounds, {})
+        round_discard_patch.assert_called_once()
+
+        # rounds prepared for a notice that is not followed by a matching train request are discarded
+        self.n1._task_prepare(NodeMessages.request_create(request))
+        self.n1._task_prepare(NodeMessages.request_create(request))
+        self.assertEqual(round_discard_patch.call_count, 2)
+
 
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
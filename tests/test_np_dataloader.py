@@ -1,11 +1,15 @@
 import functools
+import itertools
+import os
+import tempfile
 import unittest
 import logging
 
 import numpy as np
+from scipy import sparse
 
 from fedbiomed.common.exceptions import FedbiomedValueError, FedbiomedTypeError
-from fedbiomed.common.data import NPDataLoader
+from fedbiomed.common.data import NPDataLoader, NPSubset
 
 
 class TestNPDataLoader(unittest.TestCase):
@@ -238,6 +242,104 @@ class TestNPDataLoader(unittest.TestCase):
         self.assertEqual(epoch, 1)
         self.assertEqual(len(dataloader), 0)
 
+    def test_npdataloader_05_materialize(self):
+        """Materialized epochs yield the same batches as fancy indexing, as contiguous views of reused buffers"""
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(23, 4))
+        y = rng.integers(0, 3, size=(23, 1))
+
+        for shuffle in (False, True):
+            for drop_last in (False, True):
+                loaders = [NPDataLoader(dataset=X, target=y, batch_size=5, shuffle=shuffle, random_seed=1,
+                                        drop_last=drop_last, materialize=materialize)
+                           for materialize in (False, True)]
+                self.assertTrue(loaders[1].materialize())
+                buffers = None
+                for epoch in range(3):
+                    batches = [list(loader) for loader in loaders]
+                    self.assertEqual(len(batches[0]), len(batches[1]))
+                    for (data, target), (mdata, mtarget) in zip(*batches):
+                        self.assertNPArrayEqual(data, mdata)
+                        self.assertNPArrayEqual(target, mtarget)
+                        self.assertEqual(mtarget.dtype, y.dtype)
+                        self.assertTrue(mdata.flags['C_CONTIGUOUS'])
+                        if not shuffle:
+                            # batches are views of the dataset
+                            self.assertTrue(np.shares_memory(mdata, X))
+                    if shuffle:
+                        self.assertFalse(np.shares_memory(mdata, X))
+                        # buffers are allocated once
+                        if buffers is None:
+                            buffers = loaders[1]._buffers
+                        self.assertIs(buffers, loaders[1]._buffers)
+
+    def test_npdataloader_06_dtype(self):
+        """Features are cast to the type of the loader, targets keep their type"""
+        X = np.arange(14.).reshape(7, 2)
+        for materialize in (False, True):
+            for shuffle in (False, True):
+                loader = NPDataLoader(dataset=X, target=np.arange(7), batch_size=3, shuffle=shuffle,
+                                      materialize=materialize, dtype='float32')
+                self.assertEqual(loader.dtype(), np.float32)
+                self.assertEqual(loader.dataset.dtype, np.float64)
+                for data, target in loader:
+                    self.assertEqual(data.dtype, np.float32)
+                    self.assertEqual(target.dtype, np.arange(7).dtype)
+                    self.assertNPArrayEqual(data, X[target.ravel()].astype(np.float32))
+
+        # unshuffled epochs of a memory-mapped dataset are not cast at once, but batch per batch
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            np.save(os.path.join(tmp_dir, 'X.npy'), X)
+            mapped = np.load(os.path.join(tmp_dir, 'X.npy'), mmap_mode='r')
+            loader = NPDataLoader(dataset=mapped, target=np.arange(7), batch_size=3, materialize=True,
+                                  dtype='float32')
+            batches = list(loader)
+            self.assertIs(loader._features, mapped)
+            self.assertNPArrayEqual(np.concatenate([data for data, _ in batches]), X.astype(np.float32))
+            self.assertTrue(all(data.dtype == np.float32 for data, _ in batches))
+            del mapped, loader
+
+        with self.assertRaises(FedbiomedTypeError):
+            NPDataLoader(dataset=X, target=X, dtype='not-a-type')
+        with self.assertRaises(FedbiomedValueError):
+            NPDataLoader(dataset=X, target=X, dtype=np.int32)
+        with self.assertRaises(FedbiomedTypeError):
+            NPDataLoader(dataset=X, target=X, materialize='True')
+
+    def test_npdataloader_07_sparse(self):
+        """Sparse datasets are batched as CSR matrices, with the same rows as dense datasets"""
+        X = sparse.random(23, 40, density=.1, format='coo', random_state=0)
+        y = np.arange(23)
+        for shuffle, materialize in itertools.product((False, True), (False, True)):
+            loaders = [NPDataLoader(dataset=dataset, target=y, batch_size=5, shuffle=shuffle, random_seed=1,
+                                    materialize=materialize, dtype='float32')
+                       for dataset in (X, X.toarray())]
+            self.assertIsInstance(loaders[0].dataset, sparse.csr_matrix)
+            self.assertEqual(len(loaders[0]), 5)
+            for epoch in range(2):
+                batches = [list(loader) for loader in loaders]
+                for (data, target), (dense_data, dense_target) in zip(*batches):
+                    self.assertIsInstance(data, sparse.csr_matrix)
+                    self.assertEqual(data.dtype, np.float32)
+                    self.assertNPArrayEqual(data.toarray(), dense_data)
+                    self.assertNPArrayEqual(target, dense_target)
+
+        with self.assertRaises(FedbiomedValueError):
+            NPDataLoader(dataset=X, target=y[:5])
+
+    def test_npdataloader_08_classes(self):
+        """Unique labels are computed from the target once, or set by the data manager"""
+        X = np.arange(20).reshape(10, 2)
+        y = np.array([3, 1, 1, 0, 3, 3, 1, 0, 0, 1]).reshape(-1, 1)
+        loader = NPDataLoader(dataset=X, target=y, batch_size=3)
+        self.assertNPArrayEqual(loader.classes(), np.array([0, 1, 3]))
+        self.assertIs(loader.classes(), loader.classes())
+
+        loader.set_classes([4, 0, 1, 3])
+        self.assertNPArrayEqual(loader.classes(), np.array([0, 1, 3, 4]))
+
+        loader = NPDataLoader(dataset=NPSubset(X, [0, 1, 2]), target=NPSubset(y, [0, 1, 2]))
+        self.assertNPArrayEqual(loader.classes(), np.array([1, 3]))
 
 
 if __name__ == '__main__':  # pragma: no cover
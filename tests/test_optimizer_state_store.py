@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import torch
+
+#############################################################
+# Import NodeTestCase before importing FedBioMed Module
+from testsupport.base_case import NodeTestCase
+#############################################################
+
+from fedbiomed.node.optimizer_state_store import OptimizerStateStore
+
+
+class TestOptimizerStateStore(NodeTestCase):
+    """Tests the storage of optimizer states on the node"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = OptimizerStateStore(self.tmp_dir.name)
+        self.state = {'optimizer': 'Adam', 'state': {'weight': {'exp_avg': torch.ones(2)}}}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_optimizer_state_store_01_save_load(self):
+        """States are saved per job and dataset, and loaded at the next round"""
+        self.assertIsNone(self.store.load('job-1', 'dataset-1', 2))
+
+        self.store.save('job-1', 'dataset-1', 1, self.state)
+        self.assertIsNone(self.store.load('job-1', 'dataset-2', 2))
+        self.assertIsNone(self.store.load('job-2', 'dataset-1', 2))
+
+        state = self.store.load('job-1', 'dataset-1', 2)
+        self.assertTrue(torch.equal(state['state']['weight']['exp_avg'], torch.ones(2)))
+        self.assertListEqual(os.listdir(os.path.join(self.tmp_dir.name, 'job-1')), ['dataset-1.pt'])
+
+        # round numbers unknown: staleness is not checked
+        self.assertIsNotNone(self.store.load('job-1', 'dataset-1', None))
+
+        self.store.remove('job-1', 'dataset-1')
+        self.assertIsNone(self.store.load('job-1', 'dataset-1', 2))
+
+    def test_optimizer_state_store_02_staleness(self):
+        """Stale states are discarded"""
+        self.store.save('job-1', 'dataset-1', 1, self.state)
+        self.assertIsNotNone(self.store.load('job-1', 'dataset-1', 4, max_staleness=2))
+        # node skipped too many rounds
+        self.assertIsNone(self.store.load('job-1', 'dataset-1', 5, max_staleness=2))
+        self.assertIsNone(self.store.load('job-1', 'dataset-1', 2, max_staleness=2))
+
+        # state from a later round (eg. experiment resumed from a breakpoint)
+        self.store.save('job-1', 'dataset-1', 3, self.state)
+        self.assertIsNone(self.store.load('job-1', 'dataset-1', 3))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,109 @@
+from testsupport.base_case import ResearcherTestCase
+
+import copy
+import unittest
+
+import numpy as np
+import torch
+from torch.nn import Linear
+
+from fedbiomed.common.exceptions import FedbiomedAggregatorError
+from fedbiomed.researcher.aggregators import CoordinateMedian, TrimmedMean, Krum
+from fedbiomed.researcher.aggregators.functional import iter_chunks, pairwise_squared_distances
+
+
+class TestRobustAggregators(ResearcherTestCase):
+    """Test the byzantine-robust aggregators"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.model = Linear(10, 3)
+        # honest nodes are small perturbations of the same model, the last node is byzantine
+        self.models = {}
+        for i in range(5):
+            self.models[f'node_{i}'] = {key: val + 0.01 * torch.randn(val.shape)
+                                        for key, val in self.model.state_dict().items()}
+        self.models['byzantine'] = {key: val + 1000. for key, val in self.model.state_dict().items()}
+        self.weights = {node_id: 1 / len(self.models) for node_id in self.models}
+
+    def _stacked(self, key):
+        return torch.stack([params[key] for params in self.models.values()])
+
+    def test_robust_aggregators_01_iter_chunks(self):
+        """Chunks cover the flat buffer of each model, whatever the chunk size"""
+        params = list(self.models.values())
+        flat = torch.stack([torch.cat([val.reshape(-1) for val in p.values()]) for p in params])
+        for chunk_size in (1, 7, 33, 10 ** 6):
+            chunks = [chunk.clone() for _, _, chunk in iter_chunks(params, chunk_size)]
+            self.assertTrue(torch.equal(torch.cat(chunks, dim=1), flat))
+
+        distances = pairwise_squared_distances(params, chunk_size=7)
+        self.assertTrue(torch.allclose(distances, torch.cdist(flat.double(), flat.double()) ** 2, rtol=1e-4))
+
+    def test_robust_aggregators_02_median(self):
+        """Coordinate-wise median, with an even number of nodes"""
+        aggregated = CoordinateMedian(chunk_size=4).aggregate(self.models, self.weights)
+        for key, val in aggregated.items():
+            self.assertTrue(torch.allclose(val, self._stacked(key).median(dim=0).values, atol=0.02))
+            self.assertTrue(torch.allclose(val, torch.quantile(self._stacked(key), .5, dim=0)))
+
+    def test_robust_aggregators_03_trimmed_mean(self):
+        """Coordinate-wise trimmed mean discards the byzantine values"""
+        aggregated = TrimmedMean(trim_ratio=.2, chunk_size=5).aggregate(self.models, self.weights)
+        for key, val in aggregated.items():
+            expected = self._stacked(key).sort(dim=0).values[1:-1].mean(dim=0)
+            self.assertTrue(torch.allclose(val, expected))
+            self.assertTrue(torch.allclose(val, self.model.state_dict()[key], atol=0.05))
+
+        with self.assertRaises(FedbiomedAggregatorError):
+            TrimmedMean(trim_ratio=.5)
+        with self.assertRaises(FedbiomedAggregatorError):
+            TrimmedMean(chunk_size=0)
+
+    def test_robust_aggregators_04_krum(self):
+        """(Multi-)Krum selects honest nodes"""
+        krum = Krum(n_byzantine=1, n_selected=1, chunk_size=8)
+        aggregated = krum.aggregate(self.models, self.weights)
+        self.assertEqual(len(krum.last_selection()), 1)
+        self.assertNotIn('byzantine', krum.last_selection())
+        node_id = krum.last_selection()[0]
+        for key, val in aggregated.items():
+            self.assertTrue(torch.allclose(val, self.models[node_id][key]))
+
+        multi_krum = Krum(n_byzantine=1, n_selected=3)
+        aggregated = multi_krum.aggregate(self.models, self.weights)
+        self.assertEqual(len(multi_krum.last_selection()), 3)
+        self.assertNotIn('byzantine', multi_krum.last_selection())
+
+        # not enough nodes
+        with self.assertRaises(FedbiomedAggregatorError):
+            Krum(n_byzantine=2).aggregate(self.models, self.weights)
+
+    def test_robust_aggregators_05_sklearn(self):
+        """Aggregation of numpy parameters keeps their types"""
+        model_params = {'node_1': {'coef_': np.array([3., 8., 8.]), 'intercept_': np.array([4.])},
+                        'node_2': {'coef_': np.array([0.4, 1.6, 2.]), 'intercept_': np.array([1.])},
+                        'node_3': {'coef_': np.array([2., 5., 5.]), 'intercept_': np.array([6.])}}
+        aggregated = CoordinateMedian().aggregate(model_params, {})
+        self.assertIsInstance(aggregated['coef_'], np.ndarray)
+        self.assertEqual(aggregated['coef_'].dtype, np.float64)
+        self.assertTrue(np.allclose(aggregated['coef_'], [2., 5., 5.]))
+        self.assertTrue(np.allclose(aggregated['intercept_'], [4.]))
+
+        model_params['node_3'] = {'coef_': np.array([2., 5.]), 'intercept_': np.array([6.])}
+        with self.assertRaises(FedbiomedAggregatorError):
+            CoordinateMedian().aggregate(model_params, {})
+
+    def test_robust_aggregators_06_save_load_state(self):
+        """Hyper-parameters are saved in breakpoints and not sent to the nodes"""
+        krum = Krum(n_byzantine=1, n_selected=2, chunk_size=100)
+        self.assertEqual(krum.create_aggregator_args(), ({}, {}))
+        state = krum.save_state(training_plan=None, breakpoint_path=None, global_model=None)
+
+        loaded = Krum()
+        loaded.load_state(copy.deepcopy(state))
+        self.assertDictEqual(loaded._aggregator_args, {'chunk_size': 100, 'n_byzantine': 1, 'n_selected': 2})
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
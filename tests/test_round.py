@@ -3,6 +3,8 @@ import copy
 import inspect
 import logging
 import os
+import sys
+import types
 from typing import Any, Dict
 import unittest
 from unittest.mock import MagicMock, patch
@@ -19,9 +21,11 @@ from testsupport.fake_uuid import FakeUuid
 
 from fedbiomed.node.environ import environ
 from fedbiomed.node.round import Round
+from fedbiomed.node.session_cache import SessionCache
 from fedbiomed.common.logger import logger
 from fedbiomed.common.data import DataManager, DataLoadingPlanMixin, DataLoadingPlan
-from fedbiomed.common.constants import DatasetTypes
+from fedbiomed.common.constants import DatasetTypes, TrainingPlans
+from fedbiomed.common.training_plans._phase_timer import TrainingPhaseTimer
 from testsupport.testing_data_loading_block import ModifyGetItemDP, LoadingBlockTypesForTesting
 
 
@@ -720,5 +724,210 @@ class TestRound(NodeTestCase):
         self.assertEqual(msg, '')
 
 
+    @patch('fedbiomed.node.round.Round._split_train_and_test_data')
+    @patch('fedbiomed.common.message.NodeMessages.reply_create')
+    @patch('fedbiomed.common.repository.Repository.upload_file')
+    @patch('fedbiomed.node.training_plan_security_manager.TrainingPlanSecurityManager.check_training_plan_status')
+    @patch('fedbiomed.common.repository.Repository.download_file')
+    @patch('uuid.uuid4')
+    def test_round_12_warm_session(self,
+                                   uuid_patch,
+                                   repository_download_patch,
+                                   tp_security_manager_patch,
+                                   repository_upload_patch,
+                                   node_msg_patch,
+                                   mock_split_train_and_test_data):
+        """Tests training plan and data loaders are reused by next rounds of the job, until the plan changes"""
+        uuid_patch.return_value = FakeUuid()
+        repository_download_patch.side_effect = lambda url, filename: (200, os.path.join(environ['TMP_DIR'], filename))
+        tp_security_manager_patch.return_value = (True, {'name': "model_name"})
+        repository_upload_patch.return_value = {'file': TestRound.URL_MSG}
+        node_msg_patch.side_effect = TestRound.node_msg_side_effect
+        mock_split_train_and_test_data.return_value = (FakeLoader, FakeLoader)
+
+        dummy_training_plan_test = \
+            "class MyTrainingPlan:\n" + \
+            "   instances = 0\n" + \
+            "   def __init__(self):\n" + \
+            "       MyTrainingPlan.instances += 1\n" + \
+            "   def post_init(self, model_args, training_args, aggregator_args=None):\n" + \
+            "       self.aggregator_args = aggregator_args\n" + \
+            "   def load(self, *args, **kwargs):\n" + \
+            "       pass\n" + \
+            "   def save(self, *args, **kwargs):\n" + \
+            "       pass\n" + \
+            "   def training_routine(self, *args, **kwargs):\n" + \
+            "       pass\n" + \
+            "   def set_data_loaders(self, train_data_loader, test_data_loader):\n" + \
+            "       self.training_data_loader = train_data_loader\n" + \
+            "       self.testing_data_loader = test_data_loader\n" + \
+            "   def set_dataset_path(self, *args, **kwargs):\n" + \
+            "       pass\n" + \
+            "   def optimizer_args(self):\n" + \
+            "       pass\n" + \
+            "   def after_training_params(self):\n" + \
+            "       return [1,2,3,4]\n"
+        module_file_path = os.path.join(environ['TMP_DIR'], 'training_plan_' + str(FakeUuid.VALUE) + '.py')
+        with open(module_file_path, "w") as f:
+            f.write(dummy_training_plan_test)
+
+        # module may have been imported by another test
+        sys.modules.pop('training_plan_' + str(FakeUuid.VALUE), None)
+        cache = SessionCache()
+        self.r1._session_cache = cache
+
+        # first round creates the session, next round reuses it with new aggregator args
+        for aggregator_args in ({'aggregator_name': 'fedavg'}, {'aggregator_name': 'scaffold'}):
+            self.r1.aggregator_args = aggregator_args
+            msg_test = self.r1.run_model_training()
+            self.assertTrue(msg_test.get('success', False))
+            self.assertIsNone(self.r1.training_plan)
+        self.assertEqual(len(cache), 1)
+        mock_split_train_and_test_data.assert_called_once()
+        session = cache.get(self.r1._session_key)
+        self.assertEqual(session['training_plan'].instances, 1)
+        self.assertDictEqual(session['training_plan'].aggregator_args, {'aggregator_name': 'scaffold'})
+        cache.put(self.r1._session_key, session)
+
+        # training plan file changed: session is invalidated
+        with open(module_file_path, "a") as f:
+            f.write("# changed\n")
+        msg_test = self.r1.run_model_training()
+        self.assertTrue(msg_test.get('success', False))
+        self.assertEqual(mock_split_train_and_test_data.call_count, 2)
+        self.assertEqual(len(cache), 1)
+
+        cache.clear()
+        os.remove(module_file_path)
+
+
+    @patch('fedbiomed.common.repository.Repository.upload_file')
+    def test_round_13_profiling(self, repository_upload_patch):
+        """Tests profiling trace of the routines is captured and uploaded only when requested"""
+        repository_upload_patch.return_value = {'file': TestRound.URL_MSG}
+        self.r1.training_plan = MagicMock()
+        self.r1.training_plan.type.return_value = TrainingPlans.SkLearnTrainingPlan
+        self.r1.training_plan._phase_timer = TrainingPhaseTimer()
+
+        # profiling not requested
+        self.r1.initialize_validate_training_arguments()
+        self.assertIsNone(self.r1._start_profiling())
+        self.assertIsNone(self.r1._stop_profiling(None))
+
+        self.r1.training_kwargs = {'profile_steps': 2}
+        self.r1.initialize_validate_training_arguments()
+        profiler = self.r1._start_profiling()
+        self.assertIsNotNone(profiler)
+        for _ in range(3):
+            self.r1.training_plan._phase_timer.add_samples(4)
+            self.r1.training_plan._phase_timer.end_step()
+        self.assertEqual(profiler._num_steps, 3)
+
+        profile_url = self.r1._stop_profiling(profiler)
+        self.assertEqual(profile_url, TestRound.URL_MSG)
+        repository_upload_patch.assert_called_once_with(profiler.path)
+        self.assertTrue(profiler.path.endswith('.pstats'))
+        self.assertTrue(os.path.isfile(profiler.path))
+        self.assertEqual(self.r1.training_plan._phase_timer.timing()['num_samples_trained'], 12)
+        self.assertIsNone(self.r1.training_plan._phase_timer._step_hook)
+        os.remove(profiler.path)
+
+        # profiling errors do not fail the round
+        repository_upload_patch.side_effect = Exception('upload failed')
+        profiler = self.r1._start_profiling()
+        self.assertIsNone(self.r1._stop_profiling(profiler))
+        os.remove(profiler.path)
+
+    def test_round_14_optimizer_state(self):
+        """Tests optimizer state is saved after training and restored at the next round, only when requested"""
+        self.r1.training_plan = MagicMock()
+        self.r1.training_plan.optimizer_state.return_value = {'optimizer': 'Adam', 'state': {}}
+        self.r1.job_id = 'job_id_optimizer_state'
+        self.r1.dataset = {'dataset_id': 'dataset_id_1234'}
+        self.r1._optimizer_state_store = MagicMock()
+
+        # not requested
+        self.r1.initialize_validate_training_arguments()
+        self.r1._restore_optimizer_state()
+        self.r1._save_optimizer_state()
+        self.r1._optimizer_state_store.load.assert_not_called()
+        self.r1._optimizer_state_store.save.assert_not_called()
+
+        self.r1.training_kwargs = {'persist_optimizer_state': True, 'optimizer_state_max_staleness': 2}
+        self.r1.initialize_validate_training_arguments()
+        self.r1.round_number = 3
+        self.r1._optimizer_state_store.load.return_value = {'optimizer': 'Adam', 'state': {}}
+        self.r1._restore_optimizer_state()
+        self.r1._optimizer_state_store.load.assert_called_once_with('job_id_optimizer_state', 'dataset_id_1234', 3, 2)
+        self.r1.training_plan.set_optimizer_state.assert_called_once_with({'optimizer': 'Adam', 'state': {}})
+
+        self.r1._save_optimizer_state()
+        self.r1._optimizer_state_store.save.assert_called_once_with('job_id_optimizer_state', 'dataset_id_1234', 3,
+                                                                    {'optimizer': 'Adam', 'state': {}})
+
+        # errors do not fail the round
+        self.r1._optimizer_state_store.load.side_effect = Exception('corrupted state')
+        self.r1._restore_optimizer_state()
+
+        # validation only rounds do not use the optimizer state
+        self.r1._optimizer_state_store.reset_mock()
+        self.r1.training = False
+        self.r1._restore_optimizer_state()
+        self.r1._optimizer_state_store.load.assert_not_called()
+
+    @patch('inspect.signature')
+    def test_round_15_dataset_classes(self, patch_inspect_signature):
+        """Tests labels stored in the dataset parameters are set on sklearn data managers"""
+        patch_inspect_signature.return_value = inspect.Signature(parameters={})
+        data_manager_mock = MagicMock(spec=DataManager)
+        data_manager_mock.split = MagicMock(return_value=(MagicMock(), MagicMock()))
+        data_manager_mock.set_classes = MagicMock()
+        data_manager_mock.dataset = MagicMock(spec=[])
+
+        self.r1.training_plan = MagicMock()
+        self.r1.training_plan.training_data.return_value = data_manager_mock
+        self.r1.training_plan.type.return_value = TrainingPlans.SkLearnTrainingPlan
+        self.r1.dataset = {'dataset_parameters': {'target_column': 'label', 'classes': [0, 1, 2]}}
+        self.r1._split_train_and_test_data(test_ratio=0.)
+        data_manager_mock.set_classes.assert_called_once_with([0, 1, 2])
+
+        # no labels were stored at registration, or not a sklearn training plan
+        for dataset, tp_type in (({'dataset_parameters': None}, TrainingPlans.SkLearnTrainingPlan),
+                                 ({'dataset_parameters': {'classes': [0, 1]}}, TrainingPlans.TorchTrainingPlan)):
+            data_manager_mock.reset_mock()
+            self.r1.training_plan.type.return_value = tp_type
+            self.r1.dataset = dataset
+            self.r1._split_train_and_test_data(test_ratio=0.)
+            data_manager_mock.set_classes.assert_not_called()
+
+
+    @patch('fedbiomed.common.message.NodeMessages.reply_create')
+    def test_round_16_failed_round_unloads_training_plan(self, node_msg_patch):
+        """Tests the training plan module of a round that fails is unloaded, and its session not kept"""
+        node_msg_patch.side_effect = TestRound.node_msg_side_effect
+        self.r1._import_module = 'training_plan_failed_round'
+        sys.modules['training_plan_failed_round'] = types.ModuleType('training_plan_failed_round')
+        self.r1._session_cache = SessionCache()
+        self.r1._session_key = SessionCache.key('job_id', 'hash', {'dataset_id': 'dataset_id'}, {}, 0.)
+        self.r1.training_plan = MagicMock()
+        self.r1._data_loaders = (FakeLoader, FakeLoader)
+
+        msg = self.r1._send_round_reply(success=False, message='Cannot train model in round')
+        self.assertFalse(msg['success'])
+        self.assertNotIn('training_plan_failed_round', sys.modules)
+        self.assertIsNone(self.r1.training_plan)
+        self.assertIsNone(self.r1._data_loaders)
+        self.assertEqual(len(self.r1._session_cache), 0)
+
+        # failed preparation
+        sys.modules['training_plan_failed_round'] = types.ModuleType('training_plan_failed_round')
+        with patch('fedbiomed.node.round.Round._download_training_plan', return_value=None), \
+                patch('fedbiomed.node.round.Round._initialize_training_plan',
+                      return_value='Cannot instantiate training plan object'):
+            self.assertEqual(self.r1.prepare(), 'Cannot instantiate training plan object')
+        self.assertFalse(self.r1.is_prepared())
+        self.assertNotIn('training_plan_failed_round', sys.modules)
+
+
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
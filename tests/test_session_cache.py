@@ -0,0 +1,80 @@
+import sys
+import types
+import unittest
+from unittest.mock import patch
+
+#############################################################
+# Import NodeTestCase before importing FedBioMed Module
+from testsupport.base_case import NodeTestCase
+#############################################################
+
+from fedbiomed.node.session_cache import SessionCache
+
+
+class TestSessionCache(NodeTestCase):
+    """Tests the cache of warm training sessions of the node"""
+
+    @staticmethod
+    def _key(job_id, dataset_id, tp_hash='hash'):
+        return SessionCache.key(job_id, tp_hash, {'dataset_id': dataset_id, 'path': '/data'}, {'batch_size': 8}, 0.)
+
+    @staticmethod
+    def _session(name):
+        sys.modules[name] = types.ModuleType(name)
+        return {'import_module': name, 'training_plan': object(), 'data_loaders': (None, None)}
+
+    def test_session_cache_01_get_put(self):
+        """Sessions are taken out of the cache while used, and superseded sessions are evicted"""
+        cache = SessionCache()
+        key = self._key('job-1', 'dataset-1')
+        self.assertIsNone(cache.get(key))
+
+        session = self._session('tp_module_1')
+        cache.put(key, session)
+        self.assertEqual(len(cache), 1)
+        self.assertIs(cache.get(key), session)
+        self.assertEqual(len(cache), 0)
+        self.assertIn('tp_module_1', sys.modules)
+
+        # same job and dataset, training plan changed
+        cache.put(key, session)
+        self.assertIsNone(cache.get(self._key('job-1', 'dataset-1', tp_hash='other_hash')))
+        self.assertEqual(len(cache), 0)
+        self.assertNotIn('tp_module_1', sys.modules)
+        self.assertDictEqual(session, {})
+
+        # loader arguments changed
+        cache.put(key, self._session('tp_module_2'))
+        other_key = SessionCache.key('job-1', 'hash', {'dataset_id': 'dataset-1', 'path': '/data'},
+                                     {'batch_size': 16}, 0.)
+        self.assertIsNone(cache.get(other_key))
+        self.assertEqual(len(cache), 0)
+
+    def test_session_cache_02_eviction(self):
+        """Sessions are evicted when cache is full, when idle, or when their job ends"""
+        cache = SessionCache(max_sessions=2, idle_timeout=10)
+        with patch('time.monotonic', return_value=0):
+            cache.put(self._key('job-1', 'dataset-1'), self._session('tp_module_1'))
+            cache.put(self._key('job-1', 'dataset-2'), self._session('tp_module_2'))
+            cache.put(self._key('job-2', 'dataset-1'), self._session('tp_module_3'))
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn('tp_module_1', sys.modules)
+
+        cache.evict_job('job-1')
+        self.assertEqual(len(cache), 1)
+        self.assertNotIn('tp_module_2', sys.modules)
+
+        with patch('time.monotonic', return_value=11):
+            cache.evict_idle()
+        self.assertEqual(len(cache), 0)
+        self.assertNotIn('tp_module_3', sys.modules)
+
+        # disabled cache
+        cache = SessionCache(max_sessions=0)
+        cache.put(self._key('job-1', 'dataset-1'), self._session('tp_module_4'))
+        self.assertEqual(len(cache), 0)
+        self.assertNotIn('tp_module_4', sys.modules)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
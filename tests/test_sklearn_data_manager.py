@@ -1,9 +1,14 @@
 import math
+import os
+import tempfile
 import unittest
 import numpy as np
 import pandas as pd
+from scipy import sparse
+from unittest.mock import patch
 
-from fedbiomed.common.data import SkLearnDataManager
+from fedbiomed.common.data import NPSubset, SkLearnDataManager
+from fedbiomed.common.logger import logger
 from fedbiomed.common.exceptions import FedbiomedTypeError
 
 
@@ -142,11 +147,111 @@ class TestSkLearnDataManager(unittest.TestCase):
 
         self.assertEqual(count_iter, 1)  # assert that only one iteration was made because of drop_last=True
 
+    def test_sklearn_data_manager_06_memory_mapped(self):
+        """Memory-mapped datasets are split by indices and read from the mapping"""
+        rng = np.random.default_rng(0)
+        inputs = rng.normal(size=(101, 5))
+        target = rng.integers(0, 3, size=101)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            np.save(os.path.join(tmp_dir, 'inputs.npy'), inputs)
+            np.save(os.path.join(tmp_dir, 'target.npy'), target)
+            mapped_inputs = np.load(os.path.join(tmp_dir, 'inputs.npy'), mmap_mode='r')
+            mapped_target = np.load(os.path.join(tmp_dir, 'target.npy'), mmap_mode='r')
+
+            for loader_arguments in ({}, {'materialize': True, 'dtype': 'float32'}):
+                data_manager = SkLearnDataManager(inputs=mapped_inputs, target=mapped_target, batch_size=8,
+                                                  shuffle=True, **loader_arguments)
+                loader_train, loader_test = data_manager.split(test_ratio=.2)
+
+                subset_train, subset_test = data_manager.subset_train(), data_manager.subset_test()
+                for subset in subset_train + subset_test:
+                    self.assertIsInstance(subset, NPSubset)
+                    self.assertIsInstance(subset.array, np.memmap)
+                self.assertEqual(len(loader_train.dataset), 80)
+                self.assertEqual(len(loader_test.dataset), 21)
+                self.assertListEqual(sorted(np.concatenate([subset_train[0].indices, subset_test[0].indices])),
+                                     list(range(101)))
+                self.assertNPArrayEqual(np.asarray(subset_test[0]), inputs[subset_test[0].indices])
+
+                # batches are the rows of the subsets
+                rows = []
+                for data, target_batch in loader_train:
+                    self.assertEqual(data.shape[1], 5)
+                    rows.extend(zip(map(tuple, np.asarray(data, dtype=np.float32)), target_batch.ravel()))
+                expected = zip(map(tuple, inputs[subset_train[0].indices].astype(np.float32)),
+                               target[subset_train[1].indices])
+                self.assertListEqual(sorted(rows), sorted(expected))
+
+                data, target_batch = next(iter(loader_test))
+                self.assertNPArrayEqual(data, inputs[subset_test[0].indices].astype(data.dtype))
+                self.assertNPArrayEqual(target_batch, target[subset_test[1].indices])
+            del mapped_inputs, mapped_target, data_manager, loader_train, loader_test, subset_train, subset_test
+
+    def test_sklearn_data_manager_07_sparse(self):
+        """Sparse inputs are kept in CSR format and split into subsets of defined length"""
+        inputs = sparse.random(30, 100, density=.05, format='csc', random_state=0)
+        target = np.arange(30)
+        data_manager = SkLearnDataManager(inputs=inputs, target=target, batch_size=4)
+        self.assertIsInstance(data_manager.dataset()[0], sparse.csr_matrix)
+
+        for ratio, n_test in ((0., 0), (.2, 6), (1., 30)):
+            loader_train, loader_test = data_manager.split(test_ratio=ratio)
+            self.assertEqual(len(loader_train.dataset), 30 - n_test)
+            self.assertEqual(len(loader_test.dataset), n_test)
+            for loader in (loader_train, loader_test):
+                for data, target_batch in loader:
+                    self.assertIsInstance(data, sparse.csr_matrix)
+                    self.assertNPArrayEqual(data.toarray(), inputs.toarray()[target_batch.ravel()])
 
-
-
-
-
+        with self.assertRaises(FedbiomedTypeError):
+            SkLearnDataManager(inputs=inputs, target=sparse.csr_matrix(target))
+
+    def test_sklearn_data_manager_08_classes(self):
+        """Unique labels of the dataset are cached, and shared with the loaders once known"""
+        inputs = np.arange(40).reshape(20, 2)
+        target = np.tile([2, 0, 5, 0], 5)
+        data_manager = SkLearnDataManager(inputs=inputs, target=target)
+        loader_train, loader_test = data_manager.split(test_ratio=.1)
+        # loaders compute the labels of their own subset, when those of the dataset are unknown
+        self.assertIsNone(loader_test._classes)
+
+        self.assertNPArrayEqual(data_manager.classes(), np.array([0, 2, 5]))
+        self.assertIs(data_manager.classes(), data_manager.classes())
+        for ratio in (0., .1):
+            for loader in data_manager.split(test_ratio=ratio):
+                self.assertNPArrayEqual(loader.classes(), np.array([0, 2, 5]))
+
+        # labels stored in the metadata of the dataset are checked against the target, not computed from it
+        data_manager = SkLearnDataManager(inputs=inputs, target=target)
+        data_manager.set_classes([5, 0, 2])
+        with patch('numpy.unique', wraps=np.unique) as patch_unique:
+            for loader in data_manager.split(test_ratio=.5):
+                self.assertNPArrayEqual(loader.classes(), np.array([0, 2, 5]))
+            # the target is never sorted
+            for call in patch_unique.call_args_list:
+                self.assertNotEqual(len(call.args[0]), len(target))
+
+    def test_sklearn_data_manager_09_wrong_metadata_classes(self):
+        """Labels of the metadata that are not those of the target are replaced by the labels of the target"""
+        inputs = np.arange(40).reshape(20, 2)
+        target = np.tile([1, 0, 1, 0], 5)
+        # labels of the raw column, while the training plan maps or binarizes it
+        for classes in (['no', 'yes'], [0, 1, 2], [1], [0., .5, 1.], []):
+            data_manager = SkLearnDataManager(inputs=inputs, target=target)
+            data_manager.set_classes(classes)
+            with patch.object(logger, 'warning') as patch_warning:
+                loaders = data_manager.split(test_ratio=.5)
+                patch_warning.assert_called_once()
+            for loader in loaders:
+                self.assertNPArrayEqual(loader.classes(), np.array([0, 1]))
+            self.assertNPArrayEqual(data_manager.classes(), np.array([0, 1]))
+
+        # labels of an empty target
+        data_manager = SkLearnDataManager(inputs=np.zeros((0, 2)), target=np.zeros(0))
+        data_manager.set_classes([])
+        with patch.object(logger, 'warning') as patch_warning:
+            self.assertEqual(len(data_manager.classes()), 0)
+            patch_warning.assert_not_called()
 
 
 if __name__ == '__main__':  # pragma: no cover
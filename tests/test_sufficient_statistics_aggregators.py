@@ -0,0 +1,149 @@
+from testsupport.base_case import ResearcherTestCase
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.linear_model import LinearRegression
+from sklearn.naive_bayes import GaussianNB
+
+from fedbiomed.common.data import NPDataLoader
+from fedbiomed.common.exceptions import FedbiomedAggregatorError, FedbiomedTrainingPlanError
+from fedbiomed.common.training_args import TrainingArgs
+from fedbiomed.common.training_plans import FedGaussianNB, FedLinearRegression, FedPCA
+from fedbiomed.researcher.aggregators import GaussianNBAggregator, LinearRegressionAggregator, PCAAggregator
+
+
+class TestSufficientStatisticsAggregators(ResearcherTestCase):
+    """Test the single-round aggregators of sufficient statistics training plans"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # three nodes with different data distributions
+        self.inputs = [rng.normal(loc=i, scale=i + 1, size=(50 + 10 * i, 4)) for i in range(3)]
+        self.pooled_inputs = np.concatenate(self.inputs)
+
+    def _node_statistics(self, tp_type, model_args, targets=None):
+        """Trains a training plan on the data of each node, returns the statistics and the researcher's plan"""
+        statistics = {}
+        for i, inputs in enumerate(self.inputs):
+            training_plan = tp_type()
+            training_plan.post_init(dict(model_args), TrainingArgs({'epochs': 3}, only_required=False))
+            target = targets[i] if targets is not None else np.zeros((len(inputs), 1))
+            loader = NPDataLoader(inputs, target, batch_size=16, shuffle=True)
+            training_plan.set_data_loaders(loader, loader)
+            # a single pass over the data, whatever the number of epochs
+            self.assertEqual(training_plan.training_routine(), len(inputs))
+            statistics[f'node_{i}'] = training_plan.after_training_params()
+
+        researcher_plan = tp_type()
+        researcher_plan.post_init(dict(model_args), TrainingArgs({}, only_required=False))
+        return statistics, researcher_plan
+
+    def test_sufficient_statistics_aggregators_01_linear_regression(self):
+        """Aggregated linear regression is the least squares fit of the pooled data"""
+        rng = np.random.default_rng(1)
+        coef = np.array([1., -2., .5, 3.])
+        targets = [x @ coef + 4. + rng.normal(size=len(x)) for x in self.inputs]
+        for fit_intercept in (True, False):
+            model_args = {'n_features': 4, 'fit_intercept': fit_intercept}
+            statistics, training_plan = self._node_statistics(FedLinearRegression, model_args,
+                                                              [t.reshape(-1, 1) for t in targets])
+            self.assertSetEqual(set(statistics['node_0']), {'n_samples_', 'sum_x_', 'sum_y_', 'xtx_', 'xty_'})
+
+            aggregated = LinearRegressionAggregator().aggregate(statistics, {}, training_plan=training_plan)
+            expected = LinearRegression(fit_intercept=fit_intercept).fit(self.pooled_inputs, np.concatenate(targets))
+            self.assertTrue(np.allclose(aggregated['coef_'], expected.coef_))
+            self.assertAlmostEqual(aggregated['intercept_'], expected.intercept_)
+
+            # aggregated parameters are the attributes of a usable model
+            training_plan.save('/dev/null', aggregated)
+            self.assertTrue(np.allclose(training_plan.model().predict(self.pooled_inputs),
+                                        expected.predict(self.pooled_inputs)))
+
+    def test_sufficient_statistics_aggregators_02_gaussian_nb(self):
+        """Aggregated Gaussian naive Bayes is the model fitted on the pooled data"""
+        targets = [(x[:, :1] > i).astype(int) + (x[:, 1:2] > 0).astype(int) for i, x in enumerate(self.inputs)]
+        statistics, training_plan = self._node_statistics(FedGaussianNB, {'n_features': 4, 'n_classes': 3}, targets)
+
+        aggregated = GaussianNBAggregator().aggregate(statistics, {}, training_plan=training_plan)
+        expected = GaussianNB().fit(self.pooled_inputs, np.concatenate(targets).ravel())
+        for key in ('theta_', 'var_', 'class_prior_', 'class_count_', 'epsilon_'):
+            self.assertTrue(np.allclose(aggregated[key], getattr(expected, key)), key)
+
+        training_plan.save('/dev/null', aggregated)
+        self.assertTrue(np.array_equal(training_plan.model().predict(self.pooled_inputs),
+                                       expected.predict(self.pooled_inputs)))
+
+    def test_sufficient_statistics_aggregators_03_pca(self):
+        """Aggregated PCA has the components of the PCA of the pooled data"""
+        for n_components in (2, None, .9):
+            statistics, training_plan = self._node_statistics(FedPCA, {'n_features': 4,
+                                                                       'n_components': n_components})
+            aggregated = PCAAggregator().aggregate(statistics, {}, training_plan=training_plan)
+            expected = PCA(n_components=n_components).fit(self.pooled_inputs)
+
+            self.assertEqual(aggregated['n_components_'], expected.n_components_)
+            # components are defined up to their sign
+            self.assertTrue(np.allclose(np.abs(aggregated['components_']), np.abs(expected.components_)))
+            for key in ('mean_', 'explained_variance_', 'explained_variance_ratio_', 'singular_values_',
+                        'noise_variance_'):
+                self.assertTrue(np.allclose(aggregated[key], getattr(expected, key)), key)
+
+            training_plan.save('/dev/null', aggregated)
+            self.assertTrue(np.allclose(np.abs(training_plan.model().transform(self.pooled_inputs)),
+                                        np.abs(expected.transform(self.pooled_inputs))))
+
+        with self.assertRaises(FedbiomedAggregatorError):
+            PCAAggregator()._n_components('mle', np.ones(4) / 4, 4)
+
+    def test_sufficient_statistics_aggregators_04_errors(self):
+        """Statistics that cannot be aggregated"""
+        statistics, training_plan = self._node_statistics(FedPCA, {'n_features': 4})
+        with self.assertRaises(FedbiomedAggregatorError):
+            PCAAggregator().aggregate({}, {}, training_plan=training_plan)
+
+        statistics['node_0']['xtx_'] = np.zeros((3, 3))
+        with self.assertRaises(FedbiomedAggregatorError):
+            PCAAggregator().aggregate(statistics, {}, training_plan=training_plan)
+
+        # not enough samples
+        with self.assertRaises(FedbiomedAggregatorError):
+            PCAAggregator().aggregate({'node_0': {'n_samples_': np.ones(1), 'sum_x_': np.zeros(4),
+                                                  'xtx_': np.zeros((4, 4))}}, {}, training_plan=training_plan)
+
+    def test_sufficient_statistics_aggregators_05_gaussian_nb_labels(self):
+        """Gaussian naive Bayes statistics are not computed from labels outside of range(n_classes)"""
+        inputs = self.inputs[0]
+        for labels in ([0, 1, 3], [0, -1, 2], [0, .5, 2], ['a', 'b', 'c']):
+            target = np.resize(np.array(labels), (len(inputs), 1))
+            training_plan = FedGaussianNB()
+            training_plan.post_init({'n_features': 4, 'n_classes': 3}, TrainingArgs({}, only_required=False))
+            loader = NPDataLoader(inputs, target, batch_size=16)
+            training_plan.set_data_loaders(loader, loader)
+            with self.assertRaises(FedbiomedTrainingPlanError):
+                training_plan.training_routine()
+
+    def test_sufficient_statistics_aggregators_06_load_aggregated_params(self):
+        """Aggregated parameters files are loaded by the training plans of the nodes"""
+        targets = [np.zeros((len(x), 1), dtype=int) for x in self.inputs]
+        for tp_type, aggregator, model_args in ((FedLinearRegression, LinearRegressionAggregator(), {}),
+                                                (FedGaussianNB, GaussianNBAggregator(), {'n_classes': 2}),
+                                                (FedPCA, PCAAggregator(), {'n_components': 2})):
+            model_args = dict(model_args, n_features=4)
+            statistics, researcher_plan = self._node_statistics(tp_type, model_args, targets)
+            aggregated = aggregator.aggregate(statistics, {}, training_plan=researcher_plan)
+            node_plan = tp_type()
+            node_plan.post_init(dict(model_args), TrainingArgs({}, only_required=False))
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                filename = os.path.join(tmp_dir, 'aggregated_params')
+                researcher_plan.save(filename, aggregated)
+                node_plan.load(filename)
+            for key, val in aggregated.items():
+                self.assertTrue(np.allclose(getattr(node_plan.model(), key), val), key)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -1,9 +1,11 @@
+import os
+import tempfile
 import unittest
 import fedbiomed.common.data._torch_data_manager  # noqa
 import numpy as np
 
 from unittest.mock import patch
-from torch.utils.data import Dataset, Subset
+from torch.utils.data import Dataset, IterableDataset, Subset
 from fedbiomed.common.data import TorchDataManager
 from fedbiomed.common.exceptions import FedbiomedTorchDataManagerError
 
@@ -193,6 +195,44 @@ class TestTorchDataManager(unittest.TestCase):
         result = self.torch_data_manager.to_sklearn()
         self.assertIsInstance(result, fedbiomed.common.data._sklearn_data_manager.SkLearnDataManager)
 
+        # samples are converted in chunks, into arrays of the shape and type of the samples
+        for chunk_size in (1, 4, 6, 100):
+            inputs, target = self.torch_data_manager.to_sklearn(chunk_size=chunk_size).dataset()
+            np.testing.assert_array_equal(inputs, self.dataset.X_train)
+            np.testing.assert_array_equal(target, self.dataset.Y_train)
+            self.assertEqual(inputs.dtype, self.dataset.X_train.dtype)
+
+        # arrays may be memory-mapped
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            inputs, target = self.torch_data_manager.to_sklearn(chunk_size=4, mmap_dir=tmp_dir).dataset()
+            self.assertIsInstance(inputs, np.memmap)
+            self.assertEqual(len(os.listdir(tmp_dir)), 2)
+            np.testing.assert_array_equal(inputs, self.dataset.X_train)
+            np.testing.assert_array_equal(target, self.dataset.Y_train)
+            del inputs, target
+
+        # empty datasets, and datasets whose length is not their number of samples
+        with patch.object(TestTorchDataManager.CustomDataset, '__len__', return_value=0):
+            with self.assertRaises(FedbiomedTorchDataManagerError):
+                self.torch_data_manager.to_sklearn()
+
+        class CustomIterableDataset(IterableDataset):
+            def __init__(self, dataset, length):
+                self.dataset = dataset
+                self.length = length
+
+            def __len__(self):
+                return self.length
+
+            def __iter__(self):
+                return iter(zip(self.dataset.X_train, self.dataset.Y_train))
+
+        for length in (5, 7):
+            with self.assertRaises(FedbiomedTorchDataManagerError):
+                TorchDataManager(dataset=CustomIterableDataset(self.dataset, length)).to_sklearn(chunk_size=4)
+        inputs, _ = TorchDataManager(dataset=CustomIterableDataset(self.dataset, 6)).to_sklearn(chunk_size=4).dataset()
+        np.testing.assert_array_equal(inputs, self.dataset.X_train)
+
 
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
@@ -1,4 +1,5 @@
 import copy
+from collections import OrderedDict
 import itertools
 import types
 import unittest
@@ -6,19 +7,23 @@ import os
 import logging
 import re
 
+import numpy as np
 import torch
 import torch.nn as nn
 from torch.autograd import Variable
 
 from unittest.mock import patch, MagicMock
-from torch.utils.data import DataLoader, Dataset
+import torch.distributed as dist
+from torch.utils.data import DataLoader, Dataset, TensorDataset
 from torch.optim import Adam, SGD
 from torch.nn import Module
 from torch.optim.lr_scheduler import LambdaLR
 from testsupport.base_fake_training_plan import BaseFakeTrainingPlan
 from fedbiomed.common.exceptions import FedbiomedTrainingPlanError
 from fedbiomed.common.training_plans import TorchTrainingPlan, BaseTrainingPlan
+from fedbiomed.common.training_plans._data_parallel import CPUDataParallel, _ShardBatchSampler
 from fedbiomed.common.metrics import MetricTypes
+from fedbiomed.common.training_args import TrainingArgs
 
 
 # define TP outside of test class to avoid indentation problems when exporting class to file
@@ -31,6 +36,19 @@ class TrainingPlan(TorchTrainingPlan):
         return True
 
 
+class DataParallelTrainingPlan(TorchTrainingPlan):
+    """Training plan of the data parallel tests, importable by worker processes"""
+    def init_model(self):
+        torch.manual_seed(0)
+        return nn.Sequential(nn.Linear(5, 8), nn.ReLU(), nn.Linear(8, 1))
+
+    def training_step(self, data, target):
+        return torch.mean((self.model()(data) - target) ** 2)
+
+    def training_data(self):
+        pass
+
+
 class FakeDPController:
     def validate_and_fix_model(self, model):
         return model
@@ -677,6 +695,297 @@ e
             lr_extracted = tp.get_learning_rate()
             self.assertListEqual(lr_extracted, [lr * 2 * (e+1)])
 
+    def test_torch_nn_08_training_timing(self):
+        """Tests the time spent in each phase of the training loop is accounted for"""
+        tp = TorchTrainingPlan()
+        tp._set_device = MagicMock()
+        tp._model = torch.nn.Linear(2, 1)
+        tp._optimizer = SGD(tp._model.parameters(), lr=.1)
+        tp._dp_controller = FakeDPController()
+        tp._log_interval = 1
+        tp._dry_run = False
+        tp.training_step = lambda data, target: torch.mean((tp._model(data) - target) ** 2)
+
+        batch = (torch.Tensor([[1, 2], [1, 1], [2, 2]]), torch.Tensor([[1], [2], [2]]))
+        tp.training_data_loader = MagicMock(spec=DataLoader(MagicMock(spec=Dataset)), dataset=[1, 2, 3] * 4,
+                                            batch_size=3)
+        tp.training_data_loader.__iter__.return_value = 4 * [batch]
+        tp.training_data_loader.__len__.return_value = 4
+        tp._training_args = {'batch_size': 3, 'batch_maxnum': None, 'num_updates': None, 'log_interval': 1,
+                             'dry_run': False, 'epochs': 1}
+
+        history_monitor = MagicMock()
+        step_hook = MagicMock()
+        tp._phase_timer.set_step_hook(step_hook)
+        num_samples = tp.training_routine(history_monitor, None)
+        # the step hook is called at the end of each batch
+        self.assertEqual(step_hook.call_count, 4)
+
+        timing = tp.training_timing()
+        self.assertEqual(timing['num_samples_trained'], num_samples)
+        self.assertEqual(num_samples, 12)
+        for phase in ('data_loading', 'send_to_device', 'forward', 'backward_step', 'dp', 'reporting'):
+            self.assertGreaterEqual(timing[f'rtime_{phase}'], 0.)
+        self.assertGreater(timing['rtime_forward'], 0.)
+        self.assertGreater(timing['rtime_backward_step'], 0.)
+        self.assertGreater(timing['samples_per_second'], 0.)
+
+    def test_torch_nn_09_mixed_precision(self):
+        """Tests training and prediction under bfloat16 CPU autocast keep full precision parameters"""
+        tp = TorchTrainingPlan()
+        tp._set_device = MagicMock()
+        tp._model = torch.nn.Linear(2, 1)
+        tp._optimizer = SGD(tp._model.parameters(), lr=.1)
+        tp._dp_controller = FakeDPController()
+        tp._log_interval = 1
+        tp._dry_run = False
+        tp._mixed_precision = 'bf16'
+        tp._fedprox_mu = .1
+        tp._init_params = [param.detach().clone() for param in tp._model.parameters()]
+        outputs = []
+
+        def training_step(data, target):
+            outputs.append(tp._model(data))
+            return torch.mean((outputs[-1] - target) ** 2)
+        tp.training_step = training_step
+
+        data, target = torch.Tensor([[1, 2], [1, 1], [2, 2]]), torch.Tensor([[1], [2], [2]])
+        corrected_loss, loss = tp._train_over_batch(data, target)
+        self.assertEqual(tp._model(data).dtype, torch.float32)
+        self.assertEqual(outputs[-1].dtype, torch.bfloat16)
+        self.assertEqual(loss.dtype, torch.float32)
+        self.assertEqual(corrected_loss.dtype, torch.float32)
+        for param in tp._model.parameters():
+            self.assertEqual(param.dtype, torch.float32)
+            self.assertEqual(param.grad.dtype, torch.float32)
+
+        self.assertEqual(tp.predict(data).dtype, np.float32)
+        self.assertEqual(tp.training_timing()['mixed_precision'], 'bf16')
+
+        # not supported on GPU
+        tp._set_device = MagicMock(side_effect=lambda *args: setattr(tp, '_device', 'cuda'))
+        with self.assertRaises(FedbiomedTrainingPlanError):
+            tp.training_routine(None, None)
+
+        # not supported with differential privacy
+        tp = TorchTrainingPlan()
+        tp.init_model = MagicMock(return_value=torch.nn.Linear(2, 1))
+        with self.assertRaises(FedbiomedTrainingPlanError):
+            tp.post_init({}, TrainingArgs({'mixed_precision': 'bf16', 'dp_args': {'sigma': .1, 'clip': 1.}},
+                                          only_required=False))
+
+    def test_torch_nn_10_fedprox_proximal_gradient(self):
+        """Tests the FedProx proximal gradient equals the gradient of the regularized loss"""
+        mu = .5
+        model = torch.nn.Sequential(torch.nn.Linear(3, 4), torch.nn.ReLU(), torch.nn.Linear(4, 1))
+        init_params = [param.detach().clone() for param in model.parameters()]
+        with torch.no_grad():
+            for param in model.parameters():
+                param.add_(torch.randn_like(param))
+        data, target = torch.randn(5, 3), torch.randn(5, 1)
+
+        # reference: proximal term in the loss
+        reference = copy.deepcopy(model)
+        ref_loss = torch.mean((reference(data) - target) ** 2)
+        ref_corrected_loss = ref_loss + mu / 2 * sum(((param - init) ** 2).sum()
+                                                     for param, init in zip(reference.parameters(), init_params))
+        ref_corrected_loss.backward()
+
+        tp = TorchTrainingPlan()
+        tp._model = model
+        tp._optimizer = MagicMock()
+        tp._fedprox_mu = mu
+        tp._init_params = init_params
+        tp.training_step = lambda data, target: torch.mean((tp._model(data) - target) ** 2)
+        corrected_loss, loss = tp._train_over_batch(data, target)
+
+        self.assertTrue(torch.isclose(corrected_loss, ref_corrected_loss.detach()))
+        self.assertTrue(torch.isclose(loss, ref_loss))
+        for param, ref_param in zip(model.parameters(), reference.parameters()):
+            self.assertTrue(torch.allclose(param.grad, ref_param.grad, atol=1e-6))
+
+    def test_torch_nn_11_scaffold_correction(self):
+        """Tests SCAFFOLD corrections are aligned once per round and added to the gradients of each batch"""
+        model = torch.nn.Sequential(torch.nn.Linear(3, 4), torch.nn.ReLU(), torch.nn.Linear(4, 1))
+        data, target = torch.randn(5, 3), torch.randn(5, 1)
+        reference = copy.deepcopy(model)
+        torch.mean((reference(data) - target) ** 2).backward()
+
+        tp = TorchTrainingPlan()
+        tp._model = model
+        tp._optimizer = MagicMock()
+        tp.training_step = lambda data, target: torch.mean((tp._model(data) - target) ** 2)
+        tp.aggregator_name = 'Scaffold'
+        # no correction for the last bias
+        tp.correction_state = OrderedDict((name, torch.randn_like(param))
+                                          for name, param in model.named_parameters() if name != '2.bias')
+
+        tp._prepare_scaffold_corrections()
+        params, corrections = tp._scaffold_corrections
+        self.assertEqual(len(params), 3)
+        tp._train_over_batch(data, target)
+
+        for (name, param), ref_param in zip(model.named_parameters(), reference.parameters()):
+            expected = ref_param.grad + tp.correction_state.get(name, torch.zeros_like(ref_param))
+            self.assertTrue(torch.allclose(param.grad, expected))
+
+        # no correction for other aggregators
+        tp.aggregator_name = 'fedavg'
+        tp._prepare_scaffold_corrections()
+        self.assertIsNone(tp._scaffold_corrections)
+
+    def test_torch_nn_12_optimizer_state(self):
+        """Tests optimizer state is restored by parameter name onto a new model and optimizer"""
+        model = torch.nn.Sequential(torch.nn.Linear(3, 4), torch.nn.ReLU(), torch.nn.Linear(4, 1))
+        tp = TorchTrainingPlan()
+        tp._model = model
+        tp._optimizer = torch.optim.Adam(model.parameters(), lr=.1)
+        torch.mean((model(torch.randn(5, 3)) - torch.randn(5, 1)) ** 2).backward()
+        tp._optimizer.step()
+
+        state = tp.optimizer_state()
+        self.assertEqual(state['optimizer'], 'Adam')
+        self.assertSetEqual(set(state['state']), {'0.weight', '0.bias', '2.weight', '2.bias'})
+
+        # new model and optimizer of the next round, with another parameter order in the optimizer
+        new_model = copy.deepcopy(model)
+        tp._model = new_model
+        tp._optimizer = torch.optim.Adam(list(new_model.parameters())[::-1], lr=.01)
+        tp.set_optimizer_state(state)
+        for name, param in new_model.named_parameters():
+            self.assertTrue(torch.equal(tp._optimizer.state[param]['exp_avg'], state['state'][name]['exp_avg']))
+        self.assertEqual(tp._optimizer.param_groups[0]['lr'], .01)
+
+        # changed optimizer: state is not restored
+        tp._optimizer = torch.optim.SGD(new_model.parameters(), lr=.01, momentum=.9)
+        tp.set_optimizer_state(state)
+        self.assertEqual(len(tp._optimizer.state), 0)
+
+        # changed parameter shapes: states of these parameters are skipped
+        tp._model = torch.nn.Sequential(torch.nn.Linear(3, 2), torch.nn.ReLU(), torch.nn.Linear(2, 1))
+        tp._optimizer = torch.optim.Adam(tp._model.parameters())
+        tp.set_optimizer_state(state)
+        self.assertListEqual(list(tp._optimizer.state), [tp._model[2].bias])
+
+    def test_torch_nn_13_configure_data_parallel(self):
+        """Tests training falls back to a single process when data parallel training is not possible"""
+        tp = TorchTrainingPlan()
+        tp._device = 'cpu'
+        tp._dp_controller = None
+        tp.training_data_loader = DataLoader(TensorDataset(torch.randn(10, 3)), batch_size=2)
+
+        self.assertIsNone(tp._configure_data_parallel({}))
+        self.assertIsNone(tp._configure_data_parallel({'cpu_workers': 1}))
+        data_parallel = tp._configure_data_parallel({'cpu_workers': 3})
+        self.assertIsInstance(data_parallel, CPUDataParallel)
+        self.assertEqual(data_parallel.world_size, 3)
+
+        # training on gpu
+        tp._device = 'cuda:0'
+        self.assertIsNone(tp._configure_data_parallel({'cpu_workers': 3}))
+        tp._device = 'cpu'
+
+        # differential privacy
+        tp._dp_controller = MagicMock(is_active=True)
+        self.assertIsNone(tp._configure_data_parallel({'cpu_workers': 3}))
+        tp._dp_controller = None
+
+        # data loader without batch size
+        tp.training_data_loader = DataLoader(TensorDataset(torch.randn(10, 3)), batch_size=None)
+        self.assertIsNone(tp._configure_data_parallel({'cpu_workers': 3}))
+
+        # worker processes cannot be started: training in a single process
+        tp.training_data_loader = DataLoader(TensorDataset(torch.randn(10, 3)), batch_size=2)
+        data_parallel = MagicMock(start=MagicMock(side_effect=FedbiomedTrainingPlanError('error')))
+        with patch.object(tp, '_training_loop', return_value=10) as training_loop:
+            self.assertEqual(tp._data_parallel_training_loop(data_parallel, None), 10)
+            training_loop.assert_called_once_with(None)
+        data_parallel.stop.assert_not_called()
+
+    def test_torch_nn_14_data_parallel_shard(self):
+        """Tests sharding of the data loader and gradient averaging, in a single process group"""
+        store = dist.HashStore()
+        dist.init_process_group('gloo', store=store, rank=0, world_size=1)
+        try:
+            data_parallel = CPUDataParallel(1, 0, store)
+            loader = DataLoader(TensorDataset(torch.arange(10.)), batch_size=4, shuffle=True)
+            shard = data_parallel.shard(loader)
+            self.assertEqual(len(shard), 3)
+            first_epoch = torch.cat([batch[0] for batch in shard])
+            second_epoch = torch.cat([batch[0] for batch in shard])
+            self.assertListEqual(sorted(first_epoch.tolist()), list(range(10)))
+            self.assertFalse(torch.equal(first_epoch, second_epoch))
+            self.assertListEqual([data_parallel.batch_samples() for _ in range(3)], [4, 4, 2])
+
+            model = torch.nn.Linear(3, 2)
+            model(torch.randn(4, 3)).sum().backward()
+            grads = [param.grad.clone() for param in model.parameters()]
+            model.bias.grad = None
+            data_parallel.all_reduce_gradients(model.parameters())
+            self.assertTrue(torch.allclose(model.weight.grad, grads[0]))
+            self.assertTrue(torch.equal(model.bias.grad, torch.zeros(2)))
+            self.assertTrue(data_parallel.any(True))
+            self.assertEqual(data_parallel.sum(3), 3)
+        finally:
+            dist.destroy_process_group()
+
+    def test_torch_nn_15_data_parallel_shard_batches(self):
+        """Tests that shards split each batch of the data loader between processes, with padding but no overlap"""
+        # 11 samples and 3 processes: batches of 4 samples are not split evenly, the last one has 3 samples.
+        # Batches of 2 samples leave a process without sample.
+        for batch_size, drop_last, expected_samples in ((4, False, [[2, 1, 1], [2, 1, 1], [1, 1, 1]]),
+                                                        (4, True, [[2, 1, 1], [2, 1, 1]]),
+                                                        (2, False, [[1, 1, 0]] * 5 + [[1, 0, 0]])):
+            shards = [_ShardBatchSampler(11, batch_size, drop_last, shuffle=False, seed=0, world_size=3, rank=rank)
+                      for rank in range(3)]
+            loader = DataLoader(TensorDataset(torch.arange(11)), batch_size=batch_size, drop_last=drop_last)
+            batches = [list(shard) for shard in shards]
+            self.assertTrue(all(len(shard) == len(loader) for shard in shards))
+            samples = [list(shard.batch_samples) for shard in shards]
+            self.assertListEqual([list(batch) for batch in zip(*samples)], expected_samples)
+            for index, batch in enumerate(loader):
+                # counted samples of the processes are the samples of the batch of the loader
+                counted = [i for rank in range(3) for i in batches[rank][index][:samples[rank][index]]]
+                self.assertListEqual(counted, batch[0].tolist())
+                # a process without sample in a batch trains the first sample of the batch, with a zero weight
+                for rank in range(3):
+                    if samples[rank][index] == 0:
+                        self.assertListEqual(batches[rank][index], batch[0].tolist()[:1])
+
+        # all processes draw the same permutation, a new one at each epoch
+        shards = [_ShardBatchSampler(11, 4, False, shuffle=True, seed=3, world_size=2, rank=rank) for rank in range(2)]
+        first_epoch = [sum(list(shard), []) for shard in shards]
+        second_epoch = [sum(list(shard), []) for shard in shards]
+        self.assertListEqual(sorted(first_epoch[0] + first_epoch[1]), list(range(11)))
+        self.assertNotEqual(first_epoch, second_epoch)
+
+    def test_torch_nn_16_data_parallel_training(self):
+        """Tests that training with several processes performs the same updates as single process training"""
+        data = torch.randn(50, 5, generator=torch.Generator().manual_seed(1))
+        target = data.sum(1, keepdim=True)
+        # 3 processes: batches of 8 samples are not split evenly, and the last batch of 2 samples leaves a process
+        # without sample
+        for num_samples, batch_size, cpu_workers in ((48, 8, 2), (50, 8, 3)):
+            results = []
+            for workers in (1, cpu_workers):
+                tp = DataParallelTrainingPlan()
+                tp.post_init({}, TrainingArgs({'epochs': 2, 'batch_size': batch_size,
+                                               'optimizer_args': {'lr': 1e-2}}, only_required=False))
+                tp.training_data_loader = DataLoader(TensorDataset(data[:num_samples], target[:num_samples]),
+                                                     batch_size=batch_size)
+                with patch.object(CPUDataParallel, 'stop', autospec=True,
+                                  side_effect=CPUDataParallel.stop) as stop:
+                    samples = tp.training_routine(node_args={'cpu_workers': workers})
+                self.assertEqual(stop.call_count, 0 if workers == 1 else 1)
+                results.append((samples, tp.num_updates_performed(), list(tp.model().parameters())))
+
+            (samples, updates, params), (dp_samples, dp_updates, dp_params) = results
+            self.assertEqual(samples, 2 * num_samples)
+            self.assertEqual(dp_samples, samples)
+            self.assertEqual(dp_updates, updates)
+            for param, dp_param in zip(params, dp_params):
+                self.assertTrue(torch.allclose(param, dp_param, atol=1e-6))
+
 
 class TestSendToDevice(unittest.TestCase):
 
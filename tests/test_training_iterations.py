@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 import numpy as np
 from fedbiomed.common.training_plans._training_iterations import MiniBatchTrainingIterationsAccountant  # noqa
 
@@ -207,6 +207,42 @@ class TestMiniBatchTrainingIterationsAccountant(unittest.TestCase):
         # testing the value of attribute (important since we need it for aggregator weights computation)
         self.assertEqual(iter_accountant.num_samples_observed_in_total, tot_steps_counter * reference_batch_size)
 
+    def test_mini_batch_training_iterations_accountaint_04_time_budget(self):
+        mock_training_plan.training_args.return_value = {
+            'epochs': 3,
+            'batch_maxnum': 4,
+            'num_updates': None,
+            'max_train_seconds': 10.,
+        }
+        # one second per batch
+        clock = iter(range(100))
+        with patch('time.perf_counter', side_effect=lambda: float(next(clock))):
+            iter_accountant = MiniBatchTrainingIterationsAccountant(mock_training_plan)
+            tot_steps_counter = 0
+            for epoch in iter_accountant.iterate_epochs():
+                for batch in iter_accountant.iterate_batches():
+                    tot_steps_counter += 1
+        self.assertTrue(iter_accountant.time_budget_exhausted)
+        self.assertEqual(iter_accountant.num_updates_performed, tot_steps_counter)
+        self.assertLess(tot_steps_counter, 3*4)
+
+        # at least one update is performed, even if the budget is consumed before
+        mock_training_plan.training_args.return_value['max_train_seconds'] = 1e-9
+        iter_accountant = MiniBatchTrainingIterationsAccountant(mock_training_plan)
+        for epoch in iter_accountant.iterate_epochs():
+            for batch in iter_accountant.iterate_batches():
+                pass
+        self.assertEqual(iter_accountant.num_updates_performed, 1)
+
+        # no time budget
+        mock_training_plan.training_args.return_value['max_train_seconds'] = None
+        iter_accountant = MiniBatchTrainingIterationsAccountant(mock_training_plan)
+        for epoch in iter_accountant.iterate_epochs():
+            for batch in iter_accountant.iterate_batches():
+                pass
+        self.assertFalse(iter_accountant.time_budget_exhausted)
+        self.assertEqual(iter_accountant.num_updates_performed, 3*4)
+
 
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
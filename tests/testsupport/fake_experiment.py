@@ -32,7 +32,12 @@ class ExperimentMock():
                 training_args: dict = {},
                 save_breakpoints: bool = False,
                 tensorboard: bool = False,
-                experimentation_folder: Union[str, None] = None
+                experimentation_folder: Union[str, None] = None,
+                round_timeout: Union[float, None] = None,
+                round_quorum: Union[int, float, None] = None,
+                late_replies_policy: str = 'discard',
+                retain_rounds: Union[int, None] = None,
+                pipelined_rounds: bool = False
                 ):
         """ Constructor of the class.
 
@@ -45,17 +50,18 @@ class ExperimentMock():
         self._node_selection_strategy = node_selection_strategy
         self._round_current = 0
         self._round_limit = round_limit
+        self._round_timeout = round_timeout
+        self._round_quorum = round_quorum
+        self._late_replies_policy = late_replies_policy
+        self._retain_rounds = retain_rounds
+        self._pipelined_rounds = pipelined_rounds
         self._experimentation_folder = experimentation_folder
         self._training_plan_class = training_plan_class
         self._training_plan_path = training_plan_path
         self._model_args = model_args
         self._training_args = TrainingArgs(only_required=False)
         self.aggregator_args = {}
-        class Job:
-            def load_state(self, saved_state):
-                self._saved_state = saved_state
-
-        self._job = Job() # minimal
+        self._job = JobMock() # minimal
         self._aggregated_params = {}
         self._save_breakpoints = save_breakpoints
         self._monitor = tensorboard # minimal
@@ -68,3 +74,12 @@ class ExperimentMock():
         """
         self._round_current = round_current
         return self._round_current
+
+
+class JobMock:
+    """Minimal `Job` of a mocked experiment"""
+    def load_state(self, saved_state, retain_rounds=None):
+        self._saved_state = saved_state
+
+    def load_breakpoint_params(self, params_path, to_params=True):
+        return None